@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+Compare the gevent query path with the asyncio query path under concurrent load: the
+install depend query and a page of the binary package list are run by many concurrent
+requests, greenlets on the gevent path and tasks of one event loop on the asyncio path.
+The queries run against the memory elasticsearch of memory_es.py, every request to it
+waits for --latency seconds like a round trip to a server.
+
+usage:
+    PYTHONPATH=packageship:. SETTINGS_FILE_PATH=packageship/package.ini \
+        python3 benchmarks/bench_async.py --sources 500 --concurrency 1,10,50 \
+        --latency 0.002 [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import gevent
+
+from synthetic import add_arguments, generate, repo_options
+from memory_es import MemoryElasticsearch, memory_elasticsearch
+from bench_suite import Suite
+
+
+class Workload:
+    """
+    The requests of a scenario on both query paths
+
+    Attributes:
+        name: name of the scenario
+        run_gevent: function running one request on the gevent path
+        run_async: coroutine function running one request on the asyncio path
+    """
+
+    def __init__(self, name, run_gevent, run_async):
+        self.name = name
+        self.run_gevent = run_gevent
+        self.run_async = run_async
+
+
+def workloads(suite, level):
+    """
+    Description: The install depend query of the root package and a page of the binary packages
+    """
+    from packageship.application.core.depend.install_depend import InstallDepend
+    from packageship.application.core.pkginfo.pkg import Package
+
+    databases = suite.databases
+    names = suite._repos[0].binary_names[:1]
+
+    def install_depend():
+        depend = InstallDepend(db_list=databases)
+        depend.install_depend(list(names), level=level)
+        return len(depend.binary_dict)
+
+    async def async_install_depend():
+        depend = InstallDepend(db_list=databases)
+        await depend.async_install_depend(list(names), level=level)
+        return len(depend.binary_dict)
+
+    def bin_page():
+        return len(Package().all_bin_packages(databases[0], page_num=2, page_size=100)["data"])
+
+    async def async_bin_page():
+        return len((await Package().async_all_bin_packages(databases[0], page_num=2, page_size=100))["data"])
+
+    return [Workload("installdep_level%d" % level, install_depend, async_install_depend),
+            Workload("list_bin_page", bin_page, async_bin_page)]
+
+
+def _summary(latencies, wall):
+    latencies = sorted(latencies)
+    return dict(wall=wall, throughput=len(latencies) / wall if wall else 0.0,
+                median=statistics.median(latencies),
+                p95=latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))])
+
+
+def run_gevent(workload, concurrency):
+    """
+    Description: Run the requests in concurrent greenlets
+
+    Returns:
+        wall time, throughput, median and p95 latency of the requests, result of a request
+    """
+    latencies = []
+
+    def request():
+        start = time.perf_counter()
+        result = workload.run_gevent()
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    start = time.perf_counter()
+    jobs = [gevent.spawn(request) for _ in range(concurrency)]
+    gevent.joinall(jobs, raise_error=True)
+    return _summary(latencies, time.perf_counter() - start), jobs[0].value
+
+
+async def run_async(workload, concurrency):
+    """
+    Description: Run the requests in concurrent tasks of the event loop
+
+    Returns:
+        wall time, throughput, median and p95 latency of the requests, result of a request
+    """
+    latencies = []
+
+    async def request():
+        start = time.perf_counter()
+        result = await workload.run_async()
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[request() for _ in range(concurrency)])
+    return _summary(latencies, time.perf_counter() - start), results[0]
+
+
+async def run_all(suite, args):
+    """
+    Description: Run every workload at every concurrency on both paths, in the event loop
+                 of the asyncio client
+    """
+    from packageship.application.database.session import DatabaseSession
+
+    results = dict()
+    print("%-24s %6s %8s %10s %10s %10s %8s" % (
+        "scenario", "conc", "path", "wall(s)", "req/s", "p95(s)", "result"))
+    try:
+        for workload in workloads(suite, args.level):
+            for concurrency in [int(value) for value in args.concurrency.split(",")]:
+                for path in ("gevent", "asyncio"):
+                    MemoryElasticsearch.calls.clear()
+                    if path == "gevent":
+                        summary, result = run_gevent(workload, concurrency)
+                    else:
+                        summary, result = await run_async(workload, concurrency)
+                    summary.update(result=result, es_calls=sum(MemoryElasticsearch.calls.values()))
+                    results["%s_c%d_%s" % (workload.name, concurrency, path)] = summary
+                    print("%-24s %6d %8s %10.4f %10.1f %10.4f %8s" % (
+                        workload.name, concurrency, path, summary["wall"], summary["throughput"],
+                        summary["p95"], result))
+    finally:
+        await DatabaseSession().connection().async_close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_arguments(parser)
+    parser.add_argument("--concurrency", default="1,10,50", help="comma separated numbers of concurrent requests")
+    parser.add_argument("--latency", type=float, default=0.002,
+                        help="seconds every elasticsearch request waits for")
+    parser.add_argument("--level", type=int, default=0, help="level of the install depend query, 0 is all")
+    parser.add_argument("--workdir", help="folder of the generated repos, a temporary one by default")
+    parser.add_argument("--output", help="json file of the results")
+    args = parser.parse_args()
+    os.environ.setdefault("SETTINGS_FILE_PATH", "/etc/pkgship/package.ini")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="pkgship-bench-")
+    options = repo_options(args)
+    conf_path, repos = generate(workdir, **options)
+    with memory_elasticsearch():
+        suite = Suite(conf_path, repos, workdir, [args.level])
+        suite.init()
+        MemoryElasticsearch.latency = args.latency
+        results = asyncio.run(run_all(suite, args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(dict(repos=options, latency=args.latency, results=results), file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
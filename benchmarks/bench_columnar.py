@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+Benchmark the size, write time and read time of the csv, parquet and arrow exports
+of a large selfdep result and of the package information of a database
+
+usage:
+    PYTHONPATH=packageship:. python3 benchmarks/bench_columnar.py --binaries 3000
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from packageship.application.common.export import ColumnarIo
+from packageship.application.core.depend.down_load import Download
+from bench_download import selfdep_result
+
+try:
+    import pyarrow
+    from pyarrow import ipc
+    from pyarrow import parquet
+except ImportError:
+    pyarrow = None
+
+
+def package_info(packages, seed=0):
+    """
+    Package information of a synthetic database
+
+    Returns:
+        the rows of all packages
+    """
+    rand = random.Random(seed)
+    licenses = ["GPLv2+", "GPLv3+", "LGPLv2+", "MIT", "BSD", "ASL 2.0"]
+    return {"data": [dict(pkg_name="package%d" % index, license=rand.choice(licenses),
+                          version="%d.%d" % (rand.randrange(10), rand.randrange(100)),
+                          url="https://example.org/package%d" % index, database="os-version")
+                     for index in range(packages)]}
+
+
+def csv_bytes(rows):
+    """csv file of the rows"""
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def timed(func):
+    """seconds of a call and its result"""
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def package_download(info):
+    """Download of the package information of a synthetic database"""
+    download = Download()
+    download.pkg = type("Package", (), {
+        "iter_bin_packages": staticmethod(lambda database, package_list=None: iter(info["data"]))})
+    return download
+
+
+def export(depend, info, file_format):
+    """
+    Export the dependencies and the package information in a format
+
+    Returns:
+        file names and their bytes
+    """
+    if file_format == "csv":
+        files = Download(depend=depend).depend_files() + \
+            package_download(info).package_files("bin", "os-version")
+        return [(name, csv_bytes(rows)) for name, rows in files]
+    tables = Download(depend=depend).depend_columns() + \
+        package_download(info).package_columns("bin", "os-version")
+    return list(ColumnarIo(file_format).files(tables))
+
+
+def read(file_format, data):
+    """read a file of a format"""
+    if file_format == "csv":
+        return list(csv.reader(io.StringIO(data.decode("utf-8"))))
+    if file_format == "parquet":
+        return parquet.read_table(pyarrow.BufferReader(data))
+    return ipc.open_file(pyarrow.BufferReader(data)).read_all()
+
+
+def main():
+    """run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--binaries", type=int, default=3000)
+    parser.add_argument("--packages", type=int, default=50000)
+    args = parser.parse_args()
+
+    depend = selfdep_result(args.binaries, fanout=3)
+    info = package_info(args.packages)
+    file_formats = ["csv", "parquet", "arrow"] if pyarrow is not None else ["csv"]
+    for file_format in file_formats:
+        write_seconds, files = timed(lambda: export(depend, info, file_format))
+        print("%s: export %.3fs" % (file_format, write_seconds))
+        for name, data in files:
+            read_seconds, _ = timed(lambda: read(file_format, data))
+            print("    %-32s %12d bytes  read %.3fs" % (name, len(data), read_seconds))
+    if pyarrow is None:
+        print("pyarrow is not installed, only csv is measured")
+
+
+if __name__ == "__main__":
+    main()
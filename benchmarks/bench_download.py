@@ -0,0 +1,238 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+Benchmark the dependinfo/downloadfiles interface on a large selfdep result against
+the implementation it replaced, which wrote the csv files into a temporary folder
+and compressed them into memory before sending
+
+usage:
+    PYTHONPATH=packageship:. SETTINGS_FILE_PATH=packageship/package.ini \
+        python3 benchmarks/bench_download.py --binaries 3000 --repeat 3
+"""
+import argparse
+import copy
+import csv
+import json
+import os
+import random
+import shutil
+import time
+import tracemalloc
+import zipfile
+from io import BytesIO
+from unittest import mock
+from packageship.application.core.depend.basedepend import BaseDepend
+from packageship.application.core.depend.down_load import Download
+
+
+class LegacyDownload(Download):
+    """
+    The csv export before the path stack rewrite, kept as the baseline of the benchmark
+    """
+
+    def _Download__get_depends(self, pkg_name, get_type):
+        data = self.build_data if get_type == 'build' else self.install_data
+        if pkg_name not in data:
+            return []
+        return copy.deepcopy(data[pkg_name].get(get_type, []))
+
+    def _legacy_write_row(self, lst, res_type, names_set, pkg=None):
+        local_lst = copy.deepcopy(lst)
+        csv_writer = self.install_csv_writer if res_type == "install" else self.build_csv_writer
+        if not pkg:
+            csv_writer.writerow(local_lst)
+            return lst
+        names_set.add(pkg)
+        new_row = self._Download__get_single_df_row(pkg, res_type)
+        if not new_row:
+            csv_writer.writerow(local_lst)
+            return lst
+        local_lst.extend([pkg, *new_row])
+        if pkg in lst:
+            local_lst.append("1")
+        csv_writer.writerow(local_lst)
+        return lst
+
+    def _legacy_data_to_csv(self, pkg_name, names_set, res_type="install"):
+        num = self.install_count if res_type == "install" else self.build_count
+        _stack = [self._Download__get_depends(pkg_name, res_type)]
+        rows = self._Download__get_single_df_row(pkg_name, res_type)
+        if not rows:
+            return names_set
+        df_row = [pkg_name, *rows]
+        while _stack:
+            while not _stack[-1]:
+                if len(_stack) == 1:
+                    _stack.pop()
+                    break
+                _stack.pop()
+                df_row = df_row[:-num]
+            if not _stack:
+                break
+            next_pkg = _stack[-1].pop()
+            if not next_pkg:
+                continue
+            if next_pkg not in df_row and next_pkg not in names_set:
+                names_set.add(next_pkg)
+                rows = self._Download__get_single_df_row(next_pkg, res_type)
+                if not rows:
+                    continue
+                df_row.extend([next_pkg, *rows])
+                depends = self._Download__get_depends(next_pkg, res_type)
+                if depends:
+                    _stack.append(depends)
+                else:
+                    df_row = self._legacy_write_row(df_row, res_type, names_set)
+                    df_row = df_row[:-num]
+                    continue
+            else:
+                df_row = self._legacy_write_row(df_row, res_type, names_set, pkg=next_pkg)
+        return names_set
+
+    def _legacy_write(self, file_name, res_type, names):
+        with open(os.path.join(self.folder_path, file_name), "a+", encoding="utf-8",
+                  newline="") as csv_file:
+            setattr(self, res_type + "_csv_writer", csv.writer(csv_file))
+            names_set = set()
+            for name in names:
+                names_set = self._legacy_data_to_csv(name, names_set, res_type)
+
+    def legacy_run(self):
+        """
+        The csv files of the dependencies written into a folder
+
+        Returns:
+            folder path
+        """
+        if not any([self.build_data, self.install_data, self.full_depend_data]):
+            return None
+        self._update_build_dict_data()
+        self._Download__create_folder_path()
+        with open(os.path.join(self.folder_path, "full_amount_data.csv"), "a+", newline="",
+                  encoding="utf-8") as full_csv:
+            csv.writer(full_csv).writerows(self._Download__full_depend_rows())
+        if self.depend_type == "bedep":
+            return self.folder_path
+        self._legacy_write("install_data.csv", "install",
+                           self.binary_packages or self.package_name)
+        if self.depend_type in ["selfdep", "builddep"]:
+            self._legacy_write("build.csv", "build", self.package_name)
+        return self.folder_path
+
+
+def legacy_download(depend):
+    """
+    Export and compress the csv files the way the interface did before
+
+    Returns:
+        the zip file
+    """
+    folder_path = LegacyDownload(depend=depend).legacy_run()
+    memory_file = BytesIO()
+    with zipfile.ZipFile(memory_file, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for file_name in os.listdir(folder_path):
+            with open(os.path.join(folder_path, file_name), "rb") as file_content:
+                zip_file.writestr(file_name, file_content.read())
+    shutil.rmtree(folder_path)
+    return memory_file.getvalue()
+
+
+def selfdep_result(binaries, fanout, seed=0):
+    """
+    A synthetic selfdep result with long install and build chains
+
+    Args:
+        binaries: number of binary packages
+        fanout: number of install requires of a binary package
+        seed: random seed
+    Returns:
+        depend instance
+    """
+    rand = random.Random(seed)
+    depend = BaseDepend()
+    sources = max(1, binaries // 3)
+    for index in range(binaries):
+        # Every package requires the next one, so the install chains are long
+        requires = {"bin%d" % (index + 1)} if index + 1 < binaries else set()
+        requires.update("bin%d" % rand.randrange(binaries) for _ in range(fanout - 1))
+        depend.binary_dict["bin%d" % index] = dict(
+            name="bin%d" % index, version="1.0-%d" % index, source_name="src%d" % (index % sources),
+            database="os-version", install=sorted(requires), build=[])
+    for index in range(sources):
+        depend.source_dict["src%d" % index] = dict(
+            name="src%d" % index, version="1.0", database="os-version",
+            build=["bin%d" % rand.randrange(binaries) for _ in range(fanout)])
+    depend.dependency_type = "selfdep"
+    depend.packagename = ["src0"]
+    return depend
+
+
+def download(client):
+    """
+    Download the selfdep csv files through the interface
+
+    Returns:
+        the zip file
+    """
+    body = {"packagename": ["src0"], "depend_type": "selfdep",
+            "parameter": {"db_priority": ["os-version"]}}
+    response = client.post("/dependinfo/downloadfiles", data=json.dumps(body),
+                           content_type="application/json")
+    return response.data
+
+
+def measure(func, repeat):
+    """
+    Best time and peak memory of a function
+
+    Returns:
+        seconds, peak bytes and size of the zip file
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak, len(data)
+
+
+def main():
+    """run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--binaries", type=int, default=3000)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from packageship.application import init_app
+    client = init_app("query").test_client()
+    depend = selfdep_result(args.binaries, args.fanout)
+    with mock.patch("packageship.application.core.depend.DispatchDepend.execute",
+                    return_value=depend), \
+            mock.patch("packageship.application.serialize.dependinfo.get_db",
+                       return_value=["os-version"]):
+        for name, func in (("legacy", lambda: legacy_download(depend)),
+                           ("current", lambda: download(client))):
+            seconds, peak, size = measure(func, args.repeat)
+            print("%-8s best %.3fs  peak memory %.1f MiB  zip %d bytes" % (
+                name, seconds, peak / 1024 / 1024, size))
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SETTINGS_FILE_PATH", "/etc/pkgship/package.ini")
+    main()
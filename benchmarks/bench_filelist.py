@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+Benchmark the file list decoding of a binary package with many files against the
+implementation it replaced, which de-duplicated the paths with linear list lookups
+
+usage:
+    PYTHONPATH=packageship:. SETTINGS_FILE_PATH=packageship/package.ini \
+        python3 benchmarks/bench_filelist.py --files 20000 --repeat 3
+"""
+import argparse
+import random
+import time
+
+from packageship.application.core.pkginfo.pkg import BinaryPackage
+
+
+def legacy_parse_filelist_info(filelists):
+    """
+    The file list decoding before the rewrite, kept as the baseline of the benchmark
+    """
+
+    def is_append(lst, data):
+        if data not in lst:
+            lst.append(data)
+        return lst
+
+    filelist_dict = {
+        "dir": [],
+        "file": [],
+        "ghost": []
+    }
+    for info in filelists:
+        all_list = list(
+            map(lambda x: info["dirname"] + '/' + x, info["filenames"].split("/")))
+
+        for index, type_ in enumerate(info["filetypes"]):
+            if type_ == "d":
+                is_append(filelist_dict["dir"], all_list[index])
+            elif type_ == "f":
+                is_append(filelist_dict["file"], all_list[index])
+            elif type_ == "g":
+                is_append(filelist_dict["ghost"], all_list[index])
+    return filelist_dict
+
+
+def generate_filelists(files, files_per_dir=40, seed=0):
+    """
+    File lists of a package shaped like the primary database of a repository,
+    every directory lists its files joined by '/', a few files are repeated
+
+    Args:
+        files: number of files of the package
+        files_per_dir: average number of files of a directory
+        seed: seed of the random generator
+    """
+    rand = random.Random(seed)
+    filelists = []
+    created = 0
+    while created < files:
+        dirname = "/usr/share/texlive/texmf-dist/%s/%d" % (rand.choice(("tex", "fonts", "doc")), len(filelists))
+        number = min(rand.randint(1, 2 * files_per_dir), files - created)
+        names = ["file%d.%s" % (index, rand.choice(("sty", "tfm", "pdf"))) for index in range(number)]
+        types = "".join(rand.choice("fffffffdg") for _ in names)
+        # Repeated entries of the same directory are de-duplicated by the decoder
+        if filelists and rand.random() < 0.05:
+            filelists.append(dict(filelists[-1]))
+        filelists.append(dict(dirname=dirname, filenames="/".join(names), filetypes=types))
+        created += number
+    return filelists
+
+
+def timed(func, repeat):
+    """
+    Best time of several runs of a function, and its result
+    """
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    """
+    Run the benchmark and print the results
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    filelists = generate_filelists(args.files)
+    package = BinaryPackage()
+    legacy_time, legacy = timed(lambda: legacy_parse_filelist_info(filelists), args.repeat)
+    new_time, new = timed(lambda: package.parse_filelist_info(filelists), args.repeat)
+    page_time, page = timed(lambda: package.filelist_page(filelists, offset=100, limit=100), args.repeat)
+    compressed_time, compressed = timed(
+        lambda: package.parse_filelist_info(filelists, compressed=True), args.repeat)
+
+    assert legacy == new, "the decoded file lists differ"
+    assert page[0]["file"] == new["file"][100:200]
+    assert sum(len(group["filenames"]) for group in compressed["file"]) == len(new["file"])
+    print("files: %d in %d directories" % (sum(len(files) for files in new.values()), len(filelists)))
+    print("legacy list:      %8.3fs" % legacy_time)
+    print("list:             %8.3fs" % new_time)
+    print("page of 100:      %8.3fs" % page_time)
+    print("compressed:       %8.3fs" % compressed_time)
+
+
+if __name__ == "__main__":
+    main()
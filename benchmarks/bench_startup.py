@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+Measure the startup of short pkgship command lines: every command line is run --repeat
+times in a new interpreter, the median wall time is reported with the imports taking the
+most cumulative time under python -X importtime. With --ref the pkgship of a git revision
+is measured the same way, to compare the startup before and after a change.
+
+usage:
+    SETTINGS_FILE_PATH=packageship/package.ini \
+        python3 benchmarks/bench_startup.py --repeat 10 [--ref HEAD~1] [--top 8] \
+        [--output results.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Command lines answered without a query, the startup is all of their time
+COMMAND_LINES = ["--help", "installdep --help", "list --help", "dbs --help", "-v"]
+
+
+def _command(package_path, command_line, importtime=False):
+    """
+    Description: Arguments and environment of a pkgship command line of the source folder
+    """
+    env = dict(os.environ, PYTHONPATH=package_path)
+    env.setdefault("SETTINGS_FILE_PATH", os.path.join(ROOT, "packageship", "package.ini"))
+    args = [sys.executable] + (["-X", "importtime"] if importtime else [])
+    return args + [os.path.join(package_path, "pkgship")] + command_line.split(), env
+
+
+def top_imports(stderr, top):
+    """
+    Description: The modules imported by pkgship itself taking the most cumulative time
+
+    Args:
+        stderr: output of python -X importtime
+        top: number of modules
+    Returns:
+        list of module name and cumulative milliseconds
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((name.strip(), int(cumulative) / 1000))
+    imports.sort(key=lambda item: item[1], reverse=True)
+    return imports[:top]
+
+
+def measure(package_path, command_line, repeat, top):
+    """
+    Description: Wall time of the command line and its slowest imports
+
+    Returns:
+        median and min wall seconds, slowest imports
+    """
+    walls = []
+    for _ in range(repeat):
+        args, env = _command(package_path, command_line)
+        start = time.perf_counter()
+        subprocess.run(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        walls.append(time.perf_counter() - start)
+    args, env = _command(package_path, command_line, importtime=True)
+    stderr = subprocess.run(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            universal_newlines=True, check=False).stderr
+    return dict(median=statistics.median(walls), min=min(walls), imports=top_imports(stderr, top))
+
+
+def checkout(ref, folder):
+    """
+    Description: Extract the pkgship source of a git revision into the folder
+
+    Returns:
+        source folder of the revision
+    """
+    archive = subprocess.run(["git", "-C", ROOT, "archive", ref, "packageship"],
+                             stdout=subprocess.PIPE, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", folder], input=archive, check=True)
+    return os.path.join(folder, "packageship")
+
+
+def run_all(sources, args):
+    """
+    Description: Measure every command line of every source folder
+    """
+    results = dict()
+    print("%-20s %-10s %10s %10s   %s" % ("command", "source", "median(s)", "min(s)", "slowest imports (ms)"))
+    for command_line in args.commands.split(","):
+        for source, package_path in sources.items():
+            result = measure(package_path, command_line, args.repeat, args.top)
+            results["%s %s" % (source, command_line)] = result
+            print("%-20s %-10s %10.4f %10.4f   %s" % (
+                command_line, source, result["median"], result["min"],
+                ", ".join("%s %.0f" % (name, cumulative) for name, cumulative in result["imports"][:3])))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--commands", default=",".join(COMMAND_LINES),
+                        help="comma separated pkgship command lines")
+    parser.add_argument("--repeat", type=int, default=10, help="runs of every command line")
+    parser.add_argument("--top", type=int, default=8, help="number of the slowest imports kept in the results")
+    parser.add_argument("--ref", help="git revision measured as well, to compare with the working tree")
+    parser.add_argument("--output", help="json file of the results")
+    args = parser.parse_args()
+
+    sources = dict(tree=os.path.join(ROOT, "packageship"))
+    folder = tempfile.mkdtemp(prefix="pkgship-bench-")
+    try:
+        if args.ref:
+            sources[args.ref] = checkout(args.ref, folder)
+        results = run_all(sources, args)
+    finally:
+        shutil.rmtree(folder)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(dict(repeat=args.repeat, results=results), file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+Run the scenarios of pkgship on synthetic repos: the initialization, the install, build,
+self and be depend queries at several levels, the package info, the package lists,
+the compare and the download. The repos are generated with synthetic.py and the
+queries run against the memory elasticsearch of memory_es.py, so the results only
+depend on the code and on the machine. The redis cache is cleared before every run
+unless --warm is given, redis is optional.
+
+The results are written as json to --output, and compared with the results of an
+older run given with --baseline: the exit status is 1 when the median of a scenario
+is slower than the baseline by more than --tolerance.
+
+usage:
+    PYTHONPATH=packageship:. SETTINGS_FILE_PATH=packageship/package.ini \
+        python3 benchmarks/bench_suite.py --sources 2000 --fanout 6 --repeat 3 \
+        --output results.json [--baseline baseline.json] [--scenarios installdep,list]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from synthetic import add_arguments, generate, repo_options
+from memory_es import MemoryElasticsearch, memory_elasticsearch
+
+SUCCESS_CODE = "200"
+
+
+class Scenario:
+    """
+    A named operation of pkgship, timed several times
+
+    Attributes:
+        name: name of the scenario, the key of its results
+        group: the scenarios selected with --scenarios
+        func: the operation, returns a short description of its result
+    """
+
+    def __init__(self, name, group, func):
+        self.name = name
+        self.group = group
+        self.func = func
+
+
+class Suite:
+    """
+    The scenarios on the databases initialized from the synthetic repos
+    """
+
+    def __init__(self, conf_path, repos, workdir, levels):
+        # The packageship modules connect to elasticsearch when they are imported
+        from packageship.application import init_app
+        from packageship.application.initialize.integration import InitializeService
+        from packageship.libs.conf import configuration
+
+        configuration.TEMPORARY_DIRECTORY = os.path.join(workdir, "tmp")
+        self._initialize = InitializeService
+        self._conf_path = conf_path
+        self._repos = repos
+        self._workdir = workdir
+        self._levels = levels
+        app = init_app("query")
+        # The runs of a scenario would soon be rejected by the rate limits of the service
+        app.extensions["limiter"].enabled = False
+        self._client = app.test_client()
+
+    @property
+    def databases(self):
+        return [repo.dbname for repo in self._repos]
+
+    def clear_cache(self):
+        """
+        Description: Remove the results cached in redis, like pkgship init does
+        """
+        self._initialize._redis()
+
+    def init(self):
+        service = self._initialize()
+        service.import_depend(path=self._conf_path)
+        if not service.success:
+            raise RuntimeError("failed to initialize %s" % service.fail)
+        return "%d databases" % len(self.databases)
+
+    def _post(self, url, body):
+        response = self._client.post(url, json=body)
+        if response.mimetype == "application/json":
+            data = response.get_json()
+            if data.get("code") != SUCCESS_CODE:
+                raise RuntimeError("%s %s: %s" % (url, json.dumps(body), data.get("message")))
+            statistics_info = data["resp"].get("statistics") if isinstance(data.get("resp"), dict) else None
+            if statistics_info:
+                # The last row is the sum of the databases
+                return "%d binary, %d source" % (
+                    statistics_info[-1]["binarys_sum"], statistics_info[-1]["sources_sum"])
+        return "%d bytes" % len(response.get_data())
+
+    def _get(self, url):
+        response = self._client.get(url)
+        data = response.get_json()
+        if data.get("code") != SUCCESS_CODE:
+            raise RuntimeError("%s: %s" % (url, data.get("message")))
+        resp = data.get("resp")
+        return "%d items" % len(resp) if isinstance(resp, (list, dict)) else ""
+
+    def depend(self, depend_type, level, url="/dependinfo/dependlist"):
+        """
+        Description: A depend query of the root packages of the dependency graph, the be
+                     depend query asks for the packages of the last layer
+        """
+        base = self._repos[0]
+        parameter = dict(level=level) if level else dict()
+        if depend_type == "installdep":
+            names = base.binary_names[:1]
+        elif depend_type == "bedep":
+            names = base.binary_names[-1:]
+            parameter.update(packtype="binary")
+        else:
+            names = base.source_names[:1]
+        if depend_type == "selfdep":
+            parameter.update(packtype="source", self_build=True, with_subpack=True)
+        parameter["db_priority"] = self.databases[:1] if depend_type == "bedep" else self.databases
+        return self._post(url, dict(packagename=names, depend_type=depend_type, parameter=parameter))
+
+    def pkginfo(self, package_type):
+        base = self._repos[0]
+        name = base.source_names[0] if package_type == "src" else base.binary_names[0]
+        return self._get("/packages/%s/%s?database_name=%s" % (package_type, name, base.dbname))
+
+    def package_list(self, package_type, page_num, page_size=100):
+        return self._get("/packages/%s?database_name=%s&page_num=%d&page_size=%d" % (
+            package_type, self._repos[0].dbname, page_num, page_size))
+
+    def compare(self, depend_type):
+        from packageship.application.core.compare.compare_repo import CompareRepo
+        from packageship.application.core.compare.query_depend import QueryDepend
+
+        out_path = tempfile.mkdtemp(dir=self._workdir)
+        depend_chunks = QueryDepend().iter_depend_info(depend_type=depend_type, dbs=self.databases)
+        if not CompareRepo(out_path=out_path, dbs=self.databases).stream_compare(depend_chunks):
+            raise RuntimeError("failed to compare %s" % self.databases)
+        return "%d files" % len(os.listdir(out_path))
+
+    def scenarios(self):
+        """
+        Description: The scenarios in the order they run, init runs first so the
+                     databases exist for the other ones
+        """
+        scenarios = [Scenario("init", "init", self.init)]
+        for depend_type in ("installdep", "builddep", "selfdep", "bedep"):
+            for level in self._levels:
+                scenarios.append(Scenario(
+                    "%s_level%d" % (depend_type, level), depend_type,
+                    lambda depend_type=depend_type, level=level: self.depend(depend_type, level)))
+        scenarios.extend([
+            Scenario("pkginfo_src", "pkginfo", lambda: self.pkginfo("src")),
+            Scenario("pkginfo_bin", "pkginfo", lambda: self.pkginfo("bin")),
+            Scenario("list_src_first_page", "list", lambda: self.package_list("src", 1)),
+            Scenario("list_bin_last_page", "list", lambda: self.package_list(
+                "bin", max(len(self._repos[0].binaries) // 100, 1))),
+        ])
+        if len(self._repos) > 1:
+            scenarios.extend(Scenario("compare_%s" % depend_type, "compare",
+                                      lambda depend_type=depend_type: self.compare(depend_type))
+                             for depend_type in ("install", "build"))
+        scenarios.extend(
+            Scenario("download_%s" % depend_type, "download",
+                     lambda depend_type=depend_type: self.depend(
+                         depend_type, 0, url="/dependinfo/downloadfiles"))
+            for depend_type in ("installdep", "selfdep"))
+        return scenarios
+
+
+def measure(scenario, repeat, before=None):
+    """
+    Description: Run a scenario several times
+
+    Args:
+        scenario: the scenario
+        repeat: number of runs
+        before: function run before every run, not timed
+    Returns:
+        the times in seconds, the number of elasticsearch calls of one run and the result
+    """
+    times = []
+    result = None
+    MemoryElasticsearch.calls.clear()
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = scenario.func()
+        times.append(time.perf_counter() - start)
+    calls = {name: count // repeat for name, count in sorted(MemoryElasticsearch.calls.items())}
+    return times, calls, result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_baseline(results, baseline, tolerance):
+    """
+    Description: The scenarios slower than in the baseline
+
+    Args:
+        results: results of this run
+        baseline: results of the baseline run
+        tolerance: allowed slowdown of the median, 0.2 is 20%
+    Returns:
+        list of the name, the baseline median, the median of the regressed scenarios
+    """
+    regressions = []
+    for name, result in results["scenarios"].items():
+        old = baseline.get("scenarios", dict()).get(name)
+        if old and result["median"] > old["median"] * (1 + tolerance):
+            regressions.append((name, old["median"], result["median"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--levels", default="1,3,0",
+                        help="levels of the depend queries, 0 is all the levels")
+    parser.add_argument("--scenarios", default="",
+                        help="comma separated groups: init, installdep, builddep, selfdep, bedep, "
+                             "pkginfo, list, compare, download; all of them by default")
+    parser.add_argument("--warm", action="store_true", help="keep the redis cache between the runs")
+    parser.add_argument("--workdir", help="folder of the generated repos, a temporary one by default")
+    parser.add_argument("--output", help="json file of the results")
+    parser.add_argument("--baseline", help="json file of the results of an older run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown of a scenario compared with the baseline")
+    args = parser.parse_args()
+    os.environ.setdefault("SETTINGS_FILE_PATH", "/etc/pkgship/package.ini")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="pkgship-bench-")
+    options = repo_options(args)
+    start = time.perf_counter()
+    conf_path, repos = generate(workdir, **options)
+    print("generated %d databases of %d source and %d binary packages in %.3fs" % (
+        len(repos), len(repos[0].sources), len(repos[0].binaries), time.perf_counter() - start))
+
+    groups = set(filter(None, args.scenarios.split(",")))
+    results = dict(
+        metadata=dict(commit=_git_commit(), python=platform.python_version(),
+                      platform=platform.platform(), date=datetime.now().isoformat(timespec="seconds"),
+                      repeat=args.repeat, warm=args.warm, repos=options),
+        scenarios=dict())
+    with memory_elasticsearch():
+        suite = Suite(conf_path, repos, workdir, [int(level) for level in args.levels.split(",")])
+        before = None if args.warm else suite.clear_cache
+        print("%-28s %10s %10s %10s  %s" % ("scenario", "min(s)", "median(s)", "max(s)", "result"))
+        for scenario in suite.scenarios():
+            # The databases are needed by every other scenario
+            if groups and scenario.group not in groups and scenario.name != "init":
+                continue
+            times, calls, result = measure(scenario, 1 if scenario.name == "init" and groups
+                                           and "init" not in groups else args.repeat, before)
+            if groups and scenario.group not in groups:
+                continue
+            results["scenarios"][scenario.name] = dict(
+                min=min(times), median=statistics.median(times), max=max(times),
+                times=times, es_calls=calls, result=result)
+            print("%-28s %10.4f %10.4f %10.4f  %s" % (
+                scenario.name, min(times), statistics.median(times), max(times), result))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if not args.baseline:
+        return
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline.get("metadata", dict()).get("repos") != options:
+        print("warning: the baseline was run on other repos: %s" % baseline.get("metadata", dict()).get("repos"))
+    regressions = compare_baseline(results, baseline, args.tolerance)
+    for name, old, new in regressions:
+        print("regression %s: %.4fs -> %.4fs (%+.1f%%)" % (name, old, new, (new / old - 1) * 100))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+An elasticsearch kept in memory for the benchmarks, so the query stack of pkgship runs
+without an elasticsearch server. It understands the queries pkgship sends: match_all,
+term and terms filters on keyword fields, from/size, sort with search_after, the
+_source fields, count, scan and bulk. Every term filter is answered with an inverted
+index of the field, and the documents go through json like on the wire, so the time is
+spent where it is spent with a real server, without the network. The latency of the
+network is simulated with MemoryElasticsearch.latency, a cooperative sleep of gevent for
+the synchronous client and of asyncio for the AsyncElasticsearch client.
+
+usage:
+    with memory_elasticsearch() as client:
+        ...  # import the packageship modules and run pkgship
+"""
+import asyncio
+import contextlib
+import json
+from collections import Counter
+from unittest import mock
+
+import gevent
+from elasticsearch import helpers
+from elasticsearch.exceptions import NotFoundError, RequestError
+
+
+class MemoryIndices:
+    """
+    The indices api of the memory elasticsearch
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def exists(self, index, **kwargs):
+        return all(name in self._client.documents for name in index.split(","))
+
+    def create(self, index, body=None, **kwargs):
+        if index in self._client.documents:
+            raise RequestError(400, "resource_already_exists_exception", index)
+        self._client.documents[index] = []
+        return dict(acknowledged=True, index=index)
+
+    def delete(self, index, **kwargs):
+        missing = [name for name in index.split(",") if name not in self._client.documents]
+        for name in index.split(","):
+            self._client.drop(name)
+        if missing:
+            raise NotFoundError(404, "index_not_found_exception", ",".join(missing))
+        return dict(acknowledged=True)
+
+    def put_settings(self, body, index=None, **kwargs):
+        return dict(acknowledged=True)
+
+
+class MemoryElasticsearch:
+    """
+    The client api of the memory elasticsearch, all the clients share the documents
+
+    Attributes:
+        documents: documents of every index
+        calls: number of requests by api
+        latency: seconds every search and count waits for, like a round trip to a server
+    """
+
+    documents = dict()
+    calls = Counter()
+    latency = 0
+    _inverted = dict()
+
+    def __init__(self, hosts=None, **kwargs):
+        self.indices = MemoryIndices(self)
+
+    @classmethod
+    def reset(cls):
+        """
+        Description: Remove all indices and the counted calls
+        """
+        MemoryElasticsearch.latency = 0
+        cls.documents.clear()
+        cls._inverted.clear()
+        cls.calls.clear()
+
+    @classmethod
+    def drop(cls, index):
+        cls.documents.pop(index, None)
+        cls._forget(index)
+
+    @classmethod
+    def _forget(cls, index):
+        """
+        Description: Remove the inverted indexes of an index, they are shared by all the clients
+        """
+        for key in [key for key in cls._inverted if key[0] == index]:
+            del cls._inverted[key]
+
+    def add(self, index, source):
+        """
+        Description: Index a document, the index is created when it does not exist
+        """
+        self.documents.setdefault(index, []).append(json.loads(json.dumps(source)))
+        self._forget(index)
+
+    def index(self, index, body, doc_type=None, **kwargs):
+        self.calls["index"] += 1
+        self.add(index, body)
+        return dict(result="created", _index=index)
+
+    @staticmethod
+    def _values(source, path):
+        """
+        Description: Values of a dotted field, the lists of objects are flattened
+        """
+        values = [source]
+        for name in path.split("."):
+            found = []
+            for value in values:
+                value = value.get(name) if isinstance(value, dict) else None
+                if isinstance(value, list):
+                    found.extend(value)
+                elif value is not None:
+                    found.append(value)
+            values = found
+        return values
+
+    def _inverted_index(self, index, field):
+        key = (index, field)
+        if key not in self._inverted:
+            inverted = dict()
+            for position, source in enumerate(self.documents[index]):
+                for value in self._values(source, field):
+                    if not isinstance(value, (dict, list)):
+                        inverted.setdefault(value, []).append(position)
+            self._inverted[key] = inverted
+        return self._inverted[key]
+
+    def _match(self, index, query):
+        """
+        Description: Positions of the documents of the index matching the query
+        """
+        query = query or dict(match_all={})
+        if "match_all" in query:
+            return range(len(self.documents[index]))
+        if "bool" in query:
+            positions = None
+            filters = query["bool"].get("filter", [])
+            for clause in filters if isinstance(filters, list) else [filters]:
+                matched = set(self._match(index, clause))
+                positions = matched if positions is None else positions & matched
+            return sorted(positions) if positions is not None else range(len(self.documents[index]))
+        for kind in ("term", "terms"):
+            if kind in query:
+                (field, values), = query[kind].items()
+                if kind == "term":
+                    values = [values.get("value") if isinstance(values, dict) else values]
+                inverted = self._inverted_index(index, field)
+                positions = set()
+                for value in values:
+                    positions.update(inverted.get(value, ()))
+                return sorted(positions)
+        raise RequestError(400, "parsing_exception", "query not supported: %s" % list(query))
+
+    @classmethod
+    def _filter_source(cls, source, fields):
+        """
+        Description: The _source of a hit with only the requested fields
+        """
+        if fields is False:
+            return None
+        if not fields:
+            return source
+        if isinstance(fields, str):
+            fields = [fields]
+        filtered = dict()
+        for field in fields:
+            name, _, sub_field = field.partition(".")
+            if name not in source:
+                continue
+            if not sub_field:
+                filtered[name] = source[name]
+                continue
+            value = source[name]
+            if isinstance(value, list):
+                filtered[name] = [cls._filter_source(item, [sub_field]) for item in value
+                                  if isinstance(item, dict)]
+            elif isinstance(value, dict):
+                filtered[name] = cls._filter_source(value, [sub_field])
+        return filtered
+
+    def _indices(self, index):
+        names = index.split(",")
+        missing = [name for name in names if name not in self.documents]
+        if missing:
+            raise NotFoundError(404, "index_not_found_exception", ",".join(missing))
+        return names
+
+    def _hits(self, index, body):
+        """
+        Description: The index, position and sort values of the documents matching the body
+        """
+        hits = []
+        for name in self._indices(index):
+            hits.extend((name, position, None) for position in self._match(name, body.get("query")))
+        sort = body.get("sort")
+        if sort:
+            fields = []
+            for clause in sort:
+                (field, order), = (clause.items() if isinstance(clause, dict) else [(clause, "asc")])
+                order = order.get("order", "asc") if isinstance(order, dict) else order
+                fields.append((field, order == "desc"))
+            hits = [(name, position, [self.documents[name][position].get(field) for field, _ in fields])
+                    for name, position, _ in hits]
+            for number, (_, reverse) in reversed(list(enumerate(fields))):
+                hits.sort(key=lambda hit: hit[2][number], reverse=reverse)
+            if body.get("search_after"):
+                after = list(body["search_after"])
+                hits = [hit for hit in hits if hit[2] > after]
+        return hits
+
+    def search(self, index, body=None, **kwargs):
+        if self.latency:
+            gevent.sleep(self.latency)
+        return self._search(index, body)
+
+    def _search(self, index, body):
+        self.calls["search"] += 1
+        body = body or dict()
+        hits = self._hits(index, body)
+        start = body.get("from", 0)
+        page = hits[start:start + body.get("size", 10)]
+        result = []
+        for name, position, sort in page:
+            hit = dict(_index=name, _type="_doc", _id="%s-%d" % (name, position), _score=None)
+            source = self._filter_source(self.documents[name][position], body.get("_source"))
+            if source is not None:
+                hit["_source"] = json.loads(json.dumps(source))
+            if sort is not None:
+                hit["sort"] = sort
+            result.append(hit)
+        return dict(took=0, timed_out=False,
+                    hits=dict(total=dict(value=len(hits), relation="eq"), max_score=None, hits=result))
+
+    def count(self, index, body=None, **kwargs):
+        if self.latency:
+            gevent.sleep(self.latency)
+        return self._count(index, body)
+
+    def _count(self, index, body):
+        self.calls["count"] += 1
+        return dict(count=len(self._hits(index, body or dict())))
+
+    def scan(self, index, query=None):
+        """
+        Description: All the documents matching the query, like helpers.scan
+        """
+        self.calls["scan"] += 1
+        query = dict(query or dict())
+        query.pop("sort", None)
+        for name, position, _ in self._hits(index, query):
+            source = self._filter_source(self.documents[name][position], query.get("_source"))
+            yield dict(_index=name, _id="%s-%d" % (name, position),
+                       _source=json.loads(json.dumps(source)))
+
+    def bulk(self, actions):
+        """
+        Description: Index the documents of the actions, like helpers.bulk
+        """
+        self.calls["bulk"] += 1
+        count = 0
+        for action in actions:
+            self.add(action["_index"], action["_source"])
+            count += 1
+        return count, []
+
+
+class MemoryAsyncElasticsearch(MemoryElasticsearch):
+    """
+    The AsyncElasticsearch api of the memory elasticsearch, it shares the documents
+    with the synchronous client
+    """
+
+    async def search(self, index, body=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._search(index, body)
+
+    async def count(self, index, body=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._count(index, body)
+
+    async def index(self, index, body, doc_type=None, **kwargs):
+        return super().index(index, body, doc_type=doc_type, **kwargs)
+
+    async def close(self):
+        return None
+
+
+def _scan(client, query=None, index=None, **kwargs):
+    return client.scan(index, query)
+
+
+def _bulk(client, actions, **kwargs):
+    return client.bulk(actions)
+
+
+@contextlib.contextmanager
+def memory_elasticsearch():
+    """
+    Description: Replace the elasticsearch client and helpers of pkgship with the memory
+                 elasticsearch, before the packageship modules are imported
+    """
+    MemoryElasticsearch.reset()
+    with mock.patch("elasticsearch.Elasticsearch", MemoryElasticsearch), \
+            mock.patch("elasticsearch.AsyncElasticsearch", MemoryAsyncElasticsearch), \
+            mock.patch.object(helpers, "scan", _scan), mock.patch.object(helpers, "bulk", _bulk):
+        yield MemoryElasticsearch()
@@ -0,0 +1,485 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+Generate synthetic repo sources for the benchmarks: the primary and filelists
+metadata of a distribution of configurable size, fan-out and cycle density, written
+as the sqlite or the xml repodata `pkgship init` reads, with the conf.yaml of the
+generated databases. The same seed generates the same repos
+
+usage:
+    python3 benchmarks/synthetic.py --output /tmp/synthetic --sources 5000 \
+        --fanout 6 --cycle-density 0.05 --databases 2 --format sqlite
+"""
+import argparse
+import bz2
+import copy
+import gzip
+import hashlib
+import os
+import random
+import sqlite3
+import tempfile
+from xml.sax.saxutils import quoteattr, escape
+
+import yaml
+
+COMMON_NS = "http://linux.duke.edu/metadata/common"
+RPM_NS = "http://linux.duke.edu/metadata/rpm"
+FILELISTS_NS = "http://linux.duke.edu/metadata/filelists"
+
+PRIMARY_SCHEMA = """
+CREATE TABLE db_info (dbversion INTEGER, checksum TEXT);
+CREATE TABLE packages (pkgKey INTEGER PRIMARY KEY, pkgId TEXT, name TEXT, arch TEXT,
+    version TEXT, epoch TEXT, release TEXT, summary TEXT, description TEXT, url TEXT,
+    time_file INTEGER, time_build INTEGER, rpm_license TEXT, rpm_vendor TEXT, rpm_group TEXT,
+    rpm_buildhost TEXT, rpm_sourcerpm TEXT, rpm_header_start INTEGER, rpm_header_end INTEGER,
+    rpm_packager TEXT, size_package INTEGER, size_installed INTEGER, size_archive INTEGER,
+    location_href TEXT, location_base TEXT, checksum_type TEXT);
+CREATE TABLE files (name TEXT, type TEXT, pkgKey INTEGER);
+CREATE TABLE requires (name TEXT, flags TEXT, epoch TEXT, version TEXT, release TEXT,
+    pkgKey INTEGER, pre BOOLEAN DEFAULT FALSE);
+CREATE TABLE provides (name TEXT, flags TEXT, epoch TEXT, version TEXT, release TEXT, pkgKey INTEGER);
+CREATE TABLE conflicts (name TEXT, flags TEXT, epoch TEXT, version TEXT, release TEXT, pkgKey INTEGER);
+CREATE TABLE obsoletes (name TEXT, flags TEXT, epoch TEXT, version TEXT, release TEXT, pkgKey INTEGER);
+"""
+
+FILELISTS_SCHEMA = """
+CREATE TABLE db_info (dbversion INTEGER, checksum TEXT);
+CREATE TABLE packages (pkgKey INTEGER PRIMARY KEY, pkgId TEXT);
+CREATE TABLE filelist (pkgKey INTEGER, dirname TEXT, filenames TEXT, filetypes TEXT);
+"""
+
+# Directories of the generated files, the first ones are in the primary file list
+BIN_DIRS = ("/usr/bin", "/usr/sbin")
+OTHER_DIRS = ("/usr/lib64", "/usr/share/doc/%s", "/usr/share/%s", "/usr/include/%s")
+
+PACKAGE_FIELDS = ("pkgKey", "pkgId", "name", "arch", "version", "epoch", "release", "summary",
+                  "description", "url", "time_file", "time_build", "rpm_license", "rpm_vendor",
+                  "rpm_group", "rpm_buildhost", "rpm_sourcerpm", "rpm_header_start",
+                  "rpm_header_end", "rpm_packager", "size_package", "size_installed",
+                  "size_archive", "location_href", "location_base", "checksum_type")
+
+
+class SyntheticRepo:
+    """
+    A synthetic distribution. Package i requires packages of a window of the next ones,
+    so the dependencies form a layered graph, and with the probability cycle_density
+    a dependency goes back to a previous package and closes a cycle
+
+    Attributes:
+        dbname: name of the database of the repo
+        sources: source packages, dict of name and package
+        binaries: binary packages, dict of name and package
+    """
+
+    def __init__(self, dbname="synthetic", sources=1000, binaries_per_source=2, fanout=4,
+                 cycle_density=0.05, files_per_binary=10, file_requires=0.1, seed=0):
+        self.dbname = dbname
+        self.sources = dict()
+        self.binaries = dict()
+        self._random = random.Random("%s-%s" % (seed, dbname))
+        self._generate(sources, binaries_per_source, fanout, cycle_density,
+                       files_per_binary, file_requires)
+
+    @property
+    def source_names(self):
+        """
+        Description: Names of the source packages, in the order of the dependency layers
+        """
+        return list(self.sources)
+
+    @property
+    def binary_names(self):
+        """
+        Description: Names of the binary packages, in the order of the dependency layers
+        """
+        return list(self.binaries)
+
+    def _generate(self, sources, binaries_per_source, fanout, cycle_density,
+                  files_per_binary, file_requires):
+        names = ["pkg%05d" % index for index in range(sources)]
+        window = max(fanout * 4, 16)
+        for index, name in enumerate(names):
+            version = "%d.%d.%d" % (1 + index % 5, index % 13, index % 7)
+            source = dict(name=name, version=version, release="1.oe1", requires=[])
+            self.sources[name] = source
+            for sub in range(binaries_per_source):
+                bin_name = name if not sub else "%s-%s" % (name, ("devel", "libs", "help", "tools")[
+                    (sub - 1) % 4] + ("" if sub < 5 else str(sub)))
+                self.binaries[bin_name] = self._binary(bin_name, source, files_per_binary)
+
+        for index, name in enumerate(names):
+            source = self.sources[name]
+            for _ in range(self._random.randint(max(fanout // 2, 1), fanout)):
+                target = self._target(index, len(names), window, cycle_density)
+                if target is not None:
+                    source["requires"].append(self._require(names[target], file_requires, devel=True))
+            for binary in source["binaries"]:
+                for _ in range(self._random.randint(max(fanout // 2, 1), fanout)):
+                    target = self._target(index, len(names), window, cycle_density)
+                    if target is not None:
+                        binary["requires"].append(self._require(names[target], file_requires))
+                binary["requires"] = sorted(set(binary["requires"]) - set(binary["provides"]))
+            source["requires"] = sorted(set(source["requires"]))
+
+    def _binary(self, name, source, files_per_binary):
+        provides = [name, "%s(x86-64)" % name, "lib%s.so.%d()(64bit)" % (name, 1 + len(name) % 3)]
+        files = ["%s/%s" % (BIN_DIRS[index % len(BIN_DIRS)], name if not index else "%s-%d" % (name, index))
+                 for index in range(max(files_per_binary // 4, 1))]
+        for index in range(files_per_binary - len(files)):
+            directory = OTHER_DIRS[index % len(OTHER_DIRS)]
+            if "%s" in directory:
+                directory = directory % name
+            files.append("%s/%s.%d" % (directory, name, index))
+        binary = dict(name=name, version=source["version"], release=source["release"],
+                      source=source["name"], provides=provides, requires=[], files=files,
+                      dirs=sorted({os.path.dirname(path) for path in files
+                                   if name in os.path.dirname(path)}))
+        source.setdefault("binaries", []).append(binary)
+        return binary
+
+    def _target(self, index, total, window, cycle_density):
+        """
+        Description: Index of the source package the package requires
+
+        Args:
+            index: index of the source package
+            total: number of source packages
+            window: number of the next packages a package requires
+            cycle_density: probability of requiring a previous package
+        Returns:
+            the index, None when the last package would require itself
+        """
+        if index and self._random.random() < cycle_density:
+            return self._random.randrange(max(index - window, 0), index)
+        if index == total - 1:
+            return None
+        return self._random.randrange(index + 1, min(index + 1 + window, total))
+
+    def _require(self, source_name, file_requires, devel=False):
+        """
+        Description: A component provided by a binary package of the source package:
+                     a file, a library or the package name
+        """
+        binaries = self.sources[source_name]["binaries"]
+        if devel and len(binaries) > 1:
+            binary = binaries[1]
+        else:
+            binary = self._random.choice(binaries)
+        if self._random.random() < file_requires:
+            return binary["files"][0]
+        return self._random.choice(binary["provides"][::2])
+
+    def mutate(self, dbname, changes=0.1, seed=1):
+        """
+        Description: Another version of the repo, a share of the packages is updated,
+                     removed or has other requires. Used as the compared databases and as
+                     the databases of lower priority
+
+        Args:
+            dbname: name of the database of the new repo
+            changes: share of the changed packages
+            seed: seed of the changes
+        Returns:
+            the new repo
+        """
+        repo = copy.copy(self)
+        repo.dbname = dbname
+        repo.sources = copy.deepcopy(self.sources)
+        rand = random.Random("%s-%s" % (seed, dbname))
+        removed = set()
+        for name, source in list(repo.sources.items()):
+            if rand.random() >= changes:
+                continue
+            action = rand.random()
+            if action < 0.2 and len(repo.sources) > 2:
+                removed.add(name)
+                del repo.sources[name]
+                continue
+            if action < 0.6:
+                major, minor, patch = source["version"].split(".")
+                source["version"] = "%s.%s.%d" % (major, minor, int(patch) + 1)
+            for binary in source["binaries"]:
+                binary["version"] = source["version"]
+                if binary["requires"] and action >= 0.6:
+                    binary["requires"].pop(rand.randrange(len(binary["requires"])))
+        repo.binaries = {binary["name"]: binary for source in repo.sources.values()
+                         for binary in source["binaries"]}
+        return repo
+
+    @staticmethod
+    def _sourcerpm(source):
+        return "%s-%s-%s.src.rpm" % (source["name"], source["version"], source["release"])
+
+    @staticmethod
+    def _rpm(binary):
+        return "%s-%s-%s.x86_64.rpm" % (binary["name"], binary["version"], binary["release"])
+
+    def _package_rows(self, packages, binary):
+        """
+        Description: Rows of the packages table, every package has a pkgKey starting at 1
+        """
+        for pkg_key, package in enumerate(packages, start=1):
+            if binary:
+                location_href = "Packages/" + self._rpm(package)
+                sourcerpm = self._sourcerpm(self.sources[package["source"]])
+            else:
+                location_href = "Packages/" + self._sourcerpm(package)
+                sourcerpm = None
+            row = dict(
+                pkgKey=pkg_key, pkgId=hashlib.sha256(location_href.encode()).hexdigest(),
+                name=package["name"], arch="x86_64" if binary else "src",
+                version=package["version"], epoch="0", release=package["release"],
+                summary="Synthetic package %s" % package["name"],
+                description="Synthetic package %s of the benchmarks" % package["name"],
+                url="https://example.org/%s" % package["name"], time_file=1600000000,
+                time_build=1600000000, rpm_license="MulanPSL-2.0", rpm_vendor="pkgship",
+                rpm_group="Unspecified", rpm_buildhost="localhost", rpm_sourcerpm=sourcerpm,
+                rpm_header_start=4504, rpm_header_end=4504 + pkg_key, rpm_packager="pkgship",
+                size_package=1024 * pkg_key, size_installed=4096 * pkg_key,
+                size_archive=4096 * pkg_key, location_href=location_href, location_base=None,
+                checksum_type="sha256")
+            yield row, package
+
+    def _write_primary(self, path, packages, binary):
+        connection = sqlite3.connect(path)
+        connection.executescript(PRIMARY_SCHEMA)
+        connection.execute("INSERT INTO db_info VALUES (10, ?)", (self.dbname,))
+        for row, package in self._package_rows(packages, binary):
+            connection.execute("INSERT INTO packages VALUES (%s)" % ",".join("?" * len(PACKAGE_FIELDS)),
+                               [row[field] for field in PACKAGE_FIELDS])
+            connection.executemany(
+                "INSERT INTO requires (name, flags, epoch, version, release, pkgKey, pre) "
+                "VALUES (?, NULL, NULL, NULL, NULL, ?, 'FALSE')",
+                [(name, row["pkgKey"]) for name in package["requires"]])
+            if not binary:
+                continue
+            connection.executemany(
+                "INSERT INTO provides VALUES (?, 'EQ', '0', ?, ?, ?)",
+                [(name, package["version"], package["release"], row["pkgKey"]) for name in package["provides"]])
+            connection.executemany(
+                "INSERT INTO files VALUES (?, 'file', ?)",
+                [(path, row["pkgKey"]) for path in package["files"] if path.startswith(BIN_DIRS)])
+        connection.commit()
+        connection.close()
+
+    def _write_filelists(self, path, packages):
+        connection = sqlite3.connect(path)
+        connection.executescript(FILELISTS_SCHEMA)
+        connection.execute("INSERT INTO db_info VALUES (10, ?)", (self.dbname,))
+        for row, package in self._package_rows(packages, True):
+            connection.execute("INSERT INTO packages VALUES (?, ?)", (row["pkgKey"], row["pkgId"]))
+            for dirname, names, types in self._filelist(package):
+                connection.execute("INSERT INTO filelist VALUES (?, ?, ?, ?)",
+                                   (row["pkgKey"], dirname, "/".join(names), types))
+        connection.commit()
+        connection.close()
+
+    @staticmethod
+    def _filelist(package):
+        """
+        Description: The files of the package grouped by directory, as in the filelists table
+        """
+        directories = dict()
+        for path in package["files"]:
+            dirname, name = path.rsplit("/", 1)
+            directories.setdefault(dirname, []).append((name, "f"))
+        for path in package["dirs"]:
+            dirname, name = path.rsplit("/", 1)
+            directories.setdefault(dirname, []).append((name, "d"))
+        for dirname, entries in directories.items():
+            yield dirname, [name for name, _ in entries], "".join(kind for _, kind in entries)
+
+    @staticmethod
+    def _compress(path, repodata, suffix, compress, extension):
+        with open(path, "rb") as file:
+            content = file.read()
+        checksum = hashlib.sha256(content).hexdigest()
+        target = os.path.join(repodata, "%s-%s%s" % (checksum, suffix, extension))
+        with open(target, "wb") as file:
+            file.write(compress(content))
+        return target
+
+    def write_sqlite(self, root, priority=1):
+        """
+        Description: Write the sqlite repodata of the source and of the binary packages
+
+        Args:
+            root: folder of the repo, with a src and a bin repo in it
+            priority: priority of the database
+        Returns:
+            the conf.yaml item of the database
+        """
+        sources = list(self.sources.values())
+        binaries = list(self.binaries.values())
+        with tempfile.TemporaryDirectory() as temporary:
+            for folder, packages, binary in (("src", sources, False), ("bin", binaries, True)):
+                repodata = os.path.join(root, folder, "repodata")
+                os.makedirs(repodata, exist_ok=True)
+                primary = os.path.join(temporary, folder + "-primary.sqlite")
+                self._write_primary(primary, packages, binary)
+                self._compress(primary, repodata, "primary", bz2.compress, ".sqlite.bz2")
+            filelists = os.path.join(temporary, "filelists.sqlite")
+            self._write_filelists(filelists, binaries)
+            self._compress(filelists, os.path.join(root, "bin", "repodata"), "filelists",
+                           bz2.compress, ".sqlite.bz2")
+        return dict(dbname=self.dbname, src_db_file="file://" + os.path.join(root, "src"),
+                    bin_db_file="file://" + os.path.join(root, "bin"), priority=priority)
+
+    def _xml_entries(self, tag, names, package=None):
+        if not names:
+            return ""
+        entries = []
+        for name in names:
+            if package:
+                entries.append('<rpm:entry name=%s flags="EQ" epoch="0" ver=%s rel=%s/>' % (
+                    quoteattr(name), quoteattr(package["version"]), quoteattr(package["release"])))
+            else:
+                entries.append("<rpm:entry name=%s/>" % quoteattr(name))
+        return "<rpm:%s>%s</rpm:%s>" % (tag, "".join(entries), tag)
+
+    def _xml_package(self, row, package, binary):
+        files = "".join("<file>%s</file>" % escape(path) for path in package.get("files", [])
+                        if path.startswith(BIN_DIRS)) if binary else ""
+        return (
+            '<package type="rpm"><name>{name}</name><arch>{arch}</arch>'
+            '<version epoch="0" ver={version} rel={release}/>'
+            '<checksum type="sha256" pkgid="YES">{pkgId}</checksum>'
+            '<summary>{summary}</summary><description>{description}</description>'
+            '<packager>{rpm_packager}</packager><url>{url}</url>'
+            '<time file="{time_file}" build="{time_build}"/>'
+            '<size package="{size_package}" installed="{size_installed}" archive="{size_archive}"/>'
+            '<location href={location_href}/>'
+            '<format><rpm:license>{rpm_license}</rpm:license><rpm:vendor>{rpm_vendor}</rpm:vendor>'
+            '<rpm:group>{rpm_group}</rpm:group><rpm:buildhost>{rpm_buildhost}</rpm:buildhost>'
+            '<rpm:sourcerpm>{sourcerpm}</rpm:sourcerpm>'
+            '<rpm:header-range start="{rpm_header_start}" end="{rpm_header_end}"/>'
+            '{provides}{requires}{files}</format></package>\n'
+        ).format(version=quoteattr(row["version"]), release=quoteattr(row["release"]),
+                 location_href=quoteattr(row["location_href"]), sourcerpm=row["rpm_sourcerpm"] or "",
+                 provides=self._xml_entries("provides", package.get("provides"), package),
+                 requires=self._xml_entries("requires", package["requires"]), files=files,
+                 **{key: value for key, value in row.items()
+                    if key not in ("version", "release", "location_href")})
+
+    def write_xml(self, root, priority=1):
+        """
+        Description: Write the xml repodata, the source and the binary packages are in one repo
+
+        Args:
+            root: folder of the repo
+            priority: priority of the database
+        Returns:
+            the conf.yaml item of the database
+        """
+        repodata = os.path.join(root, "repodata")
+        os.makedirs(repodata, exist_ok=True)
+        binaries = list(self._package_rows(self.binaries.values(), True))
+        primary = ['<?xml version="1.0" encoding="UTF-8"?>\n<metadata xmlns="%s" xmlns:rpm="%s" '
+                   'packages="%d">\n' % (COMMON_NS, RPM_NS, len(self.sources) + len(binaries))]
+        primary.extend(self._xml_package(row, package, False)
+                       for row, package in self._package_rows(self.sources.values(), False))
+        primary.extend(self._xml_package(row, package, True) for row, package in binaries)
+        primary.append("</metadata>\n")
+        filelists = ['<?xml version="1.0" encoding="UTF-8"?>\n<filelists xmlns="%s" packages="%d">\n'
+                     % (FILELISTS_NS, len(binaries))]
+        for row, package in binaries:
+            files = ["<file>%s</file>" % escape(path) for path in package["files"]]
+            files.extend('<file type="dir">%s</file>' % escape(path) for path in package["dirs"])
+            filelists.append('<package pkgid="%s" name=%s arch="x86_64"><version epoch="0" ver=%s rel=%s/>'
+                             '%s</package>\n' % (row["pkgId"], quoteattr(package["name"]),
+                                                 quoteattr(package["version"]),
+                                                 quoteattr(package["release"]), "".join(files)))
+        filelists.append("</filelists>\n")
+
+        with tempfile.TemporaryDirectory() as temporary:
+            for name, content in (("primary", primary), ("filelists", filelists)):
+                path = os.path.join(temporary, name + ".xml")
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write("".join(content))
+                self._compress(path, repodata, name, gzip.compress, ".xml.gz")
+        return dict(dbname=self.dbname, db_file="file://" + root, priority=priority)
+
+
+def generate(output, databases=1, repo_format="sqlite", changes=0.1, **options):
+    """
+    Description: Generate the repos of the databases and their conf.yaml, every database
+                 after the first one is a mutation of the first
+
+    Args:
+        output: folder of the repos
+        databases: number of databases
+        repo_format: sqlite or xml
+        changes: share of the packages changed in the other databases
+        options: arguments of SyntheticRepo
+    Returns:
+        path of the conf.yaml, the repos
+    """
+    base = SyntheticRepo(dbname="synthetic1", **options)
+    repos = [base] + [base.mutate("synthetic%d" % index, changes=changes, seed=index)
+                      for index in range(2, databases + 1)]
+    conf = []
+    for priority, repo in enumerate(repos, start=1):
+        root = os.path.join(output, repo.dbname)
+        writer = repo.write_xml if repo_format == "xml" else repo.write_sqlite
+        conf.append(writer(root, priority=priority))
+    conf_path = os.path.join(output, "conf.yaml")
+    with open(conf_path, "w", encoding="utf-8") as file:
+        yaml.safe_dump(conf, file, default_flow_style=False, sort_keys=False)
+    return conf_path, repos
+
+
+def add_arguments(parser):
+    """
+    Description: The arguments of the generated repos, shared with the benchmark suite
+    """
+    parser.add_argument("--sources", type=int, default=1000, help="number of source packages")
+    parser.add_argument("--binaries", type=int, default=2, help="binary packages of a source package")
+    parser.add_argument("--fanout", type=int, default=4, help="maximum requires of a package")
+    parser.add_argument("--cycle-density", type=float, default=0.05,
+                        help="probability that a require goes back to a previous package")
+    parser.add_argument("--files", type=int, default=10, help="files of a binary package")
+    parser.add_argument("--file-requires", type=float, default=0.1,
+                        help="share of the requires of a file instead of a component")
+    parser.add_argument("--databases", type=int, default=2, help="number of databases")
+    parser.add_argument("--changes", type=float, default=0.1,
+                        help="share of the packages changed in the other databases")
+    parser.add_argument("--format", dest="repo_format", choices=("sqlite", "xml"), default="sqlite")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def repo_options(args):
+    """
+    Description: Keyword arguments of generate from the parsed arguments
+    """
+    return dict(databases=args.databases, repo_format=args.repo_format, changes=args.changes,
+                sources=args.sources, binaries_per_source=args.binaries, fanout=args.fanout,
+                cycle_density=args.cycle_density, files_per_binary=args.files,
+                file_requires=args.file_requires, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", required=True, help="folder of the generated repos")
+    add_arguments(parser)
+    args = parser.parse_args()
+    conf_path, repos = generate(args.output, **repo_options(args))
+    for repo in repos:
+        print("%s: %d source packages, %d binary packages" % (
+            repo.dbname, len(repo.sources), len(repo.binaries)))
+    print("conf: %s" % conf_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,28 +14,44 @@
    Initial operation and configuration of the flask project
 """
 import os
-from flask import Flask
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 
-from packageship.application.common.constant import MAX_DAY_NUMBER, MAX_MINUTES_NUMBER
-from packageship.application.settings import Config
 
-
-def init_app(permissions):
+def init_app(permissions, rate_limit=True):
     """
         Project initialization function
+
+        Args:
+            permissions: query or write
+            rate_limit: limit the requests of every client address
     """
+    # The command line imports the modules of this package, flask is only imported by the service
+    from flask import Flask
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+
+    from packageship.application.common.constant import MAX_DAY_NUMBER, MAX_MINUTES_NUMBER
+    from packageship.application.common.encoding import init_gzip
+    from packageship.application.common.metrics import init_metrics
+    from packageship.application.common.tracing import init_tracing
+    from packageship.application.settings import Config
+
     app = Flask(__name__)
 
     os.environ["PERMISSIONS"] = permissions
 
     # Load configuration items
     app.config.from_object(Config())
+    app.config["RATELIMIT_ENABLED"] = rate_limit
 
     default_limits = ["{day_nu}/day;{minute_nu}/minute".format(day_nu=MAX_DAY_NUMBER,
                                                                minute_nu=MAX_MINUTES_NUMBER)]
     Limiter(app, key_func=get_remote_address, default_limits=default_limits, )
+    # Registered first, the after request functions run in the reverse order and the body is compressed last
+    init_gzip(app)
+    # Time spent in the database, the cache and the serialization of every request
+    init_tracing(app)
+    # Request latencies and counters shared by the processes of the service
+    init_metrics(app)
     from packageship.application import apps
     # Register Blueprint
     for blue, api in apps.blue_point:
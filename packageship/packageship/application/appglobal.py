@@ -17,11 +17,12 @@ import os
 from flask import request
 from .apps.package.url import urls as package_urls
 from .apps.dependinfo.url import urls as dependinfo_urls
+from .apps.metrics.url import urls as metrics_urls
 
 
 __all__ = ['permissions']
 
-URLS = package_urls + dependinfo_urls
+URLS = package_urls + dependinfo_urls + metrics_urls
 
 
 def permissions():
@@ -15,10 +15,12 @@ Blueprint collection trying to page
 """
 from packageship.application.apps import package
 from packageship.application.apps import dependinfo
+from packageship.application.apps import metrics
 
 blue_point = [
     (package.package, package.api),
-    (dependinfo.dependinfo, dependinfo.api)
+    (dependinfo.dependinfo, dependinfo.api),
+    (metrics.metrics, metrics.api)
 ]
 
 __all__ = ['blue_point']
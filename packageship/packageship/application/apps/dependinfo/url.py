@@ -17,4 +17,6 @@ urls = [
     (view.DependList, '/dependinfo/dependlist', {'query': ('POST')}),
     (view.DownloadFiles, '/dependinfo/downloadfiles', {'query': ('POST')}),
     (view.DependGraph, '/dependinfo/dependgraph', {'query': ('POST')}),
+    (view.DependGraphSession, '/dependinfo/graphsession', {'query': ('POST')}),
+    (view.DependGraphExpand, '/dependinfo/graphsession/expand', {'query': ('POST')}),
 ]
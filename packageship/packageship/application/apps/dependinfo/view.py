@@ -12,22 +12,39 @@
 # ******************************************************************************/
 """
 description: Interface processing
-class: DependList, DownloadFiles, DependGraph
+class: DependList, DownloadFiles, DependGraph, DependGraphSession, DependGraphExpand
 """
-from flask import send_file
+import json
+from itertools import chain
+from redis.exceptions import RedisError
 from flask import request
 from flask import jsonify
+from flask import Response
 from packageship.libs.log import LOGGER
 from flask_restful import Resource
 from packageship.application.common.rsp import RspMsg
-from packageship.application.common.export import CompressIo
+from packageship.application.common.export import CompressIo, ColumnarIo
 from packageship.application.core.depend.down_load import Download
+from packageship.application.core.depend.paging import DependPaging
+from packageship.application.core.depend.graph import GraphInfo
+from packageship.application.core.depend.session import GraphSession
+from packageship.application.database.cache import buffer_cache, GraphCache
 from packageship.application.serialize.validate import validate
 from packageship.application.serialize.dependinfo import DependSchema
 from packageship.application.serialize.dependinfo import DownSchema
+from packageship.application.serialize.dependinfo import GraphSessionSchema
 
 from packageship.application.core.depend import DispatchDepend
-from packageship.application.common.exc import ElasticSearchQueryException, DatabaseConfigException
+from packageship.application.common.exc import (
+    DatabaseConfigException,
+    ElasticSearchQueryException,
+    StreamAbortedException,
+)
+
+# Parameters of the cursor paging of the depend list
+PAGING_PARAMS = ("page_size", "cursor", "database", "prefix")
+# Parameters of the level of detail of the dependency graph
+GRAPH_PARAMS = ("depth", "max_nodes", "max_fanout", "known_nodes")
 
 
 class DependList(Resource):
@@ -35,6 +52,112 @@ class DependList(Resource):
     Get a list of installation, compilation, self-dependence and dependent query results
     """
 
+    # Number of rows serialized into one chunk of a streamed response
+    STREAM_CHUNK_ROWS = 500
+
+    @staticmethod
+    def _sum_statistics(statistics):
+        """
+        Append the sum of all databases to the statistics
+        Args:
+            statistics: per database statistics
+
+        Returns:
+            statistics with the sum row at the end
+        """
+        binarys_sum, sources_sum = 0, 0
+        for statistics_con in statistics:
+            binarys_sum += statistics_con["binary_sum"]
+            sources_sum += statistics_con["source_sum"]
+        statistics.append(
+            {"sum": "Sum", "binarys_sum": binarys_sum, "sources_sum": sources_sum})
+        return statistics
+
+    def _chunks(self, rows):
+        """
+        Serialize rows and group them into chunks of the streamed response
+        Args:
+            rows: iterable of rows
+
+        Yields:
+            list of serialized rows
+        """
+        chunk = []
+        for row in rows:
+            chunk.append(json.dumps(row))
+            if len(chunk) >= self.STREAM_CHUNK_ROWS:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _stream_json(self, depend, response_body):
+        """
+        Generate the depend list as one json document, chunk by chunk
+        Args:
+            depend: dependent instance
+            response_body: response body without resp
+
+        Yields:
+            part of the json document
+        """
+        statistics_info = dict()
+        head = json.dumps(response_body)
+        yield head[:-1] + ', "resp": {"binary_list": ['
+        for index, chunk in enumerate(self._chunks(depend.iter_binary_list(statistics_info))):
+            yield (", " if index else "") + ", ".join(chunk)
+        yield '], "source_list": ['
+        for index, chunk in enumerate(self._chunks(depend.iter_source_list(statistics_info))):
+            yield (", " if index else "") + ", ".join(chunk)
+        statistics = self._sum_statistics(list(statistics_info.values()))
+        yield '], "statistics": %s}}' % json.dumps(statistics)
+
+    def _stream_ndjson(self, depend, response_body):
+        """
+        Generate the depend list as newline delimited json, one package per line
+        Args:
+            depend: dependent instance
+            response_body: response body without resp
+
+        Yields:
+            lines of the response
+        """
+        statistics_info = dict()
+        yield json.dumps(response_body) + "\n"
+        for chunk in self._chunks(
+                {"binary_list": row} for row in depend.iter_binary_list(statistics_info)):
+            yield "\n".join(chunk) + "\n"
+        for chunk in self._chunks(
+                {"source_list": row} for row in depend.iter_source_list(statistics_info)):
+            yield "\n".join(chunk) + "\n"
+        statistics = self._sum_statistics(list(statistics_info.values()))
+        for chunk in self._chunks({"statistics": row} for row in statistics):
+            yield "\n".join(chunk) + "\n"
+
+    def _page(self, result, paging, rspmsg):
+        """
+        Get one page of the depend list
+        Args:
+            result: depend query parameters
+            paging: paging parameters
+            rspmsg: response message
+
+        Returns:
+            response of the page
+        """
+        depend_paging = DependPaging(result, paging["page_size"],
+                                     database=paging.get("database"), prefix=paging.get("prefix"))
+        try:
+            page = depend_paging.page(paging.get("cursor"))
+        except ValueError:
+            return jsonify(rspmsg.body('param_error'))
+        except (ElasticSearchQueryException, DatabaseConfigException):
+            return jsonify(rspmsg.body('connect_db_error'))
+        if page is None:
+            return jsonify(rspmsg.body('pack_name_not_found'))
+        self._sum_statistics(page["statistics"])
+        return jsonify(rspmsg.body("success", resp=page))
+
     def post(self):
         """
         Query a package's all dependencies including install and build depend
@@ -43,6 +166,12 @@ class DependList(Resource):
             packagename: package name
             depend_type: installdep/builddep/selfdep/bedep
             parameter : Query dependent parameters
+            format: json/stream/ndjson, stream and ndjson send the result
+                    with chunked transfer instead of one json body
+            page_size: return one page of each list ordered by package name
+            cursor: next_cursor of the previous page
+            database: only the packages of this database
+            prefix: only the packages whose name starts with the prefix
         Returns:
             for
             example:
@@ -58,19 +187,31 @@ class DependList(Resource):
         if error:
             response = rspmsg.body('param_error')
             return jsonify(response)
+        response_format = result.pop("format", "json")
+        for name in GRAPH_PARAMS:
+            result.pop(name, None)
+        paging = {name: result.pop(name) for name in PAGING_PARAMS if name in result}
+        if "page_size" in paging:
+            return self._page(result, paging, rspmsg)
         try:
             depend = DispatchDepend.execute(**result)
         except (ElasticSearchQueryException, DatabaseConfigException) as e:
             return jsonify(rspmsg.body('connect_db_error'))
-        result_data = depend.depend_list()
-        if not result_data['binary_list'] and not result_data['source_list']:
+        binary_dict, source_dict = depend.depend_dict
+        if not binary_dict and not source_dict:
             return jsonify(rspmsg.body('pack_name_not_found'))
-        binarys_sum, sources_sum = 0, 0
-        for statistics_con in result_data["statistics"]:
-            binarys_sum += statistics_con["binary_sum"]
-            sources_sum += statistics_con["source_sum"]
-        result_data["statistics"].append(
-            {"sum": "Sum", "binarys_sum": binarys_sum, "sources_sum": sources_sum})
+        if response_format == "stream":
+            response_body = rspmsg.body("success")
+            response_body.pop("resp")
+            return Response(self._stream_json(depend, response_body),
+                            mimetype="application/json")
+        if response_format == "ndjson":
+            response_body = rspmsg.body("success")
+            response_body.pop("resp")
+            return Response(self._stream_ndjson(depend, response_body),
+                            mimetype="application/x-ndjson")
+        result_data = depend.depend_list()
+        self._sum_statistics(result_data["statistics"])
         res_dict = rspmsg.body("success", resp=result_data)
         return jsonify(res_dict)
 
@@ -80,22 +221,31 @@ class DownloadFiles(Resource):
     Download file
     """
 
-    def send(self, memory_file, names, depend_type):
+    def send(self, files, names, depend_type):
         """
-
+        Send the csv files as a zip file compressed while it is sent. The first chunk
+        of the zip file, with the first rows and the first page of the database, is
+        generated before the response, so that their failures are still answered with
+        download_failed. A failure after the status is sent is logged and aborts the
+        response: the end of the zip file is not sent and the connection is closed
         Args:
-            memory_file:
-            names:
-            depend_type:
+            files: csv file names and their rows
+            names: the name of the zip file
+            depend_type: depend type
 
         Returns:
-
+            response streaming the zip file
+        Raises:
+            StreamAbortedException: the first chunk of the zip file failed
         """
-        return send_file(memory_file,
-                         attachment_filename="{search_name}_{file_type}.zip".format(
-                             search_name=names,
-                             file_type=depend_type),
-                         as_attachment=True)
+        attachment_filename = "{search_name}_{file_type}.zip".format(
+            search_name=names,
+            file_type=depend_type)
+        stream = CompressIo().stream_zip(files)
+        first_chunk = next(stream, b"")
+        return Response(chain([first_chunk], stream),
+                        mimetype="application/zip",
+                        headers={"Content-Disposition": "attachment; filename=%s" % attachment_filename})
 
     def _validate_data(self, depend_type, data):
         """
@@ -118,39 +268,50 @@ class DownloadFiles(Resource):
     def post(self):
         """
         Download file
+        Args:
+            packagename: package name
+            depend_type: installdep/builddep/selfdep/bedep/src/bin
+            parameter: Query dependent parameters
+            format: csv/parquet/arrow, the files in the zip file, default csv
         Returns:
 
         """
         rspmsg = RspMsg()
         data = request.get_json()
-        compress_io = CompressIo()
         package_name = data.get("packagename")
         depend_type = data.get("depend_type")
         result, error = self._validate_data(depend_type, data)
         if error:
             response = rspmsg.body('param_error')
             return jsonify(response)
+        file_format = result.pop("format", "csv")
+        if file_format != "csv" and not ColumnarIo.available():
+            LOGGER.warning("pyarrow is not installed, the %s format is unavailable" % file_format)
+            return jsonify(rspmsg.body('param_error'))
         try:
             if depend_type in ["src", "bin"]:
                 database_name = result['parameter']["db_priority"]
-                folder_path = Download().process_packages(
-                    depend_type, database_name[0])
+                if file_format == "csv":
+                    files = Download().package_files(depend_type, database_name[0])
+                else:
+                    files = Download().package_columns(depend_type, database_name[0])
                 names = "".join(database_name)
-                memory_file = compress_io.send_memory_file(folder_path)
-                return self.send(memory_file, names, depend_type)
             else:
                 try:
                     depend = DispatchDepend.execute(**result)
                 except (ElasticSearchQueryException, DatabaseConfigException) as e:
                     return jsonify(rspmsg.body('connect_db_error'))
-                folder_path = depend.download_depend_files()
-                names = "".join(package_name)
-                if folder_path:
-                    memory_file = compress_io.send_memory_file(folder_path)
-                    return self.send(memory_file, names, depend_type)
+                if file_format == "csv":
+                    files = depend.download_depend_csv()
                 else:
-                    return jsonify(rspmsg.body('pack_name_not_found'))
-        except (ValueError, IOError, AttributeError) as error:
+                    files = depend.download_depend_columns()
+                names = "".join(package_name)
+            if not files:
+                return jsonify(rspmsg.body('pack_name_not_found'))
+            if file_format != "csv":
+                files = ColumnarIo(file_format).files(files)
+            return self.send(files, names, depend_type)
+        except (ValueError, IOError, AttributeError, StreamAbortedException) as error:
             LOGGER.error(error)
             return jsonify(rspmsg.body("download_failed"))
 
@@ -160,6 +321,39 @@ class DependGraph(Resource):
     Specifies the binary package dependency graph fetch
     """
 
+    @staticmethod
+    def _graph(result, node_name, node_type, options):
+        """
+        Get the graph of a node, from the graph cache if possible
+        Args:
+            result: depend query parameters
+            node_name: root node of the graph
+            node_type: binary or source
+            options: level, max_nodes and max_fanout of the graph
+
+        Returns:
+            graph nodes and edges
+        Raises:
+            ElasticSearchQueryException: query the dependency failed
+            DatabaseConfigException: database config error
+        """
+        graph_cache = GraphCache(buffer_cache.cache_key(**result))
+        try:
+            graph_data = graph_cache.get(node_name=node_name, node_type=node_type, **options)
+        except RedisError as error:
+            LOGGER.warning(error)
+            graph_data = None
+        if graph_data is not None:
+            return graph_data
+        depend = DispatchDepend.execute(**result)
+        graph_data = depend.depend_info_graph(
+            source=node_name, package_type=node_type, **options)
+        try:
+            graph_cache.set(graph_data, node_name=node_name, node_type=node_type, **options)
+        except RedisError as error:
+            LOGGER.warning(error)
+        return graph_data
+
     def post(self):
         """
         Specifies that the binary package dependency graph gets the interface
@@ -172,6 +366,12 @@ class DependGraph(Resource):
             withsubpack:Whether the query subpackage query needs to pass this parameter
             packagetype:The type of data, mainly source or binary
             node_name:The name of the node to be queried
+            depth:levels of the graph around the node, default 2
+            max_nodes:the maximum number of package nodes
+            max_fanout:the maximum number of neighbours of a node,
+                       the others are aggregated into one node
+            known_nodes:nodes the client already shows, only the new
+                        nodes and edges are returned
         Returns:
             for example:
                 {
@@ -188,12 +388,111 @@ class DependGraph(Resource):
             return jsonify(response)
         node_name = result.pop('node_name')
         node_type = result.pop('node_type')
+        known_nodes = result.pop('known_nodes', None)
+        options = dict(level=result.pop('depth', 2),
+                       max_nodes=result.pop('max_nodes', None),
+                       max_fanout=result.pop('max_fanout', None))
+        for name in ("format", *PAGING_PARAMS):
+            result.pop(name, None)
         try:
-            depend = DispatchDepend.execute(**result)
+            graph_data = self._graph(result, node_name, node_type, options)
         except (ElasticSearchQueryException, DatabaseConfigException) as e:
             return jsonify(rspmsg.body('connect_db_error'))
-        graph_data = depend.depend_info_graph(source=node_name, package_type=node_type)
         if not graph_data['edges'] and not graph_data['nodes']:
             return jsonify(rspmsg.body('pack_name_not_found'))
+        if known_nodes is not None:
+            graph_data = GraphInfo.delta(graph_data, known_nodes)
         res_dict = rspmsg.body("success", resp=graph_data)
         return jsonify(res_dict)
+
+
+class DependGraphSession(Resource):
+    """
+    Create a graph session of a dependency query
+    """
+
+    def post(self):
+        """
+        Query the dependencies once and create a graph session bound to the result,
+        the nodes of the graph are expanded with DependGraphExpand
+
+        Args:
+            the parameters of DependGraph
+            node_name:root node of the graph
+            node_type:binary or source
+            depth:levels of the graph around the node, default 2
+        Returns:
+            for example:
+                {
+                    "code": "",
+                    "resp": {"session_id": "", "nodes": [], "edges": []},
+                    "msg": ""
+                }
+        """
+        rspmsg = RspMsg()
+        result, error = validate(DependSchema, request.get_json(), load=True)
+        if error:
+            return jsonify(rspmsg.body('param_error'))
+        node_name = result.pop('node_name')
+        node_type = result.pop('node_type')
+        depth = result.pop('depth', 2)
+        for name in ("format", *PAGING_PARAMS, *GRAPH_PARAMS):
+            result.pop(name, None)
+        try:
+            depend = DispatchDepend.execute(**result)
+        except (ElasticSearchQueryException, DatabaseConfigException):
+            return jsonify(rspmsg.body('connect_db_error'))
+        binary_dict, source_dict = depend.depend_dict
+        if not binary_dict and not source_dict:
+            return jsonify(rspmsg.body('pack_name_not_found'))
+        try:
+            session = GraphSession.create(depend, node_name, node_type)
+            graph_data = session.expand(node_name, depth=depth)
+        except RedisError as error:
+            LOGGER.error(error)
+            return jsonify(rspmsg.body('connect_db_error'))
+        if graph_data is None:
+            return jsonify(rspmsg.body('pack_name_not_found'))
+        return jsonify(rspmsg.body("success", resp=dict(session_id=session.session_id, **graph_data)))
+
+
+class DependGraphExpand(Resource):
+    """
+    Expand a node of a graph session
+    """
+
+    def post(self):
+        """
+        Expand a node of a graph session, only the nodes and edges the session has
+        not returned before are returned
+
+        Args:
+            session_id:id of the graph session
+            node_name:node to expand
+            direction:requires, be_requires or both, default both
+            depth:levels to expand, default 1
+        Returns:
+            for example:
+                {
+                    "code": "",
+                    "resp": {"nodes": [], "edges": []},
+                    "msg": ""
+                }
+        """
+        rspmsg = RspMsg()
+        result, error = validate(GraphSessionSchema, request.get_json(), load=True)
+        if error:
+            return jsonify(rspmsg.body('param_error'))
+        session = GraphSession(result["session_id"])
+        try:
+            if not session.exists():
+                return jsonify(rspmsg.body('graph_session_not_found'))
+            graph_data = session.expand(result["node_name"],
+                                        direction=result.get("direction", "both"),
+                                        depth=result.get("depth", 1))
+        except RedisError as error:
+            LOGGER.error(error)
+            return jsonify(rspmsg.body('connect_db_error'))
+        if graph_data is None:
+            return jsonify(rspmsg.body('pack_name_not_found'))
+        return jsonify(rspmsg.body("success", resp=graph_data))
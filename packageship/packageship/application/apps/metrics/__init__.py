@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import os
+from flask.blueprints import Blueprint
+from flask_restful import Api
+from .url import urls
+
+
+metrics = Blueprint('metrics', __name__)
+api = Api()
+
+for view, url, operation in urls:
+    if os.environ["PERMISSIONS"] in operation.keys():
+        api.add_resource(view, url)
+
+
+__all__ = ['metrics', 'api']
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+description: Interface processing
+class: Metrics
+"""
+from redis.exceptions import RedisError
+from flask import Response
+from flask import jsonify
+from flask_restful import Resource
+
+from packageship.application.common.metrics import METRICS
+from packageship.application.common.rsp import RspMsg
+from packageship.libs.log import LOGGER
+
+# Content type of the prometheus text exposition format
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrics(Resource):
+    """
+    Metrics of all the processes of the service and of the initialization
+    """
+
+    def get(self):
+        """
+        The metrics in the prometheus text exposition format
+
+        Returns:
+            for example:
+                # HELP pkgship_gevent_jobs_total Gevent jobs spawned by the queries
+                # TYPE pkgship_gevent_jobs_total counter
+                pkgship_gevent_jobs_total 120
+        """
+        try:
+            return Response(METRICS.collect(), mimetype=EXPOSITION_CONTENT_TYPE)
+        except RedisError as error:
+            LOGGER.error(error)
+            return jsonify(RspMsg().body('service_error'))
@@ -15,15 +15,18 @@ description: Interface processing
 class: SourcePackages, BinaryPackages, SourcePackageInfo,BinaryPackageInfo,DatabasePriority
 PkgshipVersion,TableColView
 """
+import json
 import math
 from flask import request
 from flask import jsonify
+from flask import Response
 from flask_restful import Resource
 
 from packageship.application.query import database
 from packageship.application.core.baseinfo import pkg_version
 from packageship.application.serialize.package import PackageSchema
 from packageship.application.serialize.package import SingleSchema
+from packageship.application.serialize.package import BinarySingleSchema
 from packageship.application.core.pkginfo.pkg import Package
 from packageship.application.core.pkginfo.pkg import SourcePackage
 from packageship.application.core.pkginfo.pkg import BinaryPackage
@@ -31,12 +34,15 @@ from packageship.application.serialize.validate import validate
 from packageship.application.common.rsp import RspMsg
 from packageship.application.common.exc import ElasticSearchQueryException, DatabaseConfigException, \
     PackageInfoGettingError
+from packageship.libs.log import LOGGER
 
 
 class ParsePackageMethod(Resource):
     """
     Description: Common Method
     """
+    # Number of packages serialized into one chunk of a streamed response
+    STREAM_CHUNK_ROWS = 500
 
     def __init__(self):
         self.rspmsg = RspMsg()
@@ -58,8 +64,60 @@ class ParsePackageMethod(Resource):
         response = self.rspmsg.body('success', resp=package_info_set)
         response["total_count"] = total_count
         response["total_page"] = total_page
+        response["next_cursor"] = package_all.get("next_cursor")
         return response
 
+    def _stream_packages(self, first, packages, pagesize):
+        """
+        Description: Generate the package list as one json document while the packages
+                     are scrolled from the database, the totals are sent after the list
+        Args:
+            first: the first package
+            packages: generator of the rest packages
+            pagesize: Quantity displayed on one page
+        Yields:
+            part of the json document
+        """
+        head = json.dumps(self.rspmsg.body('success'))
+        yield head[:-1] + ', "resp": [' + json.dumps(first)
+        total_count = 1
+        chunk = []
+        for package in packages:
+            chunk.append(json.dumps(package))
+            if len(chunk) >= self.STREAM_CHUNK_ROWS:
+                total_count += len(chunk)
+                yield ", " + ", ".join(chunk)
+                chunk = []
+        if chunk:
+            total_count += len(chunk)
+            yield ", " + ", ".join(chunk)
+        yield '], "total_count": %d, "total_page": %d}' % (
+            total_count, math.ceil(total_count / int(pagesize)))
+
+    def command_line_packages(self, iter_packages, result, package_list):
+        """
+        Description: All packages for the command line, streamed without the limit of the page size
+        Args:
+            iter_packages: method generating the packages of a database
+            result: validated parameters
+            package_list: name of the packages, None means all packages
+        Returns:
+            response streaming the packages
+        """
+        packages = iter_packages(result.get("database_name"), package_list=package_list)
+        try:
+            # The first package decides the response code, before the response is started
+            first = next(packages, None)
+        except (ElasticSearchQueryException, DatabaseConfigException):
+            return jsonify(self.rspmsg.body('connect_db_error'))
+        except (AttributeError, KeyError, TypeError) as error:
+            LOGGER.error(error)
+            return jsonify(self.rspmsg.body("table_name_not_exist"))
+        if first is None:
+            return jsonify(self.rspmsg.body('pack_name_not_found'))
+        return Response(self._stream_packages(first, packages, result.get("page_size")),
+                        mimetype="application/json")
+
 
 class SourcePackages(ParsePackageMethod):
     """
@@ -110,10 +168,12 @@ class SourcePackages(ParsePackageMethod):
         query_pkg_name = [result.get("query_pkg_name")] if result.get(
             "query_pkg_name") else None
         find_package = Package()
+        if result.get("command_line"):
+            return self.command_line_packages(find_package.iter_src_packages, result, query_pkg_name)
         try:
             result_all = find_package.all_src_packages(
                 result.get("database_name"), page_num=page_num, page_size=page_size, package_list=query_pkg_name,
-                command_line=result.get("command_line"))
+                command_line=result.get("command_line"), cursor=result.get("cursor"))
         except (ElasticSearchQueryException, DatabaseConfigException):
             return jsonify(self.rspmsg.body('connect_db_error'))
         except PackageInfoGettingError:
@@ -171,10 +231,12 @@ class BinaryPackages(ParsePackageMethod):
         query_pkg_name = [result.get("query_pkg_name")] if result.get(
             "query_pkg_name") else None
         find_package = Package()
+        if result.get("command_line"):
+            return self.command_line_packages(find_package.iter_bin_packages, result, query_pkg_name)
         try:
             result_all = find_package.all_bin_packages(
                 result.get("database_name"), page_num=page_num, page_size=page_size, package_list=query_pkg_name,
-                command_line=result.get("command_line"))
+                command_line=result.get("command_line"), cursor=result.get("cursor"))
         except (ElasticSearchQueryException, DatabaseConfigException):
             return jsonify(self.rspmsg.body('connect_db_error'))
         except PackageInfoGettingError:
@@ -299,7 +361,10 @@ class BinaryPackageInfo(Resource):
         data = dict()
         data["database_name"] = request.args.get("database_name")
         data["pkg_name"] = pkg_name
-        result, error = validate(SingleSchema, data, load=True)
+        for option in ("filelist_format", "filelist_offset", "filelist_limit"):
+            if request.args.get(option) is not None:
+                data[option] = request.args.get(option)
+        result, error = validate(BinarySingleSchema, data, load=True)
         if error:
             response = rspmsg.body('param_error')
             return jsonify(response)
@@ -308,7 +373,8 @@ class BinaryPackageInfo(Resource):
         find_binary_package = BinaryPackage()
         try:
             pkg_result = find_binary_package.bin_package_info(
-                pkg_name, database_name)
+                pkg_name, database_name, filelist_format=result.get("filelist_format", "list"),
+                filelist_offset=result.get("filelist_offset", 0), filelist_limit=result.get("filelist_limit"))
         except (ElasticSearchQueryException, DatabaseConfigException) as e:
             return jsonify(rspmsg.body('connect_db_error'))
         if pkg_result:
@@ -90,10 +90,18 @@ class BaseCommand():
 
             setattr(self, 'read_host', _read_host)
 
-    def _set_read_host(self, remote=False):
+    def _set_read_host(self, remote=False, local=False):
         """
             Set read domain name
+            Args:
+                remote: query the remote service
+                local: run the query in the process, without the pkgship service
         """
+        if local:
+            from packageship.application.cli.local import LocalService, LOCAL_HOST
+            self.request = LocalService()
+            self.read_host = LOCAL_HOST
+            return
         if remote:
             self.read_host = configuration.REMOTE_HOST
         if self.read_host is None:
@@ -239,6 +247,18 @@ class BaseCommand():
                     help=command_param.get('help')
                 )
 
+    def query_request(self, params):
+        """
+        Description: The request of the query of the command
+        Args:
+            params: Command line parameters
+        Returns:
+            method, path and body of the request, the body is None for a get request
+        Raises:
+            NotImplementedError: the command is not a query
+        """
+        raise NotImplementedError("The command is not a query")
+
     def parse_depend_package(self, response_data):
         """
         Description: Parse the detail data of the package
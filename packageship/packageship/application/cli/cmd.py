@@ -14,29 +14,32 @@
 Description: Entry method for custom commands
 Class: PkgshipCommand
 """
+import importlib
+import sys
 
 try:
     from packageship.application.common.exc import Error
-    from requests.exceptions import ConnectionError as ConnErr
     from packageship.application.cli.base import BaseCommand
 except ImportError as import_error:
     print("Error importing related dependencies,"
           "please check if related dependencies are installed")
 else:
-    from packageship.application.common.constant import ResponseCode
-    from packageship.application.common.constant import ListNode
-    from packageship.application.common.constant import UWSIG_PATH
-    from packageship.application.common.constant import ERROR_CON
-    from packageship.application.cli.commands.allpkg import AllPackageCommand
-    from packageship.application.cli.commands.bedepend import BeDependCommand
-    from packageship.application.cli.commands.builddep import BuildDepCommand
-    from packageship.application.cli.commands.selfdepend import SelfDependCommand
-    from packageship.application.cli.commands.db import DbPriorityCommand
-    from packageship.application.cli.commands.initialize import InitDatabaseCommand
-    from packageship.application.cli.commands.installdep import InstallDepCommand
-    from packageship.application.cli.commands.singlepkg import SingleCommand
     from packageship.application.cli.commands.version import VersionCommand
-    from packageship.application.cli.commands.comparedep import CompareCommand
+
+# Name of the sub commands, and the module and the class of the command. The module of a
+# command is only imported when the command is run, or when the help of all commands is shown
+COMMANDS = {
+    'init': ('initialize', 'InitDatabaseCommand'),
+    'list': ('allpkg', 'AllPackageCommand'),
+    'builddep': ('builddep', 'BuildDepCommand'),
+    'installdep': ('installdep', 'InstallDepCommand'),
+    'selfdepend': ('selfdepend', 'SelfDependCommand'),
+    'bedepend': ('bedepend', 'BeDependCommand'),
+    'pkginfo': ('singlepkg', 'SingleCommand'),
+    'dbs': ('db', 'DbPriorityCommand'),
+    'compare': ('comparedep', 'CompareCommand'),
+    'batch': ('batch', 'BatchCommand'),
+}
 
 
 def main():
@@ -53,6 +56,21 @@ def main():
         print('Command execution error please try again')
 
 
+def register_commands(names=None):
+    """
+    Description: Register the sub commands, a command already registered is skipped
+
+    Args:
+        names: name of the sub commands, all sub commands by default
+    """
+    for name in names or COMMANDS:
+        if name in BaseCommand.subparsers.choices:
+            continue
+        module, command = COMMANDS[name]
+        command = getattr(importlib.import_module('packageship.application.cli.commands.' + module), command)
+        BaseCommand.register_command(command())
+
+
 class PkgshipCommand(BaseCommand):
     """
     Description: PKG package command line
@@ -69,6 +87,18 @@ class PkgshipCommand(BaseCommand):
         """
         super(PkgshipCommand, self).__init__()
 
+    @staticmethod
+    def _command_name(args):
+        """
+        Description: Name of the sub command of the command line, the options before it take no value
+
+        Args:
+            args: arguments of the command line
+        Returns:
+            name of the sub command, None if there is none
+        """
+        return next((arg for arg in args if not arg.startswith('-')), None)
+
     @classmethod
     def parser_args(cls):
         """
@@ -80,16 +110,13 @@ class PkgshipCommand(BaseCommand):
         Raises:
             Error: An error occurred during command parsing
         """
-        cls.register_command(InitDatabaseCommand())
-        cls.register_command(AllPackageCommand())
-        cls.register_command(BuildDepCommand())
-        cls.register_command(InstallDepCommand())
-        cls.register_command(SelfDependCommand())
-        cls.register_command(BeDependCommand())
-        cls.register_command(SingleCommand())
-        cls.register_command(DbPriorityCommand())
         cls.register_command(VersionCommand())
-        cls.register_command(CompareCommand())
+        name = cls._command_name(sys.argv[1:])
+        if name in COMMANDS:
+            register_commands([name])
+        elif name or '-v' not in sys.argv:
+            # The help and the errors of the command line list every sub command
+            register_commands()
         try:
             args = cls.parser.parse_args()
             args.func(args)
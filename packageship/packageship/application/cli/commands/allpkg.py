@@ -19,7 +19,8 @@ from json.decoder import JSONDecodeError
 from packageship.application.cli.base import BaseCommand
 from requests.exceptions import RequestException
 from requests.exceptions import ConnectionError as ConnErr
-from packageship.application.common.constant import ResponseCode
+from packageship.application.common.constant import ResponseCode, MAXIMUM_PAGE_SIZE
+from packageship.application.common.evr import version_key
 
 
 class AllPackageCommand(BaseCommand):
@@ -49,7 +50,12 @@ class AllPackageCommand(BaseCommand):
                         'Package name that needs fuzzy matching', '', 'store'),
                        ('-s', 'str', 'Specify -s to query the source package information, If not specified, query '
                                      'binary package information by default', None, 'store_true'),
-                       ('-remote', 'str', 'The address of the remote service', False, 'store_true')]
+                       ('-remote', 'str', 'The address of the remote service', False, 'store_true'),
+                       ('-local', 'str', 'Run the query in the process without the pkgship service', False, 'store_true'),
+                       ('-sortversion', 'str', 'Sort the packages by version in the order of rpm, '
+                                               'by name if not specified', False, 'store_true'),
+                       ('-concurrency', 'str', 'Number of the pages of the packages requested concurrently, '
+                                               'all packages in one response if not specified', 0, 'store')]
 
     def register(self):
         """
@@ -111,11 +117,14 @@ class AllPackageCommand(BaseCommand):
         else:
             print('Sorry, no relevant information has been found yet')
 
-    def __parse_package(self, response_data, table_name, src_or_bin):
+    def __parse_package(self, response_data, table_name, src_or_bin, sort_version=False):
         """
         Description: Parse the corresponding data of the package
         Args:
             response_data: http request response content
+            table_name: database name
+            src_or_bin: source packages or binary packages
+            sort_version: sort the packages by version
         Returns:
 
         Raises:
@@ -123,53 +132,113 @@ class AllPackageCommand(BaseCommand):
         """
         package_all = response_data.get('resp')
         if isinstance(package_all, list):
+            if sort_version:
+                package_all.sort(key=lambda package: (version_key(package.get('version')),
+                                                      package.get('pkg_name', '')))
             if src_or_bin:
                 self.__create_src_table(package_all, table_name)
             else:
                 self.__create_bin_table(package_all, table_name)
 
-    def do_command(self, params):
+    def query_request(self, params, page=None):
         """
-        Description: Action to execute command
+        Description: The request of the all packages query
         Args:
             params: Command line parameters
+            page: page of the packages, all packages if not specified
         Returns:
-
-        Raises:
-            ConnectionError: Request connection error
+            method, path and body of the request
         """
-        self._set_read_host(params.remote)
         if params.s:
             src_or_bin = 'src'
         else:
             src_or_bin = 'bin'
+        path = '/packages/{src_or_bin}?database_name={database_name}&query_pkg_name={pkg_name}' \
+               '&page_num={page}&page_size={pagesize}'.format(
+                   src_or_bin=src_or_bin,
+                   database_name=params.database,
+                   pkg_name=params.packagename,
+                   page=page or 1,
+                   pagesize=MAXIMUM_PAGE_SIZE).replace(' ', '')
+        if page is None:
+            path += '&command_line=True'
+        return 'get', path, None
+
+    def _request_pages(self, params):
+        """
+        Description: Request the first page of the packages, then the other pages concurrently
+        Args:
+            params: Command line parameters
+        Returns:
+            responses of the pages
+        Raises:
+            RequestException: the request of a page failed
+        """
+        _, path, _ = self.query_request(params, page=1)
+        response = self.request.get(self.read_host + path)
+        try:
+            total_page = json.loads(response.text).get('total_page') or 1
+        except (JSONDecodeError, AttributeError, TypeError):
+            return [response]
+        urls = [self.read_host + self.query_request(params, page=page)[1] for page in range(2, total_page + 1)]
+        responses = self.request.map(urls, max_workers=int(params.concurrency))
+        for page_response in responses:
+            if isinstance(page_response, Exception):
+                raise page_response
+        return [response] + responses
+
+    def _print_packages(self, responses, params):
+        """
+        Description: Print the packages of the responses, or the error of the first failed one
+        Args:
+            responses: responses of the query
+            params: Command line parameters
+        Returns:
 
-        _url = self.read_host + \
-            '/packages/{src_or_bin}?database_name={database_name}&query_pkg_name={pkg_name}&page_num={page}' \
-            '&page_size={pagesize}&command_line=True'.format(
-                src_or_bin=src_or_bin,
-                database_name=params.database,
-                pkg_name=params.packagename,
-                page=1,
-                pagesize=200).replace(' ', '')
+        """
+        package_all = []
+        for response in responses:
+            if response.status_code != 200:
+                self.http_error(response)
+                return
+            try:
+                response_data = json.loads(response.text)
+            except JSONDecodeError as json_error:
+                self.output_error_formatted(
+                    response.text, "JSON_DECODE_ERROR")
+                return
+            if response_data.get('code') != ResponseCode.SUCCESS:
+                self.output_error_formatted(response_data.get('message'),
+                                            response_data.get('code'))
+                return
+            if isinstance(response_data.get('resp'), list):
+                package_all.extend(response_data['resp'])
+        self.__parse_package(
+            dict(resp=package_all), params.database, params.s, params.sortversion)
+
+    def do_command(self, params):
+        """
+        Description: Action to execute command
+        Args:
+            params: Command line parameters
+        Returns:
+
+        Raises:
+            ConnectionError: Request connection error
+        """
+        self._set_read_host(params.remote, params.local)
+        if params.concurrency and (not str(params.concurrency).isdigit() or int(params.concurrency) < 1):
+            self.output_error_formatted('-concurrency must be a positive integer', ResponseCode.PARAM_ERROR)
+            return
         try:
-            response = self.request.get(_url)
+            if params.concurrency:
+                responses = self._request_pages(params)
+            else:
+                _, path, _ = self.query_request(params)
+                responses = [self.request.get(self.read_host + path)]
         except ConnErr as conn_error:
             self.output_error_formatted("", "CONN_ERROR")
         except RequestException as request_exception:
             self.output_error_formatted(request_exception, "REMOTE_ERROR")
         else:
-            if response.status_code == 200:
-                try:
-                    response_data = json.loads(response.text)
-                    if response_data.get('code') == ResponseCode.SUCCESS:
-                        self.__parse_package(
-                            response_data, params.database, params.s)
-                    else:
-                        self.output_error_formatted(response_data.get('message'),
-                                                    response_data.get('code'))
-                except JSONDecodeError as json_error:
-                    self.output_error_formatted(
-                        response.text, "JSON_DECODE_ERROR")
-            else:
-                self.http_error(response)
+            self._print_packages(responses, params)
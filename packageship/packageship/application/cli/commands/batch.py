@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Description: Entry method for custom commands
+Class: BatchCommand
+"""
+import json
+import shlex
+import sys
+from json.decoder import JSONDecodeError
+
+from packageship.application.cli.base import BaseCommand
+
+
+class BatchCommand(BaseCommand):
+    """
+    Description: run the queries of a file in the process, one pkgship command line by line,
+                 and write the result of every query as a line of json
+    Attributes:
+        parse: Command line parsing example
+        params: Command line parameters
+    """
+
+    def __init__(self):
+        """
+        Description: Class instance initialization
+        """
+        super(BatchCommand, self).__init__()
+        self.parse = BaseCommand.subparsers.add_parser(
+            'batch', help='run the queries of a file without the pkgship service')
+        self.params = [
+            ('file', 'str', 'file of the queries, one command line such as "installdep Judy -level 2" '
+                            'by line, - is the standard input', '', 'store'),
+            ('-o', 'str', 'file of the results, one json document by line, the standard output by default',
+             '', 'store')
+        ]
+
+    def register(self):
+        """
+        Description: Command line parameter injection
+
+        """
+        super(BatchCommand, self).register()
+        self.parse.set_defaults(func=self.do_command)
+
+    def do_command(self, params):
+        """
+        Description: Action to execute command
+        Args:
+            params: command lines params
+        Returns:
+
+        Raises:
+
+        """
+        # Only the command run is registered by the command line, the lines may run any command
+        from packageship.application.cli.cmd import register_commands
+        register_commands()
+        # The queries share the application of the process, its database connections and caches
+        self._set_read_host(local=True)
+        try:
+            queries = sys.stdin if params.file == '-' else open(params.file, 'r', encoding='utf-8')
+            results = open(params.o, 'w', encoding='utf-8') if params.o else sys.stdout
+        except OSError as error:
+            print('[ERROR] {}'.format(error))
+            return
+        try:
+            for number, line in enumerate(queries, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                result = dict(line=number, query=line)
+                result.update(self.run_query(line))
+                results.write(json.dumps(result) + '\n')
+                results.flush()
+        finally:
+            for file in (queries, results):
+                if file not in (sys.stdin, sys.stdout):
+                    file.close()
+
+    def run_query(self, line):
+        """
+        Description: Run the query of a command line
+        Args:
+            line: command line without pkgship
+        Returns:
+            status and response of the query, or its error
+        """
+        try:
+            args = BaseCommand.parser.parse_args(shlex.split(line))
+        except (SystemExit, ValueError):
+            # argparse prints the usage of the command
+            return dict(error='invalid command line')
+        command = getattr(getattr(args, 'func', None), '__self__', None)
+        try:
+            method, path, body = command.query_request(args)
+        except (AttributeError, NotImplementedError):
+            return dict(error='not a query command')
+        if method == 'post':
+            self.request.request(self.read_host + path, method, body=json.dumps(body), headers=self.headers)
+            status_code, text = self.request.status_code, self.request.text
+        else:
+            response = self.request.get(self.read_host + path, headers=self.headers)
+            status_code, text = response.status_code, response.text
+        try:
+            return dict(status=status_code, response=json.loads(text))
+        except (JSONDecodeError, TypeError):
+            return dict(status=status_code, error=text)
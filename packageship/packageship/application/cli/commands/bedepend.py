@@ -53,7 +53,8 @@ class BeDependCommand(BaseCommand):
             ('-build', 'str',
              'Specify -build means that the query is compiled to be dependent,-Install and -build cannot exist at the same time',
              False, 'store_true'),
-            ('-remote', 'str', 'The address of the remote service', False, 'store_true')]
+            ('-remote', 'str', 'The address of the remote service', False, 'store_true'),
+            ('-local', 'str', 'Run the query in the process without the pkgship service', False, 'store_true')]
         self.collection_params = [('pkgName', 'source package name')]
 
     def register(self):
@@ -72,21 +73,14 @@ class BeDependCommand(BaseCommand):
                 cmd_params[0], nargs='*', default=None, help=cmd_params[1])
         self.parse.set_defaults(func=self.do_command)
 
-    def do_command(self, params):
+    def query_request(self, params):
         """
-        Description: Action to execute command
+        Description: The request of the be-dependencies query
         Args:
             params: command lines params
         Returns:
-
-        Raises:
-            ConnectionError: self.request connection error
+            method, path and body of the request
         """
-        if params.build and params.install:
-            print("error: argument -install not allowed with argument -build")
-            print(self.parse.parse_args(['-h']))
-            return
-        self._set_read_host(params.remote)
         if params.b:
             pack_type = 'binary'
         else:
@@ -97,18 +91,35 @@ class BeDependCommand(BaseCommand):
             install_or_build = "build"
         else:
             install_or_build = ""
-        _url = self.read_host + '/dependinfo/dependlist'
+        return 'post', '/dependinfo/dependlist', {
+            'packagename': params.pkgName,
+            'depend_type': 'bedep',
+            "parameter": {
+                "db_priority": [params.dbName],
+                "packtype": pack_type,
+                "with_subpack": params.w,
+                "search_type": install_or_build
+            }}
+
+    def do_command(self, params):
+        """
+        Description: Action to execute command
+        Args:
+            params: command lines params
+        Returns:
+
+        Raises:
+            ConnectionError: self.request connection error
+        """
+        if params.build and params.install:
+            print("error: argument -install not allowed with argument -build")
+            print(self.parse.parse_args(['-h']))
+            return
+        self._set_read_host(params.remote, params.local)
+        method, path, body_dict = self.query_request(params)
+        _url = self.read_host + path
         try:
-            self.request.request(_url, 'post', body=json.dumps(
-                {
-                    'packagename': params.pkgName,
-                    'depend_type': 'bedep',
-                    "parameter": {
-                        "db_priority": [params.dbName],
-                        "packtype": pack_type,
-                        "with_subpack": params.w,
-                        "search_type": install_or_build
-                    }}), headers=self.headers)
+            self.request.request(_url, method, body=json.dumps(body_dict), headers=self.headers)
         except ConnErr as conn_error:
             self.output_error_formatted("", "CONN_ERROR")
         except RequestException as request_exception:
@@ -14,9 +14,11 @@ import os
 from datetime import datetime
 
 from packageship.application.cli.base import BaseCommand
-from packageship.application.core.compare.compare_repo import CompareRepo
+from packageship.application.core.compare.compare_repo import CompareRepo, FIELD
 from packageship.application.core.compare.query_depend import QueryDepend
+from packageship.application.core.compare.snapshot import CompareSnapshot
 from packageship.application.core.compare.validate import validate_args
+from packageship.application.query.database import get_db_generations
 from packageship.libs.conf import configuration
 
 
@@ -34,7 +36,9 @@ class CompareCommand(BaseCommand):
                                                        help='compare the dependency difference of different databases')
         self.params = [
             ('-t', 'str', 'dependency type of query', None, 'store'),
-            ('-o', 'str', 'the storage location of the generated csv file', configuration.COMPARE_OUTPUT_FILE, 'store')
+            ('-o', 'str', 'the storage location of the generated csv file', configuration.COMPARE_OUTPUT_FILE, 'store'),
+            ('-full', 'str', 'query all databases again instead of reusing the snapshots of the unchanged databases',
+             False, 'store_true')
         ]
         self.collection_params = [
             dict(name='-dbs', help='database to be compared,the first database is the benchmark database, '
@@ -63,15 +67,31 @@ class CompareCommand(BaseCommand):
         validate_args(depend_type, dbs, output_path)
         print('[INFO] Start to compare the software package dependencies in different databases, '
               'please wait a few minutes...')
-        # Query dependency information of all packages in each database
-        query_dependency_engine = QueryDepend()
-        all_db_dependency_info = query_dependency_engine.all_depend_info(depend_type=depend_type, dbs=dbs)
         # Path append date
         new_out_path = self._path_append(output_path)
-        # Write the generated dependency information to a csv file
+        # The databases whose generation did not change since the last comparison are read from its snapshot
+        snapshot = CompareSnapshot(path=configuration.COMPARE_SNAPSHOT_PATH, depend_type=depend_type,
+                                   generations=dict() if args.full else get_db_generations())
+        query_dbs = snapshot.outdated(dbs)
+        reuse_dbs = [database for database in dbs if database not in query_dbs]
+        if reuse_dbs:
+            print(f'[INFO] The databases {", ".join(reuse_dbs)} did not change, '
+                  f'their dependencies are read from the last comparison')
+        # Query dependency information of all packages in the other databases concurrently,
+        # and write it to the csv files as it arrives
+        query_dependency_engine = QueryDepend()
         compare_dependency_engine = CompareRepo(out_path=new_out_path, dbs=dbs)
-        is_success = compare_dependency_engine.dbs_compare(all_db_dependency_info)
+        is_success = compare_dependency_engine.stream_compare(
+            query_dependency_engine.iter_depend_info(depend_type=depend_type, dbs=query_dbs), snapshot=snapshot)
         if is_success:
+            for database, (added, removed) in compare_dependency_engine.changes.items():
+                print(f'[INFO] {database}: {added} dependencies added and {removed} removed since the last '
+                      f'comparison, see {database}_changes.csv')
+            # Only the fields of the version are queried, the versions are not kept in the snapshots
+            if compare_dependency_engine.versions_compare(query_dependency_engine.all_versions(depend_type, dbs)):
+                for database, changes in compare_dependency_engine.version_changes.items():
+                    print(f'[INFO] {database}: {changes[FIELD.UPGRADE]} packages upgraded and '
+                          f'{changes[FIELD.DOWNGRADE]} downgraded from {dbs[0]}, see versions.csv')
             print(
                 f'[INFO] The data comparison is successful, and the generated file is in the ({new_out_path}) path.')
 
@@ -39,7 +39,8 @@ class DbPriorityCommand(BaseCommand):
         self.parse = BaseCommand.subparsers.add_parser(
             'dbs', help='Get all data bases')
         self.params = [
-            ('-remote', 'str', 'The address of the remote service', False, 'store_true')
+            ('-remote', 'str', 'The address of the remote service', False, 'store_true'),
+            ('-local', 'str', 'Run the query in the process without the pkgship service', False, 'store_true')
         ]
 
     def register(self):
@@ -50,6 +51,16 @@ class DbPriorityCommand(BaseCommand):
         super(DbPriorityCommand, self).register()
         self.parse.set_defaults(func=self.do_command)
 
+    def query_request(self, params):
+        """
+        Description: The request of the databases query
+        Args:
+            params: command lines params
+        Returns:
+            method, path and body of the request
+        """
+        return 'get', '/db_priority', None
+
     def do_command(self, params):
         """
         Description: Action to execute command
@@ -60,8 +71,9 @@ class DbPriorityCommand(BaseCommand):
         Raises:
             ConnectionError: self.request connection error
         """
-        self._set_read_host(params.remote)
-        _url = self.read_host + '/db_priority'
+        self._set_read_host(params.remote, params.local)
+        _, path, _ = self.query_request(params)
+        _url = self.read_host + path
         try:
             response = self.request.get(_url, headers=self.headers)
         except ConnErr as conn_error:
@@ -47,7 +47,8 @@ class InstallDepCommand(BaseCommand):
         self.params = [
             ('-level', 'str', 'Specify the dependency level that needs to be queried, by default to the last', '',
              'store'),
-            ('-remote', 'str', 'The address of the remote service', False, 'store_true')
+            ('-remote', 'str', 'The address of the remote service', False, 'store_true'),
+            ('-local', 'str', 'Run the query in the process without the pkgship service', False, 'store_true')
         ]
         self.collection_params = [
             ('binaryName', 'binary package name'),
@@ -72,18 +73,14 @@ class InstallDepCommand(BaseCommand):
                 cmd_params[0], nargs='*', default=None, help=cmd_params[1])
         self.parse.set_defaults(func=self.do_command)
 
-    def do_command(self, params):
+    def query_request(self, params):
         """
-        Description: Action to execute command
+        Description: The request of the installation dependencies query
         Args:
             params: Command line parameters
         Returns:
-
-        Raises:
-            ConnectionError: self.request connection error
+            method, path and body of the request
         """
-        self._set_read_host(params.remote)
-        _url = self.read_host + '/dependinfo/dependlist'
         body_dict = {
             'packagename': params.binaryName,
             'depend_type': 'installdep',
@@ -93,8 +90,23 @@ class InstallDepCommand(BaseCommand):
             body_dict["parameter"] = {"db_priority": params.dbs}
         if params.level:
             body_dict["parameter"]["level"] = params.level
+        return 'post', '/dependinfo/dependlist', body_dict
+
+    def do_command(self, params):
+        """
+        Description: Action to execute command
+        Args:
+            params: Command line parameters
+        Returns:
+
+        Raises:
+            ConnectionError: self.request connection error
+        """
+        self._set_read_host(params.remote, params.local)
+        method, path, body_dict = self.query_request(params)
+        _url = self.read_host + path
         try:
-            self.request.request(_url, 'post', body=json.dumps(
+            self.request.request(_url, method, body=json.dumps(
                 body_dict), headers=self.headers)
         except ConnErr as conn_error:
             self.output_error_formatted("", "CONN_ERROR")
@@ -52,7 +52,8 @@ class SelfDependCommand(BaseCommand):
              None, 'store_true'),
             ('-w', 'str', 'Specify -w means you need to find the sub-package relationship',
              False, 'store_true'),
-            ('-remote', 'str', 'The address of the remote service', False, 'store_true')
+            ('-remote', 'str', 'The address of the remote service', False, 'store_true'),
+            ('-local', 'str', 'Run the query in the process without the pkgship service', False, 'store_true')
         ]
         self.collection_params = [
             ('-dbs', 'Operational database collection'),
@@ -76,36 +77,46 @@ class SelfDependCommand(BaseCommand):
                 cmd_params[0], nargs='*', default=None, help=cmd_params[1])
         self.parse.set_defaults(func=self.do_command)
 
-    def do_command(self, params):
+    def query_request(self, params):
         """
-        Description: Action to execute command
+        Description: The request of the self-compiled dependencies query
         Args:
             params: commands lines params
         Returns:
-
-        Raises:
-            ConnectionError: self.request connection error
+            method, path and body of the request
         """
-        self._set_read_host(params.remote)
         if params.b:
             pack_type = 'binary'
         else:
             pack_type = 'source'
+        _input_body = {
+            'packagename': params.pkgName,
+            'depend_type': 'selfdep',
+            "parameter": {
+                "self_build": params.s,
+                "packtype": pack_type,
+                "with_subpack": params.w,
+            }}
+        if params.dbs:
+            _input_body["parameter"]["db_priority"] = params.dbs
+        return 'post', '/dependinfo/dependlist', _input_body
 
-        _url = self.read_host + '/dependinfo/dependlist'
+    def do_command(self, params):
+        """
+        Description: Action to execute command
+        Args:
+            params: commands lines params
+        Returns:
+
+        Raises:
+            ConnectionError: self.request connection error
+        """
+        self._set_read_host(params.remote, params.local)
+        method, path, _input_body = self.query_request(params)
+        _url = self.read_host + path
         try:
-            _input_body = {
-                'packagename': params.pkgName,
-                'depend_type': 'selfdep',
-                "parameter": {
-                    "self_build": params.s,
-                    "packtype": pack_type,
-                    "with_subpack": params.w,
-                }}
-            if params.dbs:
-                _input_body["parameter"]["db_priority"] = params.dbs
             self.request.request(_url,
-                                 'post', body=json.dumps(_input_body), headers=self.headers)
+                                 method, body=json.dumps(_input_body), headers=self.headers)
 
         except ConnErr as conn_error:
             self.output_error_formatted("", "CONN_ERROR")
@@ -48,7 +48,8 @@ class SingleCommand(BaseCommand):
             ('database', 'str', 'name of the database operated', '', 'store'),
             ('-s', 'str', 'Specify -s to query the src source package information, If not specified, query bin binary '
                           'package information by default', None, 'store_true'),
-            ('-remote', 'str', 'The address of the remote service', False, 'store_true')]
+            ('-remote', 'str', 'The address of the remote service', False, 'store_true'),
+            ('-local', 'str', 'Run the query in the process without the pkgship service', False, 'store_true')]
         self.provides_table = self.create_table(['Symbol', 'Required by'])
         self.requires_table = self.create_table(['Symbol', 'Provides by'])
         self.file_list_table = self.create_table(['Symbol', 'File List'])
@@ -229,26 +230,35 @@ class SingleCommand(BaseCommand):
         _filelist = parse_data.get('filelist') if parse_data.get('filelist') else {}
         self.__parse_filelist(_filelist)
 
-    def do_command(self, params):
+    def query_request(self, params):
         """
-        Description: Action to execute command
+        Description: The request of the package information query
         Args:
             params: command lines params
         Returns:
-
-        Raises:
-            ConnectionError: self.request connection error
+            method, path and body of the request
         """
         if params.s:
             src_or_bin = 'src'
         else:
             src_or_bin = 'bin'
-        self._set_read_host(params.remote)
+        return 'get', '/packages/{src_or_bin}/{packagename}?database_name={database}&pkg_name={pkg_name}' \
+            .format(src_or_bin=src_or_bin, packagename=params.packagename, database=params.database,
+                    pkg_name=params.packagename), None
 
-        _url = self.read_host + \
-               '/packages/{src_or_bin}/{packagename}?database_name={database}&pkg_name={pkg_name}' \
-                   .format(src_or_bin=src_or_bin, packagename=params.packagename, database=params.database,
-                           pkg_name=params.packagename)
+    def do_command(self, params):
+        """
+        Description: Action to execute command
+        Args:
+            params: command lines params
+        Returns:
+
+        Raises:
+            ConnectionError: self.request connection error
+        """
+        self._set_read_host(params.remote, params.local)
+        _, path, _ = self.query_request(params)
+        _url = self.read_host + path
         try:
             response = self.request.get(_url)
         except ConnErr as conn_error:
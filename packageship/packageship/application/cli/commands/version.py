@@ -39,7 +39,8 @@ class VersionCommand(BaseCommand):
         self.parse = BaseCommand.parser
         self.params = [
             ('-v', 'str', 'Get version information', None, 'store_true'),
-            ('-remote', 'str', 'The address of the remote service', False, 'store_true')
+            ('-remote', 'str', 'The address of the remote service', False, 'store_true'),
+            ('-local', 'str', 'Run the query in the process without the pkgship service', False, 'store_true')
         ]
 
     def register(self):
@@ -50,6 +51,16 @@ class VersionCommand(BaseCommand):
         super(VersionCommand, self).register()
         self.parse.set_defaults(func=self.do_command)
 
+    def query_request(self, params):
+        """
+        Description: The request of the version query
+        Args:
+            params: command lines params
+        Returns:
+            method, path and body of the request
+        """
+        return 'get', '/version', None
+
     def do_command(self, params):
         """
         Description: Action to execute command
@@ -60,11 +71,12 @@ class VersionCommand(BaseCommand):
         Raises:
             ConnectionError: self.request connection error
         """
-        self._set_read_host(params.remote)
+        self._set_read_host(params.remote, params.local)
         if not params.v:
             print(self.parse.parse_args(['-h']))
             return
-        _url = self.read_host + '/version'
+        _, path, _ = self.query_request(params)
+        _url = self.read_host + path
 
         try:
             response = self.request.get(_url, headers=self.headers, timeout=2)
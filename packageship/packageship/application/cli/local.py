@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Description: Run the queries of the command line in the process, without the pkgship service
+Class: LocalService, LocalResponse
+"""
+from urllib.parse import urlsplit
+
+import requests
+
+# Host of the urls of the commands in the local mode, only the path of the url is used
+LOCAL_HOST = "http://localhost"
+
+_APP = None
+
+
+def local_app():
+    """
+    Description: The query application of the process, created once so that the
+                 database connections and the caches are shared by the queries
+    """
+    global _APP
+    if _APP is None:
+        from packageship.application import init_app
+        # The limits of the requests protect the service from its clients, not the process from itself
+        _APP = init_app("query", rate_limit=False)
+    return _APP
+
+
+class LocalResponse:
+    """
+    Description: Response of a query run in the process, with the attributes of the http response used
+                 by the commands
+    """
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.content = response.get_data()
+
+    @property
+    def text(self):
+        """
+        Description: content of the decoded response
+        """
+        return self.content.decode("utf-8")
+
+    def raise_for_status(self):
+        """
+        Description: Raise the error of the http status of the response
+        """
+        if self.status_code >= 400:
+            raise requests.HTTPError("%s Error of the local query" % self.status_code)
+
+
+class LocalService:
+    """
+    Description: The interface of RemoteService, the requests are dispatched to the views of the
+                 query application in the process instead of the pkgship service
+    """
+
+    def __init__(self):
+        self._client = local_app().test_client()
+        self._body = None
+        self._response = None
+        self._request_error = None
+
+    @property
+    def status_code(self):
+        """
+        Description: status code of the response
+        """
+        if self._response is None:
+            return requests.codes["internal_server_error"]
+        return self._response.status_code
+
+    @property
+    def content(self):
+        """
+        Description: original content of the response
+        """
+        return self._response.content if self._response else None
+
+    @property
+    def text(self):
+        """
+        Description: content of the decoded response
+        """
+        return self._response.text if self._response else None
+
+    def _dispatch(self, method, url, data=None, headers=None):
+        """
+        Description: Run the view of the path of the url
+
+        Args:
+            method: get or post
+            url: url of the request, the host is ignored
+            data: request body
+            headers: request headers
+        """
+        url = urlsplit(url)
+        path = url.path + ("?" + url.query if url.query else "")
+        return LocalResponse(self._client.open(path, method=method.upper(), data=data, headers=headers))
+
+    def request(self, url, method, body=None, max_retry=3, **kwargs):
+        """
+        Description: Run a query, the same as RemoteService.request
+
+        Args:
+            url: url of the request
+            method: get or post
+            body: Request body content
+            max_retry: unused, a query in the process is not retried
+            kwargs: Request the relevant parameters
+        """
+        self._body = body
+        self._response = self._dispatch(method, url, data=kwargs.get("data") or body,
+                                        headers=kwargs.get("headers"))
+
+    def get(self, url, **kwargs):
+        """
+        Description: Run a get query
+
+        Args:
+            url: url of the request
+            kwargs: requests parameters, the headers are used
+        """
+        return self._dispatch("get", url, headers=kwargs.get("headers"))
+
+    def post(self, url, **kwargs):
+        """
+        Description: Run a post query
+
+        Args:
+            url: url of the request
+            kwargs: requests parameters, the data and the headers are used
+        """
+        return self._dispatch("post", url, data=kwargs.get("data") or self._body, headers=kwargs.get("headers"))
+
+    def map(self, urls, method="get", max_workers=None, **kwargs):
+        """
+        Description: Run the queries of the urls, the same as RemoteService.map. The queries share
+                     the application of the process and its context, they are run one after the other
+
+        Args:
+            urls: urls of the requests
+            method: get or post
+            max_workers: unused, the queries are not run concurrently
+            kwargs: requests parameters of every request, the data and the headers are used
+        Returns:
+            responses in the order of the urls
+        """
+        return [self._dispatch(method, url, data=kwargs.get("data"), headers=kwargs.get("headers"))
+                for url in urls]
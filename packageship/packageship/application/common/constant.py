@@ -10,14 +10,32 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
-from redis import Redis, ConnectionPool
+import threading
+
 from packageship.libs.conf import configuration
 
-REDIS_CONN = Redis(connection_pool=ConnectionPool(
-    host=configuration.REDIS_HOST,
-    port=configuration.REDIS_PORT,
-    max_connections=configuration.REDIS_MAX_CONNECTIONS,
-    decode_responses=True))
+# Guards the creation of REDIS_CONN, the threads of the first requests share one pool
+_REDIS_CONN_LOCK = threading.Lock()
+
+
+def __getattr__(name):
+    """
+    REDIS_CONN is created on its first use, the commands which do not use redis do not import it
+    """
+    if name != "REDIS_CONN":
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    with _REDIS_CONN_LOCK:
+        redis_conn = globals().get("REDIS_CONN")
+        if redis_conn is None:
+            from redis import Redis, ConnectionPool
+            redis_conn = globals()["REDIS_CONN"] = Redis(connection_pool=ConnectionPool(
+                host=configuration.REDIS_HOST,
+                port=configuration.REDIS_PORT,
+                max_connections=configuration.REDIS_MAX_CONNECTIONS,
+                decode_responses=True))
+    return redis_conn
+
+
 # es page size max value
 MAX_PAGE_SIZE = 10000
 
@@ -42,6 +60,9 @@ DATABASE_ENGINE_TYPE = "elastic"
 # index of default databases
 DB_INFO_INDEX = "databaseinfo"
 
+# index of the install and build closures of the hot packages
+CLOSURE_INDEX = "dependclosure"
+
 # index suffix of bedepend require
 BE_DEPEND_TYPE = "bedepend"
 
@@ -63,6 +84,12 @@ LEVEL_RADIUS = 30
 # node size shown in the map
 NODE_SIZE = 25
 
+# Seconds a graph session is kept after its last expand
+GRAPH_SESSION_EXPIRE = 3600
+
+# Seconds the package counts and details of a database are cached, initializing the databases clears them
+DATABASE_CACHE_EXPIRE = 86400
+
 # Maximum number of requests per day
 MAX_DAY_NUMBER = 500
 
@@ -90,6 +117,12 @@ CALL_MAX_DELAY = 60
 # Maximum number of retries for failed URL calls
 MAX_RETRY = 3
 
+# Connections kept alive by the http session of RemoteService, and its concurrent requests
+REMOTE_POOL_SIZE = 10
+
+# Smallest response body of the service compressed with gzip
+GZIP_MIN_SIZE = 1024
+
 # Package build state
 BUILD_STATES = ["succeeded", "failed", "unresolvable", "broken", "blocked", "building", "excluded"]
 
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Description: Gzip encoding of the responses of the service, for the clients accepting it
+"""
+import gzip
+
+from flask import request
+
+from packageship.application.common.constant import GZIP_MIN_SIZE
+
+# Compression level of the responses, the larger levels cost more time than they save
+GZIP_LEVEL = 6
+
+
+def _gzip_response(response):
+    """
+    Description: Compress the body of a successful response, the streamed responses are
+                 sent as they are generated
+
+    Args:
+        response: flask response
+    Returns:
+        the response
+    """
+    if response.direct_passthrough or response.is_streamed or not 200 <= response.status_code < 300 \
+            or "Content-Encoding" in response.headers \
+            or "gzip" not in request.headers.get("Accept-Encoding", "").lower():
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_gzip(app):
+    """
+    Description: Compress the responses of the app
+
+    Args:
+        app: flask app
+    """
+    app.after_request(_gzip_response)
@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Comparison of the epoch:version-release of rpm packages, the same order as rpmvercmp of rpm.
+
+A version is parsed once into a sort key, a tuple of its segments, and the parsed keys are
+cached. Comparing two versions is then a comparison of tuples, and a list of packages is
+sorted by version with the key instead of comparing every pair with rpm.
+"""
+import re
+from functools import lru_cache
+
+# Segments of a version: digits, letters, and the tilde and caret separators, the other
+# characters only separate the segments
+_SEGMENT = re.compile(r"[0-9]+|[a-zA-Z]+|~|\^")
+
+# Order of the kinds of segments at the same position of two versions, as rpmvercmp:
+# tilde sorts before the end of the version, caret after the end and before a segment,
+# letters before digits
+_TILDE = (0,)
+_END = (1,)
+_CARET = (2,)
+_ALPHA = 3
+_DIGIT = 4
+
+# Number of parsed versions kept in the cache
+CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def version_key(version):
+    """
+    Description: Sort key of a version or a release
+
+    Args:
+        version: version string, None is the same as an empty version
+    Returns:
+        tuple of the segments of the version, ordered as rpmvercmp
+    """
+    key = []
+    for segment in _SEGMENT.findall(version or ""):
+        if segment == "~":
+            key.append(_TILDE)
+        elif segment == "^":
+            key.append(_CARET)
+        elif segment.isdigit():
+            # Leading zeros are ignored
+            key.append((_DIGIT, int(segment)))
+        else:
+            key.append((_ALPHA, segment))
+    key.append(_END)
+    return tuple(key)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def evr_key(epoch=None, version=None, release=None):
+    """
+    Description: Sort key of a package version, the epoch first, then the version and the release
+
+    Args:
+        epoch: epoch of the package, None is 0
+        version: version of the package
+        release: release of the package
+    Returns:
+        tuple of the epoch and the keys of the version and the release
+    """
+    try:
+        epoch = int(epoch or 0)
+    except (TypeError, ValueError):
+        epoch = 0
+    return epoch, version_key(version), version_key(release)
+
+
+def parse_evr(evr):
+    """
+    Description: Split a label [epoch:]version[-release]
+
+    Args:
+        evr: label of a package version
+    Returns:
+        epoch, version, release, None for the missing parts
+    """
+    epoch, _, version_release = (evr or "").rpartition(":")
+    version, _, release = version_release.partition("-")
+    return epoch or None, version or None, release or None
+
+
+def format_evr(epoch=None, version=None, release=None):
+    """
+    Description: Label of a package version, the epoch is omitted when it is 0
+
+    Returns:
+        [epoch:]version[-release]
+    """
+    label = version or ""
+    if release:
+        label = "%s-%s" % (label, release)
+    if epoch and str(epoch) != "0":
+        label = "%s:%s" % (epoch, label)
+    return label
+
+
+def rpmvercmp(version1, version2):
+    """
+    Description: Compare two versions or two releases
+
+    Returns:
+        1 if version1 is newer, -1 if it is older, 0 if they are equal
+    """
+    key1, key2 = version_key(version1), version_key(version2)
+    return (key1 > key2) - (key1 < key2)
+
+
+def label_compare(evr1, evr2):
+    """
+    Description: Compare two package versions
+
+    Args:
+        evr1: (epoch, version, release) of the first package
+        evr2: (epoch, version, release) of the second package
+    Returns:
+        1 if the first package is newer, -1 if it is older, 0 if they are equal
+    """
+    key1, key2 = evr_key(*evr1), evr_key(*evr2)
+    return (key1 > key2) - (key1 < key2)
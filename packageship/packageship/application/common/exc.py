@@ -129,6 +129,16 @@ class ElasticSearchInsertException(Error):
         )
 
 
+class StreamAbortedException(Error):
+    """
+    Description: A streamed response failed after its status was sent, the response is
+                 aborted so that the client sees it is incomplete
+    """
+
+    def __init__(self, message):
+        Error.__init__(self, "Stream aborted: %s" % (message,))
+
+
 class InitializeError(Error):
     """
     Data initializes the exception information
@@ -14,67 +14,187 @@
 Send file stream
 """
 
-import os
-import shutil
+import csv
+import io
 import zipfile
-from io import BytesIO
+from packageship.application.common.exc import ElasticSearchQueryException, StreamAbortedException
 from packageship.libs.log import LOGGER
 
+try:
+    import pyarrow
+    from pyarrow import ipc
+    from pyarrow import parquet
+except ImportError:
+    # The columnar export formats are only available with pyarrow installed
+    pyarrow = None
 
-class CompressIo():
+# Columnar export formats and the extension of their files
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+class _ZipStream(io.RawIOBase):
+    """
+    Write only and unseekable output of a zip file, the bytes written are taken
+    away by the zip stream, so the zip file is never held in memory
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def take(self):
+        """
+        Take away the bytes written since the last take
+        Returns:
+            bytes
+        """
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+class ColumnarIo:
     """
-    Public methods for sending and deleting files
+    Encode columns into Parquet or Arrow IPC files, the string columns and the
+    values of the list columns are dictionary encoded
+
+    Attributes:
+        file_format: parquet or arrow
     """
 
-    def _delete_file_path(self, folder_path):
+    def __init__(self, file_format):
+        if file_format not in COLUMNAR_FORMATS:
+            raise ValueError("unsupported columnar format: %s" % file_format)
+        self.file_format = file_format
+
+    @staticmethod
+    def available():
+        """
+        Whether the columnar formats are available
+        """
+        return pyarrow is not None
+
+    @property
+    def extension(self):
+        """extension of the files"""
+        return COLUMNAR_FORMATS[self.file_format]
+
+    @staticmethod
+    def _array(values):
         """
-        Delete folder
+        Build a column, strings are dictionary encoded
         Args:
-            folder_path: Folder path
+            values: values of the column
+        Returns:
+            arrow array
+        """
+        array = pyarrow.array(values)
+        if pyarrow.types.is_list(array.type) and pyarrow.types.is_string(array.type.value_type):
+            return pyarrow.ListArray.from_arrays(
+                array.offsets, array.flatten().dictionary_encode())
+        if pyarrow.types.is_string(array.type):
+            return array.dictionary_encode()
+        return array
 
+    def encode(self, columns):
+        """
+        Encode columns into a file
+        Args:
+            columns: column names and their values
         Returns:
-            None
+            bytes of the file
+        Raises:
+            ValueError: pyarrow is not installed
         """
-        try:
-            if folder_path and os.path.exists(folder_path):
-                shutil.rmtree(folder_path)
-        except (IOError, OSError) as error:
-            LOGGER.error(error)
-            raise IOError("Failed to delete folder")
+        if not self.available():
+            raise ValueError("pyarrow is required by the %s format" % self.file_format)
+        table = pyarrow.Table.from_pydict(
+            {name: self._array(values) for name, values in columns.items()})
+        sink = pyarrow.BufferOutputStream()
+        if self.file_format == "parquet":
+            parquet.write_table(table, sink)
+        else:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        return sink.getvalue().to_pybytes()
 
-    def _send_bytes_io(self, folder_path):
+    def files(self, tables):
         """
-        Send a compressed file
+        Files of the columnar tables
         Args:
-            folder_path: The file path
+            tables: table names and their columns
         Returns:
-            memory_file: File stream
+            generator of the file names and their bytes
         """
-        file_list = os.listdir(folder_path)
-        memory_file = BytesIO()
-        with zipfile.ZipFile(memory_file, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for _file in file_list:
-                with open(os.path.join(folder_path, _file), 'rb') as file_content:
-                    zip_file.writestr(_file, file_content.read())
-        memory_file.seek(0)
-        return memory_file
-
-    def send_memory_file(self, folder_path):
+        for name, columns in tables:
+            yield name + self.extension, self.encode(columns)
+
+
+class CompressIo():
+    """
+    Public methods for sending files
+    """
+    # Size of the csv text compressed at a time when streaming a zip file
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def _deflate_rows(self, zip_entry, rows, output):
         """
-        Main method of sending files
+        Write csv rows into a zip entry
         Args:
-            folder_path: The file path
+            zip_entry: zip entry opened for writing
+            rows: csv rows
+            output: output of the zip file
         Returns:
-            zip_file: File stream
+            generator of the bytes of the zip file compressed so far
+        """
+        buffer = io.StringIO(newline="")
+        csv_writer = csv.writer(buffer)
+        for row in rows:
+            csv_writer.writerow(row)
+            if buffer.tell() < self.STREAM_CHUNK_SIZE:
+                continue
+            zip_entry.write(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+            if output.size:
+                yield output.take()
+        zip_entry.write(buffer.getvalue().encode("utf-8"))
 
+    def stream_zip(self, files):
+        """
+        Compress csv files into a zip file while their rows are generated
+        Args:
+            files: file names and their rows, or the bytes of files already encoded
+        Returns:
+            generator of the bytes of the zip file
         Raises:
-            IOError: IOError
+            StreamAbortedException: a file or its rows failed, the end of the zip file
+                                    is not generated
         """
+        output = _ZipStream()
         try:
-            memory_file = self._send_bytes_io(folder_path)
-            return memory_file
-        except (OSError, IOError) as error:
-            LOGGER.error(error)
-            raise IOError("File sending failed")
-        finally:
-            self._delete_file_path(folder_path)
+            with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                for file_name, content in files:
+                    # The size of a generated file is unknown, zip64 allows any size
+                    with zip_file.open(file_name, "w", force_zip64=True) as zip_entry:
+                        if isinstance(content, bytes):
+                            zip_entry.write(content)
+                        else:
+                            yield from self._deflate_rows(zip_entry, content, output)
+                    if output.size:
+                        yield output.take()
+        except (OSError, ValueError, KeyError, TypeError, AttributeError,
+                ElasticSearchQueryException) as error:
+            LOGGER.error("Failed to generate the zip file: %s" % error)
+            raise StreamAbortedException(error) from error
+        yield output.take()
@@ -0,0 +1,413 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Description: Prometheus metrics of the service and of the initialization.
+             The samples are buffered in the process and added to a redis hash with
+             HINCRBYFLOAT, which is atomic, so the uwsgi workers and the pkgship init
+             process share the same counters
+"""
+import inspect
+import os
+import re
+import threading
+import time
+from functools import wraps
+
+from flask import g, request
+from redis.exceptions import RedisError
+
+from packageship.application.common import constant
+from packageship.libs.log import LOGGER
+
+# The keys do not start with "pkgship_", the metrics are kept when the databases are initialized again
+METRICS_KEY = "pkgship:metrics"
+# Gauges of a process, they expire when the process stops updating them
+PROCESS_GAUGES_KEY = "pkgship:metrics:process:%s"
+PROCESS_GAUGES_EXPIRE = 300
+
+# Upper bounds of the buckets of the latency histograms, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Upper bounds of the buckets of the connection pool utilization
+UTILIZATION_BUCKETS = (0.25, 0.5, 0.75, 0.9, 1, 1.5, 2)
+
+# name: (type, help)
+METRIC_FAMILIES = {
+    "pkgship_request_duration_seconds": (
+        "histogram", "Time to handle a request, by endpoint and depend type"),
+    "pkgship_es_request_duration_seconds": (
+        "histogram", "Time of the elasticsearch requests, by operation and index"),
+    "pkgship_es_request_errors_total": (
+        "counter", "Failed elasticsearch requests, by operation and index"),
+    "pkgship_es_pool_utilization": (
+        "histogram", "Connections in use of the elasticsearch connection pools of a process over "
+                     "their size when a request starts, 1 and more means the requests wait"),
+    "pkgship_es_pool_connections_in_use": (
+        "gauge", "Connections in use of the elasticsearch connection pools, by process"),
+    "pkgship_es_pool_size": ("gauge", "Size of the elasticsearch connection pools, by process"),
+    "pkgship_es_hedged_queries_total": (
+        "counter", "Elasticsearch queries sent again after the hedge delay, by the query answering first"),
+    "pkgship_cache_requests_total": (
+        "counter", "Depend results read from the redis cache (hit), computed (miss) or "
+                   "waited for while another request computes them (coalesce)"),
+    "pkgship_gevent_jobs_total": ("counter", "Gevent jobs spawned by the queries"),
+    "pkgship_gevent_jobs_active": ("gauge", "Gevent jobs running, by process"),
+    "pkgship_init_documents_indexed": (
+        "gauge", "Documents indexed by the last initialization, by database and index type"),
+    "pkgship_init_repo_duration_seconds": (
+        "gauge", "Time to initialize a database by the last initialization"),
+    "pkgship_init_repo_failed": (
+        "gauge", "1 when the last initialization of a database failed"),
+}
+
+_SUFFIXES = ("_bucket", "_sum", "_count")
+
+
+def _escape(value):
+    """
+    Description: Escape a label value of the exposition format
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def sample_name(name, labels=None):
+    """
+    Description: The sample in the exposition format, used as the field of the redis hash
+
+    Args:
+        name: name of the sample
+        labels: dict of the label names and values
+    Returns:
+        name{label="value",...}
+    """
+    if not labels:
+        return name
+    return "%s{%s}" % (name, ",".join('%s="%s"' % (key, _escape(value))
+                                      for key, value in sorted(labels.items())))
+
+
+def _format_value(value):
+    """
+    Description: A sample value of the exposition format
+    """
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Metrics:
+    """
+    Description: Counters, histograms and gauges buffered in the process and flushed to redis
+
+    Attributes:
+        _increments: sample and the increment not flushed yet
+        _gauges: sample and the value of the gauges not flushed yet
+        _process_gauges: sample and the value of the gauges of the process
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._increments = dict()
+        self._gauges = dict()
+        self._process_gauges = dict()
+
+    def inc(self, name, labels=None, value=1):
+        """
+        Description: Increment a counter
+
+        Args:
+            name: name of the counter
+            labels: dict of the label names and values
+            value: increment
+        """
+        sample = sample_name(name, labels)
+        with self._lock:
+            self._increments[sample] = self._increments.get(sample, 0) + value
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        """
+        Description: Observe a value of a histogram
+
+        Args:
+            name: name of the histogram
+            labels: dict of the label names and values
+            value: observed value
+            buckets: upper bounds of the buckets
+        """
+        labels = dict(labels or {})
+        with self._lock:
+            # Every bucket is incremented, by 0 above the value, so that all of them are exposed
+            for bound in buckets + (float("inf"),):
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                sample = sample_name(name + "_bucket", dict(labels, le=le))
+                self._increments[sample] = self._increments.get(sample, 0) + int(value <= bound)
+            for suffix, increment in (("_sum", value), ("_count", 1)):
+                sample = sample_name(name + suffix, labels)
+                self._increments[sample] = self._increments.get(sample, 0) + increment
+
+    def set(self, name, labels, value):
+        """
+        Description: Set a gauge shared by all processes, the last value set wins
+
+        Args:
+            name: name of the gauge
+            labels: dict of the label names and values
+            value: value of the gauge
+        """
+        with self._lock:
+            self._gauges[sample_name(name, labels)] = value
+
+    def add_process_gauge(self, name, value):
+        """
+        Description: Add to a gauge of the process, every process has its own sample
+                     labeled with its pid
+
+        Args:
+            name: name of the gauge
+            value: value added to the gauge
+        """
+        sample = sample_name(name, dict(pid=os.getpid()))
+        with self._lock:
+            self._process_gauges[sample] = self._process_gauges.get(sample, 0) + value
+
+    def set_process_gauge(self, name, value):
+        """
+        Description: Set a gauge of the process, every process has its own sample
+                     labeled with its pid
+
+        Args:
+            name: name of the gauge
+            value: value of the gauge
+        """
+        with self._lock:
+            self._process_gauges[sample_name(name, dict(pid=os.getpid()))] = value
+
+    def flush(self):
+        """
+        Description: Add the buffered samples to redis in one pipeline, the samples are
+                     kept in the buffer when redis is not available
+        """
+        with self._lock:
+            increments, self._increments = self._increments, dict()
+            gauges, self._gauges = self._gauges, dict()
+            process_gauges = dict(self._process_gauges)
+        if not increments and not gauges and not process_gauges:
+            return
+        try:
+            pipeline = constant.REDIS_CONN.pipeline(transaction=False)
+            for sample, increment in increments.items():
+                pipeline.hincrbyfloat(METRICS_KEY, sample, increment)
+            if gauges:
+                pipeline.hset(METRICS_KEY, mapping=gauges)
+            if process_gauges:
+                process_key = PROCESS_GAUGES_KEY % os.getpid()
+                pipeline.hset(process_key, mapping=process_gauges)
+                pipeline.expire(process_key, PROCESS_GAUGES_EXPIRE)
+            pipeline.execute()
+        except RedisError as error:
+            LOGGER.warning(error)
+            with self._lock:
+                for sample, increment in increments.items():
+                    self._increments[sample] = self._increments.get(sample, 0) + increment
+                for sample, value in gauges.items():
+                    self._gauges.setdefault(sample, value)
+
+    def collect(self):
+        """
+        Description: The metrics of all processes in the prometheus text exposition format
+
+        Returns:
+            text of the metrics
+        Raises:
+            RedisError: redis is not available
+        """
+        self.flush()
+        samples = dict(constant.REDIS_CONN.hgetall(METRICS_KEY))
+        for key in constant.REDIS_CONN.scan_iter(match=PROCESS_GAUGES_KEY % "*"):
+            samples.update(constant.REDIS_CONN.hgetall(key))
+
+        families = dict()
+        for sample, value in samples.items():
+            families.setdefault(self._family(sample), []).append((sample, value))
+        lines = []
+        for family in sorted(families):
+            metric_type, help_text = METRIC_FAMILIES.get(family, ("untyped", family))
+            lines.append("# HELP %s %s" % (family, help_text))
+            lines.append("# TYPE %s %s" % (family, metric_type))
+            for sample, value in sorted(families[family], key=lambda item: self._sort_key(item[0])):
+                lines.append("%s %s" % (sample, _format_value(value)))
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _family(sample):
+        """
+        Description: Name of the metric of a sample, without the suffixes of the histograms
+        """
+        name = sample.split("{", 1)[0]
+        for suffix in _SUFFIXES:
+            if name.endswith(suffix) and name[:-len(suffix)] in METRIC_FAMILIES:
+                return name[:-len(suffix)]
+        return name
+
+    @staticmethod
+    def _sort_key(sample):
+        """
+        Description: The buckets of a histogram are sorted by their upper bound
+        """
+        bound = re.search(r'le="([^"]+)"', sample)
+        labels = re.sub(r',?le="[^"]+"', "", sample)
+        return labels, float(bound.group(1)) if bound else 0.0
+
+
+METRICS = Metrics()
+
+
+def _observe_pool(session, operation):
+    """
+    Description: Record the use of the connection pools of the session when a request starts
+    """
+    pool_usage = getattr(session, "pool_usage", None)
+    if pool_usage is None:
+        return
+    in_use, size = pool_usage()
+    if not size:
+        return
+    METRICS.observe("pkgship_es_pool_utilization", dict(operation=operation), in_use / size,
+                    buckets=UTILIZATION_BUCKETS)
+    METRICS.set_process_gauge("pkgship_es_pool_connections_in_use", in_use)
+    METRICS.set_process_gauge("pkgship_es_pool_size", size)
+
+
+def timed_items(items, elapsed):
+    """
+    Description: Yield the items of a generator, the time spent generating them is added
+                 to elapsed, not the time of the caller between two items
+
+    Args:
+        items: generator
+        elapsed: list of the seconds spent
+    """
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            finally:
+                elapsed[0] += time.perf_counter() - start
+            yield item
+    finally:
+        items.close()
+
+
+def es_request(operation):
+    """
+    Description: Decorator of the methods of the elasticsearch session, the latency and the
+                 errors of the requests are recorded by operation and index, and the use
+                 of the connection pools of the synchronous requests
+
+    Args:
+        operation: name of the elasticsearch operation
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(self, index, *args, **kwargs):
+                labels = dict(operation=operation, index=index)
+                start = time.perf_counter()
+                try:
+                    return await func(self, index, *args, **kwargs)
+                except Exception:
+                    METRICS.inc("pkgship_es_request_errors_total", labels)
+                    raise
+                finally:
+                    METRICS.observe("pkgship_es_request_duration_seconds", labels,
+                                    time.perf_counter() - start)
+
+            return async_wrapper
+
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def generator_wrapper(self, index, *args, **kwargs):
+                labels = dict(operation=operation, index=index)
+                _observe_pool(self, operation)
+                elapsed = [0]
+                try:
+                    yield from timed_items(func(self, index, *args, **kwargs), elapsed)
+                except Exception:
+                    METRICS.inc("pkgship_es_request_errors_total", labels)
+                    raise
+                finally:
+                    METRICS.observe("pkgship_es_request_duration_seconds", labels, elapsed[0])
+
+            return generator_wrapper
+
+        @wraps(func)
+        def wrapper(self, index, *args, **kwargs):
+            labels = dict(operation=operation, index=index)
+            _observe_pool(self, operation)
+            start = time.perf_counter()
+            try:
+                return func(self, index, *args, **kwargs)
+            except Exception:
+                METRICS.inc("pkgship_es_request_errors_total", labels)
+                raise
+            finally:
+                METRICS.observe("pkgship_es_request_duration_seconds", labels,
+                                time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def _start_request():
+    """
+    Description: Start timing the request
+    """
+    g.metrics_start = time.perf_counter()
+
+
+def _observe_request(response):
+    """
+    Description: Observe the time to handle the request
+    """
+    start = g.get("metrics_start")
+    if start is None or request.endpoint is None:
+        return response
+    body = request.get_json(silent=True) if request.is_json else None
+    depend_type = body.get("depend_type", "") if isinstance(body, dict) else ""
+    METRICS.observe("pkgship_request_duration_seconds",
+                    dict(endpoint=request.endpoint, depend_type=depend_type),
+                    time.perf_counter() - start)
+    return response
+
+
+def _flush_metrics(_error=None):
+    """
+    Description: Flush the metrics of the request to redis
+    """
+    METRICS.flush()
+
+
+def init_metrics(app):
+    """
+    Description: Record the metrics of every request of the app
+
+    Args:
+        app: flask app
+    """
+    app.before_request(_start_request)
+    app.after_request(_observe_request)
+    app.teardown_request(_flush_metrics)
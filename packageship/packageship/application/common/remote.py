@@ -13,11 +13,13 @@
 import json
 import functools
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 from retrying import retry
-import aiohttp
-from packageship.application.common.constant import CALL_MAX_DELAY, MAX_RETRY, MAX_DELAY
+from packageship.application.common.constant import CALL_MAX_DELAY, MAX_RETRY, MAX_DELAY, REMOTE_POOL_SIZE
 
 
 def async_retry(stop_max_attempt_number=MAX_RETRY):
@@ -29,6 +31,7 @@ def async_retry(stop_max_attempt_number=MAX_RETRY):
     def wrap(func):
         @functools.wraps(func)
         async def wrap_func(*args, **kwargs):
+            import aiohttp
             number = stop_max_attempt_number
             while True:
                 error = None
@@ -61,6 +64,10 @@ class RemoteService:
         _request_error: request error
     """
 
+    # The http session of the process, its connections are kept alive and shared by the services
+    _session = None
+    _session_lock = threading.Lock()
+
     def __init__(self, max_delay=1000):
         self._retry = 3
         if not isinstance(max_delay, int):
@@ -93,6 +100,26 @@ class RemoteService:
         """
         return self._response.content.decode("utf-8") if self._response else None
 
+    @classmethod
+    def session(cls):
+        """
+        Description: The http session of the process, created by the first request
+
+        Returns:
+            requests session pooling REMOTE_POOL_SIZE connections of every host
+        """
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=REMOTE_POOL_SIZE, pool_maxsize=REMOTE_POOL_SIZE)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    # The responses compressed with gzip are decoded by requests
+                    session.headers["Accept-Encoding"] = "gzip, deflate"
+                    cls._session = session
+        return cls._session
+
     def _dispatch(self, method, url, **kwargs):
         """
         Description: Request remote services in different ways
@@ -154,7 +181,7 @@ class RemoteService:
             kwargs: requests parameters
             url: requested remote address
         """
-        response = requests.get(url=url, **kwargs)
+        response = self.session().get(url=url, **kwargs)
         return response
 
     def post(self, url, **kwargs):
@@ -165,16 +192,46 @@ class RemoteService:
             kwargs: requests parameters
             url: requested remote address
         """
-        data = kwargs.get("data") or self._body
-        response = requests.post(url=url, data=data, **kwargs)
+        kwargs["data"] = kwargs.get("data") or self._body
+        response = self.session().post(url=url, **kwargs)
         return response
 
+    def map(self, urls, method="get", max_workers=REMOTE_POOL_SIZE, **kwargs):
+        """
+        Description: Request the urls concurrently on the connections of the session
+
+        Args:
+            urls: http service addresses
+            method: get or post
+            max_workers: number of concurrent requests
+            kwargs: requests parameters of every request
+        Returns:
+            responses in the order of the urls, the exception of a failed request in its place
+        """
+        method = getattr(self, method, None)
+        if method is None:
+            raise RequestException(
+                "Request mode error, temporarily only support POST, GET"
+            )
+
+        def http(url):
+            try:
+                return method(url, **kwargs)
+            except RequestException as error:
+                return error
+
+        urls = list(urls)
+        if len(urls) <= 1:
+            return [http(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            return list(executor.map(http, urls))
+
 
 class Response:
     """http response"""
 
     def __init__(
-        self, error=None, response: aiohttp.ClientResponse = None, text=None
+        self, error=None, response: "aiohttp.ClientResponse" = None, text=None
     ) -> None:
         self.error = error
         self.response = response
@@ -213,13 +270,21 @@ class AsyncRequest:
     async http request
     """
 
+    # The session kept by the application and its event loop, its connections are kept
+    # alive between the requests until close() is called
     session = None
+    _loop = None
 
     def __init__(self, max_attempt_number=MAX_RETRY, stop_max_delay=MAX_DELAY) -> None:
-        if self.session is None:
-            self.session = aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(verify_ssl=False)
-            )
+        # Outside of the loop kept by the application, the request has its own session
+        # which is closed when the request exits
+        self._own_session = AsyncRequest._loop is not asyncio.get_running_loop()
+        if self._own_session:
+            self.session = self._new_session()
+        else:
+            if AsyncRequest.session is None or AsyncRequest.session.closed:
+                AsyncRequest.session = self._new_session()
+            self.session = AsyncRequest.session
         self._max_attempt_number = max_attempt_number
         self._stop_max_delay = stop_max_delay
         self._response = Response()
@@ -240,7 +305,33 @@ class AsyncRequest:
         return self
 
     async def __aexit__(self, *args):
-        await self.session.close()
+        if self._own_session:
+            await self.session.close()
+
+    @staticmethod
+    def _new_session():
+        # aiohttp is only imported by the asynchronous requests, not by the command line
+        import aiohttp
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=False, limit=REMOTE_POOL_SIZE)
+        )
+
+    @classmethod
+    def keep_alive(cls):
+        """keep the session of the running event loop between the requests, the
+        application owning the loop must call close() when it stops"""
+        loop = asyncio.get_running_loop()
+        if cls._loop is not loop:
+            cls.session = None
+            cls._loop = loop
+
+    @classmethod
+    async def close(cls):
+        """close the session kept by the application and its connections"""
+        if cls.session is not None:
+            await cls.session.close()
+        cls.session = None
+        cls._loop = None
 
     @property
     def headers(self):
@@ -275,6 +366,7 @@ class AsyncRequest:
             return getattr(self, "_response")
 
     async def _request(self, http_request):
+        import aiohttp
         try:
             self._response.response = await http_request()
             self._response.text = await self._response.response.text()
@@ -0,0 +1,280 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Description: Lightweight tracing of the time a request spends in the database,
+             the gevent jobs, the cache and the serialization
+"""
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+import gevent
+from flask import g, json, request
+from flask.json import JSONEncoder
+
+from packageship.application.common.metrics import METRICS, timed_items
+from packageship.libs.conf import configuration
+from packageship.libs.log import LOGGER
+
+_CURRENT_TRACE = ContextVar("pkgship_trace", default=None)
+
+# Query string values that turn on the debug_timings of a response
+DEBUG_TIMINGS_VALUES = ("1", "true", "True")
+
+
+class Trace:
+    """
+    Description: The spans recorded while a request is handled
+
+    Attributes:
+        name: name of the traced request
+        start: start time of the request
+        spans: list of the name and the duration in seconds of every span
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.spans = []
+
+    @property
+    def elapsed(self):
+        """
+        Description: Seconds since the start of the request
+        """
+        return time.perf_counter() - self.start
+
+    def add(self, name, duration):
+        """
+        Description: Record a span
+
+        Args:
+            name: name of the span
+            duration: duration of the span in seconds
+        """
+        self.spans.append((name, duration))
+
+    def breakdown(self):
+        """
+        Description: The number of spans and their total milliseconds by span name,
+                     spans of concurrent gevent jobs overlap so the totals may add up
+                     to more than the time of the request
+
+        Returns:
+            dict of span name and dict(count, duration), in order of the first span
+        """
+        breakdown = dict()
+        for name, duration in self.spans:
+            count, total = breakdown.get(name, (0, 0.0))
+            breakdown[name] = (count + 1, total + duration)
+        return {name: dict(count=count, duration=round(total * 1000, 3))
+                for name, (count, total) in breakdown.items()}
+
+    def timings(self):
+        """
+        Description: The debug_timings of the response
+        """
+        return dict(total=round(self.elapsed * 1000, 3), spans=self.breakdown())
+
+    def server_timing(self):
+        """
+        Description: Value of the Server-Timing header of the response
+        """
+        metrics = ['%s;dur=%.3f;desc="%d"' % (name, span["duration"], span["count"])
+                   for name, span in self.breakdown().items()]
+        metrics.append("total;dur=%.3f" % (self.elapsed * 1000))
+        return ", ".join(metrics)
+
+
+def current_trace():
+    """
+    Description: The trace of the request being handled, None outside of a traced request
+    """
+    return _CURRENT_TRACE.get()
+
+
+def start_trace(name):
+    """
+    Description: Start tracing a request in the current context
+
+    Args:
+        name: name of the traced request
+    Returns:
+        trace: the started trace
+        token: token to end the trace with
+    """
+    trace = Trace(name)
+    return trace, _CURRENT_TRACE.set(trace)
+
+
+def end_trace(token):
+    """
+    Description: Stop tracing the request started with the token
+    """
+    _CURRENT_TRACE.reset(token)
+
+
+@contextmanager
+def span(name):
+    """
+    Description: Record the time spent in the block as a span of the current trace,
+                 nothing is recorded outside of a traced request
+
+    Args:
+        name: name of the span
+    """
+    trace = _CURRENT_TRACE.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
+
+
+def traced(name):
+    """
+    Description: Decorator recording every call of the function as a span, the
+                 coroutine functions are recorded until they return, the generator
+                 functions by the time spent generating their items
+
+    Args:
+        name: name of the span
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                trace = _CURRENT_TRACE.get()
+                elapsed = [0]
+                try:
+                    yield from timed_items(func(*args, **kwargs), elapsed)
+                finally:
+                    if trace is not None:
+                        trace.add(name, elapsed[0])
+
+            return generator_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def spawn(func, *args, **kwargs):
+    """
+    Description: gevent.spawn the function in the trace of the caller, a new greenlet
+                 starts with an empty context and would not record its spans otherwise.
+                 The jobs are counted in the metrics
+
+    Args:
+        func: function run in the greenlet
+        args: positional arguments of the function
+        kwargs: keyword arguments of the function
+    Returns:
+        the spawned greenlet
+    """
+    trace = _CURRENT_TRACE.get()
+
+    def job():
+        token = _CURRENT_TRACE.set(trace)
+        METRICS.add_process_gauge("pkgship_gevent_jobs_active", 1)
+        try:
+            with span("gevent.job"):
+                return func(*args, **kwargs)
+        finally:
+            METRICS.add_process_gauge("pkgship_gevent_jobs_active", -1)
+            _CURRENT_TRACE.reset(token)
+
+    METRICS.inc("pkgship_gevent_jobs_total")
+    return gevent.spawn(job)
+
+
+class TracedJSONEncoder(JSONEncoder):
+    """
+    Description: Json encoder of the app, recording the serialization of the responses
+    """
+
+    def encode(self, o):
+        with span("serialize"):
+            return super(TracedJSONEncoder, self).encode(o)
+
+
+def _before_request():
+    """
+    Description: Start tracing the request
+    """
+    g.trace, g.trace_token = start_trace(request.endpoint or request.path)
+
+
+def _after_request(response):
+    """
+    Description: Add the Server-Timing header and the debug_timings of the response,
+                 and log the requests slower than the slow_request_threshold
+    """
+    trace = current_trace()
+    if trace is None:
+        return response
+    if request.args.get("debug_timings") in DEBUG_TIMINGS_VALUES \
+            and response.is_json and not response.is_streamed:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            body["debug_timings"] = trace.timings()
+            response.set_data(json.dumps(body))
+    response.headers["Server-Timing"] = trace.server_timing()
+
+    elapsed = trace.elapsed * 1000
+    threshold = configuration.SLOW_REQUEST_THRESHOLD
+    if threshold and elapsed >= threshold:
+        LOGGER.warning("Slow request %s %s took %.3fms, spans: %s",
+                       request.method, request.full_path, elapsed, trace.breakdown())
+    return response
+
+
+def _teardown_request(_error=None):
+    """
+    Description: Stop tracing the request
+    """
+    token = g.pop("trace_token", None)
+    if token is not None:
+        end_trace(token)
+
+
+def init_tracing(app):
+    """
+    Description: Trace every request of the app
+
+    Args:
+        app: flask app
+    """
+    app.json_encoder = TracedJSONEncoder
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -10,12 +10,11 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
-from collections import defaultdict
-
 import csv
 import os
-import stat
+from contextlib import ExitStack
 
+from packageship.application.common.evr import evr_key, format_evr
 from packageship.libs.log import LOGGER
 
 
@@ -32,6 +31,13 @@ class CompareRepo(object):
         """
         self.out_path = out_path
         self.databases = dbs
+        # Package names are interned, the dependencies of a package are the set of the ids of its depend packages
+        self._name_ids = dict()
+        self._names = list()
+        # Database name and the number of dependencies added and removed since its previous snapshot
+        self.changes = dict()
+        # Database name and the number of packages upgraded and downgraded from the base database
+        self.version_changes = dict()
 
     def dbs_compare(self, dbs_depend_info):
         """
@@ -39,71 +45,142 @@ class CompareRepo(object):
         :param dbs_depend_info: the dependent information in different databases
         :return: True/False
         """
-        LOGGER.info('Start to compare the dependent information in different databases')
         if not dbs_depend_info:
+            LOGGER.info('Start to compare the dependent information in different databases')
+            print('[ERROR] No data in all databases')
+            return False
+        return self.stream_compare((database, depend_data) for depend_info in dbs_depend_info
+                                   for database, depend_data in depend_info.items())
+
+    def stream_compare(self, depend_chunks, snapshot=None):
+        """
+        Write the dependent information of the databases to their csv files as it arrives, then compare
+        the databases in one pass over the packages of the base database
+        :param depend_chunks: iterable of (database, [{rpm_name:{rpm_depend_info}}]), the chunks of
+               the databases may arrive in any order
+        :param snapshot: CompareSnapshot, the databases with a snapshot of their current generation are
+               read from it and not expected in the chunks, the other databases are diffed against
+               their previous snapshot and saved as the new one
+        :return: True/False
+        """
+        LOGGER.info('Start to compare the dependent information in different databases')
+        if not self.databases:
             print('[ERROR] No data in all databases')
             return False
         try:
-            # The first database is recorded separately as the benchmark database
-            base_database = dbs_depend_info[0]
-            base_depend_dict = defaultdict(list)
-            self._write_data_to_csv(base_database, base_depend_dict)
-            # The latter database is used as a comparison database record
-            compare_depend_list = list()
-            for compare_database in dbs_depend_info[1:]:
-                compare_depend_dict = defaultdict(list)
-                self._write_data_to_csv(compare_database, compare_depend_dict)
-                compare_depend_list.append(compare_depend_dict)
-
-            # Compare the dependency difference between base database and other databases
-            self._compare_data(base_depend_dict, compare_depend_list)
+            # Record the relationship between the package and its dependencies of every database
+            depend_edges = {database: dict() for database in self.databases}
+            queried = snapshot.outdated(self.databases) if snapshot else list(self.databases)
+            with ExitStack() as stack:
+                csv_writers = {database: self._open_csv(stack, database) for database in self.databases}
+                for database in self.databases:
+                    if database not in queried:
+                        self._copy_snapshot(snapshot, database, csv_writers[database], depend_edges[database])
+                for database, depend_data in depend_chunks:
+                    self._write_data(csv_writers[database], depend_data, depend_edges[database])
+            # The first database is the benchmark database,
+            # compare the dependency difference between base database and other databases
+            self._compare_data(depend_edges[self.databases[0]],
+                               [depend_edges[database] for database in self.databases[1:]])
+            if snapshot:
+                for database in queried:
+                    self._compare_snapshot(snapshot, database, depend_edges[database])
+                    snapshot.save(database, os.path.join(self.out_path, f'{database}.csv'))
             # Set file permissions
             self._set_file_permissions()
             return True
-        except (ValueError, AttributeError) as e:
+        except (ValueError, AttributeError, KeyError, csv.Error, OSError, EOFError) as e:
             print('[ERROR] Failed to save the data by comparing the difference, please check the log location')
             LOGGER.error(f'Failed to save the data by comparing the difference, message is {str(e)}')
             return False
 
-    def _write_data_to_csv(self, depend_info, depend_info_dict):
+    def _open_csv(self, stack, database):
         """
-        Write dependent data to csv file
-        :param depend_info: {database：[{rpm_name:{rpm_depend_info}}]}
-        :param depend_info_dict: Record the relationship between the package name and the package dependency to
-               facilitate subsequent comparisons
-        :return: None
+        Open the csv file of a database
+        :param stack: the file is closed with the stack
+        :param database: database name
+        :return: instance of csv writer
         """
         field_names = [FIELD.DEPENDENCY, FIELD.DEPENDENCY_PACKAGE,
                        FIELD.DEPENDENCY_VERSION, FIELD.DEPENDING_PACKAGE,
                        FIELD.DEPENDING_VERSION]
-        for database, depend_data in depend_info.items():
-            LOGGER.info(f'Save data of {database} to csv')
-            csv_file = os.path.join(self.out_path, f'{database}.csv')
-            with open(csv_file, 'w', encoding='utf-8') as file:
-                csv_writer = csv.DictWriter(file, fieldnames=field_names)
-                csv_writer.writeheader()
-                self._write_data(csv_writer, depend_data, depend_info_dict)
+        LOGGER.info(f'Save data of {database} to csv')
+        csv_file = os.path.join(self.out_path, f'{database}.csv')
+        file = stack.enter_context(open(csv_file, 'w', encoding='utf-8'))
+        csv_writer = csv.DictWriter(file, fieldnames=field_names)
+        csv_writer.writeheader()
+        return csv_writer
+
+    def _copy_snapshot(self, snapshot, database, csv_writer, depend_edges):
+        """
+        Write the csv of the snapshot of a database into its csv file and record its dependencies
+        :param snapshot: CompareSnapshot
+        :param database: database name
+        :param csv_writer: instance of csv writer
+        :param depend_edges: Dictionary of the package id and the ids of its depend packages
+        :return: None
+        """
+        LOGGER.info(f'Reuse the snapshot of {database}, its generation did not change')
+        for row in snapshot.iter_rows(database):
+            csv_writer.writerow(row)
+            rpm_name, _, depend_name = row[FIELD.DEPENDENCY].partition('->')
+            depend_edges.setdefault(self._intern(rpm_name), set()).add(self._intern(depend_name))
+
+    def _compare_snapshot(self, snapshot, database, depend_edges):
+        """
+        Write the dependencies added or removed since the previous snapshot of a database
+        to a csv file, nothing is written if the database has no snapshot yet
+        :param snapshot: CompareSnapshot
+        :param database: database name
+        :param depend_edges: Dictionary of the package id and the ids of its depend packages
+        :return: None
+        """
+        old_edges = snapshot.edges(database, FIELD.DEPENDENCY)
+        if not old_edges:
+            return
+        new_edges = {(self._names[rpm_id], self._names[depend_id])
+                     for rpm_id, dependency in depend_edges.items() for depend_id in dependency}
+        added, removed = sorted(new_edges - old_edges), sorted(old_edges - new_edges)
+        self.changes[database] = (len(added), len(removed))
+        csv_file = os.path.join(self.out_path, f'{database}_changes.csv')
+        with open(csv_file, 'w', encoding='utf-8') as file:
+            csv_writer = csv.writer(file)
+            csv_writer.writerow([FIELD.CHANGE, FIELD.DEPENDENCY])
+            for change, edges in ((FIELD.ADDED, added), (FIELD.REMOVED, removed)):
+                for edge in edges:
+                    csv_writer.writerow([change, '->'.join(edge)])
+
+    def _intern(self, name):
+        """
+        Id of a package name
+        :param name: package name
+        :return: id
+        """
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return name_id
 
-    @staticmethod
-    def _write_data(csv_writer, depend_data, depend_info_dict):
+    def _write_data(self, csv_writer, depend_data, depend_edges):
         """
         Write the dependency information of a single database into a csv file and record it.
         :param csv_writer: instance of csv writer
         :param depend_data: dependency information
-        :param depend_info_dict: Dictionary used to record brief information
+        :param depend_edges: Dictionary of the package id and the ids of its depend packages
         :return: None
         """
         for rpm in depend_data:
             for rpm_name, rpm_info in rpm.items():
+                rpm_id = self._intern(rpm_name)
                 # If there is no dependency, record the (package_name ->'')
                 if not rpm_info.get('requires'):
-                    _empty_depend = '->'.join((rpm_name, ''))
                     csv_writer.writerow(
-                        {FIELD.DEPENDENCY: _empty_depend})
-                    depend_info_dict[rpm_name] = [_empty_depend]
+                        {FIELD.DEPENDENCY: '->'.join((rpm_name, ''))})
+                    depend_edges[rpm_id] = {self._intern('')}
                     continue
-                # Traverse the dependency information, write it to the csv file, and record it in the depend info dict
-                already_record_binary = list()
+                # Traverse the dependency information, write it to the csv file, and record it in the depend edges
+                already_record_binary = set()
                 for depend_info in rpm_info.get('requires'):
                     _depend_binary_rpm = depend_info.get('com_bin_name', '')
                     # Since multiple components may be provided by the same binary package,
@@ -111,25 +188,24 @@ class CompareRepo(object):
                     if _depend_binary_rpm and _depend_binary_rpm in already_record_binary:
                         continue
 
-                    already_record_binary.append(_depend_binary_rpm)
-                    _depend_map = '->'.join((rpm_name, _depend_binary_rpm))
+                    already_record_binary.add(_depend_binary_rpm)
                     # The binary package and the source package have different fields
                     _source_name = rpm_info.get('source_name', '') \
                         if 'source_name' in rpm_info else rpm_info.get('src_name', '')
                     # Write to csv file
                     csv_writer.writerow({
-                        FIELD.DEPENDENCY: _depend_map,
+                        FIELD.DEPENDENCY: '->'.join((rpm_name, _depend_binary_rpm)),
                         FIELD.DEPENDENCY_PACKAGE: _source_name,
                         FIELD.DEPENDENCY_VERSION: rpm_info.get('src_version', ''),
                         FIELD.DEPENDING_PACKAGE: depend_info.get('com_src_name', ''),
                         FIELD.DEPENDING_VERSION: depend_info.get('com_src_version', '')
                     })
-                    depend_info_dict[rpm_name].append(_depend_map)
+                    depend_edges.setdefault(rpm_id, set()).add(self._intern(_depend_binary_rpm))
 
-    def _compare_data(self, base_depend_dict, compare_depend_list):
+    def _compare_data(self, base_depend_edges, compare_depend_list):
         """
         Compare the dependency difference between the base database and other databases, and write it to a csv file
-        :param base_depend_dict: base database dependency info
+        :param base_depend_edges: base database dependency info
         :param compare_depend_list: other databases dependency info
         :return: None
         """
@@ -140,31 +216,77 @@ class CompareRepo(object):
         with open(csv_file, 'w', encoding='utf-8') as file:
             csv_writer = csv.writer(file)
             csv_writer.writerow(self.databases)
-            for rpm, dependency in base_depend_dict.items():
+            empty = frozenset()
+            for rpm_id, dependency in base_depend_edges.items():
                 _all_dependency_list = [dependency]
                 for other_database in compare_depend_list:
-                    _all_dependency_list.append(other_database.get(rpm, []))
-
-                _all_dependency_set = set([info for single_db_info in _all_dependency_list for info in single_db_info])
-                self._write_single_field(_all_dependency_list, _all_dependency_set, csv_writer)
+                    _all_dependency_list.append(other_database.get(rpm_id, empty))
+                self._write_single_field(rpm_id, _all_dependency_list, csv_writer)
 
-    @staticmethod
-    def _write_single_field(all_dependency_list, all_dependency_set, writer):
+    def _write_single_field(self, rpm_id, all_dependency_list, writer):
         """
         Traverse the dependencies of each software package in different databases and write them to a csv file
-        :param all_dependency_list: A list of dependencies of a software package in all databases
-        :param all_dependency_set: Union of dependencies in all databases
+        :param rpm_id: id of the software package
+        :param all_dependency_list: A list of the sets of dependencies of a software package in all databases
         :param writer: csv writer
         :return: None
         """
-        for dependency_info in all_dependency_set:
-            _current_write_line = list()
-            for db_dependency in all_dependency_list:
-                if dependency_info in db_dependency:
-                    _current_write_line.append(dependency_info)
-                else:
-                    _current_write_line.append(FIELD.EMPTY_FIELD)
-            writer.writerow(_current_write_line)
+        rpm_name = self._names[rpm_id]
+        all_dependency_set = set().union(*all_dependency_list)
+        for depend_id in sorted(all_dependency_set, key=self._names.__getitem__):
+            dependency_info = '->'.join((rpm_name, self._names[depend_id]))
+            writer.writerow([dependency_info if depend_id in db_dependency else FIELD.EMPTY_FIELD
+                             for db_dependency in all_dependency_list])
+
+    def versions_compare(self, dbs_versions):
+        """
+        Compare the version of the packages of the base database with the other databases, and write
+        the version of every database and the upgrades and downgrades to a csv file
+        :param dbs_versions: {database: {rpm_name: (epoch, version, release)}}
+        :return: True/False
+        """
+        base_versions = dbs_versions.get(self.databases[0]) if self.databases else None
+        if not base_versions or len(self.databases) < 2:
+            LOGGER.warning('There is no package version to compare')
+            return False
+        other_dbs = self.databases[1:]
+        self.version_changes = {database: {FIELD.UPGRADE: 0, FIELD.DOWNGRADE: 0} for database in other_dbs}
+        csv_file = os.path.join(self.out_path, 'versions.csv')
+        try:
+            with open(csv_file, 'w', encoding='utf-8') as file:
+                csv_writer = csv.writer(file)
+                csv_writer.writerow([FIELD.PACKAGE] + self.databases +
+                                    [f'{database} {FIELD.CHANGE}' for database in other_dbs])
+                for rpm_name in sorted(base_versions):
+                    base_evr = base_versions[rpm_name]
+                    row, changes = [rpm_name, format_evr(*base_evr)], []
+                    for database in other_dbs:
+                        evr = dbs_versions.get(database, {}).get(rpm_name)
+                        row.append(format_evr(*evr) if evr else FIELD.EMPTY_FIELD)
+                        changes.append(self._version_change(database, base_evr, evr))
+                    csv_writer.writerow(row + changes)
+            os.chmod(csv_file, 0o644)
+        except (OSError, csv.Error) as e:
+            LOGGER.error(f'Failed to save the versions of the packages, message is {str(e)}')
+            return False
+        return True
+
+    def _version_change(self, database, base_evr, evr):
+        """
+        Change of the version of a package from the base database to another database
+        :param database: the other database
+        :param base_evr: (epoch, version, release) in the base database
+        :param evr: (epoch, version, release) in the other database, None if there is no such package
+        :return: upgrade, downgrade, same or the empty field
+        """
+        if evr is None:
+            return FIELD.EMPTY_FIELD
+        base_key, key = evr_key(*base_evr), evr_key(*evr)
+        if key == base_key:
+            return FIELD.SAME
+        change = FIELD.UPGRADE if key > base_key else FIELD.DOWNGRADE
+        self.version_changes[database][change] += 1
+        return change
 
     def _set_file_permissions(self):
         """
@@ -193,3 +315,12 @@ class FIELD:
     DEPENDING_VERSION = 'depending version'
     # empty field
     EMPTY_FIELD = '#N/A'
+    # change of a dependency since the previous snapshot
+    CHANGE = 'change'
+    ADDED = 'added'
+    REMOVED = 'removed'
+    # version of a package in the databases
+    PACKAGE = 'package'
+    UPGRADE = 'upgrade'
+    DOWNGRADE = 'downgrade'
+    SAME = 'same'
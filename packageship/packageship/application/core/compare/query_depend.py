@@ -13,8 +13,14 @@
 """
 Query dependency information
 """
-from packageship.application.common.constant import BUILD_DEPEND_TYPE, DEFAULT_PAGE_NUM, MAXIMUM_PAGE_SIZE, \
-    INSTALL_DEPEND_TYPE
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from packageship.application.common.constant import BUILD_DEPEND_TYPE, INSTALL_DEPEND_TYPE, \
+    SOURCE_DB_TYPE, BINARY_DB_TYPE
+from packageship.application.common.evr import evr_key
 from packageship.application.query.depend import BuildRequires, InstallRequires
 from packageship.application.query.pkg import QueryPackage
 from packageship.libs.log import LOGGER
@@ -26,13 +32,16 @@ class QueryDepend(object):
     """
     SOURCE_NAME = "source_name"
     BINARY_NAME = "binary_name"
+    # Number of packages whose one-level dependencies are queried at a time
+    CHUNK_SIZE = 2000
+    # Number of chunks queried ahead of the consumer by every database
+    QUEUE_CHUNKS = 2
 
     def __init__(self):
         """
         init
         """
         self.result = list()
-        self.query_pkg = QueryPackage()
 
     def all_depend_info(self, depend_type, dbs):
         """
@@ -41,60 +50,122 @@ class QueryDepend(object):
         :param dbs:
         :return:
         """
+        depend_info = {database: list() for database in dbs}
+        for database, depend_chunk in self.iter_depend_info(depend_type, dbs):
+            depend_info[database].extend(depend_chunk)
+        if depend_type in (BUILD_DEPEND_TYPE, INSTALL_DEPEND_TYPE):
+            self.result = [{database: depend_info[database]} for database in dbs]
+
+        return self.result
+
+    def iter_depend_info(self, depend_type, dbs):
+        """
+        Query the dependency information of all packages of the databases concurrently, one thread
+        by database. The chunks of packages are yielded as soon as their dependencies are queried,
+        a database is not queried further ahead than QUEUE_CHUNKS chunks
+        :param depend_type: build or install
+        :param dbs: Databases to be queried
+        :return: generator of (database, formatted dependency information of a chunk of packages)
+        """
         if depend_type == BUILD_DEPEND_TYPE:
             LOGGER.info("Start to query all source rpm dependency information")
-            self._get_source_rpm_depend(dbs)
         elif depend_type == INSTALL_DEPEND_TYPE:
             LOGGER.info("Start to query all binary rpm dependency information")
-            self._get_bin_rpm_depend(dbs)
+        else:
+            return
+        chunks = queue.Queue(maxsize=self.QUEUE_CHUNKS * len(dbs))
+        stopped = threading.Event()
 
-        return self.result
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    chunks.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
 
-    def _get_source_rpm_depend(self, dbs):
+        def job(database):
+            try:
+                for depend_chunk in self._iter_database_depend(depend_type, database):
+                    if not put((database, depend_chunk, None)):
+                        return
+            except Exception as error:
+                put((database, None, error))
+                return
+            put((database, None, None))
+
+        with ThreadPoolExecutor(max_workers=max(len(dbs), 1)) as executor:
+            for database in dbs:
+                executor.submit(job, database)
+            try:
+                running = len(dbs)
+                while running:
+                    database, depend_chunk, error = chunks.get()
+                    if error is not None:
+                        raise error
+                    if depend_chunk is None:
+                        running -= 1
+                        continue
+                    yield database, depend_chunk
+            finally:
+                # The threads stop when the consumer fails or stops early
+                stopped.set()
+
+    def _iter_database_depend(self, depend_type, database):
         """
-        Get one-level compilation dependency of all source packages in the database
-        :param dbs: Database to be queried
-        :return: None
+        Get one-level compilation or install dependency of all packages in the database, chunk by chunk
+        :param depend_type: build or install
+        :param database: Database to be queried
+        :return: generator of the formatted dependency information of a chunk of packages
         """
-        for database in dbs:
-            # First,query all source rpm name of specify database.
-            all_source_rpm = self.query_pkg.get_src_info(src_list=None, database=database,
-                                                         page_num=DEFAULT_PAGE_NUM,
-                                                         page_size=MAXIMUM_PAGE_SIZE, command_line=True)
-            all_source_rpm_name = list()
-            for source_rpm in all_source_rpm.get('data'):
-                all_source_rpm_name.extend(source_rpm.keys())
-            LOGGER.info(f'The number of source packages in the {database} database is {len(all_source_rpm_name)}')
-            # Second, query the one-level build dependencies of all packages based on the package name.
-            build_query_engine = BuildRequires([database])
-            all_source_rpm_depend = build_query_engine.get_build_req(source_list=all_source_rpm_name)
-            # Third, format build dependencies
-            format_source_rpm_depend = self._format_depend(all_source_rpm_depend, key_word=self.SOURCE_NAME)
-
-            self.result.append({database: format_source_rpm_depend})
+        # Every thread has its own query instances, their index is not shared
+        query_pkg = QueryPackage()
+        if depend_type == BUILD_DEPEND_TYPE:
+            # First,scroll through all source rpm name of specify database.
+            rpm_names = (name for source_rpm in query_pkg.iter_src_info(database, fields=['name'])
+                         for name in source_rpm.keys())
+            query_engine, key_word = BuildRequires([database]), self.SOURCE_NAME
+        else:
+            rpm_names = (name for bin_rpm in query_pkg.iter_bin_info(database, fields=['name'])
+                         for name in bin_rpm.keys())
+            query_engine, key_word = InstallRequires([database]), self.BINARY_NAME
+        rpm_count = 0
+        while True:
+            rpm_chunk = list(islice(rpm_names, self.CHUNK_SIZE))
+            if not rpm_chunk:
+                break
+            rpm_count += len(rpm_chunk)
+            # Second, query the one-level dependencies of the packages based on the package name.
+            if depend_type == BUILD_DEPEND_TYPE:
+                rpm_depend = query_engine.get_build_req(source_list=rpm_chunk)
+            else:
+                rpm_depend = query_engine.get_install_req(binary_list=rpm_chunk)
+            # Third, format dependencies
+            yield self._format_depend(rpm_depend, key_word=key_word)
+        LOGGER.info(f'The number of packages in the {database} database is {rpm_count}')
 
-    def _get_bin_rpm_depend(self, dbs):
+    def all_versions(self, depend_type, dbs):
         """
-         Get one-level install dependency of all binary packages in the database
-        :param dbs: Database to be queried
-        :return:
+        Get the version of all packages of the databases concurrently, source rpm for build depend
+        and binary rpm for install depend. Only the fields of the version are scrolled
+        :param depend_type: build or install
+        :param dbs: Databases to be queried
+        :return: {database: {rpm_name: (epoch, version, release)}}, the newest version of the packages
+                 of the same name
         """
-        for database in dbs:
-            # First,query all binary rpm name of specify database.
-            all_bin_rpm = self.query_pkg.get_bin_info(binary_list=None, database=database,
-                                                      page_num=DEFAULT_PAGE_NUM,
-                                                      page_size=MAXIMUM_PAGE_SIZE, command_line=True)
-            all_bin_rpm_name = list()
-            for bin_rpm in all_bin_rpm.get('data'):
-                all_bin_rpm_name.extend(bin_rpm.keys())
-            LOGGER.info(f'The number of binary packages in the {database} database is {len(all_bin_rpm_name)}')
-            # Second, query the one-level install dependencies of all packages based on the package name.
-            install_query_engine = InstallRequires([database])
-            all_binary_rpm_depend = install_query_engine.get_install_req(binary_list=all_bin_rpm_name)
-            # Third, format build dependencies
-            format_binary_rpm_depend = self._format_depend(all_binary_rpm_depend, key_word=self.BINARY_NAME)
+        rpm_type = SOURCE_DB_TYPE if depend_type == BUILD_DEPEND_TYPE else BINARY_DB_TYPE
+
+        def job(database):
+            versions = dict()
+            for name, *evr in QueryPackage().iter_rpm_versions(database, rpm_type):
+                evr = tuple(evr)
+                if name not in versions or evr_key(*evr) > evr_key(*versions[name]):
+                    versions[name] = evr
+            return versions
 
-            self.result.append({database: format_binary_rpm_depend})
+        with ThreadPoolExecutor(max_workers=max(len(dbs), 1)) as executor:
+            return dict(zip(dbs, executor.map(job, dbs)))
 
     @staticmethod
     def _format_depend(all_rpm_depend, key_word):
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Snapshots of the dependencies of the compared databases
+"""
+import csv
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime
+
+from packageship.libs.log import LOGGER
+
+# Separator of the package and its depend package in the dependency column of the csv
+EDGE_SEPARATOR = '->'
+
+
+class CompareSnapshot(object):
+    """
+    The csv of every database written by the last comparison, kept with the generation of the
+    database. A database whose generation did not change is not queried again, the csv of its
+    snapshot is used instead
+    """
+
+    def __init__(self, path, depend_type, generations):
+        """
+        init
+        :param path: folder of the snapshots
+        :param depend_type: build or install, every type has its own snapshots
+        :param generations: dict of the database name and its generation
+        """
+        self.path = os.path.join(path, depend_type)
+        self.generations = generations
+
+    def _csv_file(self, database):
+        return os.path.join(self.path, f'{database}.csv.gz')
+
+    def _meta_file(self, database):
+        return os.path.join(self.path, f'{database}.json')
+
+    def meta(self, database):
+        """
+        The generation and the creation time of the snapshot of a database
+        :param database: database name
+        :return: dict, empty if there is no snapshot
+        """
+        try:
+            with open(self._meta_file(database), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return dict()
+
+    def current(self, database):
+        """
+        Whether the snapshot of the database is of its current generation
+        :param database: database name
+        :return: True/False
+        """
+        generation = self.generations.get(database)
+        return bool(generation) and self.meta(database).get('generation') == generation and \
+            os.path.isfile(self._csv_file(database))
+
+    def outdated(self, dbs):
+        """
+        The databases to query again
+        :param dbs: databases to be compared
+        :return: databases without a snapshot of their current generation
+        """
+        return [database for database in dbs if not self.current(database)]
+
+    def iter_rows(self, database):
+        """
+        The rows of the csv of the snapshot of a database
+        :param database: database name
+        :return: generator of the rows, dict of the field name and the value
+        """
+        with gzip.open(self._csv_file(database), 'rt', encoding='utf-8', newline='') as file:
+            for row in csv.DictReader(file):
+                yield row
+
+    def edges(self, database, field_name):
+        """
+        The dependencies of the snapshot of a database
+        :param database: database name
+        :param field_name: field of the dependency in the csv
+        :return: set of (package name, depend package name), empty if there is no snapshot
+        """
+        if not os.path.isfile(self._csv_file(database)):
+            return set()
+        try:
+            return {tuple(row[field_name].split(EDGE_SEPARATOR, 1)) for row in self.iter_rows(database)
+                    if row.get(field_name)}
+        except (OSError, EOFError, csv.Error) as error:
+            LOGGER.warning(f'Failed to read the snapshot of {database}, message is {str(error)}')
+            return set()
+
+    def save(self, database, csv_file):
+        """
+        Keep the csv of a database as the snapshot of its current generation, the databases
+        without a generation have no snapshot
+        :param database: database name
+        :param csv_file: csv of the database written by the comparison
+        :return: True if the snapshot is saved
+        """
+        generation = self.generations.get(database)
+        if not generation:
+            return False
+        try:
+            os.makedirs(self.path, mode=0o755, exist_ok=True)
+            # The files are replaced at once, a failed comparison leaves the old snapshot
+            tmp_csv, tmp_meta = self._csv_file(database) + '.tmp', self._meta_file(database) + '.tmp'
+            with open(csv_file, 'rb') as src, gzip.open(tmp_csv, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            with open(tmp_meta, 'w', encoding='utf-8') as file:
+                json.dump(dict(database=database, generation=generation,
+                               created=datetime.now().isoformat(timespec='seconds')), file)
+            os.replace(tmp_csv, self._csv_file(database))
+            os.replace(tmp_meta, self._meta_file(database))
+        except OSError as error:
+            LOGGER.warning(f'Failed to save the snapshot of {database}, message is {str(error)}')
+            return False
+        return True
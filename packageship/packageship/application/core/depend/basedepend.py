@@ -14,7 +14,9 @@
 Depend Base Class
 """
 
+import asyncio
 import copy
+from .closure import DependClosure
 from .graph import GraphInfo
 from packageship.libs.log import LOGGER
 from packageship.application.core.depend.down_load import Download
@@ -51,50 +53,81 @@ class BaseDepend:
         # stored the comopent name which cannot find the provided pkg
         self.com_not_found_pro = set()
 
-    def depend_list(self):
+    def _load_closure(self, packagename, parameter, **_):
         """
-        get the depend relationship with list format
+        Description: Read the depend result of all the levels of one hot package
+                     from the closure stored by the initialization
+        Args:
+            packagename: the list of package names needed to be searched
+            parameter: parameters of the query
+        Returns:
+            whether the closure was stored
         """
-        binary_list = []
-        source_list = []
+        if parameter.get("level") or parameter.get("self_build") or len(packagename) != 1:
+            return False
+        if not DependClosure.hot(packagename[0]):
+            return False
+        closure = DependClosure(self.dependency_type, packagename[0], parameter["db_priority"])
+        return closure.load(self)
 
-        statistics_info = {}
+    @staticmethod
+    def _count_statistics(statistics_info, database, sum_key):
+        """
+        Count one package into the statistics of its database
+        Args:
+            statistics_info: per database statistics, keyed by database name
+            database: the database the package was found in
+            sum_key: binary_sum or source_sum
+        """
+        if database not in statistics_info:
+            statistics_info[database] = {
+                "database": database,
+                "binary_sum": 0,
+                "source_sum": 0,
+            }
+        statistics_info[database][sum_key] += 1
+
+    def iter_binary_list(self, statistics_info):
+        """
+        Iterate the binary packages of the depend relationship one row at a time
+        Args:
+            statistics_info: per database statistics, updated while iterating
+        Yields:
+            binary row of the depend list
+        """
         for bin_name, binary_info in self.binary_dict.items():
             curr_bin_database = binary_info["database"]
-            binary_list.append(
-                {
-                    "binary_name": bin_name,
-                    "source_name": binary_info.get("source_name"),
-                    "version": binary_info.get("version"),
-                    "database": curr_bin_database,
-                }
-            )
-            if curr_bin_database not in statistics_info:
-                statistics_info[curr_bin_database] = {
-                    "database": curr_bin_database,
-                    "binary_sum": 1,
-                    "source_sum": 0,
-                }
-            else:
-                statistics_info[curr_bin_database]["binary_sum"] += 1
-
+            self._count_statistics(statistics_info, curr_bin_database, "binary_sum")
+            yield {
+                "binary_name": bin_name,
+                "source_name": binary_info.get("source_name"),
+                "version": binary_info.get("version"),
+                "database": curr_bin_database,
+            }
+
+    def iter_source_list(self, statistics_info):
+        """
+        Iterate the source packages of the depend relationship one row at a time
+        Args:
+            statistics_info: per database statistics, updated while iterating
+        Yields:
+            source row of the depend list
+        """
         for src_name, source_info in self.source_dict.items():
-            curr_src_database = source_info["database"]
-            source_list.append(
-                {
-                    "source_name": src_name,
-                    "version": source_info.get("version"),
-                    "database": source_info.get("database"),
-                }
-            )
-            if curr_src_database not in statistics_info:
-                statistics_info[curr_src_database] = {
-                    "database": curr_src_database,
-                    "binary_sum": 0,
-                    "source_sum": 1,
-                }
-            else:
-                statistics_info[curr_src_database]["source_sum"] += 1
+            self._count_statistics(statistics_info, source_info["database"], "source_sum")
+            yield {
+                "source_name": src_name,
+                "version": source_info.get("version"),
+                "database": source_info.get("database"),
+            }
+
+    def depend_list(self):
+        """
+        get the depend relationship with list format
+        """
+        statistics_info = {}
+        binary_list = list(self.iter_binary_list(statistics_info))
+        source_list = list(self.iter_source_list(statistics_info))
 
         statistics = [val for _, val in statistics_info.items()]
 
@@ -290,11 +323,25 @@ class BaseDepend:
         down_load = Download(depend=self)
         return down_load.run()
 
-    def depend_info_graph(self, source, package_type):
+    def download_depend_csv(self):
+        """
+        get the depend relationship as csv files generated while they are read
+        """
+        down_load = Download(depend=self)
+        return down_load.depend_files()
+
+    def download_depend_columns(self):
+        """
+        get the depend relationship as columnar tables
+        """
+        down_load = Download(depend=self)
+        return down_load.depend_columns()
+
+    def depend_info_graph(self, source, package_type, level=2, max_nodes=None, max_fanout=None):
         """get the depend relationship with graph format"""
-        graph_info = GraphInfo(depend=self)
+        graph_info = GraphInfo(depend=self, max_nodes=max_nodes, max_fanout=max_fanout)
 
-        return graph_info.generate_graph(root_node=source, package_type=package_type)
+        return graph_info.generate_graph(root_node=source, package_type=package_type, level=level)
 
     def _insert_into_binary_dict(self, name, **kwargs):
         """
@@ -452,3 +499,21 @@ class BaseDepend:
                 self._search_set.update(pkg_set)
                 pkg_set.clear()
         return resp
+
+    async def _async_query_in_db(self, search_dict, func):
+        """
+        Description: execute the query database jobs based on search dict in asyncio tasks
+        Attributes:
+            search_dict: the packages to search of every database
+            func: async_get_install_req, async_get_build_req or async_get_bin_name
+        """
+        jobs = []
+        for db_name, pkg_set in search_dict.items():
+            if db_name == "non_db":
+                db_name = None
+            if pkg_set:
+                jobs.append(func(list(pkg_set), db_name))
+                self._search_set.update(pkg_set)
+                pkg_set.clear()
+        results = await asyncio.gather(*jobs)
+        return [pkg_info for result in results for pkg_info in result]
@@ -172,6 +172,8 @@ class BuildDepend(BaseDepend):
             dict(packagename=kwargs["packagename"], dependency_type="builddep"))
         @buffer_cache(depend=self)
         def _depends(**kwargs):
+            if self._load_closure(**kwargs):
+                return
             self.build_depend(src_name=kwargs["packagename"],
                               level=kwargs["parameter"]["level"],
                               self_build=kwargs["parameter"]["self_build"])
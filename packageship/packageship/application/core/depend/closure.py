@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Transitive closures of the hot packages: pkgship init computes the install and build
+depend of all the levels of the configured packages and stores them compressed in an
+index of the database, so the query of such a package is answered with one lookup
+"""
+import base64
+import hashlib
+import json
+import zlib
+
+from packageship.application.common.constant import CLOSURE_INDEX
+from packageship.application.common.exc import ElasticSearchQueryException
+from packageship.application.database.session import LazyConnection
+from packageship.libs.conf import configuration
+from packageship.libs.log import LOGGER
+
+# Value of depend_closure_packages for the closures of all the packages of the databases
+ALL_PACKAGES = "all"
+
+
+class DependClosure:
+    """
+    Description: closure of a package, computed with a database priority list
+
+    Attributes:
+        depend_type: installdep or builddep
+        package: binary name of installdep, source name of builddep
+        db_list: database priority list
+    """
+
+    _session = LazyConnection()
+
+    def __init__(self, depend_type, package, db_list):
+        self.depend_type = depend_type
+        self.package = package
+        self.db_list = list(db_list)
+
+    @staticmethod
+    def packages():
+        """
+        Description: The packages whose closures are computed
+
+        Returns:
+            set of the package names, None for all the packages
+        """
+        names = [name.strip() for name in str(configuration.DEPEND_CLOSURE_PACKAGES or "").split(",")]
+        names = set(filter(None, names))
+        if ALL_PACKAGES in names:
+            return None
+        return names
+
+    @classmethod
+    def hot(cls, package):
+        """
+        Description: Whether the closures of the package are computed
+
+        Args:
+            package: package name
+        """
+        if not configuration.DEPEND_CLOSURE_PACKAGES:
+            return False
+        packages = cls.packages()
+        return packages is None or package in packages
+
+    @property
+    def key(self):
+        """
+        Description: Id of the closure in the index
+        """
+        key = "%s:%s:%s" % (self.depend_type, self.package, ",".join(self.db_list))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def document(self, depend):
+        """
+        Description: Document of the closure for the bulk of the index, the depend
+                     result is json compressed by zlib
+
+        Args:
+            depend: dependent instance, queried with all the levels
+        """
+        closure = json.dumps(dict(binary_dict=depend.binary_dict,
+                                  source_dict=depend.source_dict,
+                                  log_msg=depend.log_msg))
+        return {
+            "_index": CLOSURE_INDEX,
+            "_id": self.key,
+            "_source": {
+                "depend_type": self.depend_type,
+                "package": self.package,
+                "db_priority": ",".join(self.db_list),
+                "closure": base64.b64encode(zlib.compress(closure.encode("utf-8"))).decode("ascii"),
+            },
+        }
+
+    def load(self, depend):
+        """
+        Description: Assign the stored closure to the dependent instance
+
+        Args:
+            depend: dependent instance
+        Returns:
+            whether the closure was stored
+        """
+        body = {"query": {"ids": {"values": [self.key]}}, "size": 1}
+        try:
+            hits = self._session.query(index=CLOSURE_INDEX, body=body)["hits"]["hits"]
+        except (ElasticSearchQueryException, KeyError, TypeError):
+            return False
+        if not hits:
+            return False
+        closure = json.loads(zlib.decompress(base64.b64decode(hits[0]["_source"]["closure"])))
+        depend.binary_dict = closure["binary_dict"]
+        depend.source_dict = closure["source_dict"]
+        depend.log_msg = closure["log_msg"]
+        if depend.log_msg:
+            LOGGER.warning(depend.log_msg)
+        return True
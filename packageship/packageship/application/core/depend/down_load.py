@@ -13,12 +13,12 @@
 """
 File download logic processing
 """
-import copy
 import csv
 import os
 import uuid
+from collections import Counter
 from functools import wraps
-from typing import Set
+from itertools import chain, repeat
 from packageship.application.core.pkginfo.pkg import Package
 from packageship.libs.conf import configuration
 from packageship.libs.log import LOGGER
@@ -57,14 +57,14 @@ class Download:
         build_data: All data of build
         binary_packages: binary packages list
         folder_path: folder path
-        install_csv_writer: install_csv_writer
-        build_csv_writer: build_csv_writer
         src_package_write：src_package_write
         bin_package_write：bin_package_write
     """
     pkg = Package()
     install_count = 4
     build_count = 3
+    # Buffer size of the csv files, rows are written to the disk in large blocks
+    write_buffer_size = 1024 * 1024
 
     def __init__(self, depend=None):
         """
@@ -78,8 +78,6 @@ class Download:
             self.package_name = self._depend.packagename
         self.binary_packages = []
         self.folder_path = None
-        self.install_csv_writer = None
-        self.build_csv_writer = None
         self.src_package_write = None
         self.bin_package_write = None
         self.database_name = None
@@ -127,26 +125,19 @@ class Download:
         self.build_data = new_build_data
         return
 
-    def __process_full_depend_data_to_csv(self):
+    def __full_depend_rows(self):
         """
-        Write the full amount of data to CSVs
+        Rows of the full amount of data
         """
-
-        full_path = os.path.join(
-            self.folder_path,
-            "full_amount_data.csv")
-        with open(full_path, "a+", newline="", encoding="utf-8") as full_depend_csv:
-            full_depend_csv_writer = csv.writer(full_depend_csv)
-            for key, values in self.full_depend_data.items():
-                full_row_list = [
-                    key,
-                    values.get("source_name"),
-                    values.get("version"),
-                    values.get("database"),
-                    *["install__" + str(bin) for bin in values.get("install", [])],
-                    *["build__" + str(src) for src in values.get("build", [])]
-                ]
-                full_depend_csv_writer.writerow(full_row_list)
+        for key, values in self.full_depend_data.items():
+            yield [
+                key,
+                values.get("source_name"),
+                values.get("version"),
+                values.get("database"),
+                *["install__" + str(bin) for bin in values.get("install", [])],
+                *["build__" + str(src) for src in values.get("build", [])]
+            ]
 
     def __get_single_df_row(self, pkg_name, res_type):
         """
@@ -183,7 +174,7 @@ class Download:
             pkg_name: package name
             res_type: The type of package
 
-        Returns:this data[n]'s deepcopy
+        Returns:this data[n], it must not be modified
 
         """
         if get_type == 'build':
@@ -192,137 +183,188 @@ class Download:
             data = self.install_data
         if pkg_name not in data:
             return []
-        return copy.deepcopy(data[pkg_name].get(get_type, []))
+        return data[pkg_name].get(get_type, [])
 
-    def __write_csv_update_df_row(
-            self,
-            lst,
-            res_type,
-            names_set: Set,
-            pkg=None):
+    @staticmethod
+    def __pop_path(path, on_path, num):
         """
-        to write csv row and return new csv row list
+        Remove the last package from the dependency path
         Args:
-            lst:old csv row list
-            res_type:install or build
-            names_set:Store a list of package names that have been found
-            pkg:package name
-
-        Returns:
-            new csv row list
+            path: csv row of the packages on the path
+            on_path: count of every value of the row
+            num: number of values of a package in the row
         """
-        local_lst = copy.deepcopy(lst)
-        csv_writer = self.install_csv_writer if res_type == "install" else self.build_csv_writer
-        if not pkg:
-            csv_writer.writerow(local_lst)
-            return lst
+        for value in path[-num:]:
+            on_path[value] -= 1
+            if not on_path[value]:
+                del on_path[value]
+        del path[-num:]
 
-        names_set.add(pkg)
-        new_row = self.__get_single_df_row(pkg, res_type)
-        if not new_row:
-            csv_writer.writerow(local_lst)
-            return lst
-        local_lst.extend([pkg, *new_row])
-        if pkg in lst:
-            # When a dependency chain is closed, add 1 to the end of a line in the CSV file
-            local_lst.append("1")
-
-        csv_writer.writerow(local_lst)
-
-        return lst
-
-    def __data_to_csv(self, pkg_name, names_set, res_type="install"):
+    def __data_rows(self, pkg_name, names_set, res_type="install"):
         """
-        process json data to save csv
+        process json data to csv rows, walk the dependency tree depth first and yield
+        a row for every end of a dependency chain
         Args:
             pkg_name:search package name
+            names_set:Store a list of package names that have been found
             res_type:install or build
 
         Returns:
-
+            csv rows
         """
-        # When generating csv, need to pop up some contents of the data stack.
-        # The pop-up number of install is 4. The number of pop-ups of  build is
-
+        # Every package on the path takes 4 values of an install row and 3 of a build row
         num = self.install_count if res_type == "install" else self.build_count
-        _stack = [self.__get_depends(pkg_name, res_type)]
         rows = self.__get_single_df_row(pkg_name, res_type)
         if not rows:
-            return names_set
-        df_row = [pkg_name, *rows]
+            return
+        path = [pkg_name, *rows]
+        on_path = Counter(path)
+        # Every frame holds the depends of a package on the path and how many of them are left,
+        # the depends are visited from the last one
+        depends = self.__get_depends(pkg_name, res_type)
+        _stack = [[depends, len(depends)]]
         while _stack:
-            while not _stack[-1]:
-                if len(_stack) == 1:
-                    _stack.pop()
-                    break
+            frame = _stack[-1]
+            if not frame[1]:
                 _stack.pop()
-                df_row = df_row[:-num]
-            if not _stack:
-                break
-
-            next_pkg = _stack[-1].pop()
-
+                if _stack:
+                    self.__pop_path(path, on_path, num)
+                continue
+            frame[1] -= 1
+            next_pkg = frame[0][frame[1]]
             if not next_pkg:
                 continue
 
-            if next_pkg not in df_row and next_pkg not in names_set:
-                names_set.add(next_pkg)
-                rows = self.__get_single_df_row(next_pkg, res_type)
+            names_set_hit = next_pkg in names_set
+            names_set.add(next_pkg)
+            rows = self.__get_single_df_row(next_pkg, res_type)
+            if next_pkg not in on_path and not names_set_hit:
                 if not rows:
                     continue
-                df_row.extend([next_pkg, *rows])
-
+                path.extend([next_pkg, *rows])
+                for value in path[-num:]:
+                    on_path[value] += 1
                 depends = self.__get_depends(next_pkg, res_type)
                 if depends:
-                    _stack.append(depends)
+                    _stack.append([depends, len(depends)])
                 else:
-                    df_row = self.__write_csv_update_df_row(
-                        df_row, res_type, names_set)
-                    df_row = df_row[:-num]
-                    continue
+                    yield tuple(path)
+                    self.__pop_path(path, on_path, num)
+            elif not rows:
+                yield tuple(path)
+            elif next_pkg in on_path:
+                # When a dependency chain is closed, add 1 to the end of a line in the CSV file
+                yield (*path, next_pkg, *rows, "1")
             else:
-                df_row = self.__write_csv_update_df_row(df_row,
-                                                        res_type,
-                                                        names_set,
-                                                        pkg=next_pkg)
+                yield (*path, next_pkg, *rows)
 
-                continue
-        return names_set
+    def __install_rows(self):
+        """
+        Rows of the install dependency chains
+        """
+        name_set = set()
+        for name in self.binary_packages or self.package_name:
+            yield from self.__data_rows(name, name_set)
 
-    def __write_install_csv(self):
+    def __build_rows(self):
         """
-        Writes the data of the installed fetch to CSV
-        Returns:
+        Rows of the build dependency chains
+        """
+        n_set = set()
+        for package_name in self.package_name:
+            yield from self.__data_rows(package_name, n_set, res_type="build")
 
+    def __write_files(self, files):
         """
-        install_path = os.path.join(
-            self.folder_path,
-            "install_data.csv")
-        with open(install_path, "a+", encoding="utf-8", newline="") as install_csv:
-            self.install_csv_writer = csv.writer(install_csv)
-            name_set = set()
-            if self.binary_packages:
-                for name in self.binary_packages:
-                    name_set = self.__data_to_csv(name, name_set)
-            else:
-                for package_name in self.package_name:
-                    name_set = self.__data_to_csv(package_name, name_set)
+        Write csv files into a new folder
+        Args:
+            files: file names and their rows
 
-    def __write_build_csv(self):
+        Returns:
+            self.folder_path: folder path
         """
-        Writes the retrieved build data to CSV
+        self.__create_folder_path()
+        for file_name, rows in files:
+            with open(os.path.join(self.folder_path, file_name), "a+", newline="",
+                      encoding="utf-8", buffering=self.write_buffer_size) as csv_file:
+                csv.writer(csv_file).writerows(rows)
+        return self.folder_path
+
+    @catch_error
+    def depend_files(self):
+        """
+        The csv files of the dependencies, the rows of a file are generated while
+        the file is read, so a file is never held in memory or on the disk
         Returns:
+            list of file names and their rows, empty if there is no dependency
+        """
+        if not any([self.build_data, self.install_data, self.full_depend_data]):
+            return []
+        self._update_build_dict_data()
+        files = [("full_amount_data.csv", self.__full_depend_rows())]
+        if self.depend_type == "bedep":
+            return files
+        files.append(("install_data.csv", self.__install_rows()))
+        if self.depend_type in ["selfdep", "builddep"]:
+            files.append(("build.csv", self.__build_rows()))
+        return files
 
+    def __full_depend_columns(self):
+        """
+        Columns of the full amount of data
+        """
+        columns = {name: [] for name in (
+            "binary_name", "source_name", "version", "database", "install", "build")}
+        for key, values in self.full_depend_data.items():
+            columns["binary_name"].append(key)
+            for name in ("source_name", "version", "database"):
+                columns[name].append(values.get(name))
+            columns["install"].append([str(bin) for bin in values.get("install", [])])
+            columns["build"].append([str(src) for src in values.get("build", [])])
+        return columns
+
+    def __chain_columns(self, rows, res_type):
+        """
+        Columns of the dependency chains, one row for every package of a chain
+        Args:
+            rows: csv rows of the dependency chains
+            res_type: install or build
+
+        Returns:
+            columns of the chains
         """
+        num = self.install_count if res_type == "install" else self.build_count
+        names = ["binary_name", "source_name", "version", "database"][-num:]
+        columns = {name: [] for name in ("chain", "depth", *names, "closed")}
+        for chain_id, row in enumerate(rows):
+            # A closed chain ends with an extra "1"
+            closed = len(row) % num == 1
+            packages = len(row) // num
+            columns["chain"].extend(repeat(chain_id, packages))
+            columns["depth"].extend(range(packages))
+            for offset, name in enumerate(names):
+                columns[name].extend(row[offset:packages * num:num])
+            columns["closed"].extend(repeat(closed, packages))
+        return columns
 
-        build_path = os.path.join(
-            self.folder_path, "build.csv")
-        with open(build_path, "a+", encoding="utf-8", newline="") as build_csv:
-            self.build_csv_writer = csv.writer(build_csv)
-            n_set = set()
-            for package_name in self.package_name:
-                n_set = self.__data_to_csv(
-                    package_name, n_set, res_type="build")
+    @catch_error
+    def depend_columns(self):
+        """
+        The dependencies as columnar tables, the tables hold the same data
+        as the csv files of depend_files
+        Returns:
+            list of table names and their columns, empty if there is no dependency
+        """
+        if not any([self.build_data, self.install_data, self.full_depend_data]):
+            return []
+        self._update_build_dict_data()
+        tables = [("full_amount_data", self.__full_depend_columns())]
+        if self.depend_type == "bedep":
+            return tables
+        tables.append(("install_data", self.__chain_columns(self.__install_rows(), "install")))
+        if self.depend_type in ["selfdep", "builddep"]:
+            tables.append(("build", self.__chain_columns(self.__build_rows(), "build")))
+        return tables
 
     @catch_error
     def run(self):
@@ -331,37 +373,87 @@ class Download:
         Returns:
             self.folder_path: folder path
         """
-
-        if not any([self.build_data, self.install_data, self.full_depend_data]):
+        files = self.depend_files()
+        if not files:
             return
-        self._update_build_dict_data()
-        self.__create_folder_path()
-        self.__process_full_depend_data_to_csv()
-        if self.depend_type == "bedep":
-            return self.folder_path
-        self.__write_install_csv()
-        if self.depend_type in ["selfdep", "builddep"]:
-            self.__write_build_csv()
-        return self.folder_path
+        return self.__write_files(files)
 
     def _all_bin_packages(self, database_name):
         """
         Gets information about all binary packages in the database
         Returns:
-            all_bin_info: all binary packages information
+            all_bin_info: generator of all binary packages information
         """
-        all_bin_info = self.pkg.all_bin_packages(
-            database_name, command_line=True)
-        return all_bin_info
+        return self.pkg.iter_bin_packages(database_name)
 
     def _all_src_packages(self, database_name):
         """
         Gets information about all source  packages in the database
         Returns:
-            all_bin_info: all source  packages information
+            all_bin_info: generator of all source  packages information
+        """
+        return self.pkg.iter_src_packages(database_name)
+
+    @staticmethod
+    def __package_rows(all_packages_info):
+        """
+        Rows of the package information, with the header row
+        """
+        yield ["pkg_name", "license", "version", "url", "database"]
+        for values in all_packages_info:
+            yield [
+                values.get("pkg_name"),
+                values.get("license"),
+                values.get("version"),
+                values.get("url"),
+                values.get("database"),
+            ]
+
+    @catch_error
+    def package_files(self, name, database_name):
+        """
+        The csv file of all package information of a database, the packages are
+        scrolled from the database while the rows are written
+
+        Args:
+            name: src or bin
+            database_name: Specify the name of the database
+
+        Returns:
+            list of the file name and its rows, empty if there is no package
+        """
+        if not hasattr(self, "_all_{}_packages".format(name)):
+            return []
+        all_packages_info = getattr(
+            self, "_all_{}_packages".format(name))(database_name)
+        # The first package tells if there is any package, before the file is started
+        first = next(all_packages_info, None)
+        if first is None:
+            return []
+        return [(f"{database_name}_info.csv", self.__package_rows(chain([first], all_packages_info)))]
+
+    @catch_error
+    def package_columns(self, name, database_name):
+        """
+        All package information of a database as a columnar table
+
+        Args:
+            name: src or bin
+            database_name: Specify the name of the database
+
+        Returns:
+            list of the table name and its columns, empty if there is no package
         """
-        res = self.pkg.all_src_packages(database_name, command_line=True)
-        return res
+        files = self.package_files(name, database_name)
+        if not files:
+            return []
+        file_name, rows = files[0]
+        header = next(rows)
+        columns = {column: [] for column in header}
+        for row in rows:
+            for column, value in zip(header, row):
+                columns[column].append(value)
+        return [(os.path.splitext(file_name)[0], columns)]
 
     @catch_error
     def process_packages(self, name, database_name):
@@ -374,27 +466,7 @@ class Download:
         Returns:
             self.folder_path: Path to the folder
         """
-        all_packages_info = {}
-        if hasattr(self, "_all_{}_packages".format(name)):
-            all_packages_info = getattr(
-                self, "_all_{}_packages".format(name))(database_name)
-        if not all_packages_info:
+        files = self.package_files(name, database_name)
+        if not files:
             return []
-        self.__create_folder_path()
-        package_info_path = os.path.join(
-            self.folder_path, f"{database_name}_info.csv")
-        with open(package_info_path,
-                  "a+", newline="", encoding="utf-8") as bin_csv:
-            bin_csv_writer = csv.writer(bin_csv)
-            bin_csv_writer.writerow(["pkg_name",
-                                     "license", "version", "url", "database"])
-            for values in all_packages_info.get("data"):
-                src_csv_row = [
-                    values.get("pkg_name"),
-                    values.get("license"),
-                    values.get("version"),
-                    values.get("url"),
-                    values.get("database"),
-                ]
-                bin_csv_writer.writerow(src_csv_row)
-        return self.folder_path
+        return self.__write_files(files)
@@ -13,57 +13,88 @@
 """
 Dependent graph
 """
-import random
+import math
+import zlib
 from packageship.application.common import constant
 
+# Colors of the nodes, packages built from the same source package share a color
+COLORS = ['#E02020', '#FA6400', '#F78500', '#6DD400', '#44D7B6',
+          '#32C5FF', '#0091FF', '#6236FF', '#B620E0', '#6D7278']
+
+
+def node_color(source_name):
+    """
+    Description: color of the nodes of the packages built from a source package
+    """
+    return COLORS[zlib.crc32(source_name.encode("utf-8")) % len(COLORS)]
+
 
 class GraphInfo:
     """
     generate graph based on depend result
+
+    The nodes are laid out on layers around the root node, the packages the root
+    depends on in the lower half and the packages depending on the root in the upper
+    half, every layer one LEVEL_RADIUS further away. Nodes of a layer are ordered by
+    the position of the node they were reached from and then by name, so the same
+    graph always gets the same layout.
+
+    Attributes:
+        max_nodes: the maximum number of package nodes of the graph, the nodes whose
+                   neighbours are cut off by the budget are marked expandable
+        max_fanout: the maximum number of new neighbours shown for a node, the other
+                    neighbours are aggregated into one node
     """
 
-    def __init__(self, depend):
+    def __init__(self, depend, max_nodes=None, max_fanout=None):
         self._nodes = dict()
         self._edges = list()
         self._depend = depend
         self._up = set()
         self._down = set()
+        self._layers = dict()
+        self._parents = dict()
+        self._expandable = set()
+        self._aggregates = set()
+        self.max_nodes = max_nodes
+        self.max_fanout = max_fanout
 
-    @property
-    def _color(self):
+    def _color(self, package):
         """
-        Description: rgb random color value acquisition
+        Description: color of a package, derived from its source package name
         """
-        color = ['#E02020', '#FA6400', '#F78500', '#6DD400', '#44D7B6',
-                 '#32C5FF', '#0091FF', '#6236FF', '#B620E0', '#6D7278']
-        return color[random.randint(0, 9)]
-
-    @property
-    def _quadrant(self):
-        """Get the coordinate quadrant at random"""
-        quadrant = [1, -1]
-        return quadrant[random.randint(0, 1)]
+        try:
+            name = self._depend.binary_dict[package]["source_name"] or package
+        except (KeyError, TypeError):
+            name = package
+        return node_color(name)
 
-    @property
-    def _coordinate(self):
+    @staticmethod
+    def coordinate(layer, index, count):
         """
-        Description: calculate the random coordinates of each package in the current level
+        Description: coordinates of a node in its layer
 
+        Args:
+            layer: layer of the node, negative for the packages depending on the root
+            index: position of the node in the layer
+            count: number of nodes of the layer
         Returns:
-            The coordinate value of the dynamically calculated dependent package
             example : (x, y)
         """
-        _x, _y = random.uniform(0, constant.LEVEL_RADIUS) * self._quadrant, random.uniform(
-            0, constant.LEVEL_RADIUS) * self._quadrant
-        return _x, _y
+        if not layer:
+            return 0.0, 0.0
+        angle = math.pi * (index + 1) / (count + 1)
+        if layer > 0:
+            angle += math.pi
+        radius = constant.LEVEL_RADIUS * abs(layer)
+        return round(radius * math.cos(angle), 2), round(radius * math.sin(angle), 2)
 
-    @property
-    def node_size(self):
+    @staticmethod
+    def node_size(degree):
         """
-        Description: calculate the size of each node
+        Description: calculate the size of a node from the number of its edges
         """
-        node_size = random.uniform(1, constant.NODE_SIZE)
-        return node_size
+        return round(min(constant.NODE_SIZE, 5 + 4 * math.log2(1 + degree)), 2)
 
     @property
     def edges(self):
@@ -94,75 +125,157 @@ class GraphInfo:
         Args:
             package_name: Dependent package name
         """
-        _x, _y = self._coordinate
+        self._add_node(package, layer=0)
+
+    def _add_node(self, package, layer, parent=None):
+        """
+        Description: add a node on a layer of the graph
+
+        Args:
+            package: package name
+            layer: layer of the node
+            parent: the node this node is reached from
+        """
+        if package in self._nodes:
+            return
+        self._nodes[package] = dict(label=package, id=package)
+        self._layers[package] = layer
+        self._parents[package] = parent
 
-        self._nodes[package] = dict(
-            color=self._color,
-            label=package,
-            y=_y,
-            x=_x,
-            id=package,
-            size=self.node_size)
+    @property
+    def _full(self):
+        """Whether the node budget is used up"""
+        return bool(self.max_nodes) and \
+            len(self._layers) - len(self._aggregates) >= self.max_nodes
+
+    def _admit(self, node, neighbours, layer, req_type):
+        """
+        Description: add the neighbours of a node within the node budget and the fanout,
+                     the neighbours over the fanout are aggregated into one node
 
-    def _downward(self, downward_node, depend_data):
+        Args:
+            node: node whose neighbours are added
+            neighbours: neighbour package names
+            layer: layer of the new nodes
+            req_type: requires or be_requires
+        Returns:
+            the neighbours in the graph
+        """
+        admitted, aggregated = [], []
+        added = 0
+        for neighbour in sorted(set(neighbours)):
+            if neighbour in self._nodes:
+                admitted.append(neighbour)
+            elif self._full:
+                self._expandable.add(node)
+            elif self.max_fanout and added >= self.max_fanout:
+                aggregated.append(neighbour)
+            else:
+                self._add_node(neighbour, layer, node)
+                admitted.append(neighbour)
+                added += 1
+        if aggregated:
+            aggregate = "%s::%s" % (node, req_type)
+            self._add_node(aggregate, layer, node)
+            self._nodes[aggregate].update(
+                label="+%d" % len(aggregated), aggregate=True, count=len(aggregated))
+            self._aggregates.add(aggregate)
+            self._expandable.add(node)
+            if req_type == "requires":
+                self.edges = {"source": node, "target": aggregate}
+            else:
+                self.edges = {"source": aggregate, "target": node}
+        return admitted
+
+    def _downward(self, downward_node, depend_data, layer):
         """
         Description: Depends on the lower node of the graph
 
         Args:
             downward_node:node on which the upper layer depends
             depend_data: Dependency data
+            layer: layer of the new nodes
         Returns:
             node on which the next layer depends
         """
         _downward_node = set()
-        for node in downward_node:
+        for node in sorted(downward_node):
             self._down.add(node)
             try:
-                for require in depend_data[node]["requires"]:
-                    self.edges = {"source": node, "target": require}
-                    self.nodes = require
-                    _downward_node.add(require)
+                requires = depend_data[node]["requires"]
             except KeyError:
                 continue
+            for require in self._admit(node, requires, layer, "requires"):
+                self.edges = {"source": node, "target": require}
+                _downward_node.add(require)
 
         return _downward_node
 
-    def _upward(self, upward_node, depend_data):
+    def _upward(self, upward_node, depend_data, layer):
         """
         Description: Depends on the upper node of the graph
 
         Args:
             downward_node:upper level depends on several points
             depend_data: Dependency data
+            layer: layer of the new nodes
         Returns:
             With a layer of dependent nodes
         """
         _upward_node = set()
-        for node in upward_node:
+        for node in sorted(upward_node):
             self._up.add(node)
             try:
-                for require in depend_data[node]["be_requires"]:
-                    self.edges = {"source": require, "target": node}
-                    self.nodes = require
-                    _upward_node.add(require)
+                requires = depend_data[node]["be_requires"]
             except KeyError:
                 continue
+            for require in self._admit(node, requires, layer, "be_requires"):
+                self.edges = {"source": require, "target": node}
+                _upward_node.add(require)
 
         return _upward_node
 
     def _graph(self, root_node, depend_data, level):
         _downward = set([root_node])
         _upward = set([root_node])
+        layer = abs(self._layers.get(root_node, 0))
         while (_downward or _upward) and level != 0:
-
+            layer += 1
             if _downward:
-                _downward = self._downward(_downward, depend_data)
+                _downward = self._downward(_downward, depend_data, layer)
             if _upward:
-                _upward = self._upward(_upward, depend_data)
+                _upward = self._upward(_upward, depend_data, -layer)
             _downward = _downward - self._down
             _upward = _upward - self._up
             level -= 1
 
+    def _layout(self):
+        """
+        Description: set the coordinates, color and size of every node
+        """
+        degrees = dict()
+        for edge in self._edges:
+            for node in (edge["sourceID"], edge["targetID"]):
+                degrees[node] = degrees.get(node, 0) + 1
+        layers = dict()
+        for node, layer in self._layers.items():
+            layers.setdefault(layer, []).append(node)
+        angles = dict()
+        for layer in sorted(layers, key=lambda layer: (abs(layer), layer)):
+            # Nodes follow the order of the nodes they are reached from
+            nodes = sorted(layers[layer], key=lambda node: (
+                angles.get(self._parents[node], 0), node))
+            for index, node in enumerate(nodes):
+                angles[node] = index / len(nodes)
+                _x, _y = self.coordinate(layer, index, len(nodes))
+                self._nodes[node].update(
+                    color=self._color(
+                        self._parents[node] if node in self._aggregates else node),
+                    x=_x,
+                    y=_y,
+                    size=self.node_size(degrees.get(node, 0)),
+                    expandable=node in self._expandable)
+
     def generate_graph(self, root_node, package_type, level=2):
         """
         Description: auto generate coordinates and graph
@@ -177,14 +290,17 @@ class GraphInfo:
                 builds = [build for build in _source_data[root_node]["build"]]
             except KeyError:
                 self.nodes = root_node
+                self._layout()
                 return dict(edges=self.edges, nodes=self.nodes)
 
             self.nodes = root_node
-            for require in builds:
+            for require in self._admit(root_node, builds, 1, "requires"):
                 self.edges = {"source": root_node, "target": require}
             level = level - 1
 
         for pkg in builds:
+            if pkg != root_node and pkg not in self._nodes:
+                continue
             try:
                 depend_data = self._depend.filter_dict(level=level, root=pkg)
             except ValueError:
@@ -192,4 +308,22 @@ class GraphInfo:
             if depend_data:
                 self.nodes = pkg
                 self._graph(pkg, depend_data, level)
+        self._layout()
         return dict(edges=self.edges, nodes=self.nodes)
+
+    @staticmethod
+    def delta(graph, known_nodes):
+        """
+        Description: the part of a graph the client does not show yet
+
+        Args:
+            graph: graph generated by generate_graph
+            known_nodes: ids of the nodes the client shows
+        Returns:
+            the new nodes and the edges touching a new node
+        """
+        known_nodes = set(known_nodes)
+        return dict(
+            edges=[edge for edge in graph["edges"] if edge["sourceID"] not in known_nodes
+                   or edge["targetID"] not in known_nodes],
+            nodes=[node for node in graph["nodes"] if node["id"] not in known_nodes])
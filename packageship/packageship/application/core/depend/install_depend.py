@@ -85,6 +85,32 @@ class InstallDepend(BaseDepend):
             if self.__level == level:
                 break
 
+    async def async_install_depend(self, bin_name, level=0):
+        """
+        Description: get binary rpm package(s) install depend relation in the asyncio
+                     query path, the result is not cached in redis
+        Args:
+            bin_name: the list of package names needed to be searched
+            level: The number of levels of dependency querying,
+                    the default value of level is 0, which means search all dependency
+        Exception:
+            AttributeError: the input value is invalid
+       """
+        if not isinstance(bin_name, list):
+            raise AttributeError("the input is invalid")
+        for binary in bin_name:
+            if binary:
+                self.search_install_dict.get("non_db").add(binary)
+
+        while self._check_search(self.search_install_dict):
+            self.__level += 1
+            resp = await self._async_query_in_db(
+                search_dict=self.search_install_dict,
+                func=self.__query_installreq.async_get_install_req)
+            self.__process_one_level_dep(resp, level)
+            if self.__level == level:
+                break
+
     def __query_one_level_dep(self, level):
         """
         Description: query the one level install dep in database
@@ -97,7 +123,16 @@ class InstallDepend(BaseDepend):
         resp = self._query_in_db(
             search_dict=self.search_install_dict,
             func=self.__query_installreq.get_install_req)
+        self.__process_one_level_dep(resp, level)
 
+    def __process_one_level_dep(self, resp, level):
+        """
+        Description: put the one level install dep into the result dicts
+        Args:
+            resp: the response for one level depend result
+            level: The number of levels of dependency querying,
+                    the default value of level is 0, which means search all dependency
+       """
         if self.__level == 1:
             searched_pkg = copy.deepcopy(self._search_set)
 
@@ -164,6 +199,8 @@ class InstallDepend(BaseDepend):
 
         @buffer_cache(depend=self)
         def _depend(**kwargs):
+            if self._load_closure(**kwargs):
+                return
             self.install_depend(bin_name=kwargs["packagename"],
                                 level=kwargs["parameter"]["level"])
         _depend(**kwargs)
@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Cursor paging of the depend list
+"""
+import base64
+import binascii
+import json
+from operator import itemgetter
+from redis.exceptions import RedisError
+from packageship.libs.log import LOGGER
+from packageship.application.database.cache import buffer_cache, PageCache
+from packageship.application.core.depend import DispatchDepend
+
+# list name, the key of the package name in its rows and the key of its total count
+DEPEND_LISTS = (("binary_list", "binary_name", "binary_total"),
+                ("source_list", "source_name", "source_total"))
+NAME_KEYS = {list_name: name_key for list_name, name_key, _ in DEPEND_LISTS}
+
+
+class MemoryPage:
+    """
+    Page a depend result held in memory, used when redis is unavailable
+
+    Attributes:
+        _rows: rows of every list ordered by package name
+        _statistics: per database statistics
+    """
+
+    def __init__(self, depend):
+        statistics_info = dict()
+        self._rows = {
+            "binary_list": sorted(depend.iter_binary_list(statistics_info),
+                                  key=itemgetter("binary_name")),
+            "source_list": sorted(depend.iter_source_list(statistics_info),
+                                  key=itemgetter("source_name")),
+        }
+        self._statistics = list(statistics_info.values())
+
+    def statistics(self):
+        """per database statistics"""
+        return self._statistics
+
+    def _filter(self, list_name, database, prefix):
+        name_key = NAME_KEYS[list_name]
+        return [row for row in self._rows[list_name]
+                if (not database or row["database"] == database) and row[name_key].startswith(prefix)]
+
+    def page(self, list_name, marker, page_size, database=None, prefix=""):
+        """A page of a list ordered by package name, see PageCache.page"""
+        name_key = NAME_KEYS[list_name]
+        rows = [row for row in self._filter(list_name, database, prefix) if row[name_key] > marker]
+        return rows[:page_size]
+
+    def count(self, list_name, database=None, prefix=""):
+        """Number of rows of a list that match the filters"""
+        return len(self._filter(list_name, database, prefix))
+
+
+class DependPaging:
+    """
+    Serve the depend list page by page. The pages are read from the paging index
+    of the redis cache, which is built from the cached depend result the first
+    time it is paged, so turning the page neither recomputes nor transfers the
+    whole depend result
+
+    Attributes:
+        _kwargs: depend query parameters
+        page_size: number of rows of each list in one page
+        database: only rows of this database
+        prefix: only rows whose package name starts with the prefix
+    """
+
+    def __init__(self, kwargs, page_size, database=None, prefix=""):
+        self._kwargs = kwargs
+        self.page_size = page_size
+        self.database = database
+        self.prefix = prefix or ""
+
+    @staticmethod
+    def encode_cursor(markers):
+        """
+        Encode the position of every list into an opaque cursor
+        Args:
+            markers: the last package name returned of every list, None if the list is finished
+
+        Returns:
+            cursor, None if all the lists are finished
+        """
+        if all(marker is None for marker in markers.values()):
+            return None
+        return base64.urlsafe_b64encode(json.dumps(markers).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode the position of every list from a cursor
+        Args:
+            cursor: cursor returned by the previous page, empty means the first page
+
+        Returns:
+            markers of every list
+        Raises:
+            ValueError: the cursor is invalid
+        """
+        if not cursor:
+            return {list_name: "" for list_name in NAME_KEYS}
+        try:
+            markers = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (binascii.Error, UnicodeError, json.JSONDecodeError) as error:
+            raise ValueError("invalid cursor: %s" % cursor) from error
+        if not isinstance(markers, dict) or any(
+                not isinstance(markers.get(list_name), (str, type(None))) for list_name in NAME_KEYS):
+            raise ValueError("invalid cursor: %s" % cursor)
+        return markers
+
+    def _pages(self):
+        """
+        Get the pages of the depend result, from redis if possible
+        Returns:
+            PageCache or MemoryPage
+        """
+        pages = PageCache(buffer_cache.cache_key(**self._kwargs))
+        depend = None
+        try:
+            if not pages.exists():
+                depend = DispatchDepend.execute(**self._kwargs)
+                pages.store(depend)
+            return pages
+        except RedisError as error:
+            LOGGER.warning(error)
+            if depend is None:
+                depend = DispatchDepend.execute(**self._kwargs)
+            return MemoryPage(depend)
+
+    def page(self, cursor=None):
+        """
+        Get one page of the depend list
+        Args:
+            cursor: cursor returned by the previous page
+
+        Returns:
+            page of the depend list, None if the depend result is empty
+            for example:
+                {
+                    "binary_list": [],
+                    "source_list": [],
+                    "statistics": [],
+                    "binary_total": 0,
+                    "source_total": 0,
+                    "next_cursor": None
+                }
+        Raises:
+            ValueError: the cursor is invalid
+        """
+        markers = self.decode_cursor(cursor)
+        pages = self._pages()
+        statistics = pages.statistics()
+        if not statistics:
+            return None
+        result = dict()
+        next_markers = dict()
+        for list_name, name_key, total_key in DEPEND_LISTS:
+            marker = markers.get(list_name)
+            rows = []
+            if marker is not None:
+                # One more row tells whether there is a next page
+                rows = pages.page(list_name, marker, self.page_size + 1,
+                                  database=self.database, prefix=self.prefix)
+            next_markers[list_name] = rows[self.page_size - 1][name_key] \
+                if len(rows) > self.page_size else None
+            result[list_name] = rows[:self.page_size]
+            result[total_key] = pages.count(
+                list_name, database=self.database, prefix=self.prefix)
+        result["statistics"] = statistics
+        result["next_cursor"] = self.encode_cursor(next_markers)
+        return result
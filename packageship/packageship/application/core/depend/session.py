@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Graph sessions, expand the dependency graph node by node
+"""
+import uuid
+from packageship.application.database.cache import GraphSessionCache
+from .graph import GraphInfo, node_color
+
+# Directions of an expand and the side of the expanded node the new nodes are placed on
+DIRECTIONS = {"requires": 1, "be_requires": -1}
+
+
+class GraphSession:
+    """
+    A graph session is bound to one depend result. The adjacency of the result is
+    cached when the session is created, every expand reads only the packages it
+    reaches and returns only the nodes and edges the session has not sent yet
+
+    Attributes:
+        session_id: id of the session
+    """
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self._cache = GraphSessionCache(session_id)
+
+    @staticmethod
+    def adjacency(depend, root_node, package_type):
+        """
+        Description: requires, be_requires and source name of every package of a depend result
+
+        Args:
+            depend: dependent instance
+            root_node: root node of the graph
+            package_type: binary or source
+        Returns:
+            adjacency records by package name
+        """
+        adjacency = dict()
+
+        def _record(name):
+            return adjacency.setdefault(
+                name, dict(requires=[], be_requires=[], source_name=name))
+
+        for name, values in depend.binary_dict.items():
+            record = _record(name)
+            record["source_name"] = values.get("source_name") or name
+            record["requires"] = sorted(set(values.get("install") or []))
+            for require in record["requires"]:
+                _record(require)["be_requires"].append(name)
+        if package_type == "source":
+            try:
+                builds = depend.source_dict[root_node]["build"]
+            except KeyError:
+                builds = []
+            record = _record(root_node)
+            record["requires"] = sorted(set(record["requires"]) | set(builds))
+            for build in builds:
+                _record(build)["be_requires"].append(root_node)
+        for record in adjacency.values():
+            record["be_requires"] = sorted(set(record["be_requires"]))
+        return adjacency
+
+    @classmethod
+    def create(cls, depend, root_node, package_type):
+        """
+        Description: create a session of a depend result
+
+        Args:
+            depend: dependent instance
+            root_node: root node of the graph
+            package_type: binary or source
+        Returns:
+            the session
+        """
+        session = cls(uuid.uuid4().hex)
+        session._cache.store(cls.adjacency(depend, root_node, package_type))
+        return session
+
+    def exists(self):
+        """Whether the session exists and has not expired"""
+        return self._cache.exists()
+
+    @staticmethod
+    def _node(name, record, _x, _y):
+        """
+        Description: graph node of a package
+
+        Args:
+            name: package name
+            record: adjacency record of the package
+            _x: x coordinate
+            _y: y coordinate
+        """
+        record = record or dict(requires=[], be_requires=[], source_name=name)
+        return dict(
+            color=node_color(record["source_name"]),
+            label=name,
+            y=_y,
+            x=_x,
+            id=name,
+            size=GraphInfo.node_size(len(record["requires"]) + len(record["be_requires"])))
+
+    def _expand_layer(self, frontier, req_type, visited):
+        """
+        Description: expand one layer of nodes in one direction
+
+        Args:
+            frontier: nodes to expand
+            req_type: requires or be_requires
+            visited: names of the nodes reached by the expand, updated with the new layer
+        Returns:
+            new nodes, new edges and the nodes of the next layer
+        """
+        records = self._cache.packages(sorted(frontier))
+        edges, children = [], dict()
+        for parent in sorted(frontier):
+            neighbours = (records.get(parent) or dict()).get(req_type, [])
+            for index, neighbour in enumerate(neighbours):
+                edges.append((parent, neighbour) if req_type == "requires" else (neighbour, parent))
+                if neighbour in children or neighbour in visited:
+                    continue
+                _x, _y = GraphInfo.coordinate(DIRECTIONS[req_type], index, len(neighbours))
+                children[neighbour] = (round(frontier[parent]["x"] + _x, 2),
+                                       round(frontier[parent]["y"] + _y, 2))
+        visited.update(children)
+        new_edges = self._cache.add_edges(edges)
+        records = self._cache.packages(sorted(children))
+        new_nodes = self._cache.add_nodes([
+            (name, self._node(name, records.get(name), *children[name])) for name in sorted(children)])
+        # The nodes sent before are expanded further from the position the client has
+        layer = self._cache.nodes(sorted(set(children) - {node["id"] for node in new_nodes}))
+        layer.update((node["id"], node) for node in new_nodes)
+        return new_nodes, new_edges, layer
+
+    def expand(self, node_name, direction="both", depth=1):
+        """
+        Description: expand a node of the graph
+
+        Args:
+            node_name: node to expand
+            direction: requires, be_requires or both
+            depth: number of layers to expand
+        Returns:
+            the nodes and edges not sent before, None if the node is not in the depend result
+        """
+        nodes, edges = [], []
+        root = self._cache.node(node_name)
+        if root is None:
+            record = self._cache.packages([node_name])[node_name]
+            if record is None:
+                return None
+            root = self._node(node_name, record, 0.0, 0.0)
+            nodes.extend(self._cache.add_nodes([(node_name, root)]))
+        req_types = list(DIRECTIONS) if direction == "both" else [direction]
+        for req_type in req_types:
+            frontier, visited = {node_name: root}, {node_name}
+            for _ in range(depth):
+                new_nodes, new_edges, frontier = self._expand_layer(frontier, req_type, visited)
+                nodes.extend(new_nodes)
+                edges.extend(new_edges)
+                if not frontier:
+                    break
+        self._cache.touch()
+        return dict(
+            edges=[dict(sourceID=source, targetID=target) for source, target in edges],
+            nodes=nodes)
@@ -13,8 +13,17 @@
 """
 Description: query package information
 """
+from itertools import groupby, islice
+from operator import itemgetter
+
+import gevent
+from redis.exceptions import RedisError
+
+from packageship.application.common import tracing
+from packageship.application.common.constant import SOURCE_DB_TYPE
 from packageship.application.common.exc import PackageInfoGettingError, \
     DatabaseConfigException, ElasticSearchQueryException
+from packageship.application.database.cache import PackageInfoCache
 from packageship.application.query import database as db
 from packageship.application.query.depend import BeDependRequires, InstallRequires, BuildRequires
 from packageship.application.query.pkg import QueryPackage
@@ -25,6 +34,9 @@ class Package:
     """
     Get all source package info and binary package info
     """
+    # Fields of the documents used by the base info
+    SOURCE_FIELDS = ["name", "version", "url", "rpm_license"]
+    BINARY_FIELDS = ["name", "version", "url", "rpm_license", "src_name"]
 
     def __parse_pkg_info(self, package_info_dict, pkgname, database):
         """
@@ -47,7 +59,7 @@ class Package:
         return pkg_info
 
     def all_src_packages(self, database, page_num=1, page_size=20,
-                           package_list=None, command_line=False):
+                           package_list=None, command_line=False, cursor=None):
         """
         get all source rpm packages base info
         Args:
@@ -56,13 +68,15 @@ class Package:
             page_size: paging query size
             package_list: package list name
             command_line: command_line or UI
+            cursor: next_cursor of the previous page of all packages
 
         Returns:
             all_src_dict: all parsed source package information dict
             for example:
                 {
                 "total": "",
-                "data": ""
+                "data": "",
+                "next_cursor": ""
                 }
         Attributes:
             AttributeError: Cannot find the attribute of the corresponding object
@@ -71,14 +85,48 @@ class Package:
         Raises:
             ElasticSearchQueryException: dataBase connect failed
             DatabaseConfigException: dataBase config error
+            ValueError: the cursor is invalid
 
         """
         try:
             # query all source package info from database
             query_package = QueryPackage()
             all_src_info = query_package.get_src_info(
-                package_list, database, page_num, page_size, command_line)
+                package_list, database, page_num, page_size, command_line, cursor)
+        except (AttributeError, KeyError, TypeError) as e:
+            LOGGER.error(e)
+            return {}
+        return self._parse_src_packages(all_src_info, database)
 
+    async def async_all_src_packages(self, database, page_num=1, page_size=20, package_list=None, cursor=None):
+        """
+        get all source rpm packages base info in the asyncio query path, the same as all_src_packages in UI mode
+        Raises:
+            ElasticSearchQueryException: dataBase connect failed
+            DatabaseConfigException: dataBase config error
+            ValueError: the cursor is invalid
+        """
+        try:
+            all_src_info = await QueryPackage().async_get_src_info(
+                package_list, database, page_num, page_size, cursor)
+        except (AttributeError, KeyError, TypeError) as e:
+            LOGGER.error(e)
+            return {}
+        return self._parse_src_packages(all_src_info, database)
+
+    def _parse_src_packages(self, all_src_info, database):
+        """
+        parse the source packages of a page
+        Args:
+            all_src_info: source packages queried from the database
+            database: database
+
+        Returns:
+            all_src_dict: all parsed source package information dict
+        Raises:
+            PackageInfoGettingError: no package found
+        """
+        try:
             if not all_src_info["data"]:
                 _msg = "An error occurred when querying source package info."
                 raise PackageInfoGettingError(_msg)
@@ -88,14 +136,15 @@ class Package:
             for pkg_info in all_src_info.get("data"):
                 parsed_all_src_info.extend(self.__parse_pkg_info(info_values, pkgname, database)
                                            for pkgname, info_values in pkg_info.items())
-            all_src_dict = {"total": total_num, "data": parsed_all_src_info}
+            all_src_dict = {"total": total_num, "data": parsed_all_src_info,
+                            "next_cursor": all_src_info.get("next_cursor")}
             return all_src_dict
         except (AttributeError, KeyError, TypeError) as e:
             LOGGER.error(e)
             return {}
 
     def all_bin_packages(self, database, page_num=1, page_size=20,
-                         package_list=None, command_line=False):
+                         package_list=None, command_line=False, cursor=None):
         """
         get all binary package info
         Args:
@@ -104,12 +153,14 @@ class Package:
             page_size: paging query size
             package_list: package list name
             command_line： command_line or UI
+            cursor: next_cursor of the previous page of all packages
         Returns:
             all_bin_dict: all binary package information dict
             for example::
                 {
                 "total": "",
-                "data": ""
+                "data": "",
+                "next_cursor": ""
                 }
         Attributes:
             AttributeError: Cannot find the attribute of the corresponding object
@@ -118,14 +169,48 @@ class Package:
         Raises:
             ElasticSearchQueryException: dataBase connect failed
             DatabaseConfigException: dataBase config error
+            ValueError: the cursor is invalid
 
         """
         try:
             # query all binary package info from database
             query_package = QueryPackage()
             all_bin_info = query_package.get_bin_info(
-                package_list, database, page_num, page_size, command_line)
+                package_list, database, page_num, page_size, command_line, cursor)
+        except (AttributeError, KeyError, TypeError) as e:
+            LOGGER.error(e)
+            return {}
+        return self._parse_bin_packages(all_bin_info, database)
 
+    async def async_all_bin_packages(self, database, page_num=1, page_size=20, package_list=None, cursor=None):
+        """
+        get all binary package info in the asyncio query path, the same as all_bin_packages in UI mode
+        Raises:
+            ElasticSearchQueryException: dataBase connect failed
+            DatabaseConfigException: dataBase config error
+            ValueError: the cursor is invalid
+        """
+        try:
+            all_bin_info = await QueryPackage().async_get_bin_info(
+                package_list, database, page_num, page_size, cursor)
+        except (AttributeError, KeyError, TypeError) as e:
+            LOGGER.error(e)
+            return {}
+        return self._parse_bin_packages(all_bin_info, database)
+
+    def _parse_bin_packages(self, all_bin_info, database):
+        """
+        parse the binary packages of a page
+        Args:
+            all_bin_info: binary packages queried from the database
+            database: database
+
+        Returns:
+            all_bin_dict: all binary package information dict
+        Raises:
+            PackageInfoGettingError: no package found
+        """
+        try:
             if not all_bin_info["data"]:
                 _msg = "An error occurred when getting bianry package info."
                 raise PackageInfoGettingError(_msg)
@@ -139,12 +224,51 @@ class Package:
                         info_values, pkgname, database)
                     single_pkg["source_name"] = info_values["src_name"]
                 parsed_all_bin_info.append(single_pkg)
-            all_bin_dict = {"total": total_num, "data": parsed_all_bin_info}
+            all_bin_dict = {"total": total_num, "data": parsed_all_bin_info,
+                            "next_cursor": all_bin_info.get("next_cursor")}
             return all_bin_dict
         except (AttributeError, KeyError, TypeError) as e:
             LOGGER.error(e)
             return {}
 
+    def iter_src_packages(self, database, package_list=None):
+        """
+        Scroll through the base info of source rpm packages, used for command line and export
+        Args:
+            database: database
+            package_list: package list name, None means all packages
+
+        Returns:
+            generator of parsed source package information, the same as the data of all_src_packages
+        Raises:
+            ElasticSearchQueryException: dataBase connect failed
+            DatabaseConfigException: dataBase config error
+        """
+        query_package = QueryPackage()
+        for pkg_info in query_package.iter_src_info(database, package_list, fields=self.SOURCE_FIELDS):
+            for pkgname, info_values in pkg_info.items():
+                yield self.__parse_pkg_info(info_values, pkgname, database)
+
+    def iter_bin_packages(self, database, package_list=None):
+        """
+        Scroll through the base info of binary rpm packages, used for command line and export
+        Args:
+            database: database
+            package_list: package list name, None means all packages
+
+        Returns:
+            generator of parsed binary package information, the same as the data of all_bin_packages
+        Raises:
+            ElasticSearchQueryException: dataBase connect failed
+            DatabaseConfigException: dataBase config error
+        """
+        query_package = QueryPackage()
+        for pkg_info in query_package.iter_bin_info(database, package_list, fields=self.BINARY_FIELDS):
+            for pkgname, info_values in pkg_info.items():
+                single_pkg = self.__parse_pkg_info(info_values, pkgname, database)
+                single_pkg["source_name"] = info_values["src_name"]
+                yield single_pkg
+
 
 class SinglePackage:
     """
@@ -165,39 +289,62 @@ class SinglePackage:
                         'required_by_bin': ['A1', 'B1'],
                         'required_by_src': ['T', 'R']}]
         """
-        try:
-            # getting bedend query res
-            be_depend_obj = BeDependRequires()
-            be_depend_info = be_depend_obj.get_be_req([pkgname], database)
-
-            if not be_depend_info:
-                return []
-            provides_info_res = []
-            depend_info = be_depend_info[0].get("provides")
-            for component_info in depend_info:
-
-                # getting required_by_bin
-                install_require_info = component_info.get("install_require")
-                required_by_bin = []
-                for req_info in install_require_info:
-                    if req_info.get("req_bin_name"):
-                        required_by_bin.append(req_info.get("req_bin_name"))
-
-                # getting required_by_src
-                build_require_info = component_info.get("build_require")
-                required_by_src = []
-                for req_info in build_require_info:
-                    if req_info.get("req_src_name"):
-                        required_by_src.append(req_info.get("req_src_name"))
-
-                component_dict = {"component": component_info.get("component"),
-                                  "required_by_bin": required_by_bin,
-                                  "required_by_src": required_by_src}
-                provides_info_res.append(component_dict)
-            return provides_info_res
-        except (TypeError, IndexError) as e:
-            LOGGER.error(e)
-            return []
+        return self.batch_provides([pkgname], database).get(pkgname, [])
+
+    def batch_provides(self, pkgnames, database):
+        """
+        get provides info of several packages from one bedepend query
+        Args:
+            pkgnames: package names
+            database: database
+
+        Returns:
+            dict of the package name and its provides info, see get_provides
+        """
+        # getting bedend query res
+        be_depend_obj = BeDependRequires()
+        be_depend_info = be_depend_obj.get_be_req(pkgnames, database)
+
+        provides = dict()
+        for be_depend in be_depend_info:
+            try:
+                provides[be_depend.get("binary_name")] = self.__parse_provides(be_depend.get("provides"))
+            except (TypeError, IndexError) as e:
+                LOGGER.error(e)
+        return provides
+
+    @staticmethod
+    def __parse_provides(depend_info):
+        """
+        parse the provides of a package in the bedepend query result
+        Args:
+            depend_info: provides of the package
+
+        Returns:
+            provides info, see get_provides
+        """
+        provides_info_res = []
+        for component_info in depend_info:
+
+            # getting required_by_bin
+            install_require_info = component_info.get("install_require")
+            required_by_bin = []
+            for req_info in install_require_info:
+                if req_info.get("req_bin_name"):
+                    required_by_bin.append(req_info.get("req_bin_name"))
+
+            # getting required_by_src
+            build_require_info = component_info.get("build_require")
+            required_by_src = []
+            for req_info in build_require_info:
+                if req_info.get("req_src_name"):
+                    required_by_src.append(req_info.get("req_src_name"))
+
+            component_dict = {"component": component_info.get("component"),
+                              "required_by_bin": required_by_bin,
+                              "required_by_src": required_by_src}
+            provides_info_res.append(component_dict)
+        return provides_info_res
 
     def get_requires(self, pkgname, database):
         """
@@ -212,6 +359,19 @@ class SinglePackage:
             [{'component': 'lib.so', 'provided_by': ['libJudy']},
             {'component': 'lib4.so', 'provided_by': ['libJudy']},
             {'component': 'lib2.so', 'provided_by': ['libJudy2']}]
+        """
+        return self.batch_requires([pkgname], database).get(pkgname, [])
+
+    def batch_requires(self, pkgnames, database):
+        """
+        get requires info of several packages from one install dependency query,
+        the components of all the packages are resolved together
+        Args:
+            pkgnames: package names
+            database: database
+
+        Returns:
+            dict of the package name and its requires info, see get_requires
 
         Attributes:
             TypeError: object does not support this property or method
@@ -220,22 +380,24 @@ class SinglePackage:
         try:
             install_depend_obj = InstallRequires([database])
             install_depend_info = install_depend_obj.get_install_req(
-                [pkgname], database)
-
-            if not install_depend_info:
-                return []
-
-            depend_info = install_depend_info[0].get("requires")
-            required_by_bin = []
-            for component_info in depend_info:
-                component_dict = {'component': component_info.get("component"),
-                                  'provided_by': [component_info.get("com_bin_name", "")]}
-                if component_dict not in required_by_bin:
-                    required_by_bin.append(component_dict)
-            return required_by_bin
+                list(pkgnames), database)
         except TypeError as e:
             LOGGER.error(e)
-            return []
+            return {}
+
+        requires = dict()
+        for install_depend in install_depend_info:
+            try:
+                required_by_bin = []
+                for component_info in install_depend.get("requires"):
+                    component_dict = {'component': component_info.get("component"),
+                                      'provided_by': [component_info.get("com_bin_name", "")]}
+                    if component_dict not in required_by_bin:
+                        required_by_bin.append(component_dict)
+                requires[install_depend.get("binary_name")] = required_by_bin
+            except TypeError as e:
+                LOGGER.error(e)
+        return requires
 
 
 class SourcePackage(SinglePackage):
@@ -243,13 +405,15 @@ class SourcePackage(SinglePackage):
     class for query single source package
     """
 
-    def get_subpack_info(self, pkgname, database, pkgname_info):
+    def get_subpack_info(self, pkgname, database, pkgname_info, provides=None, requires=None):
         """
             get subpacks info for source package
             Args:
                 pkgname: package name
                 database: database
                 pkgname_info: package info which include subpacks
+                provides: provides info of the subpacks, queried if not given
+                requires: requires info of the subpacks, queried if not given
 
             Returns:
                 subpacks: subpack list
@@ -261,11 +425,15 @@ class SourcePackage(SinglePackage):
             LOGGER.error(_msg)
             return []
 
+        if provides is None:
+            provides = self.batch_provides(subpacks_bin_list, database)
+        if requires is None:
+            requires = self.batch_requires(subpacks_bin_list, database)
         subpacks = []
         for subpack_name in subpacks_bin_list:
             subpack_dict = {"bin_name": subpack_name,
-                            "provides": self.get_provides(subpack_name, database),
-                            "requires": self.get_requires(subpack_name, database)}
+                            "provides": provides.get(subpack_name, []),
+                            "requires": requires.get(subpack_name, [])}
             subpacks.append(subpack_dict)
         return subpacks
 
@@ -278,29 +446,95 @@ class SourcePackage(SinglePackage):
 
         Returns:
             build_depend_info: build dependency for source package
+        """
+        return self.batch_build_info([pkgname], database).get(pkgname, [])
+
+    def batch_build_info(self, pkgnames, database):
+        """
+        get build dependency info of several source packages from one query
+        Args:
+            pkgnames: source package names
+            database: database
+
+        Returns:
+            dict of the package name and its build dependency
 
         Attributes:
             TypeError: object does not support this property or method
         """
         try:
             build_obj = BuildRequires([database])
-            build_depend = build_obj.get_build_req([pkgname], database)
-
-            if not build_depend:
-                return []
-
-            build_depend_info = build_depend[0].get("requires")
-            build_package_list = []
-            for requires_info in build_depend_info:
-                build_package_list.append(requires_info.get("component"))
-            return build_package_list
+            build_depend = build_obj.get_build_req(list(pkgnames), database)
         except (TypeError, AttributeError) as e:
             LOGGER.error(e)
-            return []
+            return {}
+
+        build_info = dict()
+        for build_depend_info in build_depend:
+            try:
+                build_info[build_depend_info.get("source_name")] = [
+                    requires_info.get("component") for requires_info in build_depend_info.get("requires")]
+            except (TypeError, AttributeError) as e:
+                LOGGER.error(e)
+        return build_info
+
+    def _database_src_info(self, src_name_list, database):
+        """
+        get the source package info of one database, the assembled info is cached
+        Args:
+            src_name_list: source package list
+            database: database
+
+        Returns:
+            source package info list, None if no package is found
+        """
+        package_cache = PackageInfoCache(SOURCE_DB_TYPE, database)
+        try:
+            cached = package_cache.get(src_name_list)
+        except RedisError as error:
+            LOGGER.warning(error)
+            package_cache, cached = None, dict()
+        database_src_info_list = [cached[name] for name in src_name_list if name in cached]
+        missing = [name for name in src_name_list if name not in cached]
+        if not missing:
+            return database_src_info_list
+
+        single_db_src_info = QueryPackage().get_src_info(
+            missing, database, 1, 20).get("data")
+        if not single_db_src_info:
+            return database_src_info_list or None
+
+        pkgnames = [list(pkg_info.keys())[0] for pkg_info in single_db_src_info]
+        # Query build requires, provides and requires of all the packages at once
+        build_info = self.batch_build_info(pkgnames, database)
+        all_subpacks = list(dict.fromkeys(subpack for pkgname, pkg_info in zip(pkgnames, single_db_src_info)
+                                          for subpack in pkg_info[pkgname].get('subpacks') or []))
+        provides = self.batch_provides(all_subpacks, database) if all_subpacks else {}
+        requires = self.batch_requires(all_subpacks, database) if all_subpacks else {}
+
+        assembled = dict()
+        for pkgname, pkg_info in zip(pkgnames, single_db_src_info):
+            assembled[pkgname] = {
+                "src_name": pkgname,
+                "license": pkg_info[pkgname].get("license"),
+                "version": pkg_info[pkgname].get("version"),
+                "url": pkg_info[pkgname].get("url"),
+                "summary": pkg_info[pkgname].get("summary"),
+                "description": pkg_info[pkgname].get("description"),
+                "build_dep": build_info.get(pkgname, []),
+                "subpacks": self.get_subpack_info(pkgname, database, pkg_info, provides, requires)
+            }
+        database_src_info_list.extend(assembled.values())
+        if package_cache:
+            try:
+                package_cache.set(assembled)
+            except RedisError as error:
+                LOGGER.warning(error)
+        return database_src_info_list
 
     def src_package_info(self, src_name_list, database_list=None):
         """
-        get a source package info (provides, requires, etc)
+        get a source package info (provides, requires, etc), the databases are queried concurrently
         Args:
             src_name_list: source package list
             database_list: database list
@@ -314,35 +548,29 @@ class SourcePackage(SinglePackage):
             TypeError: object does not support this property or method
 
         Raises:
-            ElasticSearchQueryException: dataBase connect failed
-            DatabaseConfigException: dataBase config error
+            ElasticSearchQueryException: dataBase connect failed
+            DatabaseConfigException: dataBase config error
         """
+        def job(database):
+            """
+            Multi-ctrip task, the error is returned to be raised out of the greenlet
+            """
+            try:
+                return self._database_src_info(src_name_list, database), None
+            except (ElasticSearchQueryException, DatabaseConfigException,
+                    AttributeError, IndexError, TypeError) as error:
+                return None, error
+
         try:
+            works = [tracing.spawn(job, database) for database in database_list]
+            gevent.joinall(works)
             src_package_info_res = {}
-            query_package = QueryPackage()
-            for database in database_list:
-                single_db_src_info = query_package.get_src_info(
-                    src_name_list, database, 1, 20).get("data")
-                if not single_db_src_info:
+            for database, work in zip(database_list, works):
+                database_src_info_list, error = work.value
+                if error:
+                    raise error
+                if not database_src_info_list:
                     return {}
-
-                database_src_info_list = []
-                for pkg_info in single_db_src_info:
-                    pkgname = list(pkg_info.keys())[0]
-                    build_package_info = self.get_build_info(pkgname, database)
-                    subpacks = self.get_subpack_info(
-                        pkgname, database, pkg_info)
-
-                    database_src_info_list.append({
-                        "src_name": pkgname,
-                        "license": pkg_info[pkgname].get("license"),
-                        "version": pkg_info[pkgname].get("version"),
-                        "url": pkg_info[pkgname].get("url"),
-                        "summary": pkg_info[pkgname].get("summary"),
-                        "description": pkg_info[pkgname].get("description"),
-                        "build_dep": build_package_info,
-                        "subpacks": subpacks
-                    })
                 src_package_info_res[database] = database_src_info_list
             return src_package_info_res
         except (AttributeError, IndexError, TypeError) as e:
@@ -355,11 +583,49 @@ class BinaryPackage(SinglePackage):
     class for query single binary package
     """
 
-    def parse_filelist_info(self, filelists):
+    # Key of every file type in the parsed file list
+    FILE_TYPES = {"d": "dir", "f": "file", "g": "ghost"}
+
+    def decode_filelist(self, filelists):
         """
-            Get filelist info include dir, file, ghost for package
+            Decode the filelists of a package in one pass, the files of every type are
+            de-duplicated in their order with a dict, so the paths are not built yet
             Args:
-                filelists:
+                filelists: filelists of the package, the filenames of a directory are joined by '/'
+
+            Returns:
+                dict of the type (dir, file, ghost) and the ordered (dirname, filename) keys,
+                None if the filelists are wrong
+        """
+        decoded = {key: dict() for key in self.FILE_TYPES.values()}
+        try:
+            for info in filelists:
+                dirname = info["dirname"]
+                filenames = info["filenames"].split("/")
+                filetypes = info["filetypes"]
+                if len(filetypes) > len(filenames):
+                    raise IndexError("The filetypes of %s are more than its filenames" % dirname)
+                for filename, type_ in zip(filenames, filetypes):
+                    key = self.FILE_TYPES.get(type_)
+                    if key is None:
+                        _msg = "The filetype of filelist is not in ['d', 'f', 'g']"
+                        LOGGER.error(_msg)
+                        return None
+                    decoded[key][(dirname, filename)] = None
+            return decoded
+        except (KeyError, IndexError, AttributeError, TypeError) as e:
+            LOGGER.error(e)
+            return None
+
+    @staticmethod
+    def format_filelist(decoded, compressed=False, offset=0, limit=None):
+        """
+            Format a page of the decoded file list, only the paths of the page are built
+            Args:
+                decoded: decoded file list
+                compressed: group the files by directory instead of full paths
+                offset: number of files of every type skipped
+                limit: maximum number of files of every type, None means all
 
             Returns:
                 filelist_dict
@@ -367,52 +633,75 @@ class BinaryPackage(SinglePackage):
                 {'dir': ['/usr/share/ext', '/usr/share/int'],
                 'file': ['/usr/lib64/libJudy.so'],
                 'ghost': []}
-            Raises:
-                KeyError: key that doesn't exist in the dictionary
-                IndexError: index is out of range
+                compressed:
+                {'dir': [{'dirname': '/usr/share', 'filenames': ['ext', 'int']}],
+                'file': [{'dirname': '/usr/lib64', 'filenames': ['libJudy.so']}],
+                'ghost': []}
+        """
+        stop = None if limit is None else offset + limit
+        filelist_dict = dict()
+        for key, files in decoded.items():
+            page = islice(files, offset, stop)
+            if compressed:
+                filelist_dict[key] = [{"dirname": dirname, "filenames": [filename for _, filename in group]}
+                                      for dirname, group in groupby(page, key=itemgetter(0))]
+            else:
+                filelist_dict[key] = [dirname + '/' + filename for dirname, filename in page]
+        return filelist_dict
+
+    def filelist_page(self, filelists, compressed=False, offset=0, limit=None):
+        """
+            Get a page of the filelist info and the number of files of every type
+            Args:
+                filelists: filelists of the package
+                compressed: group the files by directory instead of full paths
+                offset: number of files of every type skipped
+                limit: maximum number of files of every type, None means all
+
+            Returns:
+                filelist_dict: see parse_filelist_info, empty if the filelists are wrong
+                filelist_total: dict of the type (dir, file, ghost) and its number of files
         """
         if not filelists:
             _msg = "Error in getting filelist info."
             LOGGER.error(_msg)
-            return {}
-
-        def is_append(lst, data):
-            if data not in lst:
-                lst.append(data)
-            return lst
+            decoded = None
+        else:
+            decoded = self.decode_filelist(filelists)
+        if decoded is None:
+            return {}, {key: 0 for key in self.FILE_TYPES.values()}
+        filelist_total = {key: len(files) for key, files in decoded.items()}
+        return self.format_filelist(decoded, compressed, offset, limit), filelist_total
+
+    def parse_filelist_info(self, filelists, compressed=False, offset=0, limit=None):
+        """
+            Get filelist info include dir, file, ghost for package
+            Args:
+                filelists:
+                compressed: group the files by directory instead of full paths
+                offset: number of files of every type skipped
+                limit: maximum number of files of every type, None means all
 
-        filelist_dict = {
-            "dir": [],
-            "file": [],
-            "ghost": []
-        }
-        try:
-            for info in filelists:
-                all_list = list(
-                    map(lambda x: info["dirname"] + '/' + x, info["filenames"].split("/")))
-
-                for index, type_ in enumerate(info["filetypes"]):
-                    if type_ == "d":
-                        is_append(filelist_dict["dir"], all_list[index])
-                    elif type_ == "f":
-                        is_append(filelist_dict["file"], all_list[index])
-                    elif type_ == "g":
-                        is_append(filelist_dict["ghost"], all_list[index])
-                    else:
-                        _msg = "The filetype of filelist is not in ['d', 'f', 'g']"
-                        LOGGER.error(_msg)
-                        return {}
-            return filelist_dict
-        except (KeyError, IndexError) as e:
-            LOGGER.error(e)
-            return {}
+            Returns:
+                filelist_dict
+                for example:
+                {'dir': ['/usr/share/ext', '/usr/share/int'],
+                'file': ['/usr/lib64/libJudy.so'],
+                'ghost': []}
+        """
+        return self.filelist_page(filelists, compressed, offset, limit)[0]
 
-    def bin_package_info(self, bin_name_list, database_list=None):
+    def bin_package_info(self, bin_name_list, database_list=None, filelist_format="list",
+                         filelist_offset=0, filelist_limit=None):
         """
         Query for binary package details
         Args:
             bin_name_list: binary package name list
             database_list: database list
+            filelist_format: list of full paths or compressed, grouped by directory
+            filelist_offset: number of files of every type skipped
+            filelist_limit: maximum number of files of every type, the number of files
+                            of every type is added as filelist_total when it is given
 
         Returns:
                 binary package detail info
@@ -437,13 +726,17 @@ class BinaryPackage(SinglePackage):
                     return {}
 
                 database_bin_info_list = []
-                for pkg_info in single_db_bin_info:
-                    pkgname = list(pkg_info.keys())[0]
-
-                    # get provides from bedepend info
-                    provides_info = self.get_provides(pkgname, database)
-                    # get requires from install info
-                    requires_info = self.get_requires(pkgname, database)
+                pkgnames = [list(pkg_info.keys())[0] for pkg_info in single_db_bin_info]
+                # get provides from bedepend info
+                all_provides = self.batch_provides(pkgnames, database)
+                # get requires from install info
+                all_requires = self.batch_requires(pkgnames, database)
+                for pkgname, pkg_info in zip(pkgnames, single_db_bin_info):
+                    provides_info = all_provides.get(pkgname, [])
+                    requires_info = all_requires.get(pkgname, [])
+                    filelist, filelist_total = self.filelist_page(
+                        pkg_info[pkgname].get("file_list"), compressed=filelist_format == "compressed",
+                        offset=filelist_offset, limit=filelist_limit)
 
                     database_bin_info_list.append({
                         "bin_name": pkgname,
@@ -456,8 +749,10 @@ class BinaryPackage(SinglePackage):
                         "src_name": pkg_info[pkgname].get("src_name"),
                         "provides": provides_info,
                         "requires": requires_info,
-                        "filelist": self.parse_filelist_info(pkg_info[pkgname].get("file_list"))
+                        "filelist": filelist
                     })
+                    if filelist_limit is not None:
+                        database_bin_info_list[-1]["filelist_total"] = filelist_total
                 bin_package_info_res[database] = database_bin_info_list
             return bin_package_info_res
         except (AttributeError, IndexError, TypeError) as e:
@@ -19,6 +19,8 @@ from copy import deepcopy
 import threading
 from redis.exceptions import RedisError
 from packageship.application.common import constant
+from packageship.application.common.metrics import METRICS
+from packageship.application.common.tracing import span, traced
 from packageship.libs.log import LOGGER
 
 
@@ -117,22 +119,26 @@ class BufferCache:
 
         while threading.currentThread().ident != self._active_thread.get(key):
             if constant.REDIS_CONN.exists(key):
+                METRICS.inc("pkgship_cache_requests_total", dict(result="coalesce"))
                 self._set_val(key)
                 if key in self._active_thread:
                     del self._active_thread[key]
                 return
             time.sleep(round(random.random(), 3))
 
+        METRICS.inc("pkgship_cache_requests_total", dict(result="miss"))
         self._func(*self._args, **self._kwargs)
-        constant.REDIS_CONN.hmset(
-            key,
-            dict(
-                source_dict=json.dumps(self._depend.source_dict),
-                binary_dict=json.dumps(self._depend.binary_dict),
-                log_msg=self._depend.log_msg,
-            ),
-        )
+        with span("cache.write"):
+            constant.REDIS_CONN.hmset(
+                key,
+                dict(
+                    source_dict=json.dumps(self._depend.source_dict),
+                    binary_dict=json.dumps(self._depend.binary_dict),
+                    log_msg=self._depend.log_msg,
+                ),
+            )
 
+    @traced("cache.read")
     def _set_val(self, key):
         """
         Description: Gets the cached hash value and assigns it to
@@ -155,19 +161,36 @@ class BufferCache:
 
         LOGGER.warning(self._depend.log_msg)
 
+    @classmethod
+    def cache_key(cls, *args, **kwargs):
+        """
+        Description: The redis key of the depend result cached for the arguments,
+                     the same key the decorated method is cached with
+
+        Args:
+            args: positional arguments of the decorated method
+            kwargs: keyword arguments of the decorated method
+        """
+        buffer = cls(depend=None)
+        buffer._args, buffer._kwargs = args, kwargs
+        key = buffer._hash_key()
+        if not key:
+            return None
+        return "pkgship_" + key
+
     def _cache(self):
         """
         Description: Gets the dependency value in the cache or executes
                      the method to get the dependency data
 
         """
-        key = self._hash_key()
+        key = self.cache_key(*self._args, **self._kwargs)
         if not key:
             return
-        key = "pkgship_" + key
 
         try:
             if constant.REDIS_CONN.exists(key):
+                METRICS.inc("pkgship_cache_requests_total", dict(result="hit"))
                 self._set_val(key)
                 return
             self._set_cache(key)
@@ -186,6 +209,366 @@ class BufferCache:
         return wrapper
 
 
+class PageCache:
+    """
+    Paging index of a cached depend result. Every list (and every database of the
+    list) is a redis sorted set whose members are "<package name>\\x00<json row>"
+    with the same score, so a page of the list ordered by package name, optionally
+    restricted to a name prefix, is read with ZRANGEBYLEX without loading the
+    whole depend result. The statistics are kept beside the cached dicts
+
+    Attributes:
+        _key: cached key of the depend result
+    """
+
+    SEPARATOR = "\x00"
+    # Number of members added to a sorted set in one command
+    BATCH_SIZE = 1000
+
+    def __init__(self, key):
+        self._key = key
+
+    def _index(self, list_name, database=None):
+        """
+        Description: Key of the sorted set of a list
+
+        Args:
+            list_name: binary_list or source_list
+            database: database name, None means all the databases
+        """
+        if database:
+            return "%s_%s_%s" % (self._key, list_name, database)
+        return "%s_%s" % (self._key, list_name)
+
+    def exists(self):
+        """
+        Description: Whether the paging index of the depend result has been stored
+        """
+        return bool(constant.REDIS_CONN.hexists(self._key, "statistics"))
+
+    def store(self, depend):
+        """
+        Description: Store the paging index of a depend result, the statistics
+                     are written last and mark the index as complete
+
+        Args:
+            depend: dependent instance
+        """
+        statistics_info = dict()
+        pipeline = constant.REDIS_CONN.pipeline(transaction=False)
+        for list_name, name_key, rows in (
+                ("binary_list", "binary_name", depend.iter_binary_list(statistics_info)),
+                ("source_list", "source_name", depend.iter_source_list(statistics_info))):
+            members = dict()
+            for row in rows:
+                member = row[name_key] + self.SEPARATOR + json.dumps(row)
+                members.setdefault(self._index(list_name), dict())[member] = 0
+                members.setdefault(self._index(list_name, row["database"]), dict())[member] = 0
+            for index, index_members in members.items():
+                index_members = list(index_members.items())
+                for start in range(0, len(index_members), self.BATCH_SIZE):
+                    pipeline.zadd(index, dict(index_members[start:start + self.BATCH_SIZE]))
+        pipeline.hset(self._key, "statistics", json.dumps(list(statistics_info.values())))
+        pipeline.execute()
+
+    def statistics(self):
+        """
+        Description: The cached per database statistics of the depend result
+        """
+        statistics = constant.REDIS_CONN.hget(self._key, "statistics")
+        return json.loads(statistics) if statistics else []
+
+    @staticmethod
+    def _prefix_range(prefix):
+        """
+        Description: Lexicographical range of the members starting with a prefix
+        """
+        if not prefix:
+            return "-", "+"
+        prefix = prefix.encode("utf-8")
+        return b"[" + prefix, b"[" + prefix + b"\xff"
+
+    def page(self, list_name, marker, page_size, database=None, prefix=""):
+        """
+        Description: A page of a list ordered by package name
+
+        Args:
+            list_name: binary_list or source_list
+            marker: the page starts after the package with this name, empty means the first page
+            page_size: maximum number of rows
+            database: only rows of this database
+            prefix: only rows whose package name starts with the prefix
+        """
+        start, end = self._prefix_range(prefix)
+        if marker:
+            # The member of the marker is "<marker>\x00...", everything after it is greater
+            start = b"[" + marker.encode("utf-8") + b"\x01"
+        members = constant.REDIS_CONN.zrangebylex(
+            self._index(list_name, database), start, end, start=0, num=page_size)
+        return [json.loads(member.split(self.SEPARATOR, 1)[1]) for member in members]
+
+    def count(self, list_name, database=None, prefix=""):
+        """
+        Description: Number of rows of a list that match the filters
+
+        Args:
+            list_name: binary_list or source_list
+            database: only rows of this database
+            prefix: only rows whose package name starts with the prefix
+        """
+        if prefix:
+            return constant.REDIS_CONN.zlexcount(
+                self._index(list_name, database), *self._prefix_range(prefix))
+        sum_key = "binary_sum" if list_name == "binary_list" else "source_sum"
+        return sum(statistics[sum_key] for statistics in self.statistics()
+                   if not database or statistics["database"] == database)
+
+
+class GraphCache:
+    """
+    Graphs generated from a cached depend result, every graph is a field of a redis
+    hash beside the cached depend result, keyed by its root node and graph options
+
+    Attributes:
+        _key: redis key of the graphs, None if the depend result can not be cached
+    """
+
+    def __init__(self, key):
+        self._key = key + "_graph" if key else None
+
+    @staticmethod
+    def _field(**options):
+        """
+        Description: Field of a graph in the hash
+
+        Args:
+            options: root node and options the graph is generated with
+        """
+        return json.dumps(options, sort_keys=True)
+
+    def get(self, **options):
+        """
+        Description: The cached graph, None if it is not cached
+
+        Args:
+            options: root node and options the graph is generated with
+        """
+        if not self._key:
+            return None
+        graph = constant.REDIS_CONN.hget(self._key, self._field(**options))
+        return json.loads(graph) if graph else None
+
+    def set(self, graph, **options):
+        """
+        Description: Cache a graph
+
+        Args:
+            graph: graph nodes and edges
+            options: root node and options the graph is generated with
+        """
+        if self._key:
+            constant.REDIS_CONN.hset(self._key, self._field(**options), json.dumps(graph))
+
+
+class CountCache:
+    """
+    Number of documents of a database index. The count is kept until the databases
+    are initialized again, which deletes every "pkgship_" key, so every generation
+    of a database is counted once instead of for every page of the package list
+
+    Attributes:
+        _key: redis key of the count
+    """
+
+    def __init__(self, index):
+        self._key = "pkgship_count_" + index
+
+    @traced("cache.count")
+    def get(self):
+        """
+        Description: The cached count, None if it is not cached
+        """
+        count = constant.REDIS_CONN.get(self._key)
+        return int(count) if count is not None else None
+
+    @traced("cache.count")
+    def set(self, count):
+        """
+        Description: Cache the count
+
+        Args:
+            count: number of documents of the index
+        """
+        constant.REDIS_CONN.set(self._key, count, ex=constant.DATABASE_CACHE_EXPIRE)
+
+
+class PackageInfoCache:
+    """
+    Assembled details of single packages of a database, every package is a field of
+    a redis hash. Like the counts, the details are kept until the databases are
+    initialized again
+
+    Attributes:
+        _key: redis key of the details
+    """
+
+    def __init__(self, package_type, database):
+        self._key = "pkgship_pkginfo_%s_%s" % (package_type, database)
+
+    @traced("cache.pkginfo")
+    def get(self, names):
+        """
+        Description: The cached details of the packages
+
+        Args:
+            names: package names
+        Returns:
+            dict of the package name and its details, only the cached packages
+        """
+        if not names:
+            return dict()
+        details = constant.REDIS_CONN.hmget(self._key, names)
+        return {name: json.loads(detail) for name, detail in zip(names, details) if detail}
+
+    @traced("cache.pkginfo")
+    def set(self, details):
+        """
+        Description: Cache the details of packages
+
+        Args:
+            details: dict of the package name and its details
+        """
+        if not details:
+            return
+        pipeline = constant.REDIS_CONN.pipeline(transaction=False)
+        pipeline.hset(self._key, mapping={name: json.dumps(detail) for name, detail in details.items()})
+        pipeline.expire(self._key, constant.DATABASE_CACHE_EXPIRE)
+        pipeline.execute()
+
+
+class GraphSessionCache:
+    """
+    Adjacency of a depend result and the nodes and edges already sent to the client
+    of a graph session. Every package is a field of a redis hash holding its requires,
+    be_requires and source name, the sent nodes are a hash of their coordinates and
+    the sent edges a set, so expanding a node costs one command per node and edge
+
+    Attributes:
+        _key: redis key of the adjacency
+    """
+
+    PREFIX = "pkgship_graphsession_"
+    SEPARATOR = "\x00"
+    # Number of packages written to redis in one command
+    BATCH_SIZE = 1000
+
+    def __init__(self, session_id):
+        self._key = self.PREFIX + session_id
+
+    @property
+    def _keys(self):
+        """keys of the adjacency, the sent nodes and the sent edges"""
+        return self._key, self._key + "_nodes", self._key + "_edges"
+
+    def store(self, adjacency):
+        """
+        Description: Store the adjacency of a new session
+
+        Args:
+            adjacency: requires, be_requires and source name of every package
+        """
+        pipeline = constant.REDIS_CONN.pipeline(transaction=False)
+        packages = list(adjacency.items())
+        for start in range(0, len(packages), self.BATCH_SIZE):
+            pipeline.hset(self._key, mapping={
+                name: json.dumps(record) for name, record in packages[start:start + self.BATCH_SIZE]})
+        pipeline.expire(self._key, constant.GRAPH_SESSION_EXPIRE)
+        pipeline.execute()
+
+    def exists(self):
+        """
+        Description: Whether the session exists and has not expired
+        """
+        return bool(constant.REDIS_CONN.exists(self._key))
+
+    def touch(self):
+        """
+        Description: Keep the session for another GRAPH_SESSION_EXPIRE seconds
+        """
+        pipeline = constant.REDIS_CONN.pipeline(transaction=False)
+        for key in self._keys:
+            pipeline.expire(key, constant.GRAPH_SESSION_EXPIRE)
+        pipeline.execute()
+
+    def packages(self, names):
+        """
+        Description: Adjacency records of packages, None for unknown packages
+
+        Args:
+            names: package names
+        """
+        if not names:
+            return dict()
+        records = constant.REDIS_CONN.hmget(self._key, names)
+        return {name: json.loads(record) if record else None
+                for name, record in zip(names, records)}
+
+    def node(self, name):
+        """
+        Description: A node already sent to the client, None if it is not sent yet
+
+        Args:
+            name: node id
+        """
+        node = constant.REDIS_CONN.hget(self._keys[1], name)
+        return json.loads(node) if node else None
+
+    def nodes(self, names):
+        """
+        Description: Nodes already sent to the client, None for the nodes not sent yet
+
+        Args:
+            names: node ids
+        """
+        if not names:
+            return dict()
+        nodes = constant.REDIS_CONN.hmget(self._keys[1], names)
+        return {name: json.loads(node) if node else None for name, node in zip(names, nodes)}
+
+    def add_nodes(self, nodes):
+        """
+        Description: Record nodes sent to the client
+
+        Args:
+            nodes: node id and node, in order
+        Returns:
+            the nodes that had not been sent before
+        """
+        if not nodes:
+            return []
+        pipeline = constant.REDIS_CONN.pipeline(transaction=False)
+        for name, node in nodes:
+            pipeline.hsetnx(self._keys[1], name, json.dumps(node))
+        return [node for (_, node), added in zip(nodes, pipeline.execute()) if added]
+
+    def add_edges(self, edges):
+        """
+        Description: Record edges sent to the client
+
+        Args:
+            edges: (source, target) of the edges, in order
+        Returns:
+            the edges that had not been sent before
+        """
+        if not edges:
+            return []
+        pipeline = constant.REDIS_CONN.pipeline(transaction=False)
+        for source, target in edges:
+            pipeline.sadd(self._keys[2], source + self.SEPARATOR + target)
+        return [edge for edge, added in zip(edges, pipeline.execute()) if added]
+
+
 buffer_cache = BufferCache
 
-__all__ = ["buffer_cache"]
+__all__ = ["buffer_cache", "PageCache", "GraphCache", "CountCache", "PackageInfoCache",
+           "GraphSessionCache"]
@@ -13,6 +13,7 @@
 """
 Provide Elasticsearch database instance initialization and operation
 """
+import asyncio
 import json
 
 from elasticsearch import Elasticsearch, AsyncElasticsearch
@@ -26,10 +27,51 @@ from packageship.application.common.exc import (
     ElasticSearchQueryException,
     ElasticSearchInsertException,
 )
+from packageship.application.common.metrics import es_request
 from packageship.application.common.singleton import singleton
+from packageship.application.common.tracing import traced
+from packageship.application.database.engines.elastic.hedge import HedgedSearch, preference
+from packageship.libs.conf import configuration
 from packageship.libs.log import LOGGER
 
 
+def _nodes(host, port):
+    """
+    The nodes of the database
+    Args:
+        host: host of a node, or the nodes of a cluster separated by commas, a node is host or host:port
+        port: port of the nodes without one
+
+    Returns: list of the host and the port of the nodes
+    """
+    nodes = []
+    for node in str(host or "").split(","):
+        node_host, _, node_port = node.strip().partition(":")
+        node = dict(host=node_host)
+        if node_port or port:
+            node["port"] = int(node_port or port)
+        nodes.append(node)
+    return nodes
+
+
+def _client_options():
+    """
+    Options of the clients of the database in package.ini, the same for both clients, the
+    timeout of the clients is the one of the queries, the writes pass their own
+    Returns: keyword arguments of the clients
+    """
+    options = dict(
+        timeout=configuration.DATABASE_QUERY_TIMEOUT,
+        max_retries=configuration.DATABASE_MAX_RETRIES,
+        retry_on_timeout=configuration.DATABASE_RETRY_ON_TIMEOUT,
+        http_compress=configuration.DATABASE_HTTP_COMPRESS,
+    )
+    if configuration.DATABASE_SNIFF_INTERVAL:
+        # Not on start, the service starts when the database does not answer yet
+        options.update(sniff_on_connection_fail=True, sniffer_timeout=configuration.DATABASE_SNIFF_INTERVAL)
+    return options
+
+
 @singleton
 class ElasticSearch(object):
     """
@@ -39,17 +81,54 @@ class ElasticSearch(object):
     def __init__(self, host=None, port=None):
         self._host = host
         self._port = port
+        nodes = _nodes(self._host, self._port)
+        options = _client_options()
         try:
-            self.client = Elasticsearch(
-                [{"host": self._host, "port": self._port}], timeout=60
-            )
+            self.client = Elasticsearch(nodes, maxsize=configuration.DATABASE_MAXSIZE, **options)
+            # The connections of the pool are opened in the event loop of the first request
             self.async_client = AsyncElasticsearch(
-                [{"host": self._host, "port": self._port}], timeout=60
+                nodes, maxsize=configuration.ASYNC_QUERY_CONCURRENCY, **options
             )
         except LocationValueError:
             LOGGER.error("The host of database in package.ini is empty")
             raise DatabaseConfigException()
+        self._async_semaphore = None
+        self._hedged_search = None
+        if configuration.DATABASE_HEDGED_READS:
+            # A search waits for a connection of the pool of a node, not for a worker
+            self._hedged_search = HedgedSearch(
+                self.client, configuration.DATABASE_HEDGE_MIN_DELAY / 1000,
+                max_workers=2 * configuration.DATABASE_MAXSIZE * len(nodes))
+
+    def pool_usage(self):
+        """
+        Connections of the pools of the nodes used by the requests of the synchronous client
+        Returns: connections in use and the size of the pools, a pool uses more connections
+                 than its size when its requests wait for one, they are closed afterwards;
+                 (0, 0) for a client without a transport or a connection pool
+        """
+        in_use = size = 0
+        connection_pool = getattr(getattr(self.client, "transport", None), "connection_pool", None)
+        for connection in getattr(connection_pool, "connections", ()):
+            pool = getattr(connection, "pool", None)
+            if pool is None or pool.pool is None:
+                continue
+            in_use += pool.pool.maxsize - pool.pool.qsize()
+            size += pool.pool.maxsize
+        return in_use, size
+
+    def _async_limit(self):
+        """
+        Semaphore bounding the concurrent requests of the asyncio query path, created in
+        the running event loop because an asyncio semaphore is bound to its loop
+        Returns: the semaphore
+        """
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(configuration.ASYNC_QUERY_CONCURRENCY)
+        return self._async_semaphore
 
+    @traced("es.query")
+    @es_request("query")
     def query(self, index, body):
         """
         Elasticsearch query function
@@ -62,12 +141,32 @@ class ElasticSearch(object):
                 server unreachable, index does not exist, etc.
         """
         try:
-            result = self.client.search(index=index, body=body)
+            result = self._search(index, body)
             return result
         except ElasticsearchException as elastic_err:
             LOGGER.error(str(elastic_err))
             raise ElasticSearchQueryException(index=index)
 
+    def _search(self, index, body):
+        """
+        Search the index, with the preference of the query if the queries are routed, and
+        hedged if there are other nodes to send it to
+        Args:
+            index: index of elasticsearch
+            body: query body of elasticsearch
+
+        Returns: elasticsearch data
+        Raises: ElasticsearchException
+        """
+        query_preference = preference(index, body) if configuration.DATABASE_PREFERENCE_ROUTING else None
+        if self._hedged_search and len(getattr(self.client.transport.connection_pool, "connections", ())) > 1:
+            return self._hedged_search.search(index, body, query_preference)
+        if query_preference:
+            return self.client.search(index=index, body=body, preference=query_preference)
+        return self.client.search(index=index, body=body)
+
+    @traced("es.scan")
+    @es_request("scan")
     def scan(self, index, body):
         """
         Elasticsearch scan function, obtain all data
@@ -79,16 +178,47 @@ class ElasticSearch(object):
         Raises: ElasticSearchQueryException,including connection timeout,
                 server unreachable, index does not exist, etc.
         """
+        return list(self._scan(index, body))
+
+    @traced("es.scan")
+    @es_request("scan")
+    def scan_iter(self, index, body):
+        """
+        Elasticsearch scan function, yield the data one by one while scrolling,
+        only one page of the scroll is kept in memory
+        Args:
+            index: index of elasticsearch
+            body: query body of elasticsearch, "_source" limits the returned fields
+
+        Yields: elasticsearch data
+        Raises: ElasticSearchQueryException,including connection timeout,
+                server unreachable, index does not exist, etc.
+        """
+        yield from self._scan(index, body)
+
+    def _scan(self, index, body):
+        """
+        Scroll through the documents of the index, without the metrics and the span
+        of scan and scan_iter
+        Args:
+            index: index of elasticsearch
+            body: query body of elasticsearch
+
+        Yields: elasticsearch data
+        Raises: ElasticSearchQueryException
+        """
         try:
             result = helpers.scan(
                 client=self.client, index=index, query=body, scroll="3m", timeout="1m"
             )
-            result_list = [res for res in result]
-            return result_list
+            for res in result:
+                yield res
         except ElasticsearchException as elastic_err:
             LOGGER.error(str(elastic_err))
             raise ElasticSearchQueryException()
 
+    @traced("es.count")
+    @es_request("count")
     def count(self, index, body):
         """
         Obtain data volume of specify index
@@ -107,6 +237,54 @@ class ElasticSearch(object):
             LOGGER.error(str(elastic_err))
             raise ElasticSearchQueryException()
 
+    @traced("es.query")
+    @es_request("query")
+    async def async_query(self, index, body):
+        """
+        Elasticsearch query function of the asyncio query path, the request is
+        cancelled with the task awaiting it
+        Args:
+            index: index of elasticsearch
+            body: query body of elasticsearch
+
+        Returns: elasticsearch data
+        Raises: ElasticSearchQueryException,including connection timeout,
+                server unreachable, index does not exist, etc.
+        """
+        async with self._async_limit():
+            try:
+                return await self.async_client.search(index=index, body=body)
+            except ElasticsearchException as elastic_err:
+                LOGGER.error(str(elastic_err))
+                raise ElasticSearchQueryException(index=index)
+
+    @traced("es.count")
+    @es_request("count")
+    async def async_count(self, index, body):
+        """
+        Obtain data volume of specify index in the asyncio query path
+        Args:
+            index: index of elasticsearch
+            body: query body of elasticsearch
+
+        Returns: data volume
+        Raises: ElasticSearchQueryException,including connection timeout,
+                server unreachable, index does not exist, etc.
+        """
+        async with self._async_limit():
+            try:
+                return await self.async_client.count(index=index, body=body)
+            except ElasticsearchException as elastic_err:
+                LOGGER.error(str(elastic_err))
+                raise ElasticSearchQueryException()
+
+    async def async_close(self):
+        """
+        Close the connections of the asyncio client, before its event loop is closed
+        """
+        await self.async_client.close()
+        self._async_semaphore = None
+
     @staticmethod
     def _load_mappings(mappings_file):
         try:
@@ -129,7 +307,8 @@ class ElasticSearch(object):
                 server unreachable, index does not exist, etc.
         """
         try:
-            self.client.index(index=index, body=body, doc_type=doc_type)
+            self.client.index(index=index, body=body, doc_type=doc_type,
+                              request_timeout=configuration.DATABASE_WRITE_TIMEOUT)
         except ElasticsearchException as elastic_err:
             LOGGER.error(str(elastic_err))
             raise ElasticSearchInsertException()
@@ -159,7 +338,8 @@ class ElasticSearch(object):
                     if fail_index:
                         fails.append(fail_index)
                         return
-                self.client.indices.create(index=index_name, body=mappings)
+                self.client.indices.create(index=index_name, body=mappings,
+                                           request_timeout=configuration.DATABASE_WRITE_TIMEOUT)
             except ElasticsearchException:
                 fails.append(index_name)
 
@@ -184,7 +364,7 @@ class ElasticSearch(object):
         if isinstance(index, (tuple, list)):
             index = ",".join(index)
         try:
-            self.client.indices.delete(index)
+            self.client.indices.delete(index, request_timeout=configuration.DATABASE_WRITE_TIMEOUT)
         except TransportError:
             fails = index
         return fails
@@ -196,7 +376,8 @@ class ElasticSearch(object):
         """
         try:
             self.client.indices.put_settings(
-                index="_all", body={"index": {"max_result_window": MAX_ES_QUERY_NUM}}
+                index="_all", body={"index": {"max_result_window": MAX_ES_QUERY_NUM}},
+                request_timeout=configuration.DATABASE_WRITE_TIMEOUT
             )
         except ElasticsearchException:
             LOGGER.error("Set max_result_window of all indies failed")
@@ -209,7 +390,8 @@ class ElasticSearch(object):
         :return: insert response
         """
         try:
-            await self.async_client.index(index=index, body=body)
+            await self.async_client.index(index=index, body=body,
+                                          request_timeout=configuration.DATABASE_WRITE_TIMEOUT)
         except ElasticsearchException as elastic_err:
             LOGGER.error(
                 "Insert to %s failed,data is %s, message is %s",index, body, elastic_err
@@ -223,7 +405,8 @@ class ElasticSearch(object):
         :exception: ElasticSearchInsertException
         """
         try:
-            _, filed_count = await helpers.async_bulk(self.async_client, body)
+            _, filed_count = await helpers.async_bulk(
+                self.async_client, body, request_timeout=configuration.DATABASE_WRITE_TIMEOUT)
             if filed_count:
                 LOGGER.warning(f"The bulk insert part fails: {filed_count}")
         except ElasticsearchException as elastic_err:
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Hedged reads of the database: a query not answered after the p95 of the queries of the
+process is sent again, and the first answer is used
+"""
+import collections
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from elasticsearch.exceptions import ElasticsearchException
+
+from packageship.application.common.metrics import METRICS
+
+# Durations of the last queries the delay is computed from, and the queries between two computations
+HEDGE_WINDOW = 1000
+HEDGE_UPDATE = 50
+HEDGE_PERCENTILE = 0.95
+
+# Appended to the preference of the hedged query, so that it is run by other copies of the shards
+HEDGE_PREFERENCE_SUFFIX = "-hedge"
+
+
+def preference(index, body):
+    """
+    The preference of a query, the same query is run by the same copies of the shards
+    whose caches already hold its results
+    Args:
+        index: index of elasticsearch
+        body: query body of elasticsearch
+
+    Returns: preference of the query
+    """
+    query = json.dumps(dict(index=index, body=body), sort_keys=True, default=str)
+    return "pkgship-" + hashlib.md5(query.encode("utf-8")).hexdigest()[:16]
+
+
+class HedgeDelay(object):
+    """
+    Seconds waited for a query before it is hedged, the p95 of the last queries,
+    not less than the minimum delay
+    """
+
+    def __init__(self, min_delay):
+        self._min_delay = min_delay
+        self._durations = collections.deque(maxlen=HEDGE_WINDOW)
+        self._count = 0
+        self._lock = threading.Lock()
+        self.delay = min_delay
+
+    def add(self, duration):
+        """
+        Add the duration of a query
+        Args:
+            duration: seconds of the query
+        """
+        with self._lock:
+            self._durations.append(duration)
+            self._count += 1
+            if self._count % HEDGE_UPDATE:
+                return
+            durations = sorted(self._durations)
+        percentile = durations[min(int(len(durations) * HEDGE_PERCENTILE), len(durations) - 1)]
+        self.delay = max(self._min_delay, percentile)
+
+
+class HedgedSearch(object):
+    """
+    Run the searches of a client, a search not answered after the delay is sent again,
+    most likely to another node by the round robin of the connection pool
+    """
+
+    def __init__(self, client, min_delay, max_workers):
+        self._client = client
+        self._delay = HedgeDelay(min_delay)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pkgship-hedge")
+
+    @property
+    def delay(self):
+        """
+        Seconds waited before a search is hedged
+        """
+        return self._delay.delay
+
+    def _search(self, index, body, query_preference):
+        if query_preference:
+            return self._client.search(index=index, body=body, preference=query_preference)
+        return self._client.search(index=index, body=body)
+
+    def search(self, index, body, query_preference=None):
+        """
+        Search the index, the search is hedged if it is not answered after the delay
+        Args:
+            index: index of elasticsearch
+            body: query body of elasticsearch
+            query_preference: preference of the search
+
+        Returns: elasticsearch data of the first answer
+        Raises: ElasticsearchException, both searches failed
+        """
+        start = time.perf_counter()
+        first = self._executor.submit(self._search, index, body, query_preference)
+        first.add_done_callback(lambda _: self._delay.add(time.perf_counter() - start))
+        done, _ = wait([first], timeout=self._delay.delay)
+        if done:
+            return first.result()
+
+        hedge = self._executor.submit(self._search, index, body,
+                                      query_preference and query_preference + HEDGE_PREFERENCE_SUFFIX)
+        pending, error = [first, hedge], None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except ElasticsearchException as search_error:
+                    error = search_error
+                    continue
+                # The slower search is not cancelled, its answer is dropped
+                METRICS.inc("pkgship_es_hedged_queries_total",
+                            dict(answer="first" if future is first else "hedge"))
+                return result
+        raise error
@@ -57,3 +57,26 @@ class DatabaseSession(object):
             self.session = self.connection()
 
         return self.session.client
+
+
+class LazyConnection(object):
+    """
+    The database connection created on its first use, so that importing a module does not
+    create the clients of the database. As a class attribute the connection is shared by the
+    instances of the class, elsewhere it is got by calling the instance
+    """
+
+    def __init__(self):
+        self._connection = None
+
+    def __call__(self):
+        """
+        Returns: the database connection
+        Raises: DatabaseConfigException
+        """
+        if self._connection is None:
+            self._connection = DatabaseSession().connection()
+        return self._connection
+
+    def __get__(self, instance, owner):
+        return self()
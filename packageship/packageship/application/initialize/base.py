@@ -13,7 +13,8 @@
 import os
 import shutil
 from packageship.application.query import database as db
-from packageship.application.database.session import DatabaseSession
+from packageship.application.common.constant import CLOSURE_INDEX
+from packageship.application.database.session import LazyConnection
 from packageship.application.common.exc import RepoError
 from packageship.libs.log import LOGGER
 from .repo import RepoFile
@@ -68,7 +69,7 @@ class BaseInitialize:
 
     """
 
-    _session = DatabaseSession().connection()
+    _session = LazyConnection()
 
     def _clear_all_index(self):
         """
@@ -84,6 +85,8 @@ class BaseInitialize:
                 del_databases.append(database_name + "-bedepend")
         del_databases.append("databaseinfo")
         self._session.delete_index(del_databases)
+        # The closures are deleted on their own, their index is missing unless they are configured
+        self._session.delete_index(CLOSURE_INDEX)
 
     @property
     def elastic_index(self):
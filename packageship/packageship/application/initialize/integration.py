@@ -13,19 +13,26 @@
 """
 System data initialization service
 """
+import hashlib
 import os
 import re
 import sqlite3
+import time
 import yaml
 import redis
 from elasticsearch import helpers
 from elasticsearch.exceptions import ElasticsearchException
 from packageship.application.common.exc import (
+    ElasticSearchQueryException,
     InitializeError,
     ResourceCompetitionError,
     RepoError,
 )
-from packageship.application.common.constant import MAX_INIT_DATABASE, REDIS_CONN
+from packageship.application.common.constant import CLOSURE_INDEX, MAX_INIT_DATABASE, REDIS_CONN
+from packageship.application.common.metrics import METRICS
+from packageship.application.core.depend import BuildDepend, InstallDepend
+from packageship.application.core.depend.closure import DependClosure
+from packageship.application.query import database as db
 from packageship.libs.log import LOGGER
 from packageship.libs.conf import configuration
 from .base import ESJson, BaseInitialize, del_temporary_file
@@ -135,6 +142,7 @@ class InitializeService(BaseInitialize):
         for repo in self._config:
             self._data = ESJson()
             self._repo = repo
+            start = time.perf_counter()
             try:
                 if not self._repo_files():
                     raise RepoError("Repo source data error: %s" %
@@ -151,11 +159,110 @@ class InitializeService(BaseInitialize):
                 if isinstance(error, ElasticsearchException):
                     self._delete_index()
             finally:
+                self._repo_metrics(time.perf_counter() - start)
                 # delete temporary directory
                 del_temporary_file(
                     configuration.TEMPORARY_DIRECTORY, folder=True)
                 self._repo = None
 
+        self._closures()
+
+    def _closures(self):
+        """
+        Description: Compute the install and build closures of the configured packages with the
+                     priority list of the initialized databases and store them in the closure
+                     index. If it fails the queries of the packages are answered level by level
+
+        """
+        if not configuration.DEPEND_CLOSURE_PACKAGES:
+            return
+        db_list = db.get_db_priority()
+        if not db_list:
+            return
+        mapping = os.path.join(os.path.dirname(__file__), "mappings", "closure.json")
+        if self._session.create_index(dict(file=mapping, name=CLOSURE_INDEX)):
+            LOGGER.warning("Failed to create the %s index, the closures are not stored ." % CLOSURE_INDEX)
+            return
+        try:
+            for depend_type, index_type in (("installdep", "binary"), ("builddep", "source")):
+                start = time.perf_counter()
+                closures = (self._closure(depend_type, package, db_list)
+                            for package in self._closure_packages(index_type, db_list))
+                indexed, _ = helpers.bulk(self._session.client, closures)
+                LOGGER.info("Stored %s %s closures in %.1f seconds" % (
+                    indexed, depend_type, time.perf_counter() - start))
+                METRICS.set("pkgship_init_documents_indexed",
+                            dict(database=CLOSURE_INDEX, type=depend_type), indexed)
+                METRICS.flush()
+        except (ElasticsearchException, ElasticSearchQueryException) as error:
+            LOGGER.error("Failed to store the closures: %s" % error)
+            self._session.delete_index(CLOSURE_INDEX)
+
+    def _closure_packages(self, index_type, db_list):
+        """
+        Description: The configured packages, or the names of all the packages of the databases
+
+        Args:
+            index_type: binary for the install closures, source for the build closures
+            db_list: database priority list
+        """
+        packages = DependClosure.packages()
+        if packages is not None:
+            return sorted(packages)
+        names = set()
+        for database in db_list:
+            for package in self._session.scan_iter(
+                    index="%s-%s" % (database, index_type),
+                    body={"query": {"match_all": {}}, "_source": ["name"]}):
+                names.add(package["_source"]["name"])
+        return sorted(names)
+
+    @staticmethod
+    def _closure(depend_type, package, db_list):
+        """
+        Description: Closure document of a package, its depend of all the levels
+
+        Args:
+            depend_type: installdep or builddep
+            package: binary name of installdep, source name of builddep
+            db_list: database priority list
+        """
+        if depend_type == "installdep":
+            depend = InstallDepend(db_list)
+            depend.install_depend([package], level=0)
+        else:
+            depend = BuildDepend(db_list)
+            depend.build_depend([package], level=0, self_build=False)
+        return DependClosure(depend_type, package, db_list).document(depend)
+
+    def _repo_metrics(self, duration):
+        """
+        Description: The duration and the result of the initialization of the repo
+
+        Args:
+            duration: seconds to initialize the repo
+        """
+        labels = dict(database=self.elastic_index)
+        METRICS.set("pkgship_init_repo_duration_seconds", labels, duration)
+        METRICS.set("pkgship_init_repo_failed", labels,
+                    int(self.elastic_index in self._fail))
+        METRICS.flush()
+
+    def _bulk(self, index_type, actions):
+        """
+        Description: Index the documents, the number of indexed documents is
+                     published as the progress of the initialization. bulk raises
+                     an error when a document fails, all of them are indexed otherwise
+
+        Args:
+            index_type: type of the index, source binary or bedepend
+            actions: documents of the index
+        """
+        helpers.bulk(self._session.client, actions)
+        METRICS.set("pkgship_init_documents_indexed",
+                    dict(database=self.elastic_index, type=index_type), len(actions))
+        METRICS.flush()
+
     def _source_depend(self):
         """
         Description: Source package dependencies
@@ -178,7 +285,7 @@ class InitializeService(BaseInitialize):
             except KeyError:
                 es_json["subpacks"] = None
             sources.append(self._es_json("-source", es_json))
-        helpers.bulk(self._session.client, sources)
+        self._bulk("source", sources)
 
     def _binary_depend(self):
         """
@@ -212,8 +319,8 @@ class InitializeService(BaseInitialize):
                 self._install_requires(bin_pack)
 
             binarys.append(self._es_json("-binary", es_json))
-        helpers.bulk(self._session.client, binarys)
-        helpers.bulk(self._session.client, be_depends)
+        self._bulk("binary", binarys)
+        self._bulk("bedepend", be_depends)
 
     def _be_depend(self, bin_pack):
         """
@@ -311,9 +418,32 @@ class InitializeService(BaseInitialize):
                 body={
                     "database_name": self.elastic_index,
                     "priority": self._repo["priority"],
+                    "generation": self._generation(),
                 },
             )
 
+    def _generation(self):
+        """
+        Description: Digest of the content of the repo files, a database initialized again
+                     from the same files keeps its generation
+
+        Returns:
+            sha256 hex digest, None if a file can not be read
+        """
+        digest = hashlib.sha256()
+        try:
+            for key in ("src_db_file", "bin_db_file", "db_file", "file_list"):
+                if not self._repo.get(key):
+                    continue
+                digest.update(key.encode("utf-8"))
+                with open(self._repo[key], "rb") as file:
+                    for block in iter(lambda: file.read(1024 * 1024), b""):
+                        digest.update(block)
+        except (OSError, TypeError) as error:
+            LOGGER.warning("Failed to compute the generation of %s: %s" % (self.elastic_index, error))
+            return None
+        return digest.hexdigest()
+
     def _es_json(self, index, source, _type="_doc"):
         """
         Description: A JSON document for the ES database
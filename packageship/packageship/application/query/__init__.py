@@ -13,7 +13,7 @@
 import time
 
 from packageship.application.common.constant import DB_INFO_INDEX, SOURCE_DB_TYPE, BINARY_DB_TYPE, BE_DEPEND_TYPE
-from packageship.application.database.session import DatabaseSession
+from packageship.application.database.session import LazyConnection
 from packageship.application.query.query_body import QueryBody
 
 
@@ -21,7 +21,7 @@ class Query(object):
     """
         common function used for query depend
     """
-    session = DatabaseSession().connection()
+    session = LazyConnection()
 
     def __init__(self):
         self._index = ""
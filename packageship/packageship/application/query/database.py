@@ -16,11 +16,12 @@ get database list according to priority
 from elasticsearch import NotFoundError
 from packageship.application.common.constant import DB_INFO_INDEX
 from packageship.application.common.exc import DatabaseConfigException, ElasticSearchQueryException
-from packageship.application.database.session import DatabaseSession
+from packageship.application.database.session import LazyConnection
 from packageship.application.query.query_body import QueryBody
 from packageship.libs.log import LOGGER
 
-db_client = DatabaseSession().connection()
+# The connection is created by the first query
+db_client = LazyConnection()
 
 
 def get_db_priority():
@@ -31,7 +32,7 @@ def get_db_priority():
     """
     db_infos = {}
     try:
-        result = db_client.query(index=DB_INFO_INDEX, body=QueryBody.QUERY_ALL_NO_PAGING)
+        result = db_client().query(index=DB_INFO_INDEX, body=QueryBody.QUERY_ALL_NO_PAGING)
         for _db in result["hits"]["hits"]:
             db_info = _db.get("_source")
             db_infos[db_info.get("database_name")] = db_info.get("priority")
@@ -42,3 +43,20 @@ def get_db_priority():
             DatabaseConfigException, ElasticSearchQueryException):
         LOGGER.warn("Error in getting db priority info.")
         return []
+
+
+def get_db_generations():
+    """
+    get the generation of every database, the digest of the repo files it was initialized from
+    Returns:
+        dict of the database name and its generation, None for the databases initialized
+        without a generation
+    """
+    try:
+        result = db_client().query(index=DB_INFO_INDEX, body=QueryBody.QUERY_ALL_NO_PAGING)
+        return {_db["_source"].get("database_name"): _db["_source"].get("generation")
+                for _db in result["hits"]["hits"]}
+    except (NotFoundError, KeyError, ConnectionRefusedError,
+            DatabaseConfigException, ElasticSearchQueryException):
+        LOGGER.warning("Error in getting db generation info.")
+        return {}
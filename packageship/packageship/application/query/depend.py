@@ -11,12 +11,15 @@
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
 """
-Module of query require relation
+Module of query require relation, the queries of a request run concurrently in gevent
+jobs, or in asyncio tasks with the async_ methods
 """
+import asyncio
 from collections import Counter
 
 import gevent
 
+from packageship.application.common import tracing
 from packageship.application.common.constant import PROVIDES_NAME, FILES_NAME
 from packageship.application.query import Query
 from packageship.application.query.query_body import QueryBody
@@ -39,6 +42,7 @@ class RequireBase(Query):
         self._source_data = ['name', 'version', 'src_name',
                              'src_version', 'provides', 'files']
 
+    @tracing.traced("depend.requires")
     def _process_requires(self, query_rpm_infos):
         """
         Process binary package install requires' info or source packages' build info
@@ -89,6 +93,48 @@ class RequireBase(Query):
         # update info of components
         self._update_requires(all_queried_components_dict, query_rpm_infos)
 
+    @tracing.traced("depend.requires")
+    async def _async_process_requires(self, query_rpm_infos):
+        """
+        Process binary package install requires' info or source packages' build info
+        in asyncio tasks, the same as _process_requires
+        Args:
+            query_rpm_infos:  response of pending add requires' info
+
+        Returns: response of added requires' info
+
+        """
+        component_list = list(set([requires for rpm_info in query_rpm_infos for requires in rpm_info["requires"]]))
+        if not component_list:
+            return
+        all_queried_components_dict = dict()
+        all_queried_components_set = set()
+        for database in self.db_list:
+            components_batch_list = [component_list[i:i + self.BATCH_SIZE_200] for i in
+                                     range(0, len(component_list), self.BATCH_SIZE_200)]
+            next_query_components = await self._async_query_components(all_queried_components_dict,
+                                                                       all_queried_components_set,
+                                                                       components_batch_list,
+                                                                       database,
+                                                                       PROVIDES_NAME)
+            if not next_query_components:
+                break
+            all_queried_components_set.difference_update(next_query_components)
+
+            components_need_query_by_files = [next_query_components[i:i + self.BATCH_SIZE_100]
+                                              for i in range(0, len(next_query_components), self.BATCH_SIZE_100)]
+            next_database_query_components = await self._async_query_components(all_queried_components_dict,
+                                                                                all_queried_components_set,
+                                                                                components_need_query_by_files,
+                                                                                database,
+                                                                                FILES_NAME)
+            if not next_database_query_components:
+                break
+            all_queried_components_set.difference_update(next_database_query_components)
+            component_list = next_database_query_components
+
+        self._update_requires(all_queried_components_dict, query_rpm_infos)
+
     def _gevent_query_components(self, all_queried_components_dict, all_queried_components_set, components_batch_list,
                                  database, query_content_name):
         """
@@ -102,7 +148,7 @@ class RequireBase(Query):
         Returns: The list of components not queried this time
         """
         works = [
-            gevent.spawn(self._gevent_component_job, database, components, all_queried_components_dict,
+            tracing.spawn(self._gevent_component_job, database, components, all_queried_components_dict,
                          all_queried_components_set, query_content_name) for components in components_batch_list]
         gevent.joinall(works)
         no_queried_components = []
@@ -143,6 +189,38 @@ class RequireBase(Query):
 
         return pending_next_query_components
 
+    async def _async_query_components(self, all_queried_components_dict, all_queried_components_set,
+                                      components_batch_list, database, query_content_name):
+        """
+        Query the batches of components in asyncio tasks, the same as _gevent_query_components
+        Returns: The list of components not queried this time
+        """
+        results = await asyncio.gather(*[
+            self._async_component_job(database, components, all_queried_components_dict,
+                                      all_queried_components_set, query_content_name)
+            for components in components_batch_list])
+        return [component for result in results for component in result]
+
+    async def _async_component_job(self, database, next_query_components, all_queried_components_dict,
+                                   all_queried_components_set, query_content_name):
+        """
+        Asyncio task of query component info, the same as _gevent_component_job
+        Returns: components not found
+        """
+        no_query_components = set(next_query_components)
+        if all_queried_components_set:
+            no_query_components.difference_update(all_queried_components_set)
+        if not no_query_components:
+            return []
+
+        next_query_components_list = list(no_query_components)
+        query_body = self._format_terms_index_and_body(database=database,
+                                                       query_content={query_content_name: next_query_components_list},
+                                                       source=self._source_data)
+        query_result = await self.session.async_query(index=self.binary_index, body=query_body)
+        return self._query_complete(next_query_components_list, database, query_result,
+                                    all_queried_components_dict, query_content_name)
+
     def _update_requires(self, all_component_info_dict, query_rpm_infos):
         """
         update info of components
@@ -342,7 +420,7 @@ class BuildRequires(RequireBase):
                                  range(0, len(source_list), self.BATCH_SIZE_100)]
         # If specify database, query requires according to database
         if specify_db:
-            works = [gevent.spawn(self._query_build_requires, source_batch_rpms, specify_db) for source_batch_rpms in
+            works = [tracing.spawn(self._query_build_requires, source_batch_rpms, specify_db) for source_batch_rpms in
                      source_rpm_batch_list]
             gevent.joinall(works)
             for work in works:
@@ -350,7 +428,7 @@ class BuildRequires(RequireBase):
         else:
             # If not specify, query requires according to database priority
             for database in self.db_list:
-                works = [gevent.spawn(self._gevent_source_job, source_batch_rpms, database) for source_batch_rpms in
+                works = [tracing.spawn(self._gevent_source_job, source_batch_rpms, database) for source_batch_rpms in
                          source_rpm_batch_list]
                 gevent.joinall(works)
 
@@ -369,6 +447,44 @@ class BuildRequires(RequireBase):
         self._process_requires(response)
         return response
 
+    async def async_get_build_req(self, source_list, specify_db=None):
+        """
+        Get one or more source packages build requires in asyncio tasks, the same as get_build_req
+        Args:
+            source_list: source packages
+            specify_db: specify database
+        Returns: source packages build requires info
+        Raises: DatabaseConfigException,ElasticSearchQueryException
+
+        """
+        response = []
+        if not self.db_list or not source_list:
+            return response
+        source_rpm_batch_list = [source_list[i:i + self.BATCH_SIZE_100] for i in
+                                 range(0, len(source_list), self.BATCH_SIZE_100)]
+        if specify_db:
+            results = await asyncio.gather(*[self._async_query_build_requires(source_batch_rpms, specify_db)
+                                             for source_batch_rpms in source_rpm_batch_list])
+            for result in results:
+                response.extend(result)
+        else:
+            for database in self.db_list:
+                results = await asyncio.gather(*[self._async_query_build_requires(source_batch_rpms, database)
+                                                 for source_batch_rpms in source_rpm_batch_list])
+                found = set()
+                for result in results:
+                    response.extend(result)
+                    found.update(source_info.get('source_name') for source_info in result)
+                next_query_source_rpms = [source_rpm for source_rpms in source_rpm_batch_list
+                                          for source_rpm in source_rpms if source_rpm not in found]
+                if not next_query_source_rpms:
+                    break
+                source_rpm_batch_list = [next_query_source_rpms[i:i + self.BATCH_SIZE_50] for i in
+                                         range(0, len(next_query_source_rpms), self.BATCH_SIZE_50)]
+
+        await self._async_process_requires(response)
+        return response
+
     def _gevent_source_job(self, source_rpms, database):
         """
         multi-ctrip of query sources packages' build requires
@@ -401,6 +517,35 @@ class BuildRequires(RequireBase):
         source = ['name', 'version', 'requires']
         query_body = self._format_terms_index_and_body(data_base, query_content, source)
         query_src_result = self.session.query(index=self.source_index, body=query_body)
+        return self._build_requires_info(query_src_result, data_base)
+
+    async def _async_query_build_requires(self, source_rpms, data_base):
+        """
+        Query build requires of one database in the asyncio query path
+        Args:
+            source_rpms: source packages
+            data_base: database
+
+        Returns: query result
+
+        """
+        query_content = dict(name=source_rpms)
+        source = ['name', 'version', 'requires']
+        query_body = self._format_terms_index_and_body(data_base, query_content, source)
+        query_src_result = await self.session.async_query(index=self.source_index, body=query_body)
+        return self._build_requires_info(query_src_result, data_base)
+
+    @staticmethod
+    def _build_requires_info(query_src_result, data_base):
+        """
+        Build requires of the source packages of a query result
+        Args:
+            query_src_result: result of the query of the source packages
+            data_base: database
+
+        Returns: source packages and the names of their build requires
+
+        """
         source_rpm_info_list = []
         # Processing the result of the query, at this time the component information only has the names
         if query_src_result and query_src_result['hits']['hits']:
@@ -443,7 +588,7 @@ class InstallRequires(RequireBase):
                              range(0, len(binary_list), self.BATCH_SIZE_100)]
         # If specify database, query requires according to database
         if specify_db:
-            works = [gevent.spawn(self._query_install_requires, binary_rpms, specify_db)
+            works = [tracing.spawn(self._query_install_requires, binary_rpms, specify_db)
                      for binary_rpms in batch_binary_list]
             gevent.joinall(works)
             for work in works:
@@ -452,7 +597,7 @@ class InstallRequires(RequireBase):
             # If not specify, query requires according to database priority
             for _db in self.db_list:
                 next_query_rpms = []
-                works = [gevent.spawn(self._gevent_binary_job, binary_rpms, _db) for binary_rpms in batch_binary_list]
+                works = [tracing.spawn(self._gevent_binary_job, binary_rpms, _db) for binary_rpms in batch_binary_list]
                 gevent.joinall(works)
                 for work in works:
                     install_requires, binary_rpms = work.value
@@ -470,6 +615,44 @@ class InstallRequires(RequireBase):
 
         return response
 
+    async def async_get_install_req(self, binary_list, specify_db=None):
+        """
+        Get one or more binary packages install requires in asyncio tasks, the same as get_install_req
+        Args:
+            binary_list: binary packages
+            specify_db: specify database
+        Returns: binary packages install requires info
+        Raises: DatabaseConfigException,ElasticSearchQueryException
+
+        """
+        response = []
+        if not self.db_list or not binary_list:
+            return response
+        batch_binary_list = [binary_list[i:i + self.BATCH_SIZE_100] for i in
+                             range(0, len(binary_list), self.BATCH_SIZE_100)]
+        if specify_db:
+            results = await asyncio.gather(*[self._async_query_install_requires(binary_rpms, specify_db)
+                                             for binary_rpms in batch_binary_list])
+            for result in results:
+                response.extend(result)
+        else:
+            for _db in self.db_list:
+                results = await asyncio.gather(*[self._async_query_install_requires(binary_rpms, _db)
+                                                 for binary_rpms in batch_binary_list])
+                found = set()
+                for result in results:
+                    response.extend(result)
+                    found.update(binary_info['binary_name'] for binary_info in result)
+                next_query_rpms = [binary_rpm for binary_rpms in batch_binary_list
+                                   for binary_rpm in binary_rpms if binary_rpm not in found]
+                if not next_query_rpms:
+                    break
+                batch_binary_list = [next_query_rpms[i:i + self.BATCH_SIZE_50] for i in
+                                     range(0, len(next_query_rpms), self.BATCH_SIZE_50)]
+
+        await self._async_process_requires(response)
+        return response
+
     def _gevent_binary_job(self, binary_rpms, database):
         """
         multi_ctrip of query binary install requires
@@ -501,7 +684,35 @@ class InstallRequires(RequireBase):
         _query_body = self._format_terms_index_and_body(
             database=data_base, query_content=dict(name=binary_list), source=_source)
         query_bin_result = self.session.query(index=self.binary_index, body=_query_body)
+        return self._install_requires_info(query_bin_result, data_base)
 
+    async def _async_query_install_requires(self, binary_list, data_base):
+        """
+        Query install requires of one database in the asyncio query path
+        Args:
+            binary_list: binary package
+            data_base: database
+
+        Returns: query result
+
+        """
+        _source = ['name', 'version', 'src_name', 'src_version', 'requires']
+        _query_body = self._format_terms_index_and_body(
+            database=data_base, query_content=dict(name=binary_list), source=_source)
+        query_bin_result = await self.session.async_query(index=self.binary_index, body=_query_body)
+        return self._install_requires_info(query_bin_result, data_base)
+
+    @staticmethod
+    def _install_requires_info(query_bin_result, data_base):
+        """
+        Install requires of the binary packages of a query result
+        Args:
+            query_bin_result: result of the query of the binary packages
+            data_base: database
+
+        Returns: binary packages and the names of their install requires
+
+        """
         # Processing the result of the query, at this time the component information only has the names
         binary_rpm_info_list = []
         if query_bin_result and query_bin_result['hits']['hits']:
@@ -557,9 +768,41 @@ class BeDependRequires(Query):
 
         binary_names = [binary_list[i:i + self.BATCH_SIZE_300]
                         for i in range(0, len(binary_list), self.BATCH_SIZE_300)]
-        works = [gevent.spawn(job, binarys) for binarys in binary_names]
+        works = [tracing.spawn(job, binarys) for binarys in binary_names]
         gevent.joinall(works)
         bedepends = [value for work in works
                      for value in work.value]
 
         return bedepends
+
+    async def async_get_be_req(self, binary_list, database):
+        """
+        Get the bedepend infos in asyncio tasks, the same as get_be_req
+        Args:
+            binary_list: Binary package
+            database: Database name
+
+        Returns: bedepend infos
+
+        Raises: DatabaseConfigException,ElasticSearchQueryException
+
+        """
+        self.set_index(index=database)
+        bedepend_index = self.bedepend_index
+
+        async def job(binarys):
+            query_body = QueryBody()
+            query_body.query_terms = dict(
+                name=dict(binary_name=binarys), page_num=0, page_size=1000)
+            result = await self.session.async_query(
+                index=bedepend_index, body=query_body.query_terms)
+            try:
+                return [depend["_source"] for depend in result["hits"]["hits"]]
+            except (KeyError, TypeError):
+                return []
+
+        binary_list = list(binary_list)
+        binary_names = [binary_list[i:i + self.BATCH_SIZE_300]
+                        for i in range(0, len(binary_list), self.BATCH_SIZE_300)]
+        results = await asyncio.gather(*[job(binarys) for binarys in binary_names])
+        return [value for result in results for value in result]
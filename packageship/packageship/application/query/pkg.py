@@ -13,12 +13,21 @@
 """
 Module of query packages' info
 """
+import asyncio
+import base64
+import binascii
+import json
+
 import gevent
+from redis.exceptions import RedisError
 
+from packageship.application.common import tracing
 from packageship.application.common.constant import UNDERLINE, BINARY_DB_TYPE, SOURCE_DB_TYPE, MAX_PAGE_SIZE, \
     DEFAULT_PAGE_NUM
-from packageship.application.database.session import DatabaseSession
+from packageship.application.database.cache import CountCache
+from packageship.application.database.session import LazyConnection
 from packageship.application.query.query_body import QueryBody
+from packageship.libs.log import LOGGER
 
 
 class QueryPackage(object):
@@ -30,7 +39,14 @@ class QueryPackage(object):
     query source packages' binary packages
     """
     # database connection
-    _db_session = DatabaseSession().connection()
+    _db_session = LazyConnection()
+    # Fields of the documents used by the package details
+    SOURCE_FIELDS = ['name', 'version', 'release', 'url', 'rpm_license', 'summary', 'description',
+                     'rpm_vendor', 'location_href', 'subpacks.name']
+    BINARY_FIELDS = ['name', 'version', 'release', 'url', 'rpm_license', 'summary', 'description',
+                     'rpm_vendor', 'rpm_sourcerpm', 'src_name', 'location_href', 'filelists']
+    # Stable sort of the paging, the name of a package is not unique in a database
+    PAGING_SORT = [{'name': 'asc'}, {'pkgKey': 'asc'}]
 
     def __init__(self, database_list=None):
         self.db_list = [] if database_list is None else database_list
@@ -69,7 +85,33 @@ class QueryPackage(object):
         response = self._query_src_bin_rpm(source_list, SOURCE_DB_TYPE, specify_db)
         return response
 
-    def get_src_info(self, src_list, database, page_num, page_size, command_line=False):
+    async def async_get_src_name(self, binary_list, specify_db=None):
+        """
+        Get binary packages' source name and version in the asyncio query path
+        Args:
+            binary_list: need to query binary packages
+            specify_db: specify database used for speed up queries
+        Returns: binary packages' name/version and their source packages' name/version
+        Raises: DatabaseConfigException ElasticSearchQueryException
+        """
+        if not self.db_list or not binary_list:
+            return []
+        return await self._async_query_src_bin_rpm(binary_list, BINARY_DB_TYPE, specify_db)
+
+    async def async_get_bin_name(self, source_list, specify_db=None):
+        """
+        Get source packages' subpackages' name and version in the asyncio query path
+        Args:
+            source_list: need to query source packages
+            specify_db: specify database used for speed up queries
+        Returns: source packages' name/version and their  subpackages' name/version
+        Raises: DatabaseConfigException ElasticSearchQueryException
+        """
+        if not self.db_list or not source_list:
+            return []
+        return await self._async_query_src_bin_rpm(source_list, SOURCE_DB_TYPE, specify_db)
+
+    def get_src_info(self, src_list, database, page_num, page_size, command_line=False, cursor=None):
         """
         Query source packages' details
         Args:
@@ -78,14 +120,15 @@ class QueryPackage(object):
             page_num: Paging query index
             page_size: Paging query size
             command_line: Whether to query all,default false,used fro command line
+            cursor: next_cursor of the previous page, the page after it is queried instead of page_num
         Returns: source_rpm info list
-        Raises: DatabaseConfigException ElasticSearchQueryException
+        Raises: DatabaseConfigException ElasticSearchQueryException ValueError
         """
         self.rpm_type = SOURCE_DB_TYPE
-        response = self._get_rpm_info(database, page_num, page_size, command_line, rpm_list=src_list)
+        response = self._get_rpm_info(database, page_num, page_size, command_line, rpm_list=src_list, cursor=cursor)
         return response
 
-    def get_bin_info(self, binary_list, database, page_num, page_size, command_line=False):
+    def get_bin_info(self, binary_list, database, page_num, page_size, command_line=False, cursor=None):
         """
         Query binary packages' details
         Args:
@@ -94,13 +137,112 @@ class QueryPackage(object):
             page_num: Paging query index
             page_size: Paging query size
             command_line: Whether to query all,default false,used fro command line
+            cursor: next_cursor of the previous page, the page after it is queried instead of page_num
         Returns: binary_rpm info list
-        Raises: DatabaseConfigException ElasticSearchQueryException
+        Raises: DatabaseConfigException ElasticSearchQueryException ValueError
         """
         self.rpm_type = BINARY_DB_TYPE
-        response = self._get_rpm_info(database, page_num, page_size, command_line, rpm_list=binary_list)
+        response = self._get_rpm_info(database, page_num, page_size, command_line, rpm_list=binary_list, cursor=cursor)
         return response
 
+    async def async_get_src_info(self, src_list, database, page_num, page_size, cursor=None):
+        """
+        Query source packages' details in the asyncio query path, the command line
+        queries all packages with get_src_info
+        Args:
+            src_list: source_rpm list
+            database: database
+            page_num: Paging query index
+            page_size: Paging query size
+            cursor: next_cursor of the previous page, the page after it is queried instead of page_num
+        Returns: source_rpm info list
+        Raises: DatabaseConfigException ElasticSearchQueryException ValueError
+        """
+        self.rpm_type = SOURCE_DB_TYPE
+        return await self._async_get_rpm_info(database, page_num, page_size, rpm_list=src_list, cursor=cursor)
+
+    async def async_get_bin_info(self, binary_list, database, page_num, page_size, cursor=None):
+        """
+        Query binary packages' details in the asyncio query path, the command line
+        queries all packages with get_bin_info
+        Args:
+            binary_list: binary_rpm list
+            database: database
+            page_num: Paging query index
+            page_size: Paging query size
+            cursor: next_cursor of the previous page, the page after it is queried instead of page_num
+        Returns: binary_rpm info list
+        Raises: DatabaseConfigException ElasticSearchQueryException ValueError
+        """
+        self.rpm_type = BINARY_DB_TYPE
+        return await self._async_get_rpm_info(database, page_num, page_size, rpm_list=binary_list, cursor=cursor)
+
+    def iter_src_info(self, database, src_list=None, fields=None):
+        """
+        Scroll through source packages' details, used for command line and export,
+        the packages are yielded while scrolling so the memory does not grow with the database
+        Args:
+            database: database
+            src_list: source_rpm list, None means all source packages
+            fields: fields of the documents to fetch, default all fields of the details
+
+        Yields: source_rpm info, {name: info}
+        Raises: DatabaseConfigException ElasticSearchQueryException
+        """
+        self.rpm_type = SOURCE_DB_TYPE
+        for source in self._scan_rpm_info(database, src_list, fields or self.SOURCE_FIELDS):
+            yield self._src_detail(source['_source'])
+
+    def iter_bin_info(self, database, binary_list=None, fields=None):
+        """
+        Scroll through binary packages' details, used for command line and export,
+        the packages are yielded while scrolling so the memory does not grow with the database
+        Args:
+            database: database
+            binary_list: binary_rpm list, None means all binary packages
+            fields: fields of the documents to fetch, default all fields of the details
+
+        Yields: binary_rpm info, {name: info}
+        Raises: DatabaseConfigException ElasticSearchQueryException
+        """
+        self.rpm_type = BINARY_DB_TYPE
+        for binary in self._scan_rpm_info(database, binary_list, fields or self.BINARY_FIELDS):
+            yield self._bin_detail(binary['_source'])
+
+    def iter_rpm_versions(self, database, rpm_type):
+        """
+        Scroll through the versions of all source packages or binary packages
+        Args:
+            database: database
+            rpm_type: source or binary
+
+        Yields: (name, epoch, version, release)
+        Raises: DatabaseConfigException ElasticSearchQueryException
+        """
+        self.rpm_type = rpm_type
+        for rpm in self._scan_rpm_info(database, None, ['name', 'epoch', 'version', 'release']):
+            rpm_info = rpm['_source']
+            yield rpm_info.get('name'), rpm_info.get('epoch'), rpm_info.get('version'), rpm_info.get('release')
+
+    def _scan_rpm_info(self, database, rpm_list, fields):
+        """
+        Scroll through the documents of the packages, there is no limit of the number of packages
+        Args:
+            database: database name
+            rpm_list: binary rpm_list or source rpm_list, None means all packages
+            fields: fields of the documents to fetch
+
+        Returns: generator of the documents
+        """
+        self.index = UNDERLINE.join((database, self.rpm_type))
+        if rpm_list is None:
+            query_body = dict(QueryBody.QUERY_ALL, _source=fields)
+        else:
+            query_body = QueryBody()
+            query_body.query_terms = dict(name=dict(name=[rpm for rpm in rpm_list if rpm]), _source=fields)
+            query_body = query_body.query_terms
+        return self._db_session.scan_iter(index=self.index, body=query_body)
+
     def _query_src_bin_rpm(self, rpm_list, query_db_type, specify_db):
         """
         Query binary package's source package or source package's binary packages
@@ -129,7 +271,7 @@ class QueryPackage(object):
                     if result:
                         return result
 
-        works = [gevent.spawn(job, rpm) for rpm in rpm_list]
+        works = [tracing.spawn(job, rpm) for rpm in rpm_list]
         gevent.joinall(works)
         response.extend([work.value for work in works if work.value])
 
@@ -139,7 +281,41 @@ class QueryPackage(object):
         self.index = UNDERLINE.join((database, query_db_type))
         query_body = self._format_term_query(rpm)
         query_result = self._db_session.query(index=self.index, body=query_body)
+        return self._process_rpm_response(database, query_db_type, query_result)
+
+    async def _async_query_src_bin_rpm(self, rpm_list, query_db_type, specify_db):
+        """
+        Query binary package's source package or source package's binary packages in asyncio tasks
+        Args:
+            rpm_list: binary packages or source packages
+            query_db_type: package type (binary or source)
+            specify_db: specify database for speed up queries
+        Returns: query result
+        """
 
+        async def job(rpm):
+            for database in [specify_db] if specify_db else self.db_list:
+                # The index is not kept in self.index, the jobs run concurrently
+                query_result = await self._db_session.async_query(
+                    index=UNDERLINE.join((database, query_db_type)), body=self._format_term_query(rpm))
+                result = self._process_rpm_response(database, query_db_type, query_result)
+                if result:
+                    return result
+            return None
+
+        results = await asyncio.gather(*[job(rpm) for rpm in rpm_list])
+        return [result for result in results if result]
+
+    def _process_rpm_response(self, database, query_db_type, query_result):
+        """
+        Format the result of the term query of a package
+        Args:
+            database: database
+            query_db_type: package type (binary or source)
+            query_result: result of the query
+
+        Returns: format result, None if the package is not found
+        """
         if not query_result or not query_result['hits']['hits']:
             return None
 
@@ -150,7 +326,7 @@ class QueryPackage(object):
 
         return rpm_info
 
-    def _get_rpm_info(self, database, page_num, page_size, command_line, rpm_list=None):
+    def _get_rpm_info(self, database, page_num, page_size, command_line, rpm_list=None, cursor=None):
         """
         General method for obtaining package details
         Args:
@@ -159,6 +335,7 @@ class QueryPackage(object):
             page_num: page number
             page_size: page size
             command_line: is or not command line scenes
+            cursor: next_cursor of the previous page of all packages
 
         Returns: result of query package details
         """
@@ -170,20 +347,60 @@ class QueryPackage(object):
                 return response
 
         self.index = UNDERLINE.join((database, self.rpm_type))
-        # Used for Command Line,query all data and no Pagination
+        # Used for Command Line,query all data and no Pagination, the documents are scrolled
+        # page by page and only the details of the packages are kept
         if command_line and rpm_list is None:
-            query_result = self._db_session.scan(index=self.index, body=QueryBody.QUERY_ALL)
-            total_num = self._db_session.count(index=self.index, body=QueryBody.QUERY_ALL)
-            response['total'] = total_num.get('count')
+            fields = self.SOURCE_FIELDS if self.rpm_type == SOURCE_DB_TYPE else self.BINARY_FIELDS
+            query_result = self._scan_rpm_info(database, None, fields)
             if self.rpm_type == SOURCE_DB_TYPE:
                 self._process_query_src_response(response, query_result)
             elif self.rpm_type == BINARY_DB_TYPE:
                 self._process_query_bin_response(response, query_result)
+            # The scroll returns every package, no need to count them again
+            response['total'] = len(response['data'])
 
             return response
-        # Distinguish query body and query scope according to usage scenarios
-        query_body, query_all = self._process_query_body(command_line, page_num, page_size, rpm_list)
+        # Query all data and Pagination of UI mode
+        if rpm_list is None:
+            return self._get_rpm_page(page_num, page_size, cursor)
+        # Distinguish query body according to usage scenarios
+        query_body = self._process_query_body(command_line, page_num, page_size, rpm_list)
         query_result = self._db_session.query(index=self.index, body=query_body)
+        return self._process_rpm_list_response(query_result)
+
+    async def _async_get_rpm_info(self, database, page_num, page_size, rpm_list=None, cursor=None):
+        """
+        Package details in the asyncio query path, the same as _get_rpm_info in UI mode
+        Args:
+            rpm_list: binary rpm_list or source rpm_list
+            database: database name
+            page_num: page number
+            page_size: page size
+            cursor: next_cursor of the previous page of all packages
+
+        Returns: result of query package details
+        """
+        if isinstance(rpm_list, list):
+            rpm_list = [rpm for rpm in rpm_list if rpm]
+            if not rpm_list:
+                return dict(total=0, data=[])
+
+        self.index = UNDERLINE.join((database, self.rpm_type))
+        if rpm_list is None:
+            return await self._async_get_rpm_page(page_num, page_size, cursor)
+        query_body = self._process_query_body(False, page_num, page_size, rpm_list)
+        query_result = await self._db_session.async_query(index=self.index, body=query_body)
+        return self._process_rpm_list_response(query_result)
+
+    def _process_rpm_list_response(self, query_result):
+        """
+        Format the result of the query of the details of a list of packages
+        Args:
+            query_result: result of the query
+
+        Returns: result of query package details
+        """
+        response = dict(total=0, data=[])
         if query_result:
             try:
                 rpm_info_list = query_result['hits']['hits']
@@ -191,15 +408,212 @@ class QueryPackage(object):
                     self._process_query_src_response(response, rpm_info_list)
                 elif self.rpm_type == BINARY_DB_TYPE:
                     self._process_query_bin_response(response, rpm_info_list)
-                # Distinguish the total quantity query method according to the usage scenario
-                total_num = self._db_session.count(index=self.index, body=QueryBody.QUERY_ALL)['count'] \
-                    if query_all else query_result['hits']['total']['value']
-                response['total'] = total_num
+                response['total'] = query_result['hits']['total']['value']
             except KeyError:
                 response = dict(total=0, data=[])
                 return response
         return response
 
+    def _get_rpm_page(self, page_num, page_size, cursor):
+        """
+        A page of all packages ordered by name. Shallow pages are queried with from/size,
+        the page after a cursor and deep pages with search_after, so deep pages neither
+        need a large max_result_window nor get slower with the page number
+        Args:
+            page_num: page number, ignored if there is a cursor
+            page_size: page size
+            cursor: next_cursor of the previous page
+
+        Returns: result of query package details, next_cursor is the cursor of the next page
+        Raises: ValueError: the cursor is invalid
+        """
+        response = dict(total=0, data=[], next_cursor=None)
+        start = (page_num - 1) * page_size
+        if cursor:
+            query_body = self._format_paging_query_all(page_size, search_after=self.decode_cursor(cursor))
+        elif start + page_size <= MAX_PAGE_SIZE:
+            query_body = self._format_paging_query_all(page_size, start=start)
+        else:
+            search_after = self._skip_packages(start)
+            if search_after is None:
+                response['total'] = self._count_packages()
+                return response
+            query_body = self._format_paging_query_all(page_size, search_after=search_after)
+        query_result = self._db_session.query(index=self.index, body=query_body)
+        if not self._process_page_response(response, query_result, page_size):
+            return response
+        response['total'] = self._count_packages()
+        return response
+
+    async def _async_get_rpm_page(self, page_num, page_size, cursor):
+        """
+        A page of all packages ordered by name in the asyncio query path, the same as _get_rpm_page
+        Args:
+            page_num: page number, ignored if there is a cursor
+            page_size: page size
+            cursor: next_cursor of the previous page
+
+        Returns: result of query package details, next_cursor is the cursor of the next page
+        Raises: ValueError: the cursor is invalid
+        """
+        response = dict(total=0, data=[], next_cursor=None)
+        start = (page_num - 1) * page_size
+        if cursor:
+            query_body = self._format_paging_query_all(page_size, search_after=self.decode_cursor(cursor))
+        elif start + page_size <= MAX_PAGE_SIZE:
+            query_body = self._format_paging_query_all(page_size, start=start)
+        else:
+            search_after = await self._async_skip_packages(start)
+            if search_after is None:
+                response['total'] = await self._async_count_packages()
+                return response
+            query_body = self._format_paging_query_all(page_size, search_after=search_after)
+        query_result = await self._db_session.async_query(index=self.index, body=query_body)
+        if not self._process_page_response(response, query_result, page_size):
+            return response
+        response['total'] = await self._async_count_packages()
+        return response
+
+    def _process_page_response(self, response, query_result, page_size):
+        """
+        Add the packages of a page of all packages and the cursor of the next page to the response
+        Args:
+            response: result of query package details
+            query_result: result of the query of the page
+            page_size: page size
+
+        Returns: False if the result has no hits
+        """
+        if not query_result:
+            return False
+        try:
+            rpm_info_list = query_result['hits']['hits']
+        except KeyError:
+            return False
+        if self.rpm_type == SOURCE_DB_TYPE:
+            self._process_query_src_response(response, rpm_info_list)
+        elif self.rpm_type == BINARY_DB_TYPE:
+            self._process_query_bin_response(response, rpm_info_list)
+        if len(rpm_info_list) == page_size and rpm_info_list[-1].get('sort'):
+            response['next_cursor'] = self.encode_cursor(rpm_info_list[-1]['sort'])
+        return True
+
+    def _skip_packages(self, number):
+        """
+        Walk over the first packages of the index with search_after, only the sort values are fetched.
+        The packages are walked page by page, so a deep page_num costs a query for every
+        MAX_PAGE_SIZE packages before it, the next_cursor of the previous page avoids the walk
+        Args:
+            number: number of packages to skip
+
+        Returns: sort values of the last skipped package, None if there are not so many packages
+        """
+        search_after = None
+        while number > 0:
+            size = min(number, MAX_PAGE_SIZE)
+            query_body = self._format_paging_query_all(size, search_after=search_after)
+            query_body['_source'] = False
+            query_result = self._db_session.query(index=self.index, body=query_body)
+            hits = query_result['hits']['hits'] if query_result else []
+            if len(hits) < size:
+                return None
+            search_after = hits[-1]['sort']
+            number -= size
+        return search_after
+
+    async def _async_skip_packages(self, number):
+        """
+        Walk over the first packages of the index in the asyncio query path, the same as _skip_packages,
+        with the same cost for a deep page_num
+        Args:
+            number: number of packages to skip
+
+        Returns: sort values of the last skipped package, None if there are not so many packages
+        """
+        search_after = None
+        while number > 0:
+            size = min(number, MAX_PAGE_SIZE)
+            query_body = self._format_paging_query_all(size, search_after=search_after)
+            query_body['_source'] = False
+            query_result = await self._db_session.async_query(index=self.index, body=query_body)
+            hits = query_result['hits']['hits'] if query_result else []
+            if len(hits) < size:
+                return None
+            search_after = hits[-1]['sort']
+            number -= size
+        return search_after
+
+    def _count_packages(self):
+        """
+        Number of packages of the index, counted once for every generation of the database
+        Returns: number of packages
+        """
+        count_cache = CountCache(self.index)
+        try:
+            count = count_cache.get()
+        except RedisError as error:
+            LOGGER.warning(error)
+            count_cache, count = None, None
+        if count is not None:
+            return count
+        count = self._db_session.count(index=self.index, body=QueryBody.QUERY_ALL)['count']
+        if count_cache:
+            try:
+                count_cache.set(count)
+            except RedisError as error:
+                LOGGER.warning(error)
+        return count
+
+    async def _async_count_packages(self):
+        """
+        Number of packages of the index in the asyncio query path, the same as _count_packages
+        Returns: number of packages
+        """
+        count_cache = CountCache(self.index)
+        try:
+            count = count_cache.get()
+        except RedisError as error:
+            LOGGER.warning(error)
+            count_cache, count = None, None
+        if count is not None:
+            return count
+        count = (await self._db_session.async_count(index=self.index, body=QueryBody.QUERY_ALL))['count']
+        if count_cache:
+            try:
+                count_cache.set(count)
+            except RedisError as error:
+                LOGGER.warning(error)
+        return count
+
+    @staticmethod
+    def encode_cursor(sort_values):
+        """
+        Encode the sort values of the last package of a page into an opaque cursor
+        Args:
+            sort_values: sort values of the package
+
+        Returns: cursor
+        """
+        return base64.urlsafe_b64encode(json.dumps(sort_values).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode the sort values of the last package of the previous page from a cursor
+        Args:
+            cursor: next_cursor of the previous page
+
+        Returns: sort values
+        Raises: ValueError: the cursor is invalid
+        """
+        try:
+            sort_values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (binascii.Error, UnicodeError, json.JSONDecodeError) as error:
+            raise ValueError("invalid cursor: %s" % cursor) from error
+        if not isinstance(sort_values, list) or len(sort_values) != len(QueryPackage.PAGING_SORT):
+            raise ValueError("invalid cursor: %s" % cursor)
+        return sort_values
+
     def _process_query_body(self, command_line, page_num, page_size, rpm_list):
         """
         Splicing query statements through parameters
@@ -212,21 +626,14 @@ class QueryPackage(object):
         Returns: query body
 
         """
-        # is or not query all data,used for get data number
-        query_all = False
-        if command_line and rpm_list:
+        if command_line:
             # Query specify rpm_list of Command line mode
             query_body = self._process_query_terms(DEFAULT_PAGE_NUM, MAX_PAGE_SIZE, rpm_list)
         else:
-            if rpm_list is None:
-                # Query all data and Pagination of UI mode
-                query_body = self._format_paging_query_all(page_num, page_size)
-                query_all = True
-            else:
-                # Query specify rpm_list of UI mode
-                query_body = self._process_query_terms(page_num, page_size, rpm_list)
+            # Query specify rpm_list of UI mode
+            query_body = self._process_query_terms(page_num, page_size, rpm_list)
 
-        return query_body, query_all
+        return query_body
 
     @staticmethod
     def _process_src_response(database, data):
@@ -274,19 +681,23 @@ class QueryPackage(object):
         return query_body.query_terms
 
     @staticmethod
-    def _format_paging_query_all(page_num, page_size):
+    def _format_paging_query_all(page_size, start=0, search_after=None):
         """
-        Format query_body of query all data by page
+        Format query_body of query all data by page, sorted by name
         Args:
-            page_num: page num
             page_size: page size
+            start: index of the first package, used without search_after
+            search_after: sort values of the package before the page
 
         Returns: query body
 
         """
-        query_body = QueryBody.PAGING_QUERY_ALL
-        query_body['from'] = (page_num - 1) * page_size
-        query_body['size'] = page_size
+        query_body = dict(QueryBody.PAGING_QUERY_ALL, sort=QueryPackage.PAGING_SORT, size=page_size)
+        if search_after is None:
+            query_body['from'] = start
+        else:
+            del query_body['from']
+            query_body['search_after'] = search_after
         return query_body
 
     @staticmethod
@@ -300,25 +711,7 @@ class QueryPackage(object):
         Returns: response
 
         """
-        src_info_list = []
-        for source in source_list:
-            src = dict()
-            source_info = source['_source']
-            src['src_name'] = source_info.get('name')
-            src['version'] = source_info.get('version')
-            src['release'] = source_info.get('release')
-            src['url'] = source_info.get('url')
-            src['license'] = source_info.get('rpm_license')
-            src['summary'] = source_info.get('summary')
-            src['description'] = source_info.get('description')
-            src['vendor'] = source_info.get('rpm_vendor')
-            src['href'] = source_info.get('location_href')
-            src['subpacks'] = [subpackage.get('name') for subpackage in source_info.get('subpacks')] \
-                if source_info.get('subpacks') else []
-            src_info = {source_info.get('name'): src}
-            src_info_list.append(src_info)
-
-        response['data'] = src_info_list
+        response['data'] = [QueryPackage._src_detail(source['_source']) for source in source_list]
         return response
 
     @staticmethod
@@ -332,28 +725,58 @@ class QueryPackage(object):
         Returns: response
 
         """
-        bin_info_list = []
-        for binary in binary_list:
-            bin_dict = dict()
-            binary_info = binary['_source']
-            bin_dict['bin_name'] = binary_info.get('name')
-            bin_dict['version'] = binary_info.get('version')
-            bin_dict['release'] = binary_info.get('release')
-            bin_dict['url'] = binary_info.get('url')
-            bin_dict['license'] = binary_info.get('rpm_license')
-            bin_dict['summary'] = binary_info.get('summary')
-            bin_dict['description'] = binary_info.get('description')
-            bin_dict['vendor'] = binary_info.get('rpm_vendor')
-            bin_dict['sourcerpm'] = binary_info.get('rpm_sourcerpm')
-            bin_dict['src_name'] = binary_info.get('src_name')
-            bin_dict['href'] = binary_info.get('location_href')
-            bin_dict['file_list'] = QueryPackage._process_file_lists(binary_info.get('filelists'))
-            bin_info = {binary_info.get('name'): bin_dict}
-            bin_info_list.append(bin_info)
-
-        response['data'] = bin_info_list
+        response['data'] = [QueryPackage._bin_detail(binary['_source']) for binary in binary_list]
         return response
 
+    @staticmethod
+    def _src_detail(source_info):
+        """
+        Details of a source package
+        Args:
+            source_info: _source of the document
+
+        Returns: {name: details}
+
+        """
+        src = dict()
+        src['src_name'] = source_info.get('name')
+        src['version'] = source_info.get('version')
+        src['release'] = source_info.get('release')
+        src['url'] = source_info.get('url')
+        src['license'] = source_info.get('rpm_license')
+        src['summary'] = source_info.get('summary')
+        src['description'] = source_info.get('description')
+        src['vendor'] = source_info.get('rpm_vendor')
+        src['href'] = source_info.get('location_href')
+        src['subpacks'] = [subpackage.get('name') for subpackage in source_info.get('subpacks')] \
+            if source_info.get('subpacks') else []
+        return {source_info.get('name'): src}
+
+    @staticmethod
+    def _bin_detail(binary_info):
+        """
+        Details of a binary package
+        Args:
+            binary_info: _source of the document
+
+        Returns: {name: details}
+
+        """
+        bin_dict = dict()
+        bin_dict['bin_name'] = binary_info.get('name')
+        bin_dict['version'] = binary_info.get('version')
+        bin_dict['release'] = binary_info.get('release')
+        bin_dict['url'] = binary_info.get('url')
+        bin_dict['license'] = binary_info.get('rpm_license')
+        bin_dict['summary'] = binary_info.get('summary')
+        bin_dict['description'] = binary_info.get('description')
+        bin_dict['vendor'] = binary_info.get('rpm_vendor')
+        bin_dict['sourcerpm'] = binary_info.get('rpm_sourcerpm')
+        bin_dict['src_name'] = binary_info.get('src_name')
+        bin_dict['href'] = binary_info.get('location_href')
+        bin_dict['file_list'] = QueryPackage._process_file_lists(binary_info.get('filelists'))
+        return {binary_info.get('name'): bin_dict}
+
     @staticmethod
     def _process_file_lists(file_lists):
         """
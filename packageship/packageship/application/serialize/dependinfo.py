@@ -19,6 +19,7 @@ from marshmallow import validate
 from marshmallow import pre_load
 from marshmallow import validates
 from marshmallow import ValidationError
+from packageship.application.common import constant
 from packageship.application.query import database
 
 
@@ -111,6 +112,20 @@ class DependSchema(Schema):
     node_type = fields.String(
         required=True, validate=validate.OneOf(["binary", "source"]))
     parameter = fields.Nested(OtherdependSchema, required=False)
+    # json: the whole result in one body, stream: chunked json, ndjson: one json object per line
+    format = fields.String(required=False, validate=validate.OneOf(
+        ["json", "stream", "ndjson"]))
+    # Cursor paging of the depend list, paging is used when page_size is given
+    page_size = fields.Integer(
+        required=False, validate=lambda x: constant.MAXIMUM_PAGE_SIZE >= x >= 1)
+    cursor = fields.String(required=False)
+    database = fields.String(required=False)
+    prefix = fields.String(required=False)
+    # Level of detail of the dependency graph
+    depth = fields.Integer(required=False, validate=lambda x: x >= 1)
+    max_nodes = fields.Integer(required=False, validate=lambda x: x >= 1)
+    max_fanout = fields.Integer(required=False, validate=lambda x: x >= 1)
+    known_nodes = fields.List(fields.String(), required=False)
 
     @pre_load
     def _update_paramter(self, data, **kwargs):
@@ -138,6 +153,9 @@ class DownSchema(Schema):
     depend_type = fields.String(required=True, validate=validate.OneOf(
         ["installdep", "builddep", "selfdep", "bedep", "src", "bin"]))
     parameter = fields.Nested(OtherdependSchema, required=False)
+    # csv files, or Parquet / Arrow IPC files which need pyarrow
+    format = fields.String(required=False, validate=validate.OneOf(
+        ["csv", "parquet", "arrow"]))
 
     @pre_load
     def _update_paramter(self, data, **kwargs):
@@ -153,3 +171,15 @@ class DownSchema(Schema):
                 fields.Nested(BedependSchema, required=True)
 
         return data
+
+
+class GraphSessionSchema(Schema):
+    """
+    Expand a node of a graph session validator
+    """
+
+    session_id = fields.String(required=True, validate=validate.Length(min=1))
+    node_name = fields.String(required=True)
+    direction = fields.String(required=False, validate=validate.OneOf(
+        ["requires", "be_requires", "both"]))
+    depth = fields.Integer(required=False, validate=lambda x: x >= 1)
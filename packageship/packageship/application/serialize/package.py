@@ -20,6 +20,7 @@ from marshmallow import validates
 from marshmallow import ValidationError
 
 from packageship.application.common import constant
+from packageship.application.query.pkg import QueryPackage
 from packageship.application.serialize.dependinfo import get_db
 
 
@@ -34,6 +35,8 @@ class PackageSchema(Schema):
         required=True, validate=lambda x: constant.MAXIMUM_PAGE_SIZE >= x >= 1, default=20)
     query_pkg_name = fields.String(required=False)
     command_line = fields.Boolean(required=False)
+    # next_cursor of the previous page, the page after it is returned instead of page_num
+    cursor = fields.String(required=False)
 
     @validates("database_name")
     def validate_name(self, database_name):
@@ -48,6 +51,21 @@ class PackageSchema(Schema):
         if database_name not in get_db():
             raise ValidationError("The name is not passed in the database")
 
+    @validates("cursor")
+    def validate_cursor(self, cursor):
+        """
+        validate cursor
+        Args:
+            cursor : next_cursor of the previous page
+
+        Raises:
+            ValidationError: The exception that failed to validate
+        """
+        try:
+            QueryPackage.decode_cursor(cursor)
+        except ValueError as error:
+            raise ValidationError(str(error))
+
 
 class SingleSchema(Schema):
     """
@@ -69,3 +87,15 @@ class SingleSchema(Schema):
         """
         if database_name not in get_db():
             raise ValidationError("The name is not passed in the database")
+
+
+class BinarySingleSchema(SingleSchema):
+    """
+    Single binary package validator, with the options of the file list
+    """
+    # list of full paths or compressed, grouped by directory
+    filelist_format = fields.String(
+        required=False, validate=validate.OneOf(["list", "compressed"]))
+    filelist_offset = fields.Integer(required=False, validate=lambda x: x >= 0)
+    filelist_limit = fields.Integer(
+        required=False, validate=lambda x: constant.MAX_PAGE_SIZE >= x >= 1)
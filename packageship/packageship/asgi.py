@@ -0,0 +1,278 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Description: ASGI entry point of the query service, served by any ASGI server, e.g.
+             uvicorn packageship.asgi:application
+             The install depend list and the pages of the package lists run on the asyncio
+             query path, a request stops querying the database as soon as its client
+             disconnects. The other requests are handled by the flask app in the threads
+             of the executor. Unlike selfpkg.py nothing is monkey patched by gevent.
+"""
+import asyncio
+import io
+import json
+import sys
+from urllib.parse import parse_qsl
+
+from packageship.application import init_app
+from packageship.application.appglobal import permissions
+from packageship.application.apps.dependinfo.view import DependList
+from packageship.application.apps.package.view import ParsePackageMethod
+from packageship.application.common.exc import ElasticSearchQueryException, DatabaseConfigException, \
+    PackageInfoGettingError
+from packageship.application.common.metrics import METRICS
+from packageship.application.common.remote import AsyncRequest
+from packageship.application.common.rsp import RspMsg
+from packageship.application.core.depend.install_depend import InstallDepend
+from packageship.application.core.pkginfo.pkg import Package
+from packageship.application.database.session import DatabaseSession
+from packageship.application.serialize.dependinfo import DependSchema
+from packageship.application.serialize.package import PackageSchema
+from packageship.application.serialize.validate import validate
+from packageship.libs.log import LOGGER
+
+app = init_app("query")
+
+
+@app.before_request
+def before_request():
+    """
+    Description: Global request interception
+    """
+    if not permissions():
+        return 'No right to perform operation'
+
+
+class AsgiApp:
+    """
+    Description: ASGI application of the query service
+
+    Attributes:
+        flask_app: flask app handling the requests of the synchronous path
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self._routes = {
+            ("POST", "/dependinfo/dependlist"): self._depend_list,
+            ("GET", "/packages/src"): self._source_packages,
+            ("GET", "/packages/bin"): self._binary_packages,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        """
+        Description: Keep the remote session between the requests while the server runs,
+                     close the connections of the asyncio query path when it stops
+        """
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                AsyncRequest.keep_alive()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await DatabaseSession().connection().async_close()
+                await AsyncRequest.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        """
+        Description: Handle a request, the handler is cancelled when the client disconnects
+        """
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.extend(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+
+        handler = asyncio.ensure_future(self._handle(scope, bytes(body)))
+        disconnect = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            await asyncio.wait([handler, disconnect], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect.cancel()
+        if not handler.done():
+            # The pending queries of the request are cancelled with it
+            handler.cancel()
+            LOGGER.info("The client disconnected, cancelled %s %s", scope["method"], scope["path"])
+            return
+        status, headers, content = handler.result()
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": content})
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    async def _handle(self, scope, body):
+        """
+        Description: Dispatch a request to the asyncio query path or to the flask app
+
+        Returns:
+            status, headers and content of the response
+        """
+        route = self._routes.get((scope["method"], scope["path"].rstrip("/") or "/"))
+        loop = asyncio.get_event_loop()
+        if route is None or not self._allowed(scope):
+            return await loop.run_in_executor(None, self._call_flask, scope, body)
+        response = await route(scope, body)
+        await loop.run_in_executor(None, METRICS.flush)
+        if response is None:
+            return await loop.run_in_executor(None, self._call_flask, scope, body)
+        return 200, [(b"content-type", b"application/json")], json.dumps(response).encode("utf-8")
+
+    def _allowed(self, scope):
+        """
+        Description: The permissions of the flask app, the flask app answers the forbidden requests
+        """
+        with self.flask_app.test_request_context(scope["path"], method=scope["method"]):
+            return permissions()
+
+    async def _depend_list(self, scope, body):
+        """
+        Description: The install depend list in one json body, the other depend types,
+                     the streamed formats and the paging are left to the flask app
+
+        Returns:
+            response body, None if the request is handled by the flask app
+        """
+        rspmsg = RspMsg()
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            return rspmsg.body('param_error')
+        if not isinstance(data, dict) or data.get("depend_type") != "installdep" or \
+                data.get("format", "json") != "json" or "page_size" in data:
+            return None
+        loop = asyncio.get_event_loop()
+        # The databases of db_priority are checked with a query of the synchronous client
+        result, error = await loop.run_in_executor(
+            None, lambda: validate(DependSchema, data, load=True, partial=("node_name", "node_type")))
+        if error or "parameter" not in result:
+            return rspmsg.body('param_error')
+        parameter = result["parameter"]
+        depend = InstallDepend(db_list=parameter["db_priority"])
+        try:
+            await depend.async_install_depend(result["packagename"], level=parameter.get("level", 0))
+        except (ElasticSearchQueryException, DatabaseConfigException):
+            return rspmsg.body('connect_db_error')
+        binary_dict, source_dict = depend.depend_dict
+        if not binary_dict and not source_dict:
+            return rspmsg.body('pack_name_not_found')
+        result_data = depend.depend_list()
+        DependList._sum_statistics(result_data["statistics"])
+        return rspmsg.body("success", resp=result_data)
+
+    async def _source_packages(self, scope, body):
+        return await self._packages(scope, Package().async_all_src_packages)
+
+    async def _binary_packages(self, scope, body):
+        return await self._packages(scope, Package().async_all_bin_packages)
+
+    @staticmethod
+    async def _packages(scope, all_packages):
+        """
+        Description: A page of the packages of a database, the command line is left to the flask app
+
+        Returns:
+            response body, None if the request is handled by the flask app
+        """
+        parse_method = ParsePackageMethod()
+        data = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        # The database name is checked with a query of the synchronous client
+        result, error = await asyncio.get_event_loop().run_in_executor(
+            None, lambda: validate(PackageSchema, data, load=True))
+        if error:
+            response = parse_method.rspmsg.body('param_error')
+            response['total_count'] = None
+            response['total_page'] = None
+            return response
+        if result.get("command_line"):
+            return None
+        page_size = result.get("page_size")
+        query_pkg_name = [result.get("query_pkg_name")] if result.get("query_pkg_name") else None
+        try:
+            result_all = await all_packages(
+                result.get("database_name"), page_num=result.get("page_num"), page_size=page_size,
+                package_list=query_pkg_name, cursor=result.get("cursor"))
+        except (ElasticSearchQueryException, DatabaseConfigException):
+            return parse_method.rspmsg.body('connect_db_error')
+        except PackageInfoGettingError:
+            return parse_method.rspmsg.body('pack_name_not_found')
+        if result_all:
+            return parse_method.parse_package(result_all, page_size)
+        return parse_method.rspmsg.body("table_name_not_exist")
+
+    def _call_flask(self, scope, body):
+        """
+        Description: Handle a request with the flask app, run in a thread of the executor
+
+        Returns:
+            status, headers and content of the response
+        """
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", ""),
+            "PATH_INFO": scope["path"],
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_PROTOCOL": "HTTP/%s" % scope.get("http_version", "1.1"),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        server = scope.get("server") or ("localhost", 80)
+        environ["SERVER_NAME"], environ["SERVER_PORT"] = server[0], str(server[1])
+        if scope.get("client"):
+            environ["REMOTE_ADDR"] = scope["client"][0]
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                name = "HTTP_" + name
+            environ[name] = environ[name] + "," + value if name in environ else value
+        environ.setdefault("CONTENT_LENGTH", str(len(body)))
+
+        response_start = dict()
+
+        def start_response(status, headers, exc_info=None):
+            response_start["status"] = int(status.split(" ", 1)[0])
+            response_start["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                                         for name, value in headers]
+
+        result = self.flask_app.wsgi_app(environ, start_response)
+        try:
+            content = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return response_start["status"], response_start["headers"], content
+
+
+application = AsgiApp(app)
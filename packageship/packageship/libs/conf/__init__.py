@@ -122,7 +122,7 @@ class Configs():
                     if _config_value.isdigit():
                         _config_value = int(_config_value)
                     elif _config_value.lower() in ('true', 'false'):
-                        _config_value = bool(_config_value)
+                        _config_value = _config_value.lower() == 'true'
                     setattr(self, _key.upper(), _config_value)
 
 
@@ -19,16 +19,57 @@ import os
 # Configuration file path for data initialization
 INIT_CONF_PATH = os.path.join('/', 'etc', 'pkgship', 'conf.yaml')
 
+# Packages whose install and build depend of all the levels are computed by the initialization
+# and read with one lookup by the queries, separated by commas, all for every package
+DEPEND_CLOSURE_PACKAGES = ''
+
 # If the path of the imported database is not specified in the configuration file, the
 # configuration in the system is used by default
 DATABASE_FOLDER_PATH = os.path.join('/', 'var', 'run', 'pkgship_dbs')
 
-# Default ip address of database
+# Default ip address of database, the nodes of a cluster are separated by commas,
+# a node is host or host:port
 DATABASE_HOST = '127.0.0.1'
 
 # Default port of database
 DATABASE_PORT = 9200
 
+# Connections kept by the connection pool of every node of the database
+DATABASE_MAXSIZE = 10
+
+# Seconds of the search, count and scroll requests to the database
+DATABASE_QUERY_TIMEOUT = 60
+
+# Seconds of the other requests to the database, the writes and the index changes
+DATABASE_WRITE_TIMEOUT = 60
+
+# Retries of a failed request on another node, the timed out requests are retried
+# only if database_retry_on_timeout is true
+DATABASE_MAX_RETRIES = 3
+DATABASE_RETRY_ON_TIMEOUT = False
+
+# Compress the request bodies, and accept compressed responses, of the database
+DATABASE_HTTP_COMPRESS = False
+
+# Seconds between two requests of the nodes of the cluster, 0 disables the sniffing,
+# the nodes are also sniffed when a node fails
+DATABASE_SNIFF_INTERVAL = 0
+
+# Send a query with the same preference to the same copies of the shards, whose caches
+# already hold its results
+DATABASE_PREFERENCE_ROUTING = False
+
+# Send a query again, to another node of the cluster, when it is not answered after the p95
+# of the queries of the process, the first answer is used
+DATABASE_HEDGED_READS = False
+
+# Minimum milliseconds waited before a query is sent again
+DATABASE_HEDGE_MIN_DELAY = 50
+
+# Maximum number of concurrent requests of the asyncio query path to the database,
+# which is also the size of its connection pool
+ASYNC_QUERY_CONCURRENCY = 50
+
 # Ordinary user query port, only the right to query data, no permission to write data
 QUERY_PORT = 8090
 
@@ -48,12 +89,27 @@ LOG_PATH = os.path.join('/', 'var', 'log', 'pkgship')
 # INFO DEBUG WARNING ERROR CRITICAL
 LOG_LEVEL = 'INFO'
 
+# Requests slower than the threshold are logged with the time spent in the database,
+# the cache and the serialization, the unit is millisecond, 0 disables the log
+SLOW_REQUEST_THRESHOLD = 3000
+
 # Maximum capacity of each file, the unit is byte, default is 30M
 BACKUP_COUNT = 30
 
 # The size of each log file, in bytes, the default size of a single log file is 30M
 MAX_BYTES = 31457280
 
+# How the records are written, sync: by the thread logging them, queue: they are
+# queued and written by a thread of the process, the requests do not wait for the log file
+LOG_MODE = 'sync'
+
+# Format of the records, text or json: one json document by record
+LOG_FORMAT = 'text'
+
+# Records below ERROR logged by a source line in a minute, the others are dropped and
+# counted in the next record of the line, 0 logs every record
+LOG_REPEAT_LIMIT = 0
+
 # The address of the Redis cache server can be either a published
 # domain or an IP address that can be accessed normally
 # The link address defaults to 127.0.0.1
@@ -76,3 +132,6 @@ TEMPORARY_DIRECTORY = '/opt/pkgship/tmp/'
 
 # The default storage location of the comparison result file
 COMPARE_OUTPUT_FILE = '/opt/pkgship/compare'
+
+# The dependencies of the compared databases kept by generation, unchanged databases are not queried again
+COMPARE_SNAPSHOT_PATH = '/opt/pkgship/compare/snapshots'
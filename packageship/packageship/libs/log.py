@@ -13,14 +13,119 @@
 """
 Logging related
 """
+import atexit
+import json
 import logging
 import os
 import pathlib
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 
 from concurrent_log_handler import ConcurrentRotatingFileHandler
 
 from .conf import configuration
 
+# Seconds of the window in which the records of a source line are counted by RepeatFilter
+REPEAT_INTERVAL = 60
+
+
+class JsonFormatter(logging.Formatter):
+    """
+        One json document by record
+    """
+
+    def format(self, record):
+        document = dict(time=self.formatTime(record, self.datefmt), name=record.name,
+                        file=record.filename, line=record.lineno, level=record.levelname,
+                        message=record.getMessage())
+        if record.exc_info:
+            document["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(document, ensure_ascii=False)
+
+
+class RepeatFilter(logging.Filter):
+    """
+        The records of a source line below ERROR are logged at most limit times in
+        REPEAT_INTERVAL seconds, the number of the dropped ones is added to the next
+        record of the line logged
+    """
+
+    def __init__(self, limit):
+        super(RepeatFilter, self).__init__()
+        self.limit = limit
+        # source line: start of the window, records logged, records dropped
+        self._windows = dict()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= REPEAT_INTERVAL:
+                dropped = window[2] if window else 0
+                window = self._windows[key] = [now, 0, 0]
+                if dropped:
+                    record.msg = "%s (%d similar records dropped)" % (record.getMessage(), dropped)
+                    record.args = None
+            if window[1] >= self.limit:
+                window[2] += 1
+                return False
+            window[1] += 1
+        return True
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+        The records are put on a queue and written by the handler in a thread of the
+        process, started by the first record of the process so that every forked worker
+        writes its own records; once closed, the records are written by the handler
+        directly and the thread is not started again
+    """
+
+    def __init__(self, handler):
+        super(BackgroundQueueHandler, self).__init__(queue.SimpleQueue())
+        self.handler = handler
+        self._listener = None
+        self._pid = None
+        self._closed = False
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _start(self):
+        with self._lock:
+            if self._closed or self._pid == os.getpid():
+                return
+            # The queue and the thread of the parent process are not the ones of a forked process
+            self.queue = queue.SimpleQueue()
+            self._listener = QueueListener(self.queue, self.handler, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        if self._closed:
+            if record.levelno >= self.handler.level:
+                self.handler.handle(record)
+            return
+        super(BackgroundQueueHandler, self).enqueue(record)
+
+    def close(self):
+        """
+            Write the records of the queue, then stop the thread
+        """
+        with self._lock:
+            self._closed = True
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+        super(BackgroundQueueHandler, self).close()
+
 
 class Log(object):
     """
@@ -43,6 +148,9 @@ class Log(object):
         self.__max_bytes = configuration.MAX_BYTES
         self.__backup_count = configuration.BACKUP_COUNT
         self.__level = configuration.LOG_LEVEL
+        self.__mode = configuration.LOG_MODE
+        self.__format = configuration.LOG_FORMAT
+        self.__repeat_limit = configuration.LOG_REPEAT_LIMIT
         self.__logger = logging.getLogger(name)
         self.__logger.setLevel(self.__level)
 
@@ -57,14 +165,24 @@ class Log(object):
         self.__set_handler()
 
     def __set_formatter(self):
-        formatter = logging.Formatter('%(asctime)s-%(name)s-%(filename)s-[line:%(lineno)d]'
-                                      '-%(levelname)s-[ log details ]: %(message)s',
-                                      datefmt='%a, %d %b %Y %H:%M:%S')
+        if self.__format == 'json':
+            formatter = JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S%z')
+        else:
+            formatter = logging.Formatter('%(asctime)s-%(name)s-%(filename)s-[line:%(lineno)d]'
+                                          '-%(levelname)s-[ log details ]: %(message)s',
+                                          datefmt='%a, %d %b %Y %H:%M:%S')
         self.__current_rotating_file_handler.setFormatter(formatter)
 
     def __set_handler(self):
         self.__current_rotating_file_handler.setLevel(self.__level)
-        self.__logger.addHandler(self.__current_rotating_file_handler)
+        if self.__repeat_limit:
+            # Dropped before they are queued or written
+            self.__logger.addFilter(RepeatFilter(self.__repeat_limit))
+        if self.__mode == 'queue':
+            # The requests only queue their records, the lock of the log file is taken by the thread
+            self.__logger.addHandler(BackgroundQueueHandler(self.__current_rotating_file_handler))
+        else:
+            self.__logger.addHandler(self.__current_rotating_file_handler)
 
     @property
     def logger(self):
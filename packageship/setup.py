@@ -69,6 +69,7 @@ setup(
             [
                 "packageship/application/initialize/mappings/bedepend.json",
                 "packageship/application/initialize/mappings/binary.json",
+                "packageship/application/initialize/mappings/closure.json",
                 "packageship/application/initialize/mappings/source.json",
             ],
         ),
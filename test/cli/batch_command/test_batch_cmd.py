@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the batch command
+"""
+import json
+import os
+import shutil
+import tempfile
+
+from requests import RequestException
+
+from packageship.application.cli.commands.batch import BatchCommand
+from packageship.application.cli.commands.db import DbPriorityCommand
+from packageship.application.common.constant import ResponseCode
+from test.cli import BaseTest, DATA_BASE_INFO
+
+
+class TestBatch(BaseTest):
+    """
+    The queries of a file are run in the process, their results are written as lines of json
+    """
+    cmd_class = BatchCommand
+
+    def setUp(self):
+        super(TestBatch, self).setUp()
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        DbPriorityCommand().register()
+        # The service is not started
+        self.mock_requests_get(side_effect=RequestException)
+        self.mock_requests_post(side_effect=RequestException)
+
+    def test_batch_queries(self):
+        """
+        test every query line has its result
+        """
+        self.mock_es_search(return_value=DATA_BASE_INFO)
+        queries = self.create_file(os.path.join(self.folder, "queries.txt"),
+                                   "dbs\n# comment\n\nnosuch Judy\ndbs -remote\n")
+        results = os.path.join(self.folder, "results.ndjson")
+        self.command_params = [queries, "-o", results]
+
+        self._execute_command()
+
+        with open(results, "r", encoding="utf-8") as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual([line["line"] for line in lines], [1, 4, 5])
+        self.assertEqual(lines[0]["status"], 200)
+        self.assertEqual(lines[0]["response"]["code"], ResponseCode.SUCCESS)
+        self.assertEqual(lines[0]["response"]["resp"], ["os-version"])
+        self.assertEqual(lines[1], dict(line=4, query="nosuch Judy", error="invalid command line"))
+        self.assertEqual(lines[2]["response"], lines[0]["response"])
@@ -21,7 +21,7 @@ from packageship.application.cli.commands.comparedep import CompareCommand
 from test.cli.compare_command import CompareBase
 
 SINGLE_CSV_FILE_COUNT = 1
-CSV_FILE_COUNT = 4
+CSV_FILE_COUNT = 5
 
 
 class CompareTest(CompareBase):
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Test the streaming comparison of the databases
+"""
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from packageship.application.core.compare.compare_repo import CompareRepo, FIELD
+
+
+def _binary(name, *depends):
+    return {name: dict(binary_name=name, src_name=name, src_version="1.0",
+                       requires=[dict(component="lib%s.so" % depend, com_bin_name=depend,
+                                      com_src_name=depend, com_src_version="1.0") for depend in depends])}
+
+
+class TestCompareRepo(unittest.TestCase):
+    """
+    The chunks of the databases arrive interleaved, the comparison is the same as with whole databases
+    """
+
+    def setUp(self):
+        self.out_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.out_path)
+
+    def _read(self, name):
+        with open(os.path.join(self.out_path, name), encoding='utf-8') as file:
+            return list(csv.reader(file))
+
+    def test_interleaved_chunks(self):
+        """
+        The csv of every database and the differences of the dependencies
+        """
+        chunks = [
+            ("db2", [_binary("bash", "glibc")]),
+            ("db1", [_binary("bash", "glibc", "ncurses")]),
+            ("db1", [_binary("vim"), _binary("ncurses", "glibc")]),
+            ("db2", [_binary("ncurses", "glibc", "glibc")]),
+        ]
+
+        self.assertTrue(CompareRepo(self.out_path, ["db1", "db2"]).stream_compare(iter(chunks)))
+
+        self.assertEqual(len(self._read("db1.csv")), 5)
+        self.assertEqual(self._read("db2.csv")[1][0], "bash->glibc")
+        self.assertEqual(self._read("compare.csv"), [
+            ["db1", "db2"],
+            ["bash->glibc", "bash->glibc"],
+            ["bash->ncurses", FIELD.EMPTY_FIELD],
+            ["vim->", FIELD.EMPTY_FIELD],
+            ["ncurses->glibc", "ncurses->glibc"],
+        ])
+
+    def test_whole_databases(self):
+        """
+        dbs_compare takes the dependencies of every database at once
+        """
+        depend_info = [{"db1": [_binary("bash", "glibc")]}, {"db2": [_binary("bash")]}]
+
+        self.assertTrue(CompareRepo(self.out_path, ["db1", "db2"]).dbs_compare(depend_info))
+
+        self.assertEqual(self._read("compare.csv")[1:], [
+            [FIELD.EMPTY_FIELD, "bash->"],
+            ["bash->glibc", FIELD.EMPTY_FIELD],
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Test the comparison reuses the snapshots of the unchanged databases
+"""
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from packageship.application.core.compare.compare_repo import CompareRepo, FIELD
+from packageship.application.core.compare.snapshot import CompareSnapshot
+from test.cli.compare_command.test_compare_repo import _binary
+
+
+class TestCompareSnapshot(unittest.TestCase):
+    """
+    A database is queried again only when its generation changed
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def _compare(self, name, chunks, generations):
+        out_path = os.path.join(self.path, name)
+        os.makedirs(out_path)
+        snapshot = CompareSnapshot(os.path.join(self.path, 'snapshots'), 'install', generations)
+        compare = CompareRepo(out_path, ['db1', 'db2'])
+        self.assertTrue(compare.stream_compare(iter(chunks), snapshot=snapshot))
+        return compare, out_path
+
+    @staticmethod
+    def _read(out_path, name):
+        with open(os.path.join(out_path, name), encoding='utf-8') as file:
+            return list(csv.reader(file))
+
+    def test_reuse_unchanged_database(self):
+        """
+        The unchanged base database is read from its snapshot, the changes of the other database are written
+        """
+        self._compare('first', [('db1', [_binary('bash', 'glibc')]), ('db2', [_binary('bash', 'glibc')])],
+                      dict(db1='a1', db2='b1'))
+        snapshot = CompareSnapshot(os.path.join(self.path, 'snapshots'), 'install', dict(db1='a1', db2='b2'))
+        self.assertEqual(snapshot.outdated(['db1', 'db2']), ['db2'])
+
+        compare, out_path = self._compare('second', [('db2', [_binary('bash', 'ncurses')])],
+                                          dict(db1='a1', db2='b2'))
+
+        self.assertEqual(self._read(out_path, 'db1.csv')[1][0], 'bash->glibc')
+        self.assertEqual(self._read(out_path, 'compare.csv')[1:], [
+            ['bash->glibc', FIELD.EMPTY_FIELD],
+            [FIELD.EMPTY_FIELD, 'bash->ncurses'],
+        ])
+        self.assertEqual(compare.changes, dict(db2=(1, 1)))
+        self.assertEqual(self._read(out_path, 'db2_changes.csv'), [
+            [FIELD.CHANGE, FIELD.DEPENDENCY],
+            [FIELD.ADDED, 'bash->ncurses'],
+            [FIELD.REMOVED, 'bash->glibc'],
+        ])
+        self.assertFalse(os.path.exists(os.path.join(out_path, 'db1_changes.csv')))
+
+    def test_no_generation(self):
+        """
+        The databases without a generation are always queried and have no snapshot
+        """
+        compare, out_path = self._compare('first', [('db1', [_binary('bash')]), ('db2', [_binary('bash')])],
+                                          dict(db1=None))
+
+        self.assertEqual(compare.changes, dict())
+        self.assertFalse(os.path.exists(os.path.join(self.path, 'snapshots')))
+
+
+if __name__ == '__main__':
+    unittest.main()
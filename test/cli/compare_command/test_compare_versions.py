@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Test the comparison of the package versions
+"""
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from packageship.application.common.evr import format_evr, label_compare, parse_evr, rpmvercmp
+from packageship.application.core.compare.compare_repo import CompareRepo, FIELD
+
+# Cases of the rpmvercmp tests of rpm: version1, version2, expected result
+RPMVERCMP_CASES = [
+    ("1.0", "1.0", 0), ("1.0", "2.0", -1), ("2.0", "1.0", 1),
+    ("2.0.1", "2.0.1", 0), ("2.0", "2.0.1", -1), ("2.0.1a", "2.0.1a", 0),
+    ("2.0.1a", "2.0.1", 1), ("5.5p1", "5.5p2", -1), ("5.5p10", "5.5p1", 1),
+    ("10xyz", "10.1xyz", -1), ("xyz10", "xyz10.1", -1), ("xyz.4", "8", -1),
+    ("8", "xyz.4", 1), ("xyz.4", "2", -1), ("5.5p2", "5.6p1", -1),
+    ("6.0.rc1", "6.0", 1), ("10b2", "10a1", 1), ("10a2", "10b2", -1),
+    ("1.0aa", "1.0a", 1), ("10.0001", "10.1", 0), ("10.0001", "10.0039", -1),
+    ("4.999.9", "5.0", -1), ("20101121", "20101122", -1), ("2_0", "2_0", 0),
+    ("2.0", "2_0", 0), ("a", "a", 0), ("a+", "a_", 0), ("+", "_", 0),
+    ("1.0~rc1", "1.0", -1), ("1.0~rc1", "1.0~rc2", -1), ("1.0~rc1~git123", "1.0~rc1", -1),
+    ("1.0^", "1.0", 1), ("1.0^git1", "1.0", 1), ("1.0^git1", "1.01", -1),
+    ("1.0^20160101", "1.0.1", -1), ("1.0^20160101^git1", "1.0^20160101", 1),
+    ("1.0~rc1^git1", "1.0~rc1", 1), ("1.0^git1~pre", "1.0^git1", -1),
+]
+
+
+class TestEvr(unittest.TestCase):
+    """
+    The versions are ordered as rpm orders them
+    """
+
+    def test_rpmvercmp(self):
+        """
+        The cases of the rpmvercmp tests of rpm
+        """
+        for version1, version2, expected in RPMVERCMP_CASES:
+            with self.subTest(version1=version1, version2=version2):
+                self.assertEqual(rpmvercmp(version1, version2), expected)
+
+    def test_label_compare(self):
+        """
+        The epoch is compared first, then the version and the release
+        """
+        self.assertEqual(label_compare(("1", "1.0", "1"), (None, "2.0", "1")), 1)
+        self.assertEqual(label_compare(("0", "1.0", "1"), (None, "1.0", "1")), 0)
+        self.assertEqual(label_compare((None, "1.0", "1.oe1"), (None, "1.0", "2.oe1")), -1)
+        self.assertEqual(parse_evr("2:1.0-3.oe1"), ("2", "1.0", "3.oe1"))
+        self.assertEqual(format_evr(*parse_evr("0:1.0-3")), "1.0-3")
+
+
+class TestCompareVersions(unittest.TestCase):
+    """
+    The version of the packages of the base database in the other databases
+    """
+
+    def setUp(self):
+        self.out_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.out_path)
+
+    def test_versions_compare(self):
+        dbs_versions = dict(
+            db1={"bash": (None, "5.0", "1"), "vim": (None, "8.2", "1"), "zlib": (None, "1.2", "1")},
+            db2={"bash": (None, "5.0", "1"), "vim": ("1", "8.1", "1"), "zlib": (None, "1.2~rc1", "1")},
+        )
+        compare = CompareRepo(self.out_path, ["db1", "db2"])
+
+        self.assertTrue(compare.versions_compare(dbs_versions))
+
+        with open(os.path.join(self.out_path, "versions.csv"), encoding="utf-8") as file:
+            self.assertEqual(list(csv.reader(file)), [
+                [FIELD.PACKAGE, "db1", "db2", "db2 change"],
+                ["bash", "5.0-1", "5.0-1", FIELD.SAME],
+                ["vim", "8.2-1", "1:8.1-1", FIELD.UPGRADE],
+                ["zlib", "1.2-1", "1.2~rc1-1", FIELD.DOWNGRADE],
+            ])
+        self.assertEqual(compare.version_changes, dict(db2={FIELD.UPGRADE: 1, FIELD.DOWNGRADE: 1}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -44,6 +44,19 @@ DB priority
         self.assert_result()
 
 
+    def test_local_mode(self):
+        """
+        test the query runs in the process without the service
+        """
+        self.command_params = ["-local"]
+        self.mock_requests_get(side_effect=RequestException)
+        self.mock_es_search(return_value=DATA_BASE_INFO)
+        self.excepted_str = """
+DB priority
+['os-version']
+        """
+        self.assert_result()
+
     def test_different_db_priority(self):
         """
         test different db priority
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the dependency chains written by Download
+"""
+import csv
+import os
+import shutil
+import unittest
+from packageship.application.core.depend.basedepend import BaseDepend
+from packageship.application.core.depend.down_load import Download
+
+
+class TestDownloadChain(unittest.TestCase):
+    """
+    Every dependency chain is one row of install_data.csv
+    """
+
+    def setUp(self):
+        self.depend = BaseDepend()
+        self.depend.dependency_type = "installdep"
+        self.depend.packagename = ["a"]
+        self.folder_path = None
+
+    def tearDown(self):
+        if self.folder_path:
+            shutil.rmtree(self.folder_path, ignore_errors=True)
+
+    def _add(self, name, install):
+        self.depend.binary_dict[name] = dict(
+            name=name, version="1.0", source_name=name + "-src", database="os-version",
+            install=install, build=[])
+
+    def _install_rows(self):
+        self.folder_path = Download(depend=self.depend).run()
+        with open(os.path.join(self.folder_path, "install_data.csv"), encoding="utf-8") as file:
+            return list(csv.reader(file))
+
+    def test_closed_chain(self):
+        """a chain back to a package on the path ends with 1"""
+        self._add("a", ["b", "c"])
+        self._add("b", ["c"])
+        self._add("c", ["a", "d", "missing"])
+        self._add("d", [])
+        package = ["%s", "%s-src", "1.0", "os-version"]
+
+        def row(*names):
+            return [value % name if "%s" in value else value
+                    for name in names for value in package]
+
+        self.assertEqual([row("a", "c", "d"),
+                          row("a", "c", "a") + ["1"],
+                          row("a", "b", "c")], self._install_rows())
+
+    def test_long_chain(self):
+        """a long install chain is written as one row"""
+        length = 3000
+        for index in range(length):
+            self._add("a" if not index else "p%d" % index,
+                      ["p%d" % (index + 1)] if index + 1 < length else [])
+        rows = self._install_rows()
+        self.assertEqual(1, len(rows))
+        self.assertEqual(length * Download.install_count, len(rows[0]))
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the file list decoding of binary packages
+"""
+from unittest import TestCase
+
+from packageship.application.core.pkginfo.pkg import BinaryPackage
+from packageship.application.serialize.package import BinarySingleSchema
+from packageship.application.serialize.validate import validate
+
+FILELISTS = [
+    {"dirname": "/usr/lib64", "filenames": "libJudy.so/libJudy.so.1/judy", "filetypes": "ffd"},
+    {"dirname": "/usr/share/doc", "filenames": "README/COPYING", "filetypes": "fg"},
+    # Repeated entries are listed once
+    {"dirname": "/usr/lib64", "filenames": "libJudy.so/libJudy.a", "filetypes": "ff"},
+]
+
+
+class TestFilelistDecode(TestCase):
+    """
+    class for test the file list decoding
+    """
+
+    def setUp(self):
+        self.package = BinaryPackage()
+
+    def test_ordered_unique_paths(self):
+        """The paths of every type keep their order and are listed once"""
+        self.assertEqual(self.package.parse_filelist_info(FILELISTS), {
+            "dir": ["/usr/lib64/judy"],
+            "file": ["/usr/lib64/libJudy.so", "/usr/lib64/libJudy.so.1", "/usr/share/doc/README",
+                     "/usr/lib64/libJudy.a"],
+            "ghost": ["/usr/share/doc/COPYING"]})
+
+    def test_compressed(self):
+        """The compressed file list groups the file names by directory"""
+        filelist = self.package.parse_filelist_info(FILELISTS, compressed=True)
+
+        self.assertEqual(filelist["file"], [
+            {"dirname": "/usr/lib64", "filenames": ["libJudy.so", "libJudy.so.1"]},
+            {"dirname": "/usr/share/doc", "filenames": ["README"]},
+            {"dirname": "/usr/lib64", "filenames": ["libJudy.a"]}])
+
+    def test_page_and_total(self):
+        """A page of the file list, with the number of files of every type"""
+        filelist, filelist_total = self.package.filelist_page(FILELISTS, offset=1, limit=2)
+
+        self.assertEqual(filelist["file"], ["/usr/lib64/libJudy.so.1", "/usr/share/doc/README"])
+        self.assertEqual(filelist["dir"], [])
+        self.assertEqual(filelist_total, {"dir": 1, "file": 4, "ghost": 1})
+
+    def test_wrong_filelists(self):
+        """Wrong file types or more file types than file names give an empty file list"""
+        for filelists in ([{"dirname": "/usr", "filenames": "a/b", "filetypes": "fx"}],
+                          [{"dirname": "/usr", "filenames": "a", "filetypes": "ff"}],
+                          [{"dirname": "/usr", "filetypes": "f"}]):
+            self.assertEqual(self.package.parse_filelist_info(filelists), {})
+        self.assertEqual(self.package.filelist_page(None)[1], {"dir": 0, "file": 0, "ghost": 0})
+
+    def test_filelist_options(self):
+        """The options of the file list are validated"""
+        data = {"database_name": "", "pkg_name": "Judy"}
+        for options in ({"filelist_format": "tree"}, {"filelist_offset": -1}, {"filelist_limit": 0}):
+            _, error = validate(BinarySingleSchema, dict(data, **options), load=True)
+            self.assertTrue(set(options) & set(error))
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the batched queries of single source package info
+"""
+import json
+from pathlib import Path
+from unittest import TestCase
+from unittest import mock
+
+from elasticsearch import Elasticsearch
+
+from packageship.application.core.pkginfo.pkg import SourcePackage
+from packageship.application.database.cache import PackageInfoCache
+
+MOCK_DATA_FOLDER = Path(Path(__file__).parent, "mock_data")
+
+
+class TestSourcePackageBatch(TestCase):
+    """
+    class for test the batched queries of source package info
+    """
+
+    def setUp(self):
+        """
+        Mock elasticsearch with the responses of Judy and redis with a dict
+        """
+        with open(Path(MOCK_DATA_FOLDER, "pkg_info_s.json"), "r") as file:
+            # Skip the database info, src_package_info starts from the source package
+            responses = json.load(file)[1:]
+        patcher = mock.patch.object(Elasticsearch, "search", side_effect=responses)
+        self.addCleanup(patcher.stop)
+        self.search = patcher.start()
+        self.cached = dict()
+        for name, value in (
+                ("get", lambda _self, names: {name: self.cached[name] for name in names if name in self.cached}),
+                ("set", lambda _self, details: self.cached.update(details))):
+            patcher = mock.patch.object(PackageInfoCache, name, value)
+            self.addCleanup(patcher.stop)
+            patcher.start()
+
+    def test_one_query_for_all_subpacks(self):
+        """
+        The provides and requires of all subpacks are queried once
+        """
+        result = SourcePackage().src_package_info(["Judy"], ["os-version"])
+
+        subpacks = result["os-version"][0]["subpacks"]
+        self.assertEqual([subpack["bin_name"] for subpack in subpacks], ["Judy", "Judy-devel", "Judy-help"])
+        self.assertEqual(subpacks[1]["requires"], [{"component": "Judy", "provided_by": ["Judy"]}])
+        # source package, build requires and its components, bedepend, install requires and its components
+        self.assertEqual(self.search.call_count, 6)
+        bedepend_body = self.search.call_args_list[3][1]["body"]
+        self.assertEqual(bedepend_body["query"]["bool"]["filter"]["terms"]["binary_name"],
+                         ["Judy", "Judy-devel", "Judy-help"])
+
+    def test_cached_detail(self):
+        """
+        The assembled detail is cached
+        """
+        result = SourcePackage().src_package_info(["Judy"], ["os-version"])
+        self.search.reset_mock()
+        cached_result = SourcePackage().src_package_info(["Judy"], ["os-version"])
+
+        self.assertEqual(cached_result, result)
+        self.search.assert_not_called()
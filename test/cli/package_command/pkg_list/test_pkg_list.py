@@ -14,7 +14,9 @@
 """
 test get all binary packages
 """
+import json
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 from requests import RequestException, Response
 from packageship.application.cli.commands.allpkg import AllPackageCommand
 from packageship.application.common.exc import ElasticSearchQueryException
@@ -143,3 +145,53 @@ HINT           :The remote connection is abnormal, please check the 'remote_host
         self.mock_requests_get(return_value=r)
         self.assert_result()
 
+    def test_concurrent_pages(self):
+        """test the pages after the first one are requested concurrently and printed in order"""
+        pages = {1: ["Judy", "Judy-devel"], 2: ["zlib"]}
+
+        class Resp:
+            status_code = 200
+
+            def __init__(self, url):
+                page = int(parse_qs(urlsplit(url).query)["page_num"][0])
+                self.text = json.dumps(dict(
+                    code="200", total_page=len(pages),
+                    resp=[dict(pkg_name=name, version="1.0") for name in pages[page]]))
+
+        self.command_params = ["os-version", "-concurrency", "2"]
+        self.mock_requests_get(side_effect=Resp)
+
+        names = [line.split()[0] for line in self.print_result.splitlines()
+                 if line.strip() and line.split()[-1] == "1.0"]
+        self.assertEqual(names, ["Judy", "Judy-devel", "zlib"])
+
+    def test_local_concurrent_pages(self):
+        """test the pages of a query in the process are requested one after the other"""
+        pages = {1: ["Judy", "Judy-devel"], 2: ["zlib"]}
+
+        class Resp:
+            status_code = 200
+
+            def __init__(self, method, url, **_):
+                page = int(parse_qs(urlsplit(url).query)["page_num"][0])
+                self.text = json.dumps(dict(
+                    code="200", total_page=len(pages),
+                    resp=[dict(pkg_name=name, version="1.0") for name in pages[page]]))
+
+        self.command_params = ["os-version", "-local", "-concurrency", "2"]
+        self.mock_requests_get(side_effect=RequestException)
+        self._to_update_kw_and_make_mock(
+            "packageship.application.cli.local.LocalService._dispatch", effect=Resp)
+
+        names = [line.split()[0] for line in self.print_result.splitlines()
+                 if line.strip() and line.split()[-1] == "1.0"]
+        self.assertEqual(names, ["Judy", "Judy-devel", "zlib"])
+
+    def test_wrong_concurrency(self):
+        """test the concurrency is a positive integer"""
+        self.command_params = ["os-version", "-concurrency", "0"]
+        self.excepted_str = """
+ERROR_CONTENT  :-concurrency must be a positive integer
+HINT           :Please check the parameter is valid and query again
+"""
+        self.assert_result()
@@ -48,6 +48,7 @@ if __name__ == "__main__":
     test_case_files = [
         os.path.join(TEST_CASE_PATH, "cli/"),
         os.path.join(TEST_CASE_PATH, "graph/"),
+        os.path.join(TEST_CASE_PATH, "dependinfo/"),
         os.path.join(TEST_CASE_PATH, "unpack/")
     ]
 
@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the closures of the hot packages stored by the initialization
+"""
+import unittest
+from unittest import mock
+
+from redis.exceptions import RedisError
+
+from packageship.application.common.constant import CLOSURE_INDEX
+from packageship.application.core.depend import BuildDepend, InstallDepend
+from packageship.application.core.depend.basedepend import BaseDepend
+from packageship.application.core.depend.closure import DependClosure
+from packageship.application.initialize.integration import InitializeService
+from packageship.libs.conf import configuration
+
+DB_LIST = ["os-version", "os-version-2"]
+
+
+class DependClosureTest(unittest.TestCase):
+    """
+    A query of all the levels of a hot package is answered by its closure
+    """
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(configuration, "DEPEND_CLOSURE_PACKAGES", "glibc, bash"),
+            mock.patch.object(DependClosure, "_session", new=mock.MagicMock()),
+            mock.patch.object(InstallDepend, "install_depend"),
+        ]
+        redis_conn = mock.MagicMock()
+        redis_conn.exists.side_effect = RedisError("redis is unavailable")
+        patches.append(mock.patch("packageship.application.common.constant.REDIS_CONN", new=redis_conn))
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        closure = BaseDepend()
+        closure.binary_dict = {"glibc": dict(name="glibc", version="2.28", source_name="glibc",
+                                             database="os-version", install=["bash"])}
+        closure.source_dict = {"glibc": dict(name="glibc", version="2.28", database="os-version")}
+        self.document = DependClosure("installdep", "glibc", DB_LIST).document(closure)
+        DependClosure._session.query.return_value = {"hits": {"hits": [self.document]}}
+
+    @staticmethod
+    def _query(packagename, level=0):
+        depend = InstallDepend(db_list=DB_LIST)
+        depend(depend_type="installdep", packagename=packagename,
+               parameter=dict(db_priority=DB_LIST, level=level))
+        return depend
+
+    def test_hot_package(self):
+        """the closure is read with one lookup of its id"""
+        depend = self._query(["glibc"])
+
+        self.assertEqual(depend.binary_dict["glibc"]["install"], ["bash"])
+        self.assertEqual(list(depend.source_dict), ["glibc"])
+        InstallDepend.install_depend.assert_not_called()
+        DependClosure._session.query.assert_called_once_with(
+            index=CLOSURE_INDEX, body={"query": {"ids": {"values": [self.document["_id"]]}}, "size": 1})
+
+    def test_not_stored(self):
+        """the depend is queried level by level if the closure is not stored"""
+        DependClosure._session.query.return_value = {"hits": {"hits": []}}
+
+        self._query(["glibc"])
+
+        InstallDepend.install_depend.assert_called_once_with(bin_name=["glibc"], level=0)
+
+    def test_not_looked_up(self):
+        """levels, several packages and other packages are not looked up"""
+        for packagename, level in ((["glibc"], 2), (["glibc", "bash"], 0), (["Judy"], 0)):
+            self._query(packagename, level)
+
+        DependClosure._session.query.assert_not_called()
+        self.assertEqual(InstallDepend.install_depend.call_count, 3)
+
+    def test_other_priority(self):
+        """a closure is computed with a database priority list"""
+        other = DependClosure("installdep", "glibc", list(reversed(DB_LIST)))
+        self.assertNotEqual(other.key, self.document["_id"])
+        self.assertNotEqual(DependClosure("builddep", "glibc", DB_LIST).key, self.document["_id"])
+
+
+class InitializeClosureTest(unittest.TestCase):
+    """
+    The initialization stores the closures of the configured packages
+    """
+
+    def setUp(self):
+        self.session = mock.MagicMock()
+        self.session.create_index.return_value = []
+        self.documents = []
+        patches = [
+            mock.patch.object(InitializeService, "_session", new=self.session),
+            mock.patch("packageship.application.query.database.get_db_priority", return_value=DB_LIST),
+            mock.patch("packageship.application.initialize.integration.helpers.bulk", side_effect=self._bulk),
+            mock.patch.object(InstallDepend, "install_depend"),
+            mock.patch.object(BuildDepend, "build_depend"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _bulk(self, _, actions):
+        actions = list(actions)
+        self.documents.extend(actions)
+        return len(actions), []
+
+    def _closures(self):
+        InitializeService()._closures()
+        return self.documents
+
+    def test_configured_packages(self):
+        """the install and build closures of every configured package are stored"""
+        with mock.patch.object(configuration, "DEPEND_CLOSURE_PACKAGES", "gcc,glibc"):
+            documents = self._closures()
+
+        self.assertEqual([(document["_source"]["depend_type"], document["_source"]["package"])
+                          for document in documents],
+                         [("installdep", "gcc"), ("installdep", "glibc"),
+                          ("builddep", "gcc"), ("builddep", "glibc")])
+        self.assertEqual(documents[0]["_id"], DependClosure("installdep", "gcc", DB_LIST).key)
+        InstallDepend.install_depend.assert_any_call(["glibc"], level=0)
+        BuildDepend.build_depend.assert_any_call(["gcc"], level=0, self_build=False)
+
+    def test_all_packages(self):
+        """all the packages of the databases have closures"""
+        self.session.scan_iter.side_effect = lambda index, body: iter(
+            [{"_source": {"name": "Judy"}}, {"_source": {"name": index.split("-")[-1]}}])
+        with mock.patch.object(configuration, "DEPEND_CLOSURE_PACKAGES", "all"):
+            documents = self._closures()
+
+        self.assertEqual([document["_source"]["package"] for document in documents],
+                         ["Judy", "binary", "Judy", "source"])
+
+    def test_not_configured(self):
+        """nothing is computed if no package is configured"""
+        with mock.patch.object(configuration, "DEPEND_CLOSURE_PACKAGES", ""):
+            self.assertEqual(self._closures(), [])
+        self.session.create_index.assert_not_called()
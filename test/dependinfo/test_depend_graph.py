@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the graph cache and the expand delta of dependgraph
+"""
+import json
+from unittest import mock
+from test.cli import ClientTest
+from test.graph.test_graph_layout import star_depend
+
+
+class DependGraphTest(ClientTest):
+    """
+    The dependgraph interface caches the graphs and returns expand deltas
+    """
+
+    def setUp(self):
+        super(DependGraphTest, self).setUp()
+        self.execute = mock.MagicMock(return_value=star_depend())
+        self._create_patch(
+            "packageship.application.core.depend.DispatchDepend.execute", new=self.execute)
+        self._create_patch(
+            "packageship.application.serialize.dependinfo.get_db", return_value=["os-version"])
+        self.hash_fields = dict()
+        redis_conn = mock.MagicMock()
+        redis_conn.hget.side_effect = lambda key, field: self.hash_fields.get((key, field))
+        redis_conn.hset.side_effect = lambda key, field, value: self.hash_fields.update(
+            {(key, field): value})
+        self._create_patch(
+            "packageship.application.common.constant.REDIS_CONN", new=redis_conn)
+
+    def _post(self, **kwargs):
+        body = {"packagename": ["root"], "depend_type": "installdep",
+                "node_name": "root", "node_type": "binary",
+                "parameter": {"db_priority": ["os-version"]}}
+        body.update(kwargs)
+        return json.loads(self.client.post("/dependinfo/dependgraph", data=json.dumps(body),
+                                           content_type="application/json").data)
+
+    def test_graph_cached(self):
+        """the graph of the same query and root is generated once"""
+        first = self._post(max_fanout=3)
+        second = self._post(max_fanout=3)
+        self.assertEqual("200", first["code"])
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.execute.call_count)
+        self._post(max_fanout=4)
+        self.assertEqual(2, self.execute.call_count)
+
+    def test_known_nodes(self):
+        """only the nodes the client does not show are returned"""
+        graph = self._post()["resp"]
+        delta = self._post(known_nodes=["root", "req0"])["resp"]
+        self.assertEqual(len(graph["nodes"]) - 2, len(delta["nodes"]))
+        self.assertNotIn("root", [node["id"] for node in delta["nodes"]])
+
+    def test_not_found(self):
+        """a node outside the depend result is not found"""
+        self.assertEqual("4003", self._post(node_name="missing")["code"])
+
+    def test_invalid_budget(self):
+        """budgets must be positive"""
+        self.assertEqual("4001", self._post(max_nodes=0)["code"])
@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the cursor paging of dependlist
+"""
+import json
+from unittest import mock
+from redis.exceptions import RedisError
+from test.cli import ClientTest
+from packageship.application.core.depend import DispatchDepend
+from packageship.application.core.depend.basedepend import BaseDepend
+from packageship.application.core.depend.paging import DependPaging
+from packageship.application.database.cache import PageCache
+
+
+class SortedSetRedis:
+    """
+    The redis commands of the paging index, kept in memory
+    """
+
+    def __init__(self):
+        self.data = dict()
+
+    def pipeline(self, transaction=True):
+        pipeline = mock.MagicMock()
+        commands = []
+        for name in ("zadd", "hset"):
+            setattr(pipeline, name, lambda *args, _name=name, **kwargs: commands.append(
+                (_name, args, kwargs)))
+        pipeline.execute.side_effect = lambda: [
+            getattr(self, name)(*args, **kwargs) for name, args, kwargs in commands]
+        return pipeline
+
+    def zadd(self, key, mapping):
+        members = self.data.setdefault(key, dict())
+        added = len(set(mapping) - set(members))
+        members.update(mapping)
+        return added
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        self.data.setdefault(key, dict()).update(mapping or {field: value})
+
+    def hget(self, key, field):
+        return self.data.get(key, dict()).get(field)
+
+    def hexists(self, key, field):
+        return field in self.data.get(key, dict())
+
+    @staticmethod
+    def _in_range(member, low, high):
+        member = member.encode("utf-8")
+        if low != "-" and not (member >= low[1:] if low[:1] == b"[" else member > low[1:]):
+            return False
+        return high == "+" or (member <= high[1:] if high[:1] == b"[" else member < high[1:])
+
+    def zrangebylex(self, key, low, high, start=None, num=None):
+        members = sorted(self.data.get(key, dict()), key=lambda member: member.encode("utf-8"))
+        members = [member for member in members if self._in_range(member, low, high)]
+        if start is not None:
+            members = members[start:start + num]
+        return members
+
+    def zlexcount(self, key, low, high):
+        return len(self.zrangebylex(key, low, high))
+
+
+class DependListPagingTest(ClientTest):
+    """
+    Pages of the dependlist interface, served from memory when redis is unavailable
+    """
+
+    def setUp(self):
+        super(DependListPagingTest, self).setUp()
+        depend = BaseDepend()
+        for index in range(45):
+            database = "os-version" if index % 3 else "os-version-2"
+            depend.binary_dict["bin%02d" % index] = dict(
+                name="bin%02d" % index, version="1.0", source_name="src%02d" % (index // 2),
+                database=database)
+        for index in range(23):
+            depend.source_dict["src%02d" % index] = dict(
+                name="src%02d" % index, version="1.0", database="os-version")
+        self.depend = depend
+        self._create_patch(
+            "packageship.application.core.depend.DispatchDepend.execute", return_value=depend)
+        self._create_patch(
+            "packageship.application.serialize.dependinfo.get_db",
+            return_value=["os-version", "os-version-2"])
+        redis_conn = mock.MagicMock()
+        redis_conn.hexists.side_effect = RedisError("redis is unavailable")
+        self._create_patch(
+            "packageship.application.common.constant.REDIS_CONN", new=redis_conn)
+
+    def _post(self, **paging):
+        body = {"packagename": ["bin00"], "depend_type": "installdep",
+                "parameter": {"db_priority": ["os-version", "os-version-2"]}}
+        body.update(paging)
+        return json.loads(self.client.post("/dependinfo/dependlist", data=json.dumps(body),
+                                           content_type="application/json").data)
+
+    def _pages(self, **paging):
+        pages = []
+        cursor = None
+        while True:
+            if cursor:
+                paging["cursor"] = cursor
+            response = self._post(**paging)
+            self.assertEqual("200", response["code"])
+            pages.append(response["resp"])
+            cursor = response["resp"]["next_cursor"]
+            if not cursor:
+                return pages
+
+    def test_pages_concatenate_to_the_whole_list(self):
+        """turning every page gives the whole list ordered by package name"""
+        plain = self._post()["resp"]
+        pages = self._pages(page_size=10)
+        self.assertEqual(5, len(pages))
+        binary_list = [row for page in pages for row in page["binary_list"]]
+        source_list = [row for page in pages for row in page["source_list"]]
+        self.assertEqual(sorted(plain["binary_list"], key=lambda row: row["binary_name"]),
+                         binary_list)
+        self.assertEqual(sorted(plain["source_list"], key=lambda row: row["source_name"]),
+                         source_list)
+        self.assertEqual(45, pages[0]["binary_total"])
+        self.assertEqual(23, pages[0]["source_total"])
+        self.assertEqual(plain["statistics"], pages[0]["statistics"])
+
+    def test_filters(self):
+        """database and prefix restrict the rows and the totals"""
+        pages = self._pages(page_size=4, database="os-version-2", prefix="bin1")
+        binary_list = [row for page in pages for row in page["binary_list"]]
+        self.assertEqual(["bin12", "bin15", "bin18"],
+                         [row["binary_name"] for row in binary_list])
+        self.assertEqual(3, pages[0]["binary_total"])
+        self.assertEqual(0, pages[0]["source_total"])
+
+    def test_invalid_cursor(self):
+        """an invalid cursor is a parameter error"""
+        self.assertEqual("4001", self._post(page_size=10, cursor="not a cursor")["code"])
+
+    def test_invalid_page_size(self):
+        """page size out of range is a parameter error"""
+        self.assertEqual("4001", self._post(page_size=0)["code"])
+
+    def test_not_found(self):
+        """an empty depend result is not found"""
+        self.depend.binary_dict.clear()
+        self.depend.source_dict.clear()
+        self.assertEqual("4003", self._post(page_size=10)["code"])
+
+    def test_cursor(self):
+        """cursor round trip, finished lists end the paging"""
+        markers = {"binary_list": "bin09", "source_list": None}
+        self.assertEqual(markers, DependPaging.decode_cursor(DependPaging.encode_cursor(markers)))
+        self.assertIsNone(DependPaging.encode_cursor({"binary_list": None, "source_list": None}))
+
+
+class DependListRedisPagingTest(DependListPagingTest):
+    """
+    Pages of the dependlist interface, read from the paging index stored in redis
+    """
+
+    def setUp(self):
+        super(DependListRedisPagingTest, self).setUp()
+        self.redis_conn = SortedSetRedis()
+        self._create_patch(
+            "packageship.application.common.constant.REDIS_CONN", new=self.redis_conn)
+
+    def _cache(self):
+        """the paging index stored for the depend result"""
+        key = [key for key in self.redis_conn.data if key.endswith("_binary_list")][0]
+        return PageCache(key[:-len("_binary_list")])
+
+    def test_store(self):
+        """the lists of every database and the statistics are stored once"""
+        self._pages(page_size=10)
+        pages = self._cache()
+        self.assertEqual(45, len(self.redis_conn.data[pages._index("binary_list")]))
+        self.assertEqual(15, len(self.redis_conn.data[pages._index("binary_list", "os-version-2")]))
+        self.assertEqual(1, DispatchDepend.execute.call_count)
+        self.assertEqual([row for row in self._post()["resp"]["statistics"] if "database" in row],
+                         pages.statistics())
+
+    def test_page_boundaries(self):
+        """a page starts after the marker, the next cursor points at its last row"""
+        self._post(page_size=10)
+        pages = self._cache()
+        first = pages.page("binary_list", "", 10)
+        self.assertEqual(["bin%02d" % index for index in range(10)],
+                         [row["binary_name"] for row in first])
+        second = pages.page("binary_list", "bin09", 10)
+        self.assertEqual("bin10", second[0]["binary_name"])
+        self.assertEqual([], pages.page("binary_list", "bin44", 10))
+
+        response = self._post(page_size=10)["resp"]
+        self.assertEqual({"binary_list": "bin09", "source_list": "src09"},
+                         DependPaging.decode_cursor(response["next_cursor"]))
+        response = self._post(page_size=10, cursor=response["next_cursor"])["resp"]
+        self.assertEqual("bin10", response["binary_list"][0]["binary_name"])
+
+    def test_prefix(self):
+        """the prefix filter ends at the last name starting with it"""
+        self._post(page_size=10)
+        pages = self._cache()
+        self.assertEqual(["bin%02d" % index for index in range(10, 20)],
+                         [row["binary_name"] for row in pages.page("binary_list", "", 20, prefix="bin1")])
+        self.assertEqual(["bin13", "bin14"],
+                         [row["binary_name"] for row in pages.page("binary_list", "bin12", 2, prefix="bin1")])
+        self.assertEqual(10, pages.count("binary_list", prefix="bin1"))
+        self.assertEqual(0, pages.count("binary_list", prefix="src"))
+        self.assertEqual(3, pages.count("binary_list", database="os-version-2", prefix="bin1"))
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the json, stream and ndjson response format of dependlist
+"""
+import json
+from test.cli import ClientTest
+from packageship.application.core.depend.basedepend import BaseDepend
+
+
+class DependListStreamTest(ClientTest):
+    """
+    The dependlist interface returns the same result in every response format
+    """
+
+    def setUp(self):
+        super(DependListStreamTest, self).setUp()
+        depend = BaseDepend()
+        for index in range(1203):
+            database = "os-version" if index % 3 else "os-version-2"
+            depend.binary_dict["bin%d" % index] = dict(
+                name="bin%d" % index, version="1.0", source_name="src%d" % (index // 2),
+                database=database)
+        for index in range(602):
+            depend.source_dict["src%d" % index] = dict(
+                name="src%d" % index, version="1.0", database="os-version")
+        self.depend = depend
+        self._create_patch(
+            "packageship.application.core.depend.DispatchDepend.execute", return_value=depend)
+        self._create_patch(
+            "packageship.application.serialize.dependinfo.get_db",
+            return_value=["os-version", "os-version-2"])
+
+    def _post(self, response_format=None):
+        body = {"packagename": ["bin0"], "depend_type": "installdep",
+                "parameter": {"db_priority": ["os-version", "os-version-2"]}}
+        if response_format:
+            body["format"] = response_format
+        return self.client.post("/dependinfo/dependlist", data=json.dumps(body),
+                                content_type="application/json")
+
+    def test_stream_same_as_json(self):
+        """chunked json is the same document as the plain json response"""
+        plain = json.loads(self._post().data)
+        response = self._post("stream")
+        self.assertTrue(response.is_streamed)
+        streamed = json.loads(response.data)
+        self.assertEqual(plain, streamed)
+        self.assertEqual(1203, len(streamed["resp"]["binary_list"]))
+        self.assertEqual(602, len(streamed["resp"]["source_list"]))
+        self.assertEqual({"sum": "Sum", "binarys_sum": 1203, "sources_sum": 602},
+                         streamed["resp"]["statistics"][-1])
+
+    def test_ndjson(self):
+        """ndjson carries one package per line"""
+        plain = json.loads(self._post().data)
+        response = self._post("ndjson")
+        self.assertEqual("application/x-ndjson", response.mimetype)
+        lines = [json.loads(line) for line in response.data.decode("utf-8").splitlines()]
+        self.assertEqual(plain["code"], lines[0]["code"])
+        resp = {"binary_list": [], "source_list": [], "statistics": []}
+        for line in lines[1:]:
+            for key, row in line.items():
+                resp[key].append(row)
+        self.assertEqual(plain["resp"], resp)
+
+    def test_not_found(self):
+        """empty results keep the not found response in every format"""
+        self.depend.binary_dict.clear()
+        self.depend.source_dict.clear()
+        for response_format in (None, "stream", "ndjson"):
+            self.assertEqual("4003", json.loads(self._post(response_format).data)["code"])
+
+    def test_wrong_format(self):
+        """unknown response format is a parameter error"""
+        self.assertEqual("4001", json.loads(self._post("xml").data)["code"])
+
+    def test_chunk_rows(self):
+        """rows are grouped into chunks"""
+        from packageship.application.apps.dependinfo.view import DependList
+        chunks = list(DependList()._chunks(iter(range(DependList.STREAM_CHUNK_ROWS + 1))))
+        self.assertEqual([DependList.STREAM_CHUNK_ROWS, 1], [len(chunk) for chunk in chunks])
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the parquet and arrow formats of downloadfiles
+"""
+import csv
+import io
+import json
+import unittest
+import zipfile
+from test.cli import ClientTest
+from test.dependinfo.test_download_stream import selfdep_result
+from packageship.application.common.export import ColumnarIo
+from packageship.application.core.depend.down_load import Download
+
+try:
+    import pyarrow
+    from pyarrow import ipc
+    from pyarrow import parquet
+except ImportError:
+    pyarrow = None
+
+
+class DownloadColumnarTest(ClientTest):
+    """
+    The columnar files hold the same data as the csv files
+    """
+
+    def setUp(self):
+        super(DownloadColumnarTest, self).setUp()
+        self.depend = selfdep_result(binaries=120)
+        self._create_patch(
+            "packageship.application.core.depend.DispatchDepend.execute", return_value=self.depend)
+        self._create_patch(
+            "packageship.application.serialize.dependinfo.get_db", return_value=["os-version"])
+
+    def _post(self, file_format):
+        body = {"packagename": ["src0"], "depend_type": "selfdep", "format": file_format,
+                "parameter": {"db_priority": ["os-version"]}}
+        return self.client.post("/dependinfo/downloadfiles", data=json.dumps(body),
+                                content_type="application/json")
+
+    def _csv_files(self):
+        zip_file = zipfile.ZipFile(io.BytesIO(self._post("csv").data))
+        return {name: list(csv.reader(io.StringIO(zip_file.read(name).decode("utf-8"))))
+                for name in zip_file.namelist()}
+
+    def test_chain_columns(self):
+        """every package of a chain is a row of the install table"""
+        tables = dict(Download(depend=self.depend).depend_columns())
+        install_rows = self._csv_files()["install_data.csv"]
+        install = tables["install_data"]
+        self.assertEqual(len(install_rows), len(set(install["chain"])))
+        first_chain = [name for chain, name in zip(install["chain"], install["binary_name"])
+                       if chain == 0]
+        self.assertEqual(install_rows[0][0::4][:len(first_chain)], first_chain)
+        self.assertEqual(sum(row[-1] == "1" for row in install_rows),
+                         len({chain for chain, closed in zip(install["chain"], install["closed"])
+                              if closed}))
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet(self):
+        """parquet files of the dependencies"""
+        zip_file = zipfile.ZipFile(io.BytesIO(self._post("parquet").data))
+        self.assertEqual(["full_amount_data.parquet", "install_data.parquet", "build.parquet"],
+                         zip_file.namelist())
+        table = parquet.read_table(pyarrow.BufferReader(zip_file.read("full_amount_data.parquet")))
+        full_rows = self._csv_files()["full_amount_data.csv"]
+        self.assertEqual([row[0] for row in full_rows],
+                         table.column("binary_name").to_pylist())
+        self.assertTrue(pyarrow.types.is_list(table.schema.field("install").type))
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrow(self):
+        """arrow ipc files keep the dictionary encoded names"""
+        zip_file = zipfile.ZipFile(io.BytesIO(self._post("arrow").data))
+        table = ipc.open_file(pyarrow.BufferReader(zip_file.read("install_data.arrow"))).read_all()
+        self.assertTrue(pyarrow.types.is_dictionary(table.schema.field("binary_name").type))
+        tables = dict(Download(depend=self.depend).depend_columns())
+        self.assertEqual(tables["install_data"]["binary_name"],
+                         table.column("binary_name").to_pylist())
+
+    def test_unavailable(self):
+        """the columnar formats need pyarrow"""
+        self._create_patch(
+            "packageship.application.common.export.ColumnarIo.available", return_value=False)
+        self.assertEqual("4001", json.loads(self._post("parquet").data)["code"])
+
+    def test_wrong_format(self):
+        """unknown formats are rejected"""
+        self.assertEqual("4001", json.loads(self._post("xlsx").data)["code"])
+        with self.assertRaises(ValueError):
+            ColumnarIo("xlsx")
@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the zip file streamed by downloadfiles
+"""
+import io
+import json
+import os
+import shutil
+import zipfile
+from test.cli import ClientTest
+from packageship.application.common.exc import ElasticSearchQueryException, StreamAbortedException
+from packageship.application.common.export import CompressIo
+from packageship.application.core.depend.basedepend import BaseDepend
+from packageship.application.core.depend.down_load import Download
+
+
+def selfdep_result(binaries):
+    """a selfdep result whose binaries install the next ones"""
+    depend = BaseDepend()
+    for index in range(binaries):
+        depend.binary_dict["bin%d" % index] = dict(
+            name="bin%d" % index, version="1.0", source_name="src%d" % (index % 10),
+            database="os-version", build=[],
+            install=["bin%d" % ((index + step) % binaries) for step in (1, 7)])
+    for index in range(10):
+        depend.source_dict["src%d" % index] = dict(
+            name="src%d" % index, version="1.0", database="os-version",
+            build=["bin%d" % (index * 3)])
+    depend.dependency_type = "selfdep"
+    depend.packagename = ["src0"]
+    return depend
+
+
+class DownloadStreamTest(ClientTest):
+    """
+    The zip file is compressed while it is sent and holds the same csv files
+    """
+
+    def setUp(self):
+        super(DownloadStreamTest, self).setUp()
+        self.depend = selfdep_result(binaries=300)
+        self._create_patch(
+            "packageship.application.core.depend.DispatchDepend.execute", return_value=self.depend)
+        self._create_patch(
+            "packageship.application.serialize.dependinfo.get_db", return_value=["os-version"])
+
+    def _post(self):
+        body = {"packagename": ["src0"], "depend_type": "selfdep",
+                "parameter": {"db_priority": ["os-version"]}}
+        return self.client.post("/dependinfo/downloadfiles", data=json.dumps(body),
+                                content_type="application/json")
+
+    def test_same_files(self):
+        """the zip file holds the csv files Download writes"""
+        response = self._post()
+        self.assertTrue(response.is_streamed)
+        self.assertEqual("application/zip", response.mimetype)
+        self.assertIn("src0_selfdep.zip", response.headers["Content-Disposition"])
+        zip_file = zipfile.ZipFile(io.BytesIO(response.data))
+        folder_path = Download(depend=self.depend).run()
+        try:
+            self.assertEqual(sorted(os.listdir(folder_path)), sorted(zip_file.namelist()))
+            for file_name in zip_file.namelist():
+                with open(os.path.join(folder_path, file_name), "rb") as csv_file:
+                    self.assertEqual(csv_file.read(), zip_file.read(file_name))
+        finally:
+            shutil.rmtree(folder_path)
+
+    def test_not_found(self):
+        """no dependency is not found"""
+        self.depend.binary_dict.clear()
+        self.depend.source_dict.clear()
+        self.assertEqual("4003", json.loads(self._post().data)["code"])
+
+    def test_chunks(self):
+        """large files are sent in several chunks"""
+        rows = (["package%d" % index, "1.0", "os-version"] for index in range(20000))
+        chunks = list(CompressIo().stream_zip([("large.csv", rows)]))
+        self.assertGreater(len(chunks), 1)
+        zip_file = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        self.assertEqual(20000, len(zip_file.read("large.csv").splitlines()))
+
+    @staticmethod
+    def _failing_rows(rows):
+        """rows of a file whose database scroll fails after the rows"""
+        for index in range(rows):
+            yield ["package%d" % index, "1.0", "os-version"]
+        raise ElasticSearchQueryException(index="os-version-binary")
+
+    def test_failed_before_the_response(self):
+        """a failure of the first rows is answered with download_failed"""
+        self._create_patch(
+            "packageship.application.core.depend.down_load.Download.depend_files",
+            return_value=[("install_data.csv", self._failing_rows(0))])
+        response = self._post()
+        self.assertEqual("70004", json.loads(response.data)["code"])
+
+    def test_failed_in_the_stream(self):
+        """a failure after the first chunks aborts the stream, the end of the zip file is not sent"""
+        chunks = []
+        with self.assertRaises(StreamAbortedException):
+            for chunk in CompressIo().stream_zip([("large.csv", self._failing_rows(20000))]):
+                chunks.append(chunk)
+        self.assertGreater(len(chunks), 1)
+        with self.assertRaises(zipfile.BadZipFile):
+            zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the graph session and its expand interface
+"""
+import json
+from unittest import mock
+from test.cli import ClientTest
+from test.graph.test_graph_layout import star_depend
+
+
+class MemoryRedis:
+    """
+    The redis commands of a graph session, kept in memory
+    """
+
+    def __init__(self):
+        self.data = dict()
+
+    def pipeline(self, transaction=True):
+        results = []
+        pipeline = mock.MagicMock()
+
+        def command(name):
+            return lambda *args, **kwargs: results.append(getattr(self, name)(*args, **kwargs))
+
+        for name in ("hset", "hsetnx", "sadd", "expire"):
+            setattr(pipeline, name, command(name))
+        pipeline.execute.side_effect = lambda: list(results)
+        return pipeline
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        self.data.setdefault(key, dict()).update(mapping or {field: value})
+
+    def hsetnx(self, key, field, value):
+        fields = self.data.setdefault(key, dict())
+        if field in fields:
+            return 0
+        fields[field] = value
+        return 1
+
+    def sadd(self, key, member):
+        members = self.data.setdefault(key, set())
+        added = member not in members
+        members.add(member)
+        return int(added)
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def hget(self, key, field):
+        return self.data.get(key, dict()).get(field)
+
+    def hmget(self, key, fields):
+        return [self.hget(key, field) for field in fields]
+
+
+class GraphSessionTest(ClientTest):
+    """
+    The graph session is created once and expanded node by node
+    """
+
+    def setUp(self):
+        super(GraphSessionTest, self).setUp()
+        depend = star_depend()
+        depend.binary_dict["req0"]["install"] = ["leaf0", "leaf1"]
+        for name, install in (("leaf0", ["deep0"]), ("leaf1", []), ("deep0", ["deep1"]), ("deep1", [])):
+            depend.binary_dict[name] = dict(
+                name=name, version="1.0", source_name=name.rstrip("0123456789"),
+                database="os-version", install=install, build=[])
+        self.execute = mock.MagicMock(return_value=depend)
+        self._create_patch(
+            "packageship.application.core.depend.DispatchDepend.execute", new=self.execute)
+        self._create_patch(
+            "packageship.application.serialize.dependinfo.get_db", return_value=["os-version"])
+        self._create_patch(
+            "packageship.application.common.constant.REDIS_CONN", new=MemoryRedis())
+
+    def _post(self, url, body):
+        return json.loads(self.client.post(url, data=json.dumps(body),
+                                           content_type="application/json").data)
+
+    def _create(self, **kwargs):
+        body = {"packagename": ["root"], "depend_type": "installdep",
+                "node_name": "root", "node_type": "binary",
+                "parameter": {"db_priority": ["os-version"]}}
+        body.update(kwargs)
+        return self._post("/dependinfo/graphsession", body)
+
+    def _expand(self, session_id, node_name, **kwargs):
+        body = dict(session_id=session_id, node_name=node_name, **kwargs)
+        return self._post("/dependinfo/graphsession/expand", body)
+
+    def test_create(self):
+        """the session starts with the graph around the root"""
+        response = self._create(depth=1)
+        self.assertEqual("200", response["code"])
+        nodes = {node["id"]: node for node in response["resp"]["nodes"]}
+        self.assertEqual(13, len(nodes))
+        self.assertEqual((0.0, 0.0), (nodes["root"]["x"], nodes["root"]["y"]))
+        self.assertLess(nodes["req0"]["y"], 0)
+        self.assertGreater(nodes["user0"]["y"], 0)
+        self.assertEqual(12, len(response["resp"]["edges"]))
+
+    def test_expand_returns_only_new(self):
+        """expanding returns the new nodes and edges once, without querying again"""
+        session_id = self._create(depth=1)["resp"]["session_id"]
+        response = self._expand(session_id, "req0", direction="requires")
+        self.assertEqual(["leaf0", "leaf1"],
+                         sorted(node["id"] for node in response["resp"]["nodes"]))
+        self.assertIn({"sourceID": "req0", "targetID": "leaf0"}, response["resp"]["edges"])
+        self.assertEqual({"nodes": [], "edges": []},
+                         self._expand(session_id, "req0")["resp"])
+        self.assertEqual(1, self.execute.call_count)
+
+    def test_expand_through_sent_nodes(self):
+        """a deeper expand goes on through the nodes the client already has"""
+        response = self._create(depth=1)
+        session_id = response["resp"]["session_id"]
+        req0 = [node for node in response["resp"]["nodes"] if node["id"] == "req0"][0]
+        response = self._expand(session_id, "root", direction="requires", depth=3)
+        nodes = {node["id"]: node for node in response["resp"]["nodes"]}
+        self.assertEqual(["deep0", "leaf0", "leaf1"], sorted(nodes))
+        self.assertLess(nodes["leaf0"]["y"], req0["y"])
+        self.assertIn({"sourceID": "leaf0", "targetID": "deep0"}, response["resp"]["edges"])
+        self.assertNotIn({"sourceID": "root", "targetID": "req0"}, response["resp"]["edges"])
+        nodes = self._expand(session_id, "req0", direction="requires", depth=3)["resp"]["nodes"]
+        self.assertEqual(["deep1"], [node["id"] for node in nodes])
+
+    def test_expand_position(self):
+        """new nodes are placed around the expanded node"""
+        response = self._create(depth=1)
+        req0 = [node for node in response["resp"]["nodes"] if node["id"] == "req0"][0]
+        nodes = self._expand(response["resp"]["session_id"], "req0")["resp"]["nodes"]
+        for node in nodes:
+            self.assertLess(node["y"], req0["y"])
+
+    def test_session_not_found(self):
+        """an unknown session is reported"""
+        self.assertEqual("4012", self._expand("missing", "root")["code"])
+
+    def test_node_not_found(self):
+        """a node outside the depend result is not found"""
+        session_id = self._create()["resp"]["session_id"]
+        self.assertEqual("4003", self._expand(session_id, "missing")["code"])
+
+    def test_invalid_direction(self):
+        """the direction is validated"""
+        self.assertEqual("4001", self._expand("session", "root", direction="left")["code"])
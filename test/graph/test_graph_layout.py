@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the layout, node budget and fanout of the dependency graph
+"""
+import unittest
+from packageship.application.core.depend.basedepend import BaseDepend
+from packageship.application.core.depend.graph import GraphInfo
+
+
+def star_depend():
+    """root installs ten packages and two packages install root"""
+    depend = BaseDepend()
+
+    def add(name, install=()):
+        depend.binary_dict[name] = dict(
+            name=name, version="1.0", source_name=name.rstrip("0123456789"),
+            database="os-version", install=list(install), build=[])
+
+    add("root", ["req%d" % index for index in range(10)])
+    for index in range(10):
+        add("req%d" % index)
+    add("user0", ["root"])
+    add("user1", ["root"])
+    return depend
+
+
+class TestGraphLayout(unittest.TestCase):
+    """
+    The graph layout is deterministic and bounded
+    """
+
+    def setUp(self):
+        self.depend = star_depend()
+
+    def _graph(self, **kwargs):
+        return GraphInfo(self.depend, **kwargs).generate_graph("root", "binary")
+
+    def test_deterministic(self):
+        """the same graph gets the same layout"""
+        self.assertEqual(self._graph(), self._graph())
+
+    def test_layers(self):
+        """requires below the root, be_requires above it"""
+        nodes = {node["id"]: node for node in self._graph()["nodes"]}
+        self.assertEqual((0.0, 0.0), (nodes["root"]["x"], nodes["root"]["y"]))
+        for index in range(10):
+            self.assertLess(nodes["req%d" % index]["y"], 0)
+        self.assertGreater(nodes["user0"]["y"], 0)
+        self.assertGreater(nodes["user1"]["y"], 0)
+        self.assertEqual(nodes["req0"]["color"], nodes["req9"]["color"])
+        self.assertGreater(nodes["root"]["size"], nodes["req0"]["size"])
+
+    def test_fanout(self):
+        """neighbours over the fanout are aggregated"""
+        graph = self._graph(max_fanout=3)
+        nodes = {node["id"]: node for node in graph["nodes"]}
+        self.assertEqual({"root", "req0", "req1", "req2", "user0", "user1", "root::requires"},
+                         set(nodes))
+        self.assertTrue(nodes["root::requires"]["aggregate"])
+        self.assertEqual(7, nodes["root::requires"]["count"])
+        self.assertTrue(nodes["root"]["expandable"])
+        self.assertIn({"sourceID": "root", "targetID": "root::requires"}, graph["edges"])
+
+    def test_node_budget(self):
+        """nodes over the budget are cut off"""
+        graph = self._graph(max_nodes=5)
+        nodes = {node["id"]: node for node in graph["nodes"]}
+        self.assertEqual(5, len(nodes))
+        self.assertTrue(nodes["root"]["expandable"])
+        for edge in graph["edges"]:
+            self.assertIn(edge["sourceID"], nodes)
+            self.assertIn(edge["targetID"], nodes)
+
+    def test_delta(self):
+        """delta holds the nodes the client does not show"""
+        graph = self._graph()
+        delta = GraphInfo.delta(graph, ["root", "req0", "req1"])
+        self.assertEqual(len(graph["nodes"]) - 3, len(delta["nodes"]))
+        self.assertNotIn({"sourceID": "root", "targetID": "req0"}, delta["edges"])
+        self.assertIn({"sourceID": "root", "targetID": "req2"}, delta["edges"])
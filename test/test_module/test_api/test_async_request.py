@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+test the sessions of the asynchronous remote requests
+"""
+import asyncio
+import unittest
+from unittest import mock
+
+from packageship.application.common.remote import AsyncRequest
+
+
+class AsyncRequestSessionTest(unittest.TestCase):
+    """
+    The session is closed with the request unless the application keeps it
+    """
+
+    def setUp(self):
+        self.sessions = []
+
+        async def _get(request, url, **_):
+            self.sessions.append(request.session)
+
+        patcher = mock.patch.object(AsyncRequest, "_get", new=_get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_own_session(self):
+        """every request closes its own session"""
+        async def requests():
+            await AsyncRequest.get("http://localhost/1")
+            await AsyncRequest.get("http://localhost/2")
+
+        asyncio.run(requests())
+
+        self.assertIsNot(self.sessions[0], self.sessions[1])
+        self.assertTrue(all(session.closed for session in self.sessions))
+        self.assertIsNone(AsyncRequest.session)
+
+    def test_kept_session(self):
+        """the requests share the session kept by the application until it is closed"""
+        async def requests():
+            AsyncRequest.keep_alive()
+            await AsyncRequest.get("http://localhost/1")
+            await AsyncRequest.get("http://localhost/2")
+            self.assertFalse(self.sessions[0].closed)
+            await AsyncRequest.close()
+
+        asyncio.run(requests())
+
+        self.assertIs(self.sessions[0], self.sessions[1])
+        self.assertTrue(self.sessions[0].closed)
+        self.assertIsNone(AsyncRequest.session)
+
+
+if __name__ == "__main__":
+    unittest.main()
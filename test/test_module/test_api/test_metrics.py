@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the metrics endpoint
+"""
+import fnmatch
+import unittest
+from unittest import mock
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from packageship.application import init_app
+from packageship.application.common import metrics
+from packageship.application.common.metrics import Metrics
+
+app = init_app('query')
+
+
+class MemoryRedis:
+    """
+    The redis commands of the metrics, kept in memory like redis with decode_responses
+    """
+
+    def __init__(self):
+        self.data = dict()
+
+    def pipeline(self, transaction=True):
+        pipeline = mock.MagicMock()
+        for name in ("hincrbyfloat", "hset", "expire"):
+            setattr(pipeline, name, getattr(self, name))
+        return pipeline
+
+    def hincrbyfloat(self, key, field, amount):
+        fields = self.data.setdefault(key, dict())
+        fields[field] = str(float(fields.get(field, 0)) + amount)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        mapping = mapping or {field: value}
+        self.data.setdefault(key, dict()).update({field: str(value) for field, value in mapping.items()})
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, dict()))
+
+    def scan_iter(self, match):
+        return [key for key in self.data if fnmatch.fnmatch(key, match)]
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Test the metrics are shared by the processes and exposed in the prometheus format
+    """
+
+    def setUp(self):
+        self.redis = MemoryRedis()
+        patcher = mock.patch("packageship.application.common.constant.REDIS_CONN", new=self.redis)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        # Drop the samples buffered by the requests of other tests while redis was not available
+        metrics.METRICS.flush()
+        self.redis.data.clear()
+        self.client = app.test_client()
+
+    def test_processes_share_counters(self):
+        """
+        The counters of several processes are added up in redis
+        """
+        for _ in range(2):
+            process = Metrics()
+            process.inc("pkgship_cache_requests_total", dict(result="hit"))
+            process.observe("pkgship_es_request_duration_seconds",
+                            dict(operation="query", index="os-version-binary"), 0.02)
+            process.flush()
+
+        text = Metrics().collect()
+        self.assertIn('pkgship_cache_requests_total{result="hit"} 2\n', text)
+        self.assertIn("# TYPE pkgship_es_request_duration_seconds histogram\n", text)
+        buckets = [line for line in text.splitlines() if line.startswith("pkgship_es_request_duration_seconds_bucket")]
+        self.assertEqual(buckets[0], 'pkgship_es_request_duration_seconds_bucket'
+                                     '{index="os-version-binary",le="0.005",operation="query"} 0')
+        self.assertTrue(buckets[-1].startswith('pkgship_es_request_duration_seconds_bucket{'
+                                               'index="os-version-binary",le="+Inf",operation="query"} 2'))
+
+    def test_redis_error_keeps_samples(self):
+        """
+        The samples are flushed once redis is available again
+        """
+        process = Metrics()
+        process.inc("pkgship_gevent_jobs_total")
+        with mock.patch.object(self.redis, "pipeline", side_effect=RedisConnectionError()):
+            process.flush()
+        process.inc("pkgship_gevent_jobs_total")
+        process.flush()
+
+        self.assertEqual(self.redis.hgetall(metrics.METRICS_KEY)["pkgship_gevent_jobs_total"], "2.0")
+
+    def test_metrics_endpoint(self):
+        """
+        The requests of the service are observed by endpoint
+        """
+        self.client.get("/packages/tablecol")
+        response = self.client.get("/metrics")
+
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+        self.assertIn('pkgship_request_duration_seconds_count{depend_type="",endpoint="tablecolview"} 1',
+                      response.get_data(as_text=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
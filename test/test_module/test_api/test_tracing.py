@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+# -*- coding:utf-8 -*-
+"""
+test the tracing of the requests
+"""
+import unittest
+from unittest import mock
+
+import gevent
+
+from packageship.application import init_app
+from packageship.application.common import tracing
+from packageship.libs.conf import configuration
+
+app = init_app('query')
+
+
+class TestTracing(unittest.TestCase):
+    """
+    Test the spans, the Server-Timing header, the debug_timings and the slow request log
+    """
+    BASE_URL = "/packages/tablecol"
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_spans_of_greenlets(self):
+        """
+        The spans of the gevent jobs are recorded in the trace of the caller
+        """
+        trace, token = tracing.start_trace("test")
+        try:
+            with tracing.span("es.query"):
+                works = [tracing.spawn(tracing.traced("es.query")(lambda: None)) for _ in range(3)]
+                gevent.joinall(works)
+        finally:
+            tracing.end_trace(token)
+
+        breakdown = trace.breakdown()
+        self.assertEqual(breakdown["es.query"]["count"], 4)
+        self.assertEqual(breakdown["gevent.job"]["count"], 3)
+        self.assertIsNone(tracing.current_trace())
+
+    def test_no_trace(self):
+        """
+        Nothing is recorded outside of a request
+        """
+        with tracing.span("es.query"):
+            work = tracing.spawn(lambda: tracing.current_trace())
+            work.join()
+        self.assertIsNone(work.value)
+
+    def test_server_timing(self):
+        """
+        Every response has the Server-Timing header, the body is unchanged
+        """
+        response = self.client.get(self.BASE_URL)
+
+        self.assertIn("serialize;dur=", response.headers["Server-Timing"])
+        self.assertIn("total;dur=", response.headers["Server-Timing"])
+        self.assertNotIn("debug_timings", response.get_json())
+
+    def test_debug_timings(self):
+        """
+        The debug_timings are added to the response on demand
+        """
+        response = self.client.get(self.BASE_URL + "?debug_timings=1")
+
+        timings = response.get_json()["debug_timings"]
+        self.assertEqual(timings["spans"]["serialize"]["count"], 1)
+        self.assertGreaterEqual(timings["total"], timings["spans"]["serialize"]["duration"])
+
+    def test_slow_request_log(self):
+        """
+        The requests slower than the threshold are logged with their spans
+        """
+        with mock.patch.object(tracing, "LOGGER") as mock_logger:
+            with mock.patch.object(configuration, "SLOW_REQUEST_THRESHOLD", 0):
+                self.client.get(self.BASE_URL)
+            mock_logger.warning.assert_not_called()
+            with mock.patch.object(configuration, "SLOW_REQUEST_THRESHOLD", 0.000001):
+                self.client.get(self.BASE_URL)
+        self.assertIn("serialize", mock_logger.warning.call_args[0][-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,7 @@
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
 import os
+import time
 from unittest import TestCase, mock
 from unittest.mock import MagicMock
 
@@ -19,7 +20,11 @@ from elasticsearch.client.indices import IndicesClient
 from elasticsearch.exceptions import ElasticsearchException, TransportError
 
 from packageship.application.common.exc import ElasticSearchQueryException, DatabaseConfigException
+from packageship.application.common.metrics import METRICS
 from packageship.application.database.engines.elastic import ElasticSearch
+from packageship.application.database.engines.elastic.elasticdb import _nodes
+from packageship.application.database.engines.elastic.hedge import HedgeDelay, HEDGE_PREFERENCE_SUFFIX
+from packageship.libs.conf import configuration
 
 MOCK_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data/mapping.json")
 
@@ -68,6 +73,27 @@ class TestEsQuery(TestCase):
 
         self.assertEqual(result, data)
 
+    @mock.patch.object(helpers, "scan")
+    def test_scan_iter_metrics(self, mock_scan):
+        """
+        Test the scroll of scan_iter is recorded once, when it is exhausted
+        Args:
+            mock_scan: mock elasticsearch scan operation
+        Returns:
+        """
+        mock_scan.return_value = iter([{"_source": {"name": "Judy"}}, {"_source": {"name": "zlib"}}])
+
+        es = self._es_init()
+        with mock.patch.object(METRICS, "observe") as mock_observe:
+            documents = es.scan_iter(index="test", body={"query": {"match_all": {}}})
+            mock_observe.assert_not_called()
+            self.assertEqual(len(list(documents)), 2)
+
+        durations = [call for call in mock_observe.call_args_list
+                     if call.args[0] == "pkgship_es_request_duration_seconds"]
+        self.assertEqual(len(durations), 1)
+        self.assertEqual(durations[0].args[1], dict(operation="scan", index="test"))
+
     def test_scan_failed(self):
         """
         Test elasticsearch scan failed
@@ -197,6 +223,78 @@ class TestEsQuery(TestCase):
         result = es_instance.delete_index(indices)
         self.assertEqual(result, "test1,test2")
 
+    def test_cluster_nodes(self):
+        """
+        Test the nodes of a cluster, the port of a node is the default one if not specified
+        Returns:
+        """
+        self.assertEqual(_nodes("192.168.1.1, 192.168.1.2:9201", "9200"),
+                         [dict(host="192.168.1.1", port=9200), dict(host="192.168.1.2", port=9201)])
+
+        es_instance = ElasticSearch(host="127.0.0.1,127.0.0.2:9201", port="9200")
+        hosts = [connection.host for connection in es_instance.client.transport.connection_pool.connections]
+        self.assertEqual(sorted(hosts), ["http://127.0.0.1:9200", "http://127.0.0.2:9201"])
+
+    def test_pool_usage(self):
+        """
+        Test the connections in use of the pools of the nodes
+        Returns:
+        """
+        es_instance = self._es_init()
+        pool = es_instance.client.transport.connection_pool.connections[0].pool
+        in_use, size = es_instance.pool_usage()
+
+        connection = pool._get_conn()
+        self.assertEqual(es_instance.pool_usage(), (in_use + 1, size))
+        pool._put_conn(connection)
+        self.assertEqual(es_instance.pool_usage(), (in_use, size))
+
+    def test_pool_usage_without_transport(self):
+        """
+        Test a client without a transport, such as a stand-in of the benchmarks, has no pool usage
+        Returns:
+        """
+        es_instance = self._es_init()
+        with mock.patch.object(es_instance, "client", new=object()):
+            self.assertEqual(es_instance.pool_usage(), (0, 0))
+
+    def test_hedged_query(self):
+        """
+        Test a query not answered after the delay is sent again, and the first answer is used
+        Returns:
+        """
+        def search(index, body, preference):
+            if preference.endswith(HEDGE_PREFERENCE_SUFFIX):
+                return dict(answer="hedge")
+            time.sleep(0.5)
+            return dict(answer="first")
+
+        with mock.patch.object(configuration, "DATABASE_HEDGED_READS", True), \
+                mock.patch.object(configuration, "DATABASE_PREFERENCE_ROUTING", True), \
+                mock.patch.object(configuration, "DATABASE_HEDGE_MIN_DELAY", 10), \
+                mock.patch.object(Elasticsearch, "search", side_effect=search) as mock_search:
+            es_instance = ElasticSearch(host="127.0.0.1,127.0.0.2", port="9203")
+            result = es_instance.query(index="test", body={"query": {"match_all": {}}})
+
+        self.assertEqual(result, dict(answer="hedge"))
+        preferences = [call.kwargs["preference"] for call in mock_search.call_args_list]
+        self.assertEqual(preferences[1], preferences[0] + HEDGE_PREFERENCE_SUFFIX)
+
+    def test_hedge_delay(self):
+        """
+        Test the delay is the p95 of the queries, not less than the minimum delay
+        Returns:
+        """
+        delay = HedgeDelay(0.01)
+        for duration in range(1, 101):
+            delay.add(duration / 1000)
+        self.assertAlmostEqual(delay.delay, 0.096)
+
+        delay = HedgeDelay(0.5)
+        for duration in range(1, 101):
+            delay.add(duration / 1000)
+        self.assertEqual(delay.delay, 0.5)
+
     @staticmethod
     def _es_init():
         return ElasticSearch(host="127.0.0.1", port="9200")
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import asyncio
+import os
+from unittest import TestCase
+from unittest.mock import AsyncMock, patch
+
+from packageship.application.query import Query
+from packageship.application.query.depend import InstallRequires
+from packageship.libs.conf import configuration
+from test.base_code.read_mock_data import MockData
+
+MOCK_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class TestAsyncInstallRequireDbQuery(TestCase):
+    DATABASE_LIST = ['os_version_1', 'os_version_2']
+    JUDY_BINARY_INFO = MockData.read_mock_json_data(os.path.join(MOCK_DATA_FILE, "JudyBinary.json"))
+    PROVIDES_COMPONENTS_INFO = MockData.read_mock_json_data(os.path.join(MOCK_DATA_FILE, "providesComponentsInfo.json"))
+    FILES_COMPONENTS_INFO = MockData.read_mock_json_data(os.path.join(MOCK_DATA_FILE, "filesComponentsInfo.json"))
+    EXPECT_VALUE = MockData.read_mock_json_data(os.path.join(MOCK_DATA_FILE, "returnJudyResult.json"))
+
+    def setUp(self):
+        """
+        Precondition for test cases
+        Returns:
+        """
+        self.session = Query().session
+        self.install_instance = InstallRequires(database_list=self.DATABASE_LIST)
+
+    def _mock_async_query(self, **kwargs):
+        patcher = patch.object(self.session, "async_query", new=AsyncMock(**kwargs))
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_same_result_as_gevent_path(self):
+        """
+        Test the asyncio query path returns the install requires of the gevent path
+        Returns:
+        """
+        self._mock_async_query(side_effect=[self.JUDY_BINARY_INFO,
+                                            self.PROVIDES_COMPONENTS_INFO,
+                                            self.FILES_COMPONENTS_INFO])
+
+        result = asyncio.run(self.install_instance.async_get_install_req(binary_list=['Judy']))
+
+        self.assertEqual(self._format_return(self.EXPECT_VALUE), self._format_return(result))
+
+    def test_query_no_data(self):
+        """
+        Test query for packages that do not exist
+        Returns:
+        """
+        self._mock_async_query(return_value={})
+
+        result = asyncio.run(self.install_instance.async_get_install_req(
+            binary_list=['Judy'], specify_db='os_version_1'))
+
+        self.assertEqual(result, [])
+
+    def test_cancel_pending_queries(self):
+        """
+        Test the pending queries are cancelled with the request
+        Returns:
+        """
+        cancelled = []
+
+        async def never_answer(index, body):
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.append(index)
+                raise
+
+        self._mock_async_query(side_effect=never_answer)
+
+        async def request():
+            task = asyncio.ensure_future(self.install_instance.async_get_install_req(
+                binary_list=['Judy%d' % i for i in range(150)], specify_db='os_version_1'))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(request())
+
+        # Two batches of binary packages were queried concurrently
+        self.assertEqual(len(cancelled), 2)
+
+    def test_bounded_concurrency(self):
+        """
+        Test no more requests than async_query_concurrency run at the same time
+        Returns:
+        """
+        running = []
+        peak = []
+
+        async def search(index, body):
+            running.append(index)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(index)
+            return {}
+
+        patcher = patch.object(self.session.async_client, "search", new=search)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.addCleanup(setattr, configuration, "ASYNC_QUERY_CONCURRENCY", configuration.ASYNC_QUERY_CONCURRENCY)
+        configuration.ASYNC_QUERY_CONCURRENCY = 2
+
+        async def requests():
+            # The semaphore belongs to the event loop of the test
+            self.session._async_semaphore = None
+            try:
+                await asyncio.gather(*[self.session.async_query(index="os_version_1-binary", body={})
+                                       for _ in range(6)])
+            finally:
+                self.session._async_semaphore = None
+
+        asyncio.run(requests())
+
+        self.assertEqual(len(peak), 6)
+        self.assertEqual(max(peak), 2)
+
+    @staticmethod
+    def _format_return(return_data):
+        format_data = [dict(binary_name=data.get('binary_name'),
+                            bin_version=data.get('bin_version'),
+                            database=data.get('database'),
+                            src_name=data.get('src_name'),
+                            src_version=data.get('src_version'),
+                            requires=sorted(data.get('requires'), key=lambda x: x.get('component')))
+                       for data in return_data
+                       ]
+        return format_data
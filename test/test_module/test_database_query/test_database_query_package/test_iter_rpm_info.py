@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+from unittest import TestCase
+from unittest import mock
+
+from elasticsearch import helpers
+
+from packageship.application.core.pkginfo.pkg import Package
+from packageship.application.query.pkg import QueryPackage
+from test.test_module.test_database_query.test_database_query_package.get_mock_data import ObtainMockData
+
+
+class TestIterRpmInfo(TestCase):
+    """
+    Test scrolling through packages' details
+    """
+    ALL_BINARY_RPM_INFO = ObtainMockData.get_data("allBinaryNoPaging.json")
+
+    def setUp(self):
+        """
+        Set up function
+        Returns: None
+
+        """
+        self.query_package = QueryPackage()
+        self.session = self.query_package._db_session
+
+    def _scan(self, hits):
+        """
+        Patch the scroll of elasticsearch, the hits are consumed one by one
+        Args:
+            hits: documents of the scroll
+
+        Returns: the mock of helpers.scan
+        """
+        patcher = mock.patch.object(helpers, "scan", return_value=iter(hits))
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_iter_bin_info_is_lazy(self):
+        """
+        Test the packages are yielded while scrolling
+        Returns:
+        """
+        hits = iter(self.ALL_BINARY_RPM_INFO)
+        self._scan(hits)
+        packages = self.query_package.iter_bin_info(database='os_version_1')
+        first = next(packages)
+
+        self.assertIn(self.ALL_BINARY_RPM_INFO[0]['_source']['name'], first)
+        self.assertEqual(len(list(hits)), len(self.ALL_BINARY_RPM_INFO) - 1)
+
+    def test_iter_bin_info_source_filter(self):
+        """
+        Test the scroll only fetches the fields of the details
+        Returns:
+        """
+        mock_scan = self._scan(self.ALL_BINARY_RPM_INFO)
+        packages = list(self.query_package.iter_bin_info(database='os_version_1'))
+
+        self.assertEqual(len(packages), len(self.ALL_BINARY_RPM_INFO))
+        query = mock_scan.call_args[1]['query']
+        self.assertEqual(query['_source'], QueryPackage.BINARY_FIELDS)
+        self.assertEqual(mock_scan.call_args[1]['index'], 'os_version_1-binary')
+
+    def test_iter_specify_packages_no_limit(self):
+        """
+        Test scroll specify packages, more than the maximum page size
+        Returns:
+        """
+        mock_scan = self._scan([])
+        names = ['pkg%d' % index for index in range(20000)]
+        list(self.query_package.iter_src_info(database='os_version_1', src_list=names + ['']))
+
+        query = mock_scan.call_args[1]['query']
+        self.assertEqual(query['query']['bool']['filter']['terms']['name'], names)
+        self.assertNotIn('size', query)
+
+    def test_command_line_total_without_count(self):
+        """
+        Test the total of the command line query is the number of scrolled packages
+        Returns:
+        """
+        self._scan(self.ALL_BINARY_RPM_INFO)
+        with mock.patch.object(self.session, "count") as mock_count:
+            query_result = self.query_package.get_bin_info(binary_list=None, database='os_version_1', page_num=1,
+                                                           page_size=20, command_line=True)
+        self.assertEqual(query_result['total'], len(self.ALL_BINARY_RPM_INFO))
+        mock_count.assert_not_called()
+
+    def test_iter_bin_packages(self):
+        """
+        Test the base info of binary packages, only the needed fields are fetched
+        Returns:
+        """
+        mock_scan = self._scan(self.ALL_BINARY_RPM_INFO)
+        packages = list(Package().iter_bin_packages('os_version_1'))
+
+        source = self.ALL_BINARY_RPM_INFO[0]['_source']
+        self.assertEqual(packages[0]['pkg_name'], source['name'])
+        self.assertEqual(packages[0]['source_name'], source['src_name'])
+        self.assertEqual(packages[0]['database'], 'os_version_1')
+        self.assertEqual(mock_scan.call_args[1]['query']['_source'], Package.BINARY_FIELDS)
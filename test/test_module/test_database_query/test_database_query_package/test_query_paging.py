@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+from unittest import TestCase
+from unittest import mock
+
+from packageship.application.common.constant import MAX_PAGE_SIZE
+from packageship.application.database.cache import CountCache
+from packageship.application.query.pkg import QueryPackage
+from packageship.application.serialize.package import PackageSchema
+from packageship.application.serialize.validate import validate
+
+
+class FakeIndex:
+    """
+    Sorted documents of an index, searched with from/size or search_after
+    """
+
+    def __init__(self, number):
+        # Names repeat, pkgKey breaks the tie
+        self.docs = [dict(_source=dict(name="pkg%05d" % (index // 2), pkgKey=index),
+                          sort=["pkg%05d" % (index // 2), index]) for index in range(number)]
+        self.bodies = []
+
+    def search(self, index, body):
+        """
+        Search the documents like elasticsearch
+        """
+        self.bodies.append(body)
+        if "search_after" in body:
+            docs = [doc for doc in self.docs if doc["sort"] > body["search_after"]]
+        else:
+            docs = self.docs[body["from"]:]
+        return dict(hits=dict(hits=docs[:body["size"]]))
+
+
+class TestQueryPaging(TestCase):
+    """
+    Test paging all packages with search_after
+    """
+
+    def setUp(self):
+        """
+        Set up function
+        Returns: None
+
+        """
+        self.query_package = QueryPackage()
+        self.index = FakeIndex(2 * MAX_PAGE_SIZE + 50)
+        session = self.query_package._db_session
+        for name, value in (("query", mock.Mock(side_effect=self.index.search)),
+                            ("count", mock.Mock(return_value=dict(count=len(self.index.docs))))):
+            patcher = mock.patch.object(session, name, value)
+            self.addCleanup(patcher.stop)
+            setattr(self, name, patcher.start())
+        self.cached = dict()
+        for name, value in (("get", lambda _self: self.cached.get(_self._key)),
+                            ("set", lambda _self, count: self.cached.update({_self._key: count}))):
+            patcher = mock.patch.object(CountCache, name, value)
+            self.addCleanup(patcher.stop)
+            patcher.start()
+
+    def _names(self, response):
+        """
+        Names of the packages of a page
+        """
+        return [list(package.values())[0]['src_name'] for package in response['data']]
+
+    def test_shallow_page(self):
+        """
+        Test shallow pages are queried with from/size and a stable sort
+        Returns:
+        """
+        response = self.query_package.get_src_info(None, 'os_version_1', page_num=3, page_size=20)
+
+        body = self.index.bodies[-1]
+        self.assertEqual(body['from'], 40)
+        self.assertEqual(body['sort'], QueryPackage.PAGING_SORT)
+        self.assertEqual(response['total'], len(self.index.docs))
+        self.assertEqual(len(response['data']), 20)
+        self.assertEqual(QueryPackage.decode_cursor(response['next_cursor']), self.index.docs[59]['sort'])
+
+    def test_cursor_page(self):
+        """
+        Test the page after a cursor is queried with search_after and follows the previous page
+        Returns:
+        """
+        first = self.query_package.get_src_info(None, 'os_version_1', page_num=1, page_size=20)
+        second = self.query_package.get_src_info(None, 'os_version_1', page_num=1, page_size=20,
+                                                 cursor=first['next_cursor'])
+
+        body = self.index.bodies[-1]
+        self.assertNotIn('from', body)
+        self.assertEqual(body['search_after'], self.index.docs[19]['sort'])
+        expected = self.query_package.get_src_info(None, 'os_version_1', page_num=2, page_size=20)
+        self.assertEqual(second['data'], expected['data'])
+
+    def test_deep_page(self):
+        """
+        Test deep pages walk with search_after instead of a deep from
+        Returns:
+        """
+        page_num = MAX_PAGE_SIZE // 20 + 3
+        response = self.query_package.get_src_info(None, 'os_version_1', page_num=page_num, page_size=20)
+
+        self.assertTrue(all(body.get('from', 0) + body['size'] <= MAX_PAGE_SIZE for body in self.index.bodies))
+        self.assertTrue(all(body['_source'] is False for body in self.index.bodies[:-1]))
+        start = (page_num - 1) * 20
+        self.assertEqual(self._names(response),
+                         [doc['_source']['name'] for doc in self.index.docs[start:start + 20]])
+
+    def test_page_out_of_range(self):
+        """
+        Test a deep page after the last package
+        Returns:
+        """
+        response = self.query_package.get_src_info(None, 'os_version_1', page_num=MAX_PAGE_SIZE, page_size=20)
+
+        self.assertEqual(response['data'], [])
+        self.assertIsNone(response['next_cursor'])
+        self.assertEqual(response['total'], len(self.index.docs))
+
+    def test_last_page_no_cursor(self):
+        """
+        Test the last page has no next cursor
+        Returns:
+        """
+        response = self.query_package.get_src_info(None, 'os_version_1', page_num=1, page_size=20,
+                                                   cursor=QueryPackage.encode_cursor(self.index.docs[-6]['sort']))
+
+        self.assertEqual(len(response['data']), 5)
+        self.assertIsNone(response['next_cursor'])
+
+    def test_count_cached(self):
+        """
+        Test the total is counted once
+        Returns:
+        """
+        for page_num in range(1, 4):
+            self.query_package.get_bin_info(None, 'os_version_1', page_num=page_num, page_size=20)
+
+        self.count.assert_called_once()
+
+    def test_invalid_cursor(self):
+        """
+        Test invalid cursors are rejected
+        Returns:
+        """
+        for cursor in ('not a cursor', QueryPackage.encode_cursor(dict(name='Judy'))):
+            with self.assertRaises(ValueError):
+                QueryPackage.decode_cursor(cursor)
+            with mock.patch("packageship.application.serialize.package.get_db", return_value=['os_version_1']):
+                _, error = validate(PackageSchema, dict(database_name='os_version_1', page_num=1, page_size=20,
+                                                        cursor=cursor), load=True)
+            self.assertIn('cursor', error)
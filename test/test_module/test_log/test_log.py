@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2020-2020. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN "AS IS" BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Test the queued logging, the repeated records and the json format
+"""
+import json
+import logging
+import unittest
+from unittest import mock
+
+from packageship.libs import log
+from packageship.libs.log import BackgroundQueueHandler, JsonFormatter, RepeatFilter
+
+
+class ListHandler(logging.Handler):
+    """
+    Keeps the formatted records
+    """
+
+    def __init__(self):
+        super(ListHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(self.format(record))
+
+
+class TestLog(unittest.TestCase):
+    """
+    The records of the logger of the tests
+    """
+
+    def setUp(self):
+        self.handler = ListHandler()
+        self.logger = logging.getLogger("pkgship.test.log")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.addCleanup(self.logger.handlers.clear)
+        self.addCleanup(self.logger.filters.clear)
+
+    def _warn(self, times, name):
+        for _ in range(times):
+            self.logger.warning("package %s not found", name)
+
+    def test_repeat_filter(self):
+        """
+        The records of a line over the limit are dropped and counted in the next window
+        """
+        self.logger.addHandler(self.handler)
+        self.logger.addFilter(RepeatFilter(2))
+        with mock.patch.object(log.time, "monotonic", return_value=0):
+            self._warn(5, "Judy")
+            self.logger.error("error is always logged")
+        with mock.patch.object(log.time, "monotonic", return_value=log.REPEAT_INTERVAL):
+            self._warn(1, "zlib")
+
+        self.assertEqual(self.handler.records, [
+            "package Judy not found", "package Judy not found", "error is always logged",
+            "package zlib not found (3 similar records dropped)"])
+
+    def test_queue_handler(self):
+        """
+        The queued records are written by the thread in json
+        """
+        self.handler.setFormatter(JsonFormatter())
+        queue_handler = BackgroundQueueHandler(self.handler)
+        self.logger.addHandler(queue_handler)
+
+        self._warn(3, "Judy")
+        queue_handler.close()
+
+        records = [json.loads(record) for record in self.handler.records]
+        self.assertEqual([record["message"] for record in records], ["package Judy not found"] * 3)
+        self.assertEqual(records[0]["level"], "WARNING")
+        self.assertEqual(records[0]["file"], "test_log.py")
+
+
+    def test_queue_handler_closed(self):
+        """
+        The records logged after close are written directly, the thread is not started again
+        """
+        with mock.patch.object(log.atexit, "register") as register:
+            queue_handler = BackgroundQueueHandler(self.handler)
+        register.assert_called_once_with(queue_handler.close)
+        self.logger.addHandler(queue_handler)
+
+        self._warn(1, "Judy")
+        queue_handler.close()
+        with mock.patch.object(log, "QueueListener") as listener:
+            self._warn(1, "zlib")
+        listener.assert_not_called()
+
+        self.assertEqual(self.handler.records, ["package Judy not found", "package zlib not found"])
+
+if __name__ == '__main__':
+    unittest.main()